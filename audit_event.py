@@ -28,6 +28,11 @@ from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
+try:
+    from src import io_accounting
+except Exception:
+    io_accounting = None
+
 logger = logging.getLogger(__name__)
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -262,6 +267,8 @@ class AuditStore:
                         conn.close()
 
             self._retry(_insert)
+            if io_accounting:
+                io_accounting.record_write("audit_db", len(event.model_dump_json()))
             return event.id
 
         except Exception as e:
@@ -304,6 +311,60 @@ class AuditStore:
             logger.error("Failed to query unsynced audit events: %s", e)
             return []
 
+    def get_since(self, after_rowid: int, event_type: Optional[str] = None,
+                  limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Get events stored after a rowid, oldest first, for live streams.
+
+        Each event carries its "rowid"; pass the last one back to continue,
+        starting from last_rowid() to follow only new events.
+        """
+        try:
+            def _query():
+                with self._db_lock:
+                    conn = self._get_connection()
+                    try:
+                        query = ("SELECT rowid, id, timestamp, event_type, action, resource, value, "
+                                 "source, status, details FROM audit_events WHERE rowid > ?")
+                        params: list = [after_rowid]
+                        if event_type:
+                            query += " AND event_type = ?"
+                            params.append(event_type)
+                        query += " ORDER BY rowid ASC LIMIT ?"
+                        params.append(limit)
+                        events = []
+                        for row in conn.execute(query, params).fetchall():
+                            event = dict(row)
+                            if event["value"]:
+                                event["value"] = json.loads(event["value"])
+                            events.append(event)
+                        return events
+                    finally:
+                        conn.close()
+
+            return self._retry(_query)
+
+        except Exception as e:
+            logger.error("Failed to query audit events since %s: %s", after_rowid, e)
+            return []
+
+    def last_rowid(self) -> int:
+        """Rowid of the newest stored event (0 when empty)."""
+        try:
+            def _query():
+                with self._db_lock:
+                    conn = self._get_connection()
+                    try:
+                        return conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM audit_events").fetchone()[0]
+                    finally:
+                        conn.close()
+
+            return self._retry(_query)
+
+        except Exception as e:
+            logger.error("Failed to query last audit rowid: %s", e)
+            return 0
+
     def mark_synced(self, event_ids: List[str]) -> int:
         """Mark events as synced after successful upload."""
         if not event_ids:
@@ -27,12 +27,23 @@ EDGE_LOCAL_SERVER_PORT = 9090
 
 
 def _get_edge_url():
-    """Get the Edge local server URL from the persisted edge IP file.
+    """Get the Edge local server URL.
 
-    server.py (separate process) writes the Edge IP to data/edge_ip.txt
-    whenever a heartbeat arrives. We read it here since we run in main.py's
-    process and can't share in-memory state with server.py.
+    server.py reports each heartbeat to the controller over the controller
+    channel (src/controller_ipc.py), so the Edge IP is normally known in
+    this process (main.py). data/edge_ip.txt, written whenever the IP
+    changes, covers a controller restart before the next heartbeat.
     """
+    try:
+        try:
+            from src.operating_mode import get_mode_state
+        except ImportError:
+            from operating_mode import get_mode_state
+        edge_ip = get_mode_state().edge_ip
+        if edge_ip:
+            return f"http://{edge_ip}:{EDGE_LOCAL_SERVER_PORT}"
+    except Exception:
+        pass
     try:
         ip_file = os.path.join(os.path.dirname(__file__), "data", "edge_ip.txt")
         if os.path.exists(ip_file):
@@ -6,6 +6,7 @@ import time
 import threading
 import logging
 import json
+import hashlib
 from typing import Dict, List, Optional, Union, Any
 import configparser
 from watchdog.observers import Observer
@@ -35,49 +36,45 @@ from src.sensors.DO import DO
 from src.sensors.pH import pH
 from src.sensors.ec import EC
 from src.sensors.npk import NPK
+from src import lumina_logger
 from src.lumina_logger import GlobalLogger
+from src import io_accounting
+from src import status_report
+from src import config_snapshot
+from src import config_bus
+from src import poll_scheduler
+from src import reactive_dosing
+from src import action_dispatch
+from src import controller_ipc
+from src import operating_mode
+from src.relay_coalescer import safety_priority
 # Removed old RippleScheduler - now using simplified controllers
 
 logger = GlobalLogger("RippleController", log_prefix="ripple_").logger
 
+# Seconds process_actions waits for the relay echoes of one action.json batch
+ACTION_CONFIRM_TIMEOUT = 5.0
+
 class ConfigFileHandler(FileSystemEventHandler):
     """
     File system event handler for monitoring configuration file changes.
 
     Monitors the device configuration file (device.conf) and action file (action.json)
     for modifications and triggers appropriate reloading and processing operations.
-    Implements debouncing to prevent duplicate event processing and change detection
-    to identify specific configuration sections that were modified.
+    Implements debouncing to prevent duplicate event processing. device.conf
+    changes are published key by key on the controller's config change bus.
     """
     def __init__(self, controller):
         self.controller = controller
         self.last_action_state = {}
-        self.last_config_state = {}  # Store the last known state of the config file
-        # Load initial config state
-        self._load_current_config()
-        
-    def _load_current_config(self):
-        """Load the current state of the config file for comparison"""
-        try:
-            if os.path.exists(self.controller.config_file):
-                config = configparser.ConfigParser(empty_lines_in_values=False, interpolation=None)
-                config.read(self.controller.config_file)
-                
-                # Store a copy of the current config state
-                self.last_config_state = {}
-                for section in config.sections():
-                    self.last_config_state[section] = {}
-                    for key, value in config[section].items():
-                        self.last_config_state[section][key] = value
-                        
-                logger.debug(f"[WATCHDOG] Loaded current config state with {len(self.last_config_state)} sections")
-                # Debug: Log sprinkler section for monitoring
-                if 'Sprinkler' in self.last_config_state:
-                    logger.debug(f"[WATCHDOG] Sprinkler section loaded: {dict(self.last_config_state['Sprinkler'])}")
-        except Exception as e:
-            logger.error(f"Error loading current config state: {e}")
-            logger.exception("Full exception details:")
-        
+        # Latency and outcome of the last action.json batch (see process_actions)
+        self.last_action_report = None
+        self._snapshot_timer = None
+        self._snapshot_timer_lock = threading.Lock()
+        # Changes are diffed against the config as it was when monitoring started
+        self.controller.config_bus.set_baseline(
+            config_snapshot.get_config_snapshot(self.controller.config_file))
+
     def on_modified(self, event):
         """
         Handle file modification events from the file system monitor.
@@ -92,10 +89,8 @@ class ConfigFileHandler(FileSystemEventHandler):
         Note:
             - Docstring created by Claude 3.5 Sonnet on 2024-09-22
             - Implements debouncing to prevent duplicate event processing
-            - Detects changes in device.conf configuration sections
+            - Publishes key-level device.conf changes on the config change bus
             - Processes action.json for manual command execution
-            - Triggers selective configuration reloading based on changes
-            - Updates internal state tracking for future comparisons
         """
         try:
             # Normalize paths for comparison
@@ -112,6 +107,11 @@ class ConfigFileHandler(FileSystemEventHandler):
             else:
                 debounce_key = 'device.conf'
 
+            if debounce_key == 'device.conf':
+                # Debounced events are dropped below; make sure the snapshot still
+                # ends up matching the file once the burst is over
+                self._schedule_snapshot_refresh()
+
             with sys._config_debounce_lock:
                 current_time = time.time()
                 if debounce_key in sys._config_last_event_time:
@@ -129,18 +129,7 @@ class ConfigFileHandler(FileSystemEventHandler):
                 # Wait for sed -i rename to complete before reading the file
                 time.sleep(0.2)
 
-                # Identify which sections were changed
-                changed_sections = self._identify_changed_sections()
-
-                if changed_sections:
-                    logger.info(f"Changed sections detected: {changed_sections}")
-                    # Reload specific sections and trigger relevant checks
-                    self.controller.reload_specific_sections(changed_sections)
-                else:
-                    logger.info("No significant changes detected in config file")
-
-                # Update our stored config state for next comparison
-                self._load_current_config()
+                self._reload_and_publish()
 
             elif debounce_key == 'action.json':
                 logger.info("Action file modified, processing new actions")
@@ -151,54 +140,32 @@ class ConfigFileHandler(FileSystemEventHandler):
             logger.error(f"Error in on_modified handler: {e}")
             logger.exception("Full exception details:")
     
-    def _identify_changed_sections(self):
-        """Identify which sections in the config file have changed"""
-        changed_sections = set()
-        
-        try:
-            # Load the current config state
-            current_config = configparser.ConfigParser(empty_lines_in_values=False, interpolation=None)
-            current_config.read(self.controller.config_file)
-            
-            logger.debug(f"[WATCHDOG] Checking {len(current_config.sections())} sections against {len(self.last_config_state)} stored sections")
-            
-            # Check for new or modified sections
-            for section in current_config.sections():
-                # If this is a new section
-                if section not in self.last_config_state:
-                    logger.info(f"[WATCHDOG] New section detected: {section}")
-                    changed_sections.add(section)
-                    continue
-                
-                # Check for modified keys in existing sections
-                for key, value in current_config[section].items():
-                    if key not in self.last_config_state[section]:
-                        logger.info(f"[WATCHDOG] New key detected in {section}: {key} = {value}")
-                        changed_sections.add(section)
-                        break
-                    elif self.last_config_state[section][key] != value:
-                        logger.info(f"[WATCHDOG] Changed value in {section}.{key}: '{self.last_config_state[section][key]}' -> '{value}'")
-                        changed_sections.add(section)
-                        break
-            
-            # Check for deleted sections
-            for section in self.last_config_state:
-                if section not in current_config.sections():
-                    logger.info(f"[WATCHDOG] Deleted section detected: {section}")
-                    changed_sections.add(section)
-            
-            if changed_sections:
-                logger.info(f"[WATCHDOG] Total changed sections: {changed_sections}")
-            else:
-                logger.debug(f"[WATCHDOG] No changes detected between stored and current config")
-            
-            return changed_sections
-            
-        except Exception as e:
-            logger.error(f"Error identifying changed sections: {e}")
-            logger.exception("Full exception details:")
-            return set()  # Return empty set if there's an error
-    
+    def on_moved(self, event):
+        """Atomic writers (server.py config transactions) rename a temp file onto device.conf"""
+        if os.path.abspath(event.dest_path) == os.path.abspath(self.controller.config_file):
+            self.on_modified(event)
+
+    def _reload_and_publish(self):
+        """Swap in the current device.conf snapshot and publish key-level changes"""
+        snapshot = config_snapshot.reload_config_snapshot(self.controller.config_file)
+        changes = self.controller.config_bus.publish(snapshot)
+        if changes:
+            # Time from the file write to the handlers having run (write-to-applied)
+            applied_ms = (time.time() - snapshot.signature[0] / 1e9) * 1000 if snapshot.signature else 0.0
+            logger.info(f"[WATCHDOG] device.conf v{snapshot.version}: {len(changes)} key(s) changed, "
+                        f"applied {applied_ms:.0f} ms after write")
+        else:
+            logger.debug("No significant changes detected in config file")
+
+    def _schedule_snapshot_refresh(self, delay=0.5):
+        """Re-check device.conf once no further events arrive for `delay` seconds"""
+        with self._snapshot_timer_lock:
+            if self._snapshot_timer is not None:
+                self._snapshot_timer.cancel()
+            self._snapshot_timer = threading.Timer(delay, self._reload_and_publish)
+            self._snapshot_timer.daemon = True
+            self._snapshot_timer.start()
+
     def process_actions(self):
         try:
             # Check if file exists and is not empty before trying to read it
@@ -208,6 +175,7 @@ class ConfigFileHandler(FileSystemEventHandler):
 
             # Read the action file
             try:
+                written_at = os.path.getmtime('config/action.json')
                 with open('config/action.json', 'r') as f:
                     file_content = f.read().strip()
                     if not file_content:
@@ -217,7 +185,7 @@ class ConfigFileHandler(FileSystemEventHandler):
             except json.JSONDecodeError as e:
                 logger.error(f"Invalid JSON in action file: {e}")
                 # Try to reset the file to empty JSON object
-                with open('config/action.json', 'w') as f:
+                with io_accounting.open_accounted("action_json", 'config/action.json', 'w') as f:
                     json.dump({}, f)
                 return
 
@@ -238,165 +206,21 @@ class ConfigFileHandler(FileSystemEventHandler):
                     return
 
                 # NOTE: File clearing moved to AFTER processing to prevent action loss on crash
-                
-                # Read dynamic mappings from config file
-                # Make sure config is up-to-date
-                self.controller.config.read(self.controller.config_file)
-                config = self.controller.config
-                
-                # Log available sections for debugging
-                logger.info(f"Available config sections: {config.sections()}")
-                
-                action_mapping = {}
-                
-                # Create mapping function for a relay device
-                def create_relay_action(device_name):
-                    # Check if it's a single relay device or a group
-                    if ',' in device_name:
-                        # Handle group of devices using set_multiple_relays where possible
-                        devices = [d.strip() for d in device_name.split(',')]
-                        
-                        # For special group cases where we know relay indices
-                        if all(d in ["SprinklerA", "SprinklerB"] for d in devices) and len(devices) == 2:
-                            # Sprinklers are on adjacent indices (typically 9 and 10)
-                            logger.info(f"Using optimized set_multiple_relays for sprinklers")
-                            # Get the first relay key
-                            relay_key = list(relay_instance.relay_addresses.keys())[0]
-                            # Get indices from relay_assignments
-                            indices = []
-                            for device in devices:
-                                if device in relay_instance.relay_assignments:
-                                    indices.append(relay_instance.relay_assignments[device]['index'])
-                            if len(indices) == 2 and abs(indices[0] - indices[1]) == 1:
-                                # They're adjacent, use set_multiple_relays
-                                start_index = min(indices)
-                                return lambda status: relay_instance.set_multiple_relays(relay_key, start_index, [status, status])
-                        
-                        elif all(d.startswith("NutrientPump") for d in devices) and len(devices) == 3:
-                            # Nutrient pumps are on adjacent indices (typically 0, 1, 2)
-                            logger.info(f"Using optimized set_multiple_relays for nutrient pumps")
-                            # Get the first relay key
-                            relay_key = list(relay_instance.relay_addresses.keys())[0]
-                            # Get indices from relay_assignments
-                            indices = []
-                            for device in devices:
-                                if device in relay_instance.relay_assignments:
-                                    indices.append(relay_instance.relay_assignments[device]['index'])
-                            if len(indices) == 3 and max(indices) - min(indices) == 2:
-                                # They're adjacent, use set_multiple_relays
-                                start_index = min(indices)
-                                return lambda status: relay_instance.set_multiple_relays(relay_key, start_index, [status, status, status])
-                        
-                        # Fallback to individual relay control if optimization not possible
-                        logger.info(f"Using individual relay control for group: {devices}")
-                        return lambda status: [relay_instance.set_relay(device, status) for device in devices]
-                    else:
-                        # IMPORTANT: All controls should use set_relay directly
-                        # This ensures we correctly use case-insensitive relay lookup
-                        logger.info(f"Creating direct relay action for: {device_name}")
-                        return lambda status: relay_instance.set_relay(device_name, status)
-                
-                # First check if RELAY_CONTROLS is in config (standard way)
-                if 'RELAY_CONTROLS' in config:
-                    logger.info("Using RELAY_CONTROLS section from config")
-                    for api_name, device_name in config['RELAY_CONTROLS'].items():
-                        action_mapping[api_name] = create_relay_action(device_name)
-                        logger.info(f"Loaded action mapping: {api_name} -> {device_name}")
-                # If not found, try direct file reading
-                else:
-                    logger.info("Trying to read RELAY_CONTROLS directly from config file")
-                    try:
-                        # Direct parsing to maintain case sensitivity
-                        with open(self.controller.config_file, 'r') as f:
-                            in_relay_controls = False
-                            relay_controls = {}
-                            
-                            for line in f:
-                                line = line.strip()
-                                if not line or line.startswith('#'):
-                                    continue
-                                    
-                                if line == '[RELAY_CONTROLS]':
-                                    in_relay_controls = True
-                                    continue
-                                elif line.startswith('[') and line.endswith(']'):
-                                    in_relay_controls = False
-                                    continue
-                                    
-                                if in_relay_controls and '=' in line:
-                                    key, value = [x.strip() for x in line.split('=', 1)]
-                                    relay_controls[key] = value
-                                    
-                            if relay_controls:
-                                logger.info(f"Found {len(relay_controls)} relay controls by direct reading")
-                                for api_name, device_name in relay_controls.items():
-                                    action_mapping[api_name] = create_relay_action(device_name)
-                                    logger.info(f"Loaded action mapping: {api_name} -> {device_name}")
-                            else:
-                                raise ValueError("No relay controls found in file")
-                    except Exception as e:
-                        logger.error(f"Error reading config file directly: {e}")
-                        # Fall back to hardcoded mappings
-                        logger.warning("Falling back to hardcoded mappings")
-                        default_mappings = {
-                            'nutrient_pump_a': 'NutrientPumpA',
-                            'nutrient_pump_b': 'NutrientPumpB',
-                            'nutrient_pump_c': 'NutrientPumpC',
-                            'ph_up_pump': 'pHUpPump',
-                            'ph_down_pump': 'pHDownPump',
-                            'valve_outside_to_tank': 'ValveOutsideToTank',
-                            'valve_tank_to_outside': 'ValveTankToOutside',
-                            'mixing_pump': 'MixingPump',
-                            'pump_from_tank_to_gutters': 'PumpFromTankToGutters',
-                            'sprinkler_a': 'SprinklerA',
-                            'sprinkler_b': 'SprinklerB',
-                            'pump_from_collector_tray_to_tank': 'PumpFromCollectorTrayToTank'
-                        }
-                        for api_name, device_name in default_mappings.items():
-                            action_mapping[api_name] = create_relay_action(device_name)
-                            logger.info(f"Using default mapping: {api_name} -> {device_name}")
-                
-                # Process each action
-                for action, state in new_actions.items():
-                    action_handler = action_mapping.get(action)
-                    if action_handler:
-                        logger.info(f"Processing action {action} with state {state}")
-                        try:
-                            # Debug the action handler
-                            logger.info(f"Action handler type: {type(action_handler).__name__}")
-                            logger.info(f"Action handler object: {action_handler}")
-                            
-                            # Get device name from the mapping we loaded earlier
-                            device_name = "unknown"
-                            for key, value in config.items():
-                                if key == 'RELAY_CONTROLS':
-                                    device_name = value.get(action, "unknown")
-                                    logger.info(f"Found device mapping in config: {action} -> {device_name}")
-                            
-                            logger.info(f"Executing action handler for {action} -> {device_name}")
-                            
-                            # Call the appropriate action handler function - with detailed error trapping
-                            try:
-                                result = action_handler(state)
-                                logger.info(f"Action handler result: {result}")
-                            except TypeError as te:
-                                logger.error(f"TypeError in action handler: {te}")
-                                logger.error(f"Action handler arguments might be incorrect: {action_handler}, state={state}")
-                            except AttributeError as ae:
-                                logger.error(f"AttributeError in action handler: {ae}")
-                                logger.error(f"Object might be missing expected method: {action_handler}")
-                            
-                            # Add a delay after each action to ensure hardware responds
-                            time.sleep(0.2)
-                            
-                            # Log success
-                            logger.info(f"Action {action} successfully executed")
-                        except Exception as e:
-                            logger.error(f"Error applying action {action}: {e}")
-                            logger.exception("Full exception details:")
-                    else:
-                        logger.warning(f"Unknown action: {action}")
-                
+
+                # Compiled once per device.conf version; all actions go out as one batch
+                snapshot = config_snapshot.get_config_snapshot(self.controller.config_file)
+                report = action_dispatch.apply_actions(snapshot, new_actions, relay_instance,
+                                                       ACTION_CONFIRM_TIMEOUT)
+
+                # End to end: action.json write to relay confirmation
+                confirm_ms = round((time.time() - written_at) * 1000, 1)
+                report["write_to_confirm_ms"] = confirm_ms
+                self.last_action_report = report
+                logger.info(f"[ACTIONS] {report['actions']} action(s) -> {report['devices']} device(s) in "
+                            f"{report['writes']} write(s), "
+                            f"{'confirmed' if report['confirmed'] else 'NOT confirmed'} "
+                            f"{confirm_ms:.0f} ms after action.json was written")
+
                 # Update last state
                 self.last_action_state = new_actions.copy()
 
@@ -406,7 +230,7 @@ class ConfigFileHandler(FileSystemEventHandler):
                         current_content = json.load(f)
                     # Only clear if no new actions arrived during processing
                     if current_content == new_actions or not current_content:
-                        with open('config/action.json', 'w') as f:
+                        with io_accounting.open_accounted("action_json", 'config/action.json', 'w') as f:
                             json.dump({}, f)
                         logger.info("Action file cleared after successful processing")
                     else:
@@ -477,6 +301,10 @@ class RippleController:
         'ValveCO2_on_at_startup': 'ValveCO2',
     }
 
+    # Set from [CONTROL] unified_tick_enabled at startup (see _start_control_tick)
+    unified_tick = False
+    control_tick = None
+
     def __init__(self, enable_file_watcher=True):
         """Initialize the Ripple controller.
 
@@ -485,6 +313,9 @@ class RippleController:
                 Set to False when only hardware access is needed (e.g. from server.py).
         """
         self._enable_file_watcher = enable_file_watcher
+        # Mode and Edge heartbeat; server.py reports heartbeats over the controller channel
+        self.mode_state = operating_mode.get_mode_state()
+        self.ipc_server = None
         self.water_level_sensors = {}  # Dict to store water level sensor instances
         self.relays = {}  # Dict to store relay instances
         self.sensor_targets = {}  # Dict to store sensor target values
@@ -516,18 +347,27 @@ class RippleController:
         self.config = configparser.ConfigParser(empty_lines_in_values=False, interpolation=None)
         self.sensor_data_file = os.path.join(self.data_dir, 'saved_sensor_data.json')
 
+        # Last rendered status values, so system_status.txt is only rewritten on change
+        self._last_status_values = None
+        self._last_status_write = 0.0
+
         # Track raw config text + hash for cloud sync via edge relay
         self.current_config_text, self.current_config_hash = self._read_config_with_hash()
 
+        # [CONTROL] unified_tick_enabled: one control tick replaces the per-controller
+        # schedules (src/control_tick.py). Read once; switching needs a restart.
+        self.unified_tick = config_snapshot.get_config_snapshot(self.config_file).control_tick_enabled
+
         self.initialize_sensors()
         self.load_sensor_targets()
         self.apply_plumbing_startup_configuration()
-        self.apply_sprinkler_startup_configuration()
+        if not self.unified_tick:
+            self.apply_sprinkler_startup_configuration()
 
-        # MOQ-96: Initialize recurring sprinkler schedule
-        # apply_sprinkler_startup_configuration only toggles the relay;
-        # we must also start the scheduling chain so cycles continue.
-        self.initialize_sprinkler_scheduling()
+            # MOQ-96: Initialize recurring sprinkler schedule
+            # apply_sprinkler_startup_configuration only toggles the relay;
+            # we must also start the scheduling chain so cycles continue.
+            self.initialize_sprinkler_scheduling()
 
         # Make sure config file exists before attempting to watch it
         if not os.path.exists(self.config_file):
@@ -539,7 +379,7 @@ class RippleController:
         action_file = os.path.join(self.config_dir, 'action.json')
         if not os.path.exists(action_file):
             logger.warning(f"Action file {action_file} does not exist. Creating an empty JSON file.")
-            with open(action_file, 'w') as f:
+            with io_accounting.open_accounted("action_json", action_file, 'w') as f:
                 json.dump({}, f)
         else:
             # Ensure action file has valid JSON format
@@ -550,9 +390,13 @@ class RippleController:
                         json.loads(content)
             except (json.JSONDecodeError, Exception) as e:
                 logger.warning(f"Action file has invalid JSON format: {e}. Resetting to empty object.")
-                with open(action_file, 'w') as f:
+                with io_accounting.open_accounted("action_json", action_file, 'w') as f:
                     json.dump({}, f)
         
+        # Key-level device.conf change notifications, fed by ConfigFileHandler
+        self.config_bus = config_bus.ConfigChangeBus()
+        self._subscribe_config_changes()
+
         # Initialize watchdog observer (only when enabled and only once per process)
         if self._enable_file_watcher and not getattr(sys, '_config_observer_started', False):
             self.event_handler = ConfigFileHandler(self)
@@ -560,6 +404,8 @@ class RippleController:
             self.observer.schedule(self.event_handler, self.config_dir, recursive=False)
             self.observer.start()
             sys._config_observer_started = True
+            # The watcher now swaps the snapshot on change; getters stop checking the file
+            config_snapshot.watch_config(self.config_file)
             logger.info(f"Configuration and action file monitoring started for directory: {self.config_dir}")
         else:
             self.event_handler = None
@@ -824,301 +670,282 @@ class RippleController:
             logger.error(f"Error applying plumbing startup configuration: {e}")
             logger.exception("Full exception details:")
 
-    def reload_specific_sections(self, changed_sections):
-        """Reload only the specific sections that have changed"""
-        try:
-            # Reload the config file
-            self.config.read(self.config_file)
-            
-            # Track if we've made any changes that require a full reload of sensor targets
-            need_reload_targets = False
-            
-            # Process each changed section
-            for section in changed_sections:
-                logger.info(f"Reloading configuration for section: {section}")
-                
-                if section == 'Mixing':
-                    # First, ensure mixing pump is turned off before doing anything else
-                    # This guarantees that changing any mixing setting will always reset the mixing state
-                    try:
-                        from src.sensors.Relay import Relay
-                        relay = Relay()
-                        if relay:
-                            relay.set_mixing_pump(False)
-                            logger.info("Mixing pump turned off as part of configuration change procedure")
-                    except Exception as e:
-                        logger.error(f"Error turning off mixing pump: {e}")
-                        
-                    # Now update the configuration values using operational values (second value)
-                    mixing_interval = self._parse_config_value('Mixing', 'mixing_interval', 1)
-                    mixing_duration = self._parse_config_value('Mixing', 'mixing_duration', 1)
-                    trigger_mixing_duration = self._parse_config_value('Mixing', 'trigger_mixing_duration', 1)
-                    
-                    # Configuration is automatically reloaded by individual controllers
-                    # No need to explicitly update configuration as simplified controllers read config directly
-                    
-                    # Only proceed to potentially turning it back on if not in an error state
-                    try:
-                        # Stop any current mixing cycle first
-                        try:
-                            self.mixing_controller.stop_current_cycle()
-                            logger.info("[CONFIG CHANGE] Stopped current mixing cycle")
-                        except Exception as e:
-                            logger.warning(f"[CONFIG CHANGE] Error stopping mixing cycle: {e}")
-                            
-                        # Get mixing duration - USING THE PARSED VALUE
-                        logger.info(f"Using parsed mixing_duration: '{mixing_duration}'")
-                        
-                        mixing_seconds = self._time_to_seconds(mixing_duration)
-                        logger.info(f"[CONFIG CHANGE] Parsed mixing duration: {mixing_duration} = {mixing_seconds} seconds")
-                        
-                        # Only activate the mixing pump if duration is positive
-                        if mixing_seconds > 0:
-                            logger.info(f"[CONFIG CHANGE] Mixing duration > 0 ({mixing_duration}), starting mixing cycle")
-                            # Use simplified mixing controller
-                            try:
-                                self.mixing_controller.start_mixing_cycle()
-                                logger.info("[CONFIG CHANGE] Successfully started mixing cycle with new configuration")
-                            except Exception as e:
-                                logger.error(f"[CONFIG CHANGE] Error starting mixing cycle: {e}")
-                        else:
-                            logger.info(f"[CONFIG CHANGE] Mixing duration is zero ({mixing_duration}), keeping pump off")
-                            
-                    except Exception as e:
-                        logger.error(f"[CONFIG CHANGE] Error during mixing configuration change: {e}")
-                        logger.exception("Full exception details:")
-                            
-                    logger.info("Mixing configuration updated")
-                
-                elif section == 'NutrientPump':
-                    # Parse using the second value (operational value) if available
-                    nutrient_on_duration = self._parse_config_value('NutrientPump', 'nutrient_pump_on_duration', 1)
-                    nutrient_wait_duration = self._parse_config_value('NutrientPump', 'nutrient_pump_wait_duration', 1)
-                    ph_on_duration = self._parse_config_value('NutrientPump', 'ph_pump_on_duration', 1)
-                    ph_wait_duration = self._parse_config_value('NutrientPump', 'ph_pump_wait_duration', 1)
-                    
-                    # Configuration is automatically reloaded by individual controllers
-                    # No need to explicitly update configuration as simplified controllers read config directly
-                    
-                    # Initialize Relay connection
-                    from src.sensors.Relay import Relay
-                    relay = Relay()
-                    
-                    # Check nutrient pump duration
-                    nutrient_seconds = self._time_to_seconds(nutrient_on_duration)
-                    
-                    if nutrient_seconds == 0:
-                        # Turn off nutrient pumps if duration is set to zero
-                        if relay:
-                            relay.set_nutrient_pumps(False)
-                            logger.info("Nutrient pumps turned off due to zero duration configuration")
-                            
-                            # Stop any current nutrient cycle
-                            try:
-                                self.nutrient_controller.stop_current_cycle()
-                                logger.info("Stopped current nutrient cycle due to zero duration configuration")
-                            except Exception as e:
-                                logger.info(f"Nutrient cycle stop exception (may be normal): {e}")
-                        else:
-                            logger.warning("Failed to turn off nutrient pumps: relay not available")
-                    
-                    # Check pH pump duration
-                    ph_seconds = self._time_to_seconds(ph_on_duration)
-                    
-                    if ph_seconds == 0:
-                        # Turn off pH pumps if duration is set to zero
-                        if relay:
-                            relay.set_ph_plus_pump(False)
-                            relay.set_ph_minus_pump(False)
-                            logger.info("pH pumps turned off due to zero duration configuration")
-                            
-                            # Stop any current pH cycle
-                            try:
-                                self.ph_controller.stop_current_cycle()
-                                logger.info("Stopped current pH cycle due to zero duration configuration")
-                            except Exception as e:
-                                logger.info(f"pH cycle stop exception (may be normal): {e}")
-                        else:
-                            logger.warning("Failed to turn off pH pumps: relay not available")
-                    
-                    # Only trigger nutrient cycle check if we're not turning things off
-                    if nutrient_seconds > 0:
-                        # Schedule nutrient cycle check (don't start immediately to avoid flash)
-                        logger.info("Scheduling nutrient cycle check due to NutrientPump config change")
-                        # Let the controller handle this in its own timing to avoid unwanted activation
-                    
-                    logger.info("NutrientPump configuration updated")
-                
-                elif section == 'Sprinkler':
-                    # First, ensure sprinklers are turned off before doing anything else
-                    try:
-                        from src.sensors.Relay import Relay
-                        relay = Relay()
-                        if relay:
-                            relay.set_sprinklers(False)
-                            logger.info("Sprinklers turned off as part of configuration change procedure")
-                    except Exception as e:
-                        logger.error(f"Error turning off sprinklers: {e}")
-
-                    # Check master toggle: sprinkler_scheduling_enabled
-                    scheduling_enabled = True  # Default to enabled for backward compatibility
-                    if self.config.has_option('Sprinkler', 'sprinkler_scheduling_enabled'):
-                        scheduling_value = self._parse_config_value('Sprinkler', 'sprinkler_scheduling_enabled', 1)
-                        if isinstance(scheduling_value, str):
-                            scheduling_enabled = scheduling_value.lower() == 'true'
-                        else:
-                            scheduling_enabled = bool(scheduling_value)
-                    logger.info(f"[CONFIG CHANGE] sprinkler_scheduling_enabled: {scheduling_enabled}")
-
-                    if not scheduling_enabled:
-                        logger.info("[CONFIG CHANGE] Sprinkler scheduling is DISABLED - stopping all cycles and clearing schedule")
-                        try:
-                            self.sprinkler_controller.stop_current_cycle()
-                            from src.sprinkler_static import stop_sprinkler_schedule
-                            stop_sprinkler_schedule()
-                        except Exception as e:
-                            logger.warning(f"[CONFIG CHANGE] Error stopping sprinkler schedule: {e}")
-                        logger.info("Sprinkler configuration updated (scheduling disabled)")
-                        continue
-
-                    # Parse new values
-                    sprinkler_on_duration = self._parse_config_value('Sprinkler', 'sprinkler_on_duration', 1)
-                    sprinkler_wait_duration = self._parse_config_value('Sprinkler', 'sprinkler_wait_duration', 1)
-                    sprinkler_on_seconds = self._time_to_seconds(sprinkler_on_duration)
-
-                    # Get old values for comparison (last_config_state still holds pre-change values)
-                    old_on_duration = "00:00:00"
-                    old_wait_duration = "00:00:00"
-                    if self.event_handler and hasattr(self.event_handler, 'last_config_state'):
-                        old_sprinkler = self.event_handler.last_config_state.get('Sprinkler', {})
-                        old_on_raw = old_sprinkler.get('sprinkler_on_duration', '')
-                        old_wait_raw = old_sprinkler.get('sprinkler_wait_duration', '')
-                        if ',' in old_on_raw:
-                            old_on_duration = old_on_raw.split(',')[1].strip()
-                        if ',' in old_wait_raw:
-                            old_wait_duration = old_wait_raw.split(',')[1].strip()
-
-                    old_on_seconds = self._time_to_seconds(old_on_duration)
-                    old_wait_seconds = self._time_to_seconds(old_wait_duration)
-                    new_wait_seconds = self._time_to_seconds(sprinkler_wait_duration)
-
-                    logger.info(f"[CONFIG CHANGE] Sprinkler on_duration: {old_on_duration} -> {sprinkler_on_duration}")
-                    logger.info(f"[CONFIG CHANGE] Sprinkler wait_duration: {old_wait_duration} -> {sprinkler_wait_duration}")
-
-                    # Stop any current cycle
-                    try:
-                        self.sprinkler_controller.stop_current_cycle()
-                        logger.info("[CONFIG CHANGE] Stopped current sprinkler cycle")
-                    except Exception as e:
-                        logger.warning(f"[CONFIG CHANGE] Error stopping sprinkler cycle: {e}")
-
-                    # Sentinel: wait_duration of 99:99:99 or 00:00:00 means "disable scheduling"
-                    DISABLE_SENTINEL_SECONDS = self._time_to_seconds("99:99:99")
-                    scheduling_disabled_by_wait = (new_wait_seconds == 0 or new_wait_seconds >= DISABLE_SENTINEL_SECONDS)
-
-                    if sprinkler_on_seconds <= 0 or scheduling_disabled_by_wait:
-                        reason = "on_duration=0" if sprinkler_on_seconds <= 0 else f"wait_duration={sprinkler_wait_duration} (disabled)"
-                        logger.info(f"[CONFIG CHANGE] Sprinkler scheduling OFF: {reason}")
-                        try:
-                            from src.sprinkler_static import stop_sprinkler_schedule
-                            stop_sprinkler_schedule()
-                        except Exception as e:
-                            logger.warning(f"[CONFIG CHANGE] Error stopping sprinkler schedule: {e}")
-                    elif sprinkler_on_seconds > old_on_seconds:
-                        # on_duration increased → farmer wants more watering → immediate run
-                        logger.info(f"[CONFIG CHANGE] on_duration INCREASED ({old_on_duration} -> {sprinkler_on_duration}), starting immediate sprinkler cycle")
-                        try:
-                            self.sprinkler_controller.start_sprinkler_cycle()
-                        except Exception as e:
-                            logger.error(f"[CONFIG CHANGE] Error starting sprinkler cycle: {e}")
-                    elif new_wait_seconds < old_wait_seconds:
-                        # wait_duration decreased → farmer wants more frequent watering → immediate run
-                        logger.info(f"[CONFIG CHANGE] wait_duration DECREASED ({old_wait_duration} -> {sprinkler_wait_duration}), starting immediate sprinkler cycle")
-                        try:
-                            self.sprinkler_controller.start_sprinkler_cycle()
-                        except Exception as e:
-                            logger.error(f"[CONFIG CHANGE] Error starting sprinkler cycle: {e}")
-                    else:
-                        # on_duration unchanged/decreased, wait_duration unchanged/increased → just reschedule
-                        logger.info(f"[CONFIG CHANGE] No urgency increase, scheduling next cycle with wait_duration={sprinkler_wait_duration}")
-                        try:
-                            from src.sprinkler_static import schedule_next_sprinkler_cycle_static
-                            schedule_next_sprinkler_cycle_static()
-                        except Exception as e:
-                            logger.error(f"[CONFIG CHANGE] Error scheduling next sprinkler cycle: {e}")
-
-                    logger.info("Sprinkler configuration updated")
-                
-                elif section == 'EC':
-                    if 'EC' in self.config:
-                        need_reload_targets = True
-                        logger.info("Scheduling EC check due to EC config change")
-                        from src.nutrient_static import schedule_next_nutrient_cycle_static
-                        schedule_next_nutrient_cycle_static()
-                        logger.info("EC configuration updated")
-                
-                elif section == 'pH':
-                    if 'pH' in self.config:
-                        # Configuration is automatically reloaded by individual controllers
-                        # No need to explicitly update configuration as simplified controllers read config directly
-                        
-                        # Update sensor targets
-                        need_reload_targets = True
-                        
-                        # Schedule pH check (don't start immediately to avoid flash)
-                        logger.info("Scheduling pH check due to pH config change")
-                        # Let the controller handle this in its own timing
-                        logger.info("pH configuration updated")
-                
-                elif section == 'WaterLevel':
-                    # Water level targets affect valve control
-                    need_reload_targets = True
-
-                    from src.water_level_static import is_water_level_control_enabled, get_drain_status
-                    enabled = is_water_level_control_enabled()
-
-                    # Log if drain config changed during active drain
-                    drain_status = get_drain_status()
-                    if drain_status.get('active'):
-                        logger.info(f"[CONFIG CHANGE] WaterLevel config changed while drain active "
-                                    f"(mode={drain_status.get('mode')}, target={drain_status.get('target_level')}). "
-                                    f"New values take effect on next evaluate_water_level() call.")
-
-                    if not enabled and self.water_level_controller.is_monitoring:
-                        logger.info("water_level_control_enabled DISABLED - stopping monitoring")
-                        self.water_level_controller.stop_monitoring()
-                    elif enabled and not self.water_level_controller.is_monitoring:
-                        logger.info("water_level_control_enabled ENABLED - starting monitoring")
-                        self.water_level_controller.start_water_level_monitoring()
-                    elif enabled:
-                        # Thresholds changed while enabled — next reading will use new values
-                        logger.info("WaterLevel thresholds updated, triggering immediate check")
-                        self.water_level_controller.force_check_now()
-
-                    logger.info("WaterLevel configuration updated")
-                
-                elif section == 'PLUMBING':
-                    # Apply plumbing startup configuration immediately when config changes
-                    logger.info("PLUMBING configuration changed, applying startup values to hardware")
-                    self.apply_plumbing_startup_configuration()
-                    logger.info("PLUMBING configuration updated")
-            
-            # Reload sensor targets if needed
-            if need_reload_targets:
-                self.load_sensor_targets()
-                logger.info("Sensor targets reloaded")
+    def _subscribe_config_changes(self):
+        """
+        Subscribe controller handlers to the device.conf keys they depend on.
 
-            # Update raw config text + hash for cloud sync
+        Each handler is called with only its changed keys (see src/config_bus.py),
+        so e.g. a sprinkler duration edit never touches the pH or EC controllers.
+        """
+        bus = self.config_bus
+        # Runs first so self.config and the cloud-sync hash are current for the others
+        bus.subscribe("*", self._on_any_config_changed)
+        if not self.unified_tick:
+            # The control tick reads these from the config snapshot on every tick
+            bus.subscribe("Mixing.*", self._on_mixing_config_changed)
+            bus.subscribe("NutrientPump.nutrient_pump_on_duration", self._on_nutrient_duration_changed)
+            bus.subscribe("NutrientPump.ph_pump_on_duration", self._on_ph_pump_duration_changed)
+            bus.subscribe(["Sprinkler.sprinkler_scheduling_enabled",
+                           "Sprinkler.sprinkler_on_duration",
+                           "Sprinkler.sprinkler_wait_duration"], self._on_sprinkler_config_changed)
+            bus.subscribe(["EC.ec_target", "EC.ec_deadband", "EC.ec_min", "EC.ec_max"],
+                          self._on_ec_target_changed)
+            bus.subscribe("WaterLevel.*", self._on_water_level_config_changed)
+        bus.subscribe("PLUMBING.*_on_at_startup", self._on_plumbing_config_changed)
+        bus.subscribe("POLLING.*", self._on_polling_config_changed)
+        bus.subscribe("NutrientPump.reactive_*", self._on_reactive_dosing_config_changed)
+        bus.subscribe("CONTROL.tick_interval_seconds", self._on_control_tick_config_changed)
+        bus.subscribe([f"{section}.{prefix}_{field}"
+                       for section, prefix in (("pH", "ph"), ("EC", "ec"), ("WaterLevel", "water_level"))
+                       for field in ("target", "deadband", "min", "max")],
+                      self._on_sensor_targets_changed)
+
+    def _snapshot_value(self, snapshot, section, key, default=""):
+        """Operational value of section.key in a snapshot, parsed like _parse_config_value"""
+        value = config_bus.operational_value(snapshot.get(section, key))
+        return default if value is None else value
+
+    def _on_any_config_changed(self, changes, snapshot):
+        """Keep self.config and the cloud-sync hash in step with device.conf"""
+        # Rebuilt rather than read_dict() into the old parser, which would keep deleted keys
+        config = configparser.ConfigParser(empty_lines_in_values=False, interpolation=None)
+        config.read_dict(snapshot.sections)
+        self.config = config
+        if snapshot.text is None:
             self.current_config_text, self.current_config_hash = self._read_config_with_hash()
+        else:
+            self.current_config_text = snapshot.text
+            self.current_config_hash = hashlib.sha256(snapshot.text.encode()).hexdigest()
+
+    def _on_mixing_config_changed(self, changes, snapshot):
+        """Restart the mixing cycle with the new durations"""
+        # First, ensure mixing pump is turned off before doing anything else
+        # This guarantees that changing any mixing setting will always reset the mixing state
+        try:
+            from src.sensors.Relay import Relay
+            relay = Relay()
+            if relay:
+                relay.set_mixing_pump(False)
+                logger.info("Mixing pump turned off as part of configuration change procedure")
+        except Exception as e:
+            logger.error(f"Error turning off mixing pump: {e}")
+
+        mixing_duration = self._snapshot_value(snapshot, 'Mixing', 'mixing_duration')
 
-            logger.info("Specific configuration sections reloaded successfully")
+        # Only proceed to potentially turning it back on if not in an error state
+        try:
+            # Stop any current mixing cycle first
+            try:
+                self.mixing_controller.stop_current_cycle()
+                logger.info("[CONFIG CHANGE] Stopped current mixing cycle")
+            except Exception as e:
+                logger.warning(f"[CONFIG CHANGE] Error stopping mixing cycle: {e}")
+
+            mixing_seconds = self._time_to_seconds(mixing_duration)
+            logger.info(f"[CONFIG CHANGE] Parsed mixing duration: {mixing_duration} = {mixing_seconds} seconds")
+
+            # Only activate the mixing pump if duration is positive
+            if mixing_seconds > 0:
+                logger.info(f"[CONFIG CHANGE] Mixing duration > 0 ({mixing_duration}), starting mixing cycle")
+                try:
+                    self.mixing_controller.start_mixing_cycle()
+                    logger.info("[CONFIG CHANGE] Successfully started mixing cycle with new configuration")
+                except Exception as e:
+                    logger.error(f"[CONFIG CHANGE] Error starting mixing cycle: {e}")
+            else:
+                logger.info(f"[CONFIG CHANGE] Mixing duration is zero ({mixing_duration}), keeping pump off")
 
         except Exception as e:
-            logger.error(f"Error reloading specific sections: {e}")
-            # Fall back to full reload if specific reload fails
-            logger.info("Falling back to full configuration reload")
-            self.reload_configuration()
-    
+            logger.error(f"[CONFIG CHANGE] Error during mixing configuration change: {e}")
+            logger.exception("Full exception details:")
+
+        logger.info("Mixing configuration updated")
+
+    def _on_nutrient_duration_changed(self, changes, snapshot):
+        """Turn nutrient pumps off when their on-duration is set to zero"""
+        nutrient_on_duration = self._snapshot_value(snapshot, 'NutrientPump', 'nutrient_pump_on_duration')
+        if self._time_to_seconds(nutrient_on_duration) > 0:
+            # Let the controller pick up the new duration in its own timing to avoid unwanted activation
+            logger.info("Nutrient pump on-duration updated; next cycle will use it")
+            return
+
+        from src.sensors.Relay import Relay
+        relay = Relay()
+        if relay:
+            relay.set_nutrient_pumps(False)
+            logger.info("Nutrient pumps turned off due to zero duration configuration")
+
+            # Stop any current nutrient cycle
+            try:
+                self.nutrient_controller.stop_current_cycle()
+                logger.info("Stopped current nutrient cycle due to zero duration configuration")
+            except Exception as e:
+                logger.info(f"Nutrient cycle stop exception (may be normal): {e}")
+        else:
+            logger.warning("Failed to turn off nutrient pumps: relay not available")
+
+    def _on_ph_pump_duration_changed(self, changes, snapshot):
+        """Turn pH pumps off when their on-duration is set to zero"""
+        ph_on_duration = self._snapshot_value(snapshot, 'NutrientPump', 'ph_pump_on_duration')
+        if self._time_to_seconds(ph_on_duration) > 0:
+            logger.info("pH pump on-duration updated; next cycle will use it")
+            return
+
+        from src.sensors.Relay import Relay
+        relay = Relay()
+        if relay:
+            relay.set_ph_plus_pump(False)
+            relay.set_ph_minus_pump(False)
+            logger.info("pH pumps turned off due to zero duration configuration")
+
+            # Stop any current pH cycle
+            try:
+                self.ph_controller.stop_current_cycle()
+                logger.info("Stopped current pH cycle due to zero duration configuration")
+            except Exception as e:
+                logger.info(f"pH cycle stop exception (may be normal): {e}")
+        else:
+            logger.warning("Failed to turn off pH pumps: relay not available")
+
+    def _on_sprinkler_config_changed(self, changes, snapshot):
+        """Reschedule or immediately run sprinklers depending on how the schedule changed"""
+        # First, ensure sprinklers are turned off before doing anything else
+        try:
+            from src.sensors.Relay import Relay
+            relay = Relay()
+            if relay:
+                relay.set_sprinklers(False)
+                logger.info("Sprinklers turned off as part of configuration change procedure")
+        except Exception as e:
+            logger.error(f"Error turning off sprinklers: {e}")
+
+        # Check master toggle: sprinkler_scheduling_enabled
+        scheduling_enabled = True  # Default to enabled for backward compatibility
+        if snapshot.has_option('Sprinkler', 'sprinkler_scheduling_enabled'):
+            scheduling_value = self._snapshot_value(snapshot, 'Sprinkler', 'sprinkler_scheduling_enabled')
+            scheduling_enabled = scheduling_value.lower() == 'true'
+        logger.info(f"[CONFIG CHANGE] sprinkler_scheduling_enabled: {scheduling_enabled}")
+
+        if not scheduling_enabled:
+            logger.info("[CONFIG CHANGE] Sprinkler scheduling is DISABLED - stopping all cycles and clearing schedule")
+            try:
+                self.sprinkler_controller.stop_current_cycle()
+                from src.sprinkler_static import stop_sprinkler_schedule
+                stop_sprinkler_schedule()
+            except Exception as e:
+                logger.warning(f"[CONFIG CHANGE] Error stopping sprinkler schedule: {e}")
+            logger.info("Sprinkler configuration updated (scheduling disabled)")
+            return
+
+        # Parse new values
+        sprinkler_on_duration = self._snapshot_value(snapshot, 'Sprinkler', 'sprinkler_on_duration')
+        sprinkler_wait_duration = self._snapshot_value(snapshot, 'Sprinkler', 'sprinkler_wait_duration')
+        sprinkler_on_seconds = self._time_to_seconds(sprinkler_on_duration)
+
+        # Old values come from the change itself; unchanged keys keep their current value
+        old_on_duration, old_wait_duration = sprinkler_on_duration, sprinkler_wait_duration
+        for change in changes:
+            if change.key == 'sprinkler_on_duration':
+                old_on_duration = change.old_operational if change.old and ',' in change.old else "00:00:00"
+            elif change.key == 'sprinkler_wait_duration':
+                old_wait_duration = change.old_operational if change.old and ',' in change.old else "00:00:00"
+
+        old_on_seconds = self._time_to_seconds(old_on_duration)
+        old_wait_seconds = self._time_to_seconds(old_wait_duration)
+        new_wait_seconds = self._time_to_seconds(sprinkler_wait_duration)
+
+        logger.info(f"[CONFIG CHANGE] Sprinkler on_duration: {old_on_duration} -> {sprinkler_on_duration}")
+        logger.info(f"[CONFIG CHANGE] Sprinkler wait_duration: {old_wait_duration} -> {sprinkler_wait_duration}")
+
+        # Stop any current cycle
+        try:
+            self.sprinkler_controller.stop_current_cycle()
+            logger.info("[CONFIG CHANGE] Stopped current sprinkler cycle")
+        except Exception as e:
+            logger.warning(f"[CONFIG CHANGE] Error stopping sprinkler cycle: {e}")
+
+        # Sentinel: wait_duration of 99:99:99 or 00:00:00 means "disable scheduling"
+        DISABLE_SENTINEL_SECONDS = self._time_to_seconds("99:99:99")
+        scheduling_disabled_by_wait = (new_wait_seconds == 0 or new_wait_seconds >= DISABLE_SENTINEL_SECONDS)
+
+        if sprinkler_on_seconds <= 0 or scheduling_disabled_by_wait:
+            reason = "on_duration=0" if sprinkler_on_seconds <= 0 else f"wait_duration={sprinkler_wait_duration} (disabled)"
+            logger.info(f"[CONFIG CHANGE] Sprinkler scheduling OFF: {reason}")
+            try:
+                from src.sprinkler_static import stop_sprinkler_schedule
+                stop_sprinkler_schedule()
+            except Exception as e:
+                logger.warning(f"[CONFIG CHANGE] Error stopping sprinkler schedule: {e}")
+        elif sprinkler_on_seconds > old_on_seconds:
+            # on_duration increased → farmer wants more watering → immediate run
+            logger.info(f"[CONFIG CHANGE] on_duration INCREASED ({old_on_duration} -> {sprinkler_on_duration}), starting immediate sprinkler cycle")
+            try:
+                self.sprinkler_controller.start_sprinkler_cycle()
+            except Exception as e:
+                logger.error(f"[CONFIG CHANGE] Error starting sprinkler cycle: {e}")
+        elif new_wait_seconds < old_wait_seconds:
+            # wait_duration decreased → farmer wants more frequent watering → immediate run
+            logger.info(f"[CONFIG CHANGE] wait_duration DECREASED ({old_wait_duration} -> {sprinkler_wait_duration}), starting immediate sprinkler cycle")
+            try:
+                self.sprinkler_controller.start_sprinkler_cycle()
+            except Exception as e:
+                logger.error(f"[CONFIG CHANGE] Error starting sprinkler cycle: {e}")
+        else:
+            # on_duration unchanged/decreased, wait_duration unchanged/increased → just reschedule
+            logger.info(f"[CONFIG CHANGE] No urgency increase, scheduling next cycle with wait_duration={sprinkler_wait_duration}")
+            try:
+                from src.sprinkler_static import schedule_next_sprinkler_cycle_static
+                schedule_next_sprinkler_cycle_static()
+            except Exception as e:
+                logger.error(f"[CONFIG CHANGE] Error scheduling next sprinkler cycle: {e}")
+
+        logger.info("Sprinkler configuration updated")
+
+    def _on_ec_target_changed(self, changes, snapshot):
+        """Re-evaluate nutrient dosing against the new EC target or limits"""
+        if 'EC' not in snapshot.sections:
+            return
+        logger.info("Scheduling EC check due to EC config change")
+        from src.nutrient_static import schedule_next_nutrient_cycle_static
+        schedule_next_nutrient_cycle_static()
+        logger.info("EC configuration updated")
+
+    def _on_water_level_config_changed(self, changes, snapshot):
+        """Start/stop water level monitoring or re-check against new thresholds"""
+        from src.water_level_static import is_water_level_control_enabled, get_drain_status
+        enabled = is_water_level_control_enabled()
+
+        # Log if drain config changed during active drain
+        drain_status = get_drain_status()
+        if drain_status.get('active'):
+            logger.info(f"[CONFIG CHANGE] WaterLevel config changed while drain active "
+                        f"(mode={drain_status.get('mode')}, target={drain_status.get('target_level')}). "
+                        f"New values take effect on next evaluate_water_level() call.")
+
+        if not enabled and self.water_level_controller.is_monitoring:
+            logger.info("water_level_control_enabled DISABLED - stopping monitoring")
+            self.water_level_controller.stop_monitoring()
+        elif enabled and not self.water_level_controller.is_monitoring:
+            logger.info("water_level_control_enabled ENABLED - starting monitoring")
+            self.water_level_controller.start_water_level_monitoring()
+        elif enabled:
+            # Thresholds changed while enabled — next reading will use new values
+            logger.info("WaterLevel thresholds updated, triggering immediate check")
+            self.water_level_controller.force_check_now()
+
+        logger.info("WaterLevel configuration updated")
+
+    def _on_plumbing_config_changed(self, changes, snapshot):
+        """Apply plumbing startup values to hardware immediately"""
+        logger.info("PLUMBING configuration changed, applying startup values to hardware")
+        self.apply_plumbing_startup_configuration()
+        logger.info("PLUMBING configuration updated")
+
+    def _on_sensor_targets_changed(self, changes, snapshot):
+        """Reload sensor targets once, however many pH/EC/water level targets changed"""
+        self.load_sensor_targets()
+        logger.info("Sensor targets reloaded")
+
     def reload_configuration(self):
         """Reload complete configuration from device.conf (fallback method)"""
         try:
@@ -1190,7 +1017,7 @@ class RippleController:
             self._run_startup_checks()
 
             # Write initial status file
-            self.write_status_file()
+            self.write_status_file(force=True)
             logger.info("Initial status file written to data/system_status.txt")
 
             self.run_main_loop()
@@ -1201,6 +1028,11 @@ class RippleController:
     def _run_startup_checks(self):
         """Run all system checks and activations at startup"""
         try:
+            if self.unified_tick:
+                # The first control tick sets every controlled device, pumps off
+                logger.info("[Startup] Unified control tick enabled - controller schedules not started")
+                return
+
             logger.info("==== RUNNING STARTUP CHECKS AND ACTIVATIONS ====")
             
             # Make sure we have the latest config
@@ -1455,6 +1287,9 @@ class RippleController:
         try:
             logger.info("Shutting down Ripple controller")
             
+            if self.control_tick is not None:
+                self.control_tick.shutdown()
+
             # Shutdown simplified controllers first
             if hasattr(self, 'sprinkler_controller'):
                 self.sprinkler_controller.shutdown()
@@ -1466,9 +1301,18 @@ class RippleController:
                 self.ph_controller.shutdown()
             if hasattr(self, 'water_level_controller'):
                 self.water_level_controller.shutdown()
+
+            # Send relay changes still waiting in a coalescing window
+            relay = Relay()
+            if relay:
+                relay.coalescer.flush()
                 
+            if self.ipc_server is not None:
+                self.ipc_server.stop()
+
             # Old scheduler removed - simplified controllers handle their own shutdown
             if self.observer:
+                config_snapshot.unwatch_config(self.config_file)
                 self.observer.stop()
                 self.observer.join(timeout=5)  # Add timeout to prevent indefinite blocking
                 if self.observer.is_alive():
@@ -1477,154 +1321,55 @@ class RippleController:
         except Exception as e:
             logger.error(f"Error during shutdown: {e}")
 
-    def write_status_file(self):
+    def write_status_file(self, force=False):
         """Write human-readable system status to a text file for debugging.
 
         Creates a status file in the data directory with current system state,
         similar to lumina-edge's scheduled_tasks_main.txt approach.
-        
-        Reads from saved_sensor_data.json cache (populated by main loop) rather
-        than querying sensors directly - avoids creating fresh instances with
-        empty data.
-        """
-        try:
-            status_file = os.path.join(self.data_dir, 'system_status.txt')
-            sensor_data_file = os.path.join(self.data_dir, 'saved_sensor_data.json')
-
-            # Get current timestamp
-            now = datetime.now()
-            
-            # Load cached sensor data
-            cached_data = {}
-            try:
-                if os.path.exists(sensor_data_file):
-                    with open(sensor_data_file, 'r') as f:
-                        cached_data = json.load(f)
-            except Exception as e:
-                logger.warning(f"Could not load cached sensor data: {e}")
-
-            # Collect system status
-            lines = []
-            lines.append("=" * 60)
-            lines.append("RIPPLE SYSTEM STATUS")
-            lines.append(f"Generated: {now.strftime('%Y-%m-%d %H:%M:%S')}")
-            lines.append("=" * 60)
-            lines.append("")
-
-            # Relay states - read from cached data
-            lines.append("RELAY STATES:")
-            lines.append("-" * 40)
-            try:
-                relay_metrics = cached_data.get('data', {}).get('relay_metrics', {})
-                relay_points = relay_metrics.get('measurements', {}).get('points', [])
-                if relay_points:
-                    for point in relay_points:
-                        device = point.get('tags', {}).get('device', 'none')
-                        if device and device != 'none':
-                            status = "ON" if point.get('fields', {}).get('status', 0) else "OFF"
-                            lines.append(f"  {device}: {status}")
-                else:
-                    # Fallback: try raw relay array
-                    relays = cached_data.get('relays', {})
-                    if relays:
-                        for name, states in relays.items():
-                            if name != 'last_updated' and isinstance(states, list):
-                                lines.append(f"  {name}: {states}")
-                    else:
-                        lines.append("  (No relay data available)")
-            except Exception as e:
-                lines.append(f"  (Error reading relays: {e})")
-            lines.append("")
 
-            # Water level sensors - read from cached data
-            lines.append("WATER LEVELS:")
-            lines.append("-" * 40)
-            try:
-                water_data = cached_data.get('data', {}).get('water_metrics', {})
-                # Look for water level specific data in the cache
-                found_water = False
-                for key, value in water_data.items():
-                    if 'level' in key.lower() or 'water' in key.lower():
-                        measurements = value.get('measurements', {}).get('points', [])
-                        for point in measurements:
-                            location = point.get('tags', {}).get('location', 'unknown')
-                            level = point.get('fields', {}).get('value', 'N/A')
-                            lines.append(f"  {location}: {level}%")
-                            found_water = True
-                if not found_water:
-                    lines.append("  (No water level data available)")
-            except Exception as e:
-                lines.append(f"  (Error reading water levels: {e})")
-            lines.append("")
-
-            # pH sensors - read from cached data
-            lines.append("PH SENSORS:")
-            lines.append("-" * 40)
-            try:
-                ph_data = cached_data.get('data', {}).get('water_metrics', {}).get('ph', {})
-                ph_points = ph_data.get('measurements', {}).get('points', [])
-                if ph_points:
-                    for point in ph_points:
-                        location = point.get('tags', {}).get('location', 'unknown')
-                        value = point.get('fields', {}).get('value', 'N/A')
-                        temp = point.get('fields', {}).get('temperature', 'N/A')
-                        lines.append(f"  {location}: pH {value} (temp: {temp}°C)")
-                else:
-                    lines.append("  (No pH data available)")
-            except Exception as e:
-                lines.append(f"  (Error reading pH: {e})")
-            lines.append("")
+        Rendered from the in-memory sensor data snapshot kept by
+        helpers.save_sensor_data() - no JSON re-read. The file is only
+        rewritten when a displayed value or relay state changed, or when
+        STATUS_MAX_REFRESH_SECONDS have passed since the last write.
 
-            # EC sensors - read from cached data
-            lines.append("EC SENSORS:")
-            lines.append("-" * 40)
-            try:
-                ec_data = cached_data.get('data', {}).get('water_metrics', {}).get('ec', {})
-                ec_points = ec_data.get('measurements', {}).get('points', [])
-                if ec_points:
-                    for point in ec_points:
-                        location = point.get('tags', {}).get('location', 'unknown')
-                        value = point.get('fields', {}).get('value', 'N/A')
-                        tds = point.get('fields', {}).get('tds', 'N/A')
-                        temp = point.get('fields', {}).get('temperature', 'N/A')
-                        lines.append(f"  {location}: EC {value} mS/cm, TDS {tds} ppm (temp: {temp}°C)")
-                else:
-                    lines.append("  (No EC data available)")
-            except Exception as e:
-                lines.append(f"  (Error reading EC: {e})")
-            lines.append("")
+        Args:
+            force: Write even if nothing changed (used at startup).
 
-            # Controller states
-            lines.append("CONTROLLER STATES:")
-            lines.append("-" * 40)
-            try:
-                if self.sprinkler_controller:
-                    enabled = getattr(self.sprinkler_controller, 'scheduling_enabled', 'N/A')
-                    lines.append(f"  Sprinkler scheduling: {'Enabled' if enabled else 'Disabled'}")
-                if self.nutrient_controller:
-                    lines.append(f"  Nutrient controller: Active")
-                if self.ph_controller:
-                    lines.append(f"  pH controller: Active")
-                if self.mixing_controller:
-                    lines.append(f"  Mixing controller: Active")
-                if self.water_level_controller:
-                    lines.append(f"  Water level controller: Active")
-            except Exception as e:
-                lines.append(f"  (Error reading controller states: {e})")
-            lines.append("")
+        Returns:
+            bool: True if the file was written.
 
-            # Next update
-            lines.append(f"Next status update: ~5 minutes")
-            lines.append("=" * 60)
+        Note:
+            - Skipped while the optional SD-card write budget is exhausted (see
+              src/io_accounting.py)
+            - The same report is served on demand by GET /api/v1/status/text
+        """
+        try:
+            values = status_report.extract_status_values(helpers.get_saved_sensor_data())
+            values["controllers"] = status_report.controller_status_lines(
+                self.sprinkler_controller, self.nutrient_controller, self.ph_controller,
+                self.mixing_controller, self.water_level_controller,
+            )
+
+            now = time.monotonic()
+            if not force and values == self._last_status_values and \
+                    now - self._last_status_write < status_report.STATUS_MAX_REFRESH_SECONDS:
+                return False
+            if io_accounting.should_defer("status_file"):
+                return False
 
-            # Write to file
-            with open(status_file, 'w') as f:
-                f.write('\n'.join(lines))
+            status_file = os.path.join(self.data_dir, 'system_status.txt')
+            text = status_report.render_status(values, values["controllers"])
+            with io_accounting.open_accounted("status_file", status_file, 'w') as f:
+                f.write(text)
 
+            self._last_status_values = values
+            self._last_status_write = now
             logger.debug(f"Status file updated: {status_file}")
+            return True
 
         except Exception as e:
             logger.error(f"Error writing status file: {e}")
+            return False
 
     def _check_nutrient_scheduler_health(self):
         """Check if the nutrient scheduler chain is alive, reinitialize if broken"""
@@ -1665,41 +1410,82 @@ class RippleController:
     def _check_heartbeat_timeout(self):
         """Check if Edge heartbeat has timed out. Switch to autonomous if so."""
         try:
-            from server import get_mode, set_mode, get_last_heartbeat_time, HEARTBEAT_TIMEOUT_S
+            timeout = operating_mode.HEARTBEAT_TIMEOUT_S
+            elapsed = self.mode_state.check_timeout(timeout)
+            if elapsed is None:
+                return  # Not passive, no heartbeat ever received, or still within the timeout
 
-            last_hb = get_last_heartbeat_time()
-            if last_hb == 0.0:
-                return  # No heartbeat ever received, already autonomous
+            logger.warning(f"Edge heartbeat timeout ({elapsed:.0f}s > {timeout}s). Switching to autonomous mode.")
 
-            elapsed = time.time() - last_hb
-            if elapsed > HEARTBEAT_TIMEOUT_S and get_mode() == "passive":
-                logger.warning(f"Edge heartbeat timeout ({elapsed:.0f}s > {HEARTBEAT_TIMEOUT_S}s). Switching to autonomous mode.")
-                set_mode("autonomous")
+            try:
+                from audit_event import audit as _audit
+                if _audit:
+                    _audit.emit("mode_change", "autonomous_mode",
+                                source="system",
+                                value={"previous_mode": "passive", "trigger": "heartbeat_timeout",
+                                       "elapsed_s": round(elapsed, 0), "timeout_s": timeout},
+                                details=f"Heartbeat timeout ({elapsed:.0f}s > {timeout}s)")
+            except Exception:
+                pass
 
-                try:
-                    from audit_event import audit as _audit
-                    if _audit:
-                        _audit.emit("mode_change", "autonomous_mode",
-                                    source="system",
-                                    value={"previous_mode": "passive", "trigger": "heartbeat_timeout",
-                                           "elapsed_s": round(elapsed, 0), "timeout_s": HEARTBEAT_TIMEOUT_S},
-                                    details=f"Heartbeat timeout ({elapsed:.0f}s > {HEARTBEAT_TIMEOUT_S}s)")
-                except Exception:
-                    pass
-
-                # Safety: turn off dosing pumps and sprinklers that Edge may have left on
-                relay = Relay()
-                if relay:
-                    for device in ["NutrientPumpA", "NutrientPumpB", "NutrientPumpC",
-                                   "pHUpPump", "pHDownPump", "SprinklerA", "SprinklerB"]:
-                        try:
-                            relay.set_relay(device, False)
-                        except Exception as e:
-                            logger.error(f"Safety shutdown: failed to turn off {device}: {e}")
-                    logger.info("Safety shutdown: turned off dosing pumps and sprinklers")
+            # Safety: turn off dosing pumps and sprinklers that Edge may have left on
+            relay = Relay()
+            if relay:
+                devices = ["NutrientPumpA", "NutrientPumpB", "NutrientPumpC",
+                           "pHUpPump", "pHDownPump", "SprinklerA", "SprinklerB"]
+                with safety_priority():
+                    try:
+                        # One frame per contiguous run instead of one write per device
+                        relay.apply_states({device: False for device in devices})
+                    except Exception as e:
+                        logger.error(f"Safety shutdown: failed to turn off {devices}: {e}")
+                logger.info("Safety shutdown: turned off dosing pumps and sprinklers")
         except Exception as e:
             logger.error(f"Error checking heartbeat timeout: {e}")
 
+    def _start_ipc_server(self):
+        """Serve commands, mode/heartbeat and Modbus to server.py over the controller channel."""
+        try:
+            server = controller_ipc.ControllerIPCServer()
+            server.register("ping", lambda: {"pid": os.getpid()})
+            server.register("mode.heartbeat", self._ipc_heartbeat)
+            server.register("mode.get", self.mode_state.snapshot)
+            server.register("actions.apply", self._ipc_apply_actions)
+            server.register("modbus.command", controller_ipc.modbus_command_handler(globals.modbus_client))
+            server.start()
+            self.ipc_server = server
+        except Exception as e:
+            logger.error(f"[IPC] Failed to start controller channel, server.py falls back to files: {e}")
+
+    def _ipc_heartbeat(self, edge_ip=None):
+        """Controller channel: an Edge heartbeat reached server.py."""
+        result = self.mode_state.heartbeat(edge_ip)
+        if result["changed"]:
+            try:
+                from audit_event import audit as _audit
+                if _audit:
+                    _audit.emit("mode_change", "passive_mode",
+                                source="system",
+                                value={"previous_mode": result["previous_mode"], "trigger": "heartbeat_received"},
+                                details=f"Edge heartbeat received, switching from {result['previous_mode']} to passive")
+            except Exception:
+                pass
+        return result
+
+    def _ipc_apply_actions(self, actions):
+        """Controller channel: apply an /api/v1/action payload now instead of via action.json."""
+        relay = Relay()
+        if not relay:
+            raise RuntimeError("No relay hardware available")
+        started = time.monotonic()
+        snapshot = config_snapshot.get_config_snapshot(self.config_file)
+        report = action_dispatch.apply_actions(snapshot, actions, relay, ACTION_CONFIRM_TIMEOUT)
+        report["apply_ms"] = round((time.monotonic() - started) * 1000, 1)
+        logger.info(f"[ACTIONS] {report['actions']} API action(s) -> {report['devices']} device(s) in "
+                    f"{report['writes']} write(s), {'confirmed' if report['confirmed'] else 'NOT confirmed'} "
+                    f"in {report['apply_ms']:.0f} ms")
+        return report
+
     def run_main_loop(self):
         """Main loop for the Ripple controller"""
         logger.info("Starting main control loop")
@@ -1711,68 +1497,185 @@ class RippleController:
         except Exception as e:
             logger.warning(f"Failed to start audit sync: {e}")
 
-        loop_count = 0
+        self._start_ipc_server()
+
+        self.poll_scheduler = self._build_poll_scheduler()
+        if self.unified_tick:
+            self._start_control_tick()
+        else:
+            self._start_reactive_dosing()
         try:
             while True:
-                # Get data from all sensors
-                self.update_sensor_data()
+                # Sensor classes and housekeeping each run on their own deadline
+                self.poll_scheduler.run_pending()
+                time.sleep(self.poll_scheduler.time_until_next())
+
+        except KeyboardInterrupt:
+            logger.info("Main loop interrupted by user")
+        except Exception as e:
+            logger.error(f"Error in main loop: {e}")
+            logger.exception("Full exception details:")
 
-                # Save sensor data
-                self.save_sensor_data()
+    def _build_poll_scheduler(self):
+        """
+        Create the deadline scheduler for sensor polls and loop housekeeping.
 
-                # Update status file immediately after sensor data is saved
-                # This ensures system_status.txt always reflects latest sensor data
-                self.write_status_file()
+        Poll intervals per sensor class and the per-bus frame gap come from
+        device.conf [POLLING] (see ConfigSnapshot.poll_intervals). Tasks are
+        staggered slightly so classes sharing a bus do not all fall due at once.
 
-                # Process any pending commands or events
-                self.process_events()
+        The scheduler is also the target of realtime boosts from the drain,
+        refill and dosing code (poll_scheduler.realtime_boost).
+        """
+        snapshot = config_snapshot.get_config_snapshot(self.config_file)
+        poll_scheduler.get_bus_gate().min_gap = snapshot.bus_min_frame_gap
+        intervals = snapshot.poll_intervals
+
+        scheduler = poll_scheduler.PollScheduler(on_realtime_change=self._on_realtime_mode_changed)
+        scheduler.add("water_level", intervals["water_level"], WaterLevel.get_statuses_async)
+        scheduler.add("relay", intervals["relay"], self._poll_relays, offset=0.5)
+        scheduler.add("ph", intervals["ph"], pH.get_statuses_async, offset=1.0)
+        scheduler.add("ec", intervals["ec"], EC.get_statuses_async, offset=1.5)
+        scheduler.add("npk", intervals["npk"], NPK.get_statuses_async, offset=2.0)
+        # Status file, heartbeat and action checks keep the old 10 s loop cadence,
+        # on their own thread so they never hold back the sensor polls
+        self._housekeeping_count = 0
+        self._start_housekeeping_worker()
+        scheduler.add("housekeeping", 10.0, self._housekeeping_due.set, offset=2.5)
+        scheduler.configure_realtime(snapshot.realtime_enabled, snapshot.realtime_intervals,
+                                     snapshot.realtime_max_polls_per_second, snapshot.realtime_settle_seconds)
+        poll_scheduler.set_active_scheduler(scheduler)
+        return scheduler
+
+    def _start_control_tick(self):
+        """
+        Run all controllers as one control tick on the poll scheduler.
 
-                # Check Edge heartbeat timeout
-                self._check_heartbeat_timeout()
+        Replaces the nutrient/pH/mixing/sprinkler chains and the water level
+        callback (see src/control_tick.py). Sprinklers start with an on phase
+        when sprinkler_on_at_startup is true, as in the chained mode.
+        """
+        from src import control_tick
+
+        snapshot = config_snapshot.get_config_snapshot(self.config_file)
+        sprinkler_on = False
+        if self.config.has_option('Sprinkler', 'sprinkler_on_at_startup'):
+            value = self._parse_config_value('Sprinkler', 'sprinkler_on_at_startup', 1)
+            sprinkler_on = isinstance(value, str) and value.lower() == 'true'
+
+        relay = Relay()
+        controllers = control_tick.default_controllers(relay, sprinkler_on_at_startup=sprinkler_on)
+        self.control_tick = control_tick.ControlTick(controllers=controllers, config_path=self.config_file)
+        self.control_tick.interval = snapshot.control_tick_interval
+        self.poll_scheduler.add("control_tick", snapshot.control_tick_interval, self.control_tick.run, offset=0.25)
+        logger.info(f"[TICK] Unified control tick every {snapshot.control_tick_interval:g}s")
+
+    def _on_realtime_mode_changed(self, active):
+        """Expose realtime mode (any boosted sensor) as globals.REALTIME_MODE"""
+        globals.REALTIME_MODE = active
+
+    def _poll_relays(self):
+        relay_instance = Relay()
+        if relay_instance:
+            relay_instance.get_status()
+
+    def _start_housekeeping_worker(self):
+        """
+        Run housekeeping on a dedicated thread, woken by the poll scheduler.
 
-                # Check nutrient scheduler health every ~60s (6 loops * 10s)
-                loop_count += 1
-                if loop_count % 6 == 0:
-                    self._check_nutrient_scheduler_health()
-                    self._check_ph_scheduler_health()
+        process_actions() waits up to ACTION_CONFIRM_TIMEOUT for relay echoes.
+        On the scheduler thread that held back the 2 s water level polls and
+        the 1 s realtime drain polls by seconds. The scheduler now only sets
+        _housekeeping_due; a cycle that falls due while the previous one is
+        still running is coalesced into a single follow-up run.
+        """
+        self._housekeeping_due = threading.Event()
 
-                # Periodic action file check as failsafe (in case watchdog misses events)
-                # Runs every loop (10s) - safe because process_actions() has early-exit checks
+        def worker():
+            while True:
+                self._housekeeping_due.wait()
+                self._housekeeping_due.clear()
                 try:
-                    self.event_handler.process_actions()
+                    self._run_housekeeping()
                 except Exception as e:
-                    logger.error(f"Error in periodic action check: {e}")
+                    logger.error(f"Error in housekeeping: {e}")
+                    logger.exception("Full exception details:")
 
-                # Wait for next cycle
-                time.sleep(10)  # 10 second interval between sensor readings
+        threading.Thread(target=worker, name="housekeeping", daemon=True).start()
 
-        except KeyboardInterrupt:
-            logger.info("Main loop interrupted by user")
-        except Exception as e:
-            logger.error(f"Error in main loop: {e}")
-            logger.exception("Full exception details:")
-            
-    def update_sensor_data(self):
-        """Trigger async sensor reads. Individual modules save data via helpers.save_sensor_data()."""
-        try:
-            WaterLevel.get_statuses_async()
-            time.sleep(0.5)
+    def _run_housekeeping(self):
+        """Per-cycle work that used to follow the sensor reads in the main loop."""
+        # Save sensor data
+        self.save_sensor_data()
 
-            relay_instance = Relay()
-            if relay_instance:
-                relay_instance.get_status()
-            time.sleep(0.5)
+        # Refresh status file only if displayed values changed
+        # (or the max refresh interval elapsed)
+        self.write_status_file()
 
-            pH.get_statuses_async()
-            time.sleep(0.5)
+        # Process any pending commands or events
+        self.process_events()
 
-            EC.get_statuses_async()
-            time.sleep(0.5)
+        # Check Edge heartbeat timeout
+        self._check_heartbeat_timeout()
+
+        # Check nutrient scheduler health every ~60s (6 cycles * 10s)
+        self._housekeeping_count += 1
+        if self._housekeeping_count % 6 == 0 and not self.unified_tick:
+            self._check_nutrient_scheduler_health()
+            self._check_ph_scheduler_health()
 
-            NPK.get_statuses_async()
+        # Periodic action file check as failsafe (in case watchdog misses events)
+        # Runs every cycle (10s) - safe because process_actions() has early-exit checks
+        try:
+            self.event_handler.process_actions()
         except Exception as e:
-            logger.error(f"Error updating sensor data: {e}")
-            
+            logger.error(f"Error in periodic action check: {e}")
+
+    def _start_reactive_dosing(self):
+        """
+        Register the EC and pH reading handlers for reactive dosing.
+
+        Registered in the controller process only; whether they evaluate is
+        governed by NutrientPump.reactive_dosing_enabled (see src/reactive_dosing.py).
+        """
+        from src import nutrient_static, ph_static
+        from src.sensor_validation import is_valid_ec, is_ec_change_valid, is_valid_ph, is_ph_change_valid
+
+        snapshot = config_snapshot.get_config_snapshot(self.config_file)
+        for kind, evaluate, is_valid, is_change_valid in (
+                ("ec", nutrient_static.evaluate_nutrient_dosing_now, is_valid_ec, is_ec_change_valid),
+                ("ph", ph_static.evaluate_ph_adjustment_now, is_valid_ph, is_ph_change_valid)):
+            reactive_dosing.register(reactive_dosing.ReactiveEvaluator(
+                kind, evaluate, is_valid, is_change_valid,
+                min_interval=snapshot.reactive_evaluation_interval,
+                enabled=snapshot.reactive_dosing_enabled))
+        logger.info(f"[REACTIVE] Reactive dosing {'enabled' if snapshot.reactive_dosing_enabled else 'disabled'}")
+
+    def _on_reactive_dosing_config_changed(self, changes, snapshot):
+        """Switch reactive dosing on/off or change its evaluation interval"""
+        for kind in ("ec", "ph"):
+            evaluator = reactive_dosing.get_evaluator(kind)
+            if evaluator is not None:
+                evaluator.configure(snapshot.reactive_dosing_enabled, snapshot.reactive_evaluation_interval)
+
+    def _on_control_tick_config_changed(self, changes, snapshot):
+        """Apply a new control tick interval; enabling or disabling the tick needs a restart"""
+        if self.control_tick is None:
+            return
+        self.control_tick.interval = snapshot.control_tick_interval
+        self.poll_scheduler.set_interval("control_tick", snapshot.control_tick_interval)
+
+    def _on_polling_config_changed(self, changes, snapshot):
+        """Apply new [POLLING] intervals, bus gap and realtime limits to the running scheduler"""
+        poll_scheduler.get_bus_gate().min_gap = snapshot.bus_min_frame_gap
+        scheduler = getattr(self, 'poll_scheduler', None)
+        if scheduler is None:
+            return
+        for name, interval in snapshot.poll_intervals.items():
+            scheduler.set_interval(name, interval)
+        scheduler.configure_realtime(snapshot.realtime_enabled, snapshot.realtime_intervals,
+                                     snapshot.realtime_max_polls_per_second, snapshot.realtime_settle_seconds)
+
     def check_sensor_ranges(self, ph_statuses: Dict[str, float], ec_statuses: Dict[str, float], water_levels: Dict[str, float]):
         """Check if sensor values are within configured ranges from device.conf."""
         try:
@@ -1870,33 +1773,27 @@ class RippleController:
         logger.info("Use individual controller status methods for job information")
 
     def _create_backup_sprinkler_timer(self, duration_seconds):
-        """Create a backup thread-based timer to stop sprinklers"""
+        """Create a backup deadline to stop sprinklers"""
         try:
-            logger.info(f"Setting up backup thread to stop sprinklers in {duration_seconds} seconds")
-            import threading
+            logger.info(f"Setting up backup deadline to stop sprinklers in {duration_seconds} seconds")
+            from src.deadline_service import get_deadline_service
             
-            def stop_sprinklers_thread():
-                logger.info(f"Backup thread-based sprinkler timer started - will stop in {duration_seconds} seconds")
-                time.sleep(duration_seconds)
+            def stop_sprinklers_deadline():
                 try:
-                    logger.info("Backup thread timer elapsed - turning off sprinklers now")
-                    # Create a new relay instance within this thread to ensure a fresh connection
+                    logger.info("Backup deadline elapsed - turning off sprinklers now")
                     from src.sensors.Relay import Relay
                     relay = Relay()
                     if relay:
                         relay.set_sprinklers(False)
-                        logger.info("Sprinklers turned off by backup thread timer")
+                        logger.info("Sprinklers turned off by backup deadline")
                     else:
-                        logger.error("Failed to get relay instance in backup timer thread")
+                        logger.error("Failed to get relay instance in backup deadline")
                 except Exception as e:
-                    logger.error(f"Error turning off sprinklers in backup timer thread: {e}")
-                    logger.exception("Full thread exception details:")
+                    logger.error(f"Error turning off sprinklers in backup deadline: {e}")
+                    logger.exception("Full exception details:")
             
-            # Start the timer thread
-            stop_thread = threading.Thread(target=stop_sprinklers_thread)
-            stop_thread.daemon = True
-            stop_thread.start()
-            logger.info(f"Backup sprinkler stop thread started with ID: {stop_thread.ident}")
+            get_deadline_service().call_later(duration_seconds, stop_sprinklers_deadline, name="sprinkler_backup_stop")
+            logger.info("Backup sprinkler stop deadline scheduled")
             return True
         except Exception as e:
             logger.error(f"Error creating backup sprinkler timer: {e}")
@@ -1944,6 +1841,8 @@ class RippleController:
 
 if __name__ == "__main__":
     try:
+        io_accounting.configure("main", globals.DATA_FOLDER_PATH, globals.get_io_write_budget_mb())
+        lumina_logger.requeue_leftover_segments(globals.SENSOR_DATA_LOG_PATH)
         globals.start_scheduler()
         controller = RippleController()
         # Start the main control loop
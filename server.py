@@ -2,7 +2,13 @@
 
 import os
 import sys
+
+if __name__ == "__main__":
+    # No Modbus connection of our own: src.globals builds a proxy to main.py (src/controller_ipc.py)
+    os.environ.setdefault("RIPPLE_MODBUS_VIA_CONTROLLER", "1")
+
 import json
+import asyncio
 import configparser
 import subprocess  # Added for system commands
 import threading
@@ -12,6 +18,7 @@ from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import secrets
+import orjson
 import struct
 import time
 from datetime import datetime
@@ -26,12 +33,21 @@ sys.path.append(src_dir)
 import src.globals as globals
 import src.helpers as helpers
 from src.lumina_logger import GlobalLogger
+from src import io_accounting
+from src import response_cache
+from src import config_transaction
+from src import api_workers
+from src.config_snapshot import get_config_snapshot
 from src.sensors.water_level import WaterLevel
 from src.sensors.Relay import Relay
 from src.sensors.DO import DO
 from src.sensors.pH import pH
 from src.sensors.ec import EC
-from src.sensor_scanner import SensorScanner, ScanRequest
+from src.sensor_scanner import ScanRequest
+from src import scan_jobs
+from src import telemetry_stream
+from src import controller_ipc
+from src import operating_mode
 
 try:
     from audit_event import audit
@@ -147,7 +163,10 @@ _mode_lock = threading.Lock()
 _current_mode = "autonomous"  # Start autonomous until Edge checks in
 _last_heartbeat_time = 0.0    # time.time() of last heartbeat
 _edge_ip = None               # IP of Edge device (captured from heartbeat sender)
-HEARTBEAT_TIMEOUT_S = 60      # Switch to autonomous after 60s without heartbeat
+HEARTBEAT_TIMEOUT_S = operating_mode.HEARTBEAT_TIMEOUT_S
+CONTROLLER_MODE_TIMEOUT = 0.5 # Seconds to wait for main.py on heartbeat and mode calls
+CONTROLLER_ACTION_TIMEOUT = 8.0  # Seconds to wait for main.py to apply and confirm actions
+SSE_KEEPALIVE_SECONDS = 15    # Comment line on idle Server-Sent Event streams
 
 def get_mode():
     with _mode_lock:
@@ -160,21 +179,25 @@ def set_mode(mode):
         _current_mode = mode
         if old != mode:
             logger.info(f"Mode changed: {old} -> {mode}")
+    if old != mode:
+        _telemetry().publish("mode", {"mode": mode, "previous": old, "timestamp": helpers.datetime_to_iso8601()})
 
 def get_last_heartbeat_time():
     with _mode_lock:
         return _last_heartbeat_time
 
-def update_heartbeat(edge_ip=None):
+def update_heartbeat(edge_ip=None, persist=True):
     global _last_heartbeat_time, _edge_ip
     with _mode_lock:
         _last_heartbeat_time = time.time()
         if edge_ip:
             _edge_ip = edge_ip
+            if not persist:
+                return  # main.py took the heartbeat and keeps the Edge IP itself
             # Persist edge_ip for cross-process access (audit_sync runs in main.py process)
             try:
                 ip_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "edge_ip.txt")
-                with open(ip_file, "w") as f:
+                with io_accounting.open_accounted("edge_ip", ip_file, "w") as f:
                     f.write(edge_ip)
                 logger.info(f"Persisted edge_ip={edge_ip} to {ip_file}")
             except Exception as e:
@@ -184,6 +207,23 @@ def get_edge_ip():
     with _mode_lock:
         return _edge_ip
 
+def _controller():
+    return controller_ipc.get_controller_client()
+
+def _telemetry():
+    return telemetry_stream.get_telemetry_hub(globals.SAVED_SENSOR_DATA_PATH, audit,
+                                              mode_source=_sync_mode_from_controller)
+
+def _sync_mode_from_controller():
+    """Mirror main.py's mode (e.g. a heartbeat timeout) for "mode" stream subscribers; returns events published."""
+    try:
+        state = _controller().call("mode.get", reply_timeout=CONTROLLER_MODE_TIMEOUT)
+    except (controller_ipc.ControllerUnavailable, controller_ipc.ControllerCallError):
+        return 0  # standalone: this process owns the mode and publishes its own changes
+    old = get_mode()
+    set_mode(state["mode"])
+    return int(state["mode"] != old)
+
 # Create FastAPI app
 app = FastAPI(title="Ripple Fertigation API", 
               description="REST API for monitoring and controlling the Ripple fertigation system",
@@ -363,6 +403,32 @@ def _safe_get_second_value(config_parser, section, key, default=""):
         logger.warning(f"Could not get second value for {section}.{key}: {e}")
         return default
 
+# Pre-serialized bodies for the GET endpoints the Edge polls (see src/response_cache.py)
+_response_cache = response_cache.ResponseCache()
+
+
+def _config_snapshot():
+    """Current device.conf snapshot; re-parsed only when the file changes"""
+    return get_config_snapshot('config/device.conf')
+
+
+def _config_parser_from(snapshot):
+    """ConfigParser view of a snapshot, for builders written against ConfigParser"""
+    config = configparser.ConfigParser(interpolation=None)
+    config.read_dict(snapshot.sections)
+    return config
+
+
+async def _cached_config_response(request, name, builder):
+    """Serve a body built from the current device.conf snapshot, with ETag / 304"""
+    def build():
+        snapshot = _config_snapshot()
+        return _response_cache.get_or_build(name, snapshot.version,
+                                            lambda: builder(_config_parser_from(snapshot)))
+    cached = await api_workers.run_blocking(build)
+    return response_cache.conditional_response(request, cached)
+
+
 def get_valid_relay_fields():
     """
     Dynamically read valid relay control fields from device.conf.
@@ -437,23 +503,31 @@ def get_valid_relay_fields():
             'sprinkler_b', 'pump_from_collector_tray_to_tank', 'nanobubbler'
         ]
 
-_config_write_lock = threading.Lock()
+# All config POSTs go through one writer: concurrent updates are validated
+# together and land in device.conf as a single atomic write
+_config_writer = config_transaction.ConfigTransactionWriter('config/device.conf')
+
+def _log_config_commit(changes):
+    logger.info(f"[CONFIG TXN] device.conf committed {len(changes)} key change(s): "
+                + ", ".join(f"{c.name}={c.new_operational}" for c in changes))
 
-def update_device_conf_from_config(cfg: FertigationConfig) -> bool:
+_config_writer.add_listener(_log_config_commit)
+
+async def update_device_conf_from_config(cfg: FertigationConfig) -> bool:
     """Update device.conf with provided fertigation config values.
-    Only updates fields that are not None — omitted fields keep current values."""
+    Only updates fields that are not None — omitted fields keep current values.
+    Raises ConfigValidationError if the values are rejected."""
     try:
-        with _config_write_lock:
-            return _update_device_conf_locked(cfg)
+        return await _config_writer.apply_async(lambda config: _apply_fertigation_config(config, cfg),
+                                                 label="fertigation")
+    except config_transaction.ConfigValidationError:
+        raise
     except Exception as e:
         logger.error(f"Error updating device.conf: {e}")
         return False
 
-def _update_device_conf_locked(cfg: FertigationConfig) -> bool:
-    """Internal: update device.conf while holding _config_write_lock."""
-    config = configparser.ConfigParser()
-    config.read('config/device.conf')
-
+def _apply_fertigation_config(config, cfg: FertigationConfig) -> bool:
+    """Internal: apply fertigation values to a ConfigParser inside a config transaction."""
     # pH settings
     if cfg.target_ph is not None:
         ref = _safe_get_first_value(config, 'pH', 'ph_target', str(cfg.target_ph))
@@ -514,17 +588,11 @@ def _update_device_conf_locked(cfg: FertigationConfig) -> bool:
             ref = _safe_get_first_value(config, 'Recirculation', 'recirculation_wait_duration', cfg.recirculation_wait_duration)
             config.set('Recirculation', 'recirculation_wait_duration', f"{ref}, {cfg.recirculation_wait_duration}")
 
-    with open('config/device.conf', 'w') as configfile:
-        config.write(configfile)
-
     logger.info(f"Updated device.conf: {cfg.model_dump(exclude_none=True)}")
     return True
 
-@app.get("/api/v1/config", tags=["General"])
-async def get_device_config(username: str = Depends(verify_credentials)):
-    """Return current device.conf as raw INI text with SHA256 hash."""
+def _build_device_config(config_path):
     import hashlib
-    config_path = os.path.join(current_dir, 'config', 'device.conf')
     with open(config_path, 'r') as f:
         config_text = f.read()
     config_hash = hashlib.sha256(config_text.encode()).hexdigest()
@@ -533,6 +601,20 @@ async def get_device_config(username: str = Depends(verify_credentials)):
         "config_hash": config_hash,
     }
 
+@app.get("/api/v1/config", tags=["General"])
+async def get_device_config(request: Request, username: str = Depends(verify_credentials)):
+    """
+    Return current device.conf as raw INI text with SHA256 hash.
+
+    The file is read and hashed only when its mtime, size or inode change;
+    the ETag is returned so pollers can use If-None-Match.
+    """
+    config_path = os.path.join(current_dir, 'config', 'device.conf')
+    cached = await api_workers.run_blocking(
+        lambda: _response_cache.get_or_build("config", response_cache.file_signature(config_path),
+                                             lambda: _build_device_config(config_path)))
+    return response_cache.conditional_response(request, cached)
+
 @app.get("/api/v1/system", response_model=SystemStatus, tags=["General"])
 async def system_info(username: str = Depends(verify_credentials)):
     """
@@ -569,6 +651,18 @@ async def receive_heartbeat(request: Request, hb: HeartbeatRequest = HeartbeatRe
         # Fallback: extract from X-Forwarded-For or peer address
         edge_ip = request.headers.get("x-forwarded-for", "").split(",")[0].strip() or None
         logger.warning(f"Heartbeat: request.client={request.client}, falling back to edge_ip={edge_ip}")
+    # Controller round trip, or edge_ip.txt and audit writes: off the event loop
+    return await api_workers.run_blocking(_receive_heartbeat, edge_ip)
+
+def _receive_heartbeat(edge_ip: Optional[str]):
+    try:
+        # main.py owns the mode and the heartbeat timeout; keep a mirror here
+        result = _controller().call("mode.heartbeat", reply_timeout=CONTROLLER_MODE_TIMEOUT, edge_ip=edge_ip)
+        update_heartbeat(edge_ip=edge_ip, persist=False)
+        set_mode(result["mode"])
+        return {"status": "success", "mode": result["mode"], "timestamp": time.time()}
+    except (controller_ipc.ControllerUnavailable, controller_ipc.ControllerCallError) as e:
+        logger.debug(f"Heartbeat not reported to controller ({e}), keeping mode here")
     update_heartbeat(edge_ip=edge_ip)
     if get_mode() != "passive":
         old_mode = get_mode()
@@ -587,6 +681,15 @@ async def receive_heartbeat(request: Request, hb: HeartbeatRequest = HeartbeatRe
 @app.get("/api/v1/mode", tags=["Status"])
 async def get_current_mode(username: str = Depends(verify_credentials)):
     """Get current operating mode."""
+    return await api_workers.run_blocking(_current_mode_state)
+
+def _current_mode_state():
+    try:
+        state = _controller().call("mode.get", reply_timeout=CONTROLLER_MODE_TIMEOUT)
+        set_mode(state["mode"])
+        return {"mode": state["mode"], "last_heartbeat": state["last_heartbeat"], "timeout_s": state["timeout_s"]}
+    except (controller_ipc.ControllerUnavailable, controller_ipc.ControllerCallError):
+        pass
     return {
         "mode": get_mode(),
         "last_heartbeat": get_last_heartbeat_time(),
@@ -599,17 +702,19 @@ async def update_fertigation_config(cfg: FertigationConfig, username: str = Depe
     All fields are optional — only provided fields are updated in device.conf."""
     try:
         changed_fields = cfg.model_dump(exclude_unset=True)
-        if update_device_conf_from_config(cfg):
+        if await update_device_conf_from_config(cfg):
             if audit and changed_fields:
-                audit.emit("config_change", "fertigation_config_update",
-                           resource="fertigation", source="user_cloud",
-                           value=changed_fields, user_name=username,
-                           details=f"Updated {len(changed_fields)} fertigation fields")
+                await api_workers.run_blocking(audit.emit, "config_change", "fertigation_config_update",
+                                               resource="fertigation", source="user_cloud",
+                                               value=changed_fields, user_name=username,
+                                               details=f"Updated {len(changed_fields)} fertigation fields")
             return {"status": "success", "message": "Configuration applied successfully"}
         else:
             raise HTTPException(status_code=500, detail="Failed to apply configuration")
     except HTTPException:
         raise
+    except config_transaction.ConfigValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error applying configuration: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -620,12 +725,14 @@ async def update_instruction_set(instruction_set: Dict, username: str = Depends(
     try:
         fertigation = instruction_set['current_phase']['details']['action_fertigation']
         cfg = FertigationConfig(**fertigation)
-        if update_device_conf_from_config(cfg):
+        if await update_device_conf_from_config(cfg):
             return {"status": "success", "message": "Instruction set applied successfully"}
         else:
             raise HTTPException(status_code=500, detail="Failed to apply instruction set")
     except HTTPException:
         raise
+    except config_transaction.ConfigValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error applying instruction set: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -634,18 +741,140 @@ async def update_instruction_set(instruction_set: Dict, username: str = Depends(
 async def update_manual_command(command: FertigationConfig, username: str = Depends(verify_credentials)):
     """Legacy endpoint. Delegates to unified config update."""
     try:
-        if update_device_conf_from_config(command):
+        if await update_device_conf_from_config(command):
             return {"status": "success", "message": "User instruction set applied successfully"}
         else:
             raise HTTPException(status_code=500, detail="Failed to apply user instruction set")
     except HTTPException:
         raise
+    except config_transaction.ConfigValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error applying user instruction set: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _build_system_status(snapshot):
+    """Build the /api/v1/status payload from sensor data and a config snapshot"""
+    # Read current sensor data
+    with open(globals.SAVED_SENSOR_DATA_PATH, 'rb') as f:
+        sensor_data = orjson.loads(f.read())
+    
+    # Extract essential sensor values
+    simplified_status = {}
+    
+    # Extract sensor values
+    if 'data' in sensor_data and 'water_metrics' in sensor_data['data']:
+        water_metrics = sensor_data['data']['water_metrics']
+        
+        # Extract pH value
+        if 'ph' in water_metrics and 'measurements' in water_metrics['ph']:
+            ph_points = water_metrics['ph']['measurements']['points']
+            if ph_points:
+                simplified_status['ph'] = ph_points[-1]['fields']['value']
+                simplified_status['ph_temperature'] = ph_points[-1]['fields']['temperature']
+        
+        # Extract EC value
+        if 'ec' in water_metrics and 'measurements' in water_metrics['ec']:
+            ec_points = water_metrics['ec']['measurements']['points']
+            if ec_points:
+                simplified_status['ec'] = ec_points[-1]['fields']['value']
+                # Extract additional EC data
+                simplified_status['ec_tds'] = ec_points[-1]['fields'].get('tds')
+                simplified_status['ec_salinity'] = ec_points[-1]['fields'].get('salinity')
+                simplified_status['ec_temperature'] = ec_points[-1]['fields'].get('temperature')
+        
+        # Extract water level
+        if 'water_level' in water_metrics and 'measurements' in water_metrics['water_level']:
+            water_level_points = water_metrics['water_level']['measurements']['points']
+            if water_level_points:
+                simplified_status['water_level'] = water_level_points[-1]['fields']['value']
+
+    # Extract soil metrics
+    if 'data' in sensor_data and 'soil_metrics' in sensor_data['data']:
+        soil_metrics = sensor_data['data']['soil_metrics']
+
+        if 'npk' in soil_metrics and 'measurements' in soil_metrics['npk']:
+            npk_points = soil_metrics['npk']['measurements']['points']
+            if npk_points:
+                simplified_status['nitrogen'] = npk_points[-1]['fields'].get('nitrogen')
+                simplified_status['phosphorus'] = npk_points[-1]['fields'].get('phosphorus')
+                simplified_status['potassium'] = npk_points[-1]['fields'].get('potassium')
+
+    # Extract target values from config file
+    try:
+        config = _config_parser_from(snapshot)
+
+        # pH targets (read operational value = second comma-separated value)
+        if config.has_section('pH'):
+            simplified_status['target_ph'] = float(config.get('pH', 'ph_target').split(',')[1].strip())
+            simplified_status['ph_deadband'] = float(config.get('pH', 'ph_deadband').split(',')[1].strip())
+            simplified_status['ph_min'] = float(config.get('pH', 'ph_min').split(',')[1].strip())
+            simplified_status['ph_max'] = float(config.get('pH', 'ph_max').split(',')[1].strip())
+
+        # EC targets (read operational value = second comma-separated value)
+        if config.has_section('EC'):
+            simplified_status['target_ec'] = float(config.get('EC', 'ec_target').split(',')[1].strip())
+            simplified_status['ec_deadband'] = float(config.get('EC', 'ec_deadband').split(',')[1].strip())
+            simplified_status['ec_min'] = float(config.get('EC', 'ec_min').split(',')[1].strip())
+            simplified_status['ec_max'] = float(config.get('EC', 'ec_max').split(',')[1].strip())
+
+        # Water level targets (read operational value = second comma-separated value)
+        if config.has_section('WaterLevel'):
+            simplified_status['target_water_level'] = float(config.get('WaterLevel', 'water_level_target').split(',')[1].strip())
+            simplified_status['water_level_deadband'] = float(config.get('WaterLevel', 'water_level_deadband').split(',')[1].strip())
+            simplified_status['water_level_min'] = float(config.get('WaterLevel', 'water_level_min').split(',')[1].strip())
+            simplified_status['water_level_max'] = float(config.get('WaterLevel', 'water_level_max').split(',')[1].strip())
+
+        # Nutrient pump settings (read operational value = second comma-separated value)
+        if config.has_section('NutrientPump'):
+            simplified_status['abc_ratio'] = config.get('NutrientPump', 'abc_ratio').split(',')[1].strip().strip('"')
+
+        # Sprinkler settings (read operational value = second comma-separated value)
+        if config.has_section('Sprinkler'):
+            simplified_status['sprinkler_on_duration'] = config.get('Sprinkler', 'sprinkler_on_duration').split(',')[1].strip().strip('"')
+            simplified_status['sprinkler_wait_duration'] = config.get('Sprinkler', 'sprinkler_wait_duration').split(',')[1].strip().strip('"')
+            # Add sprinkler_on_at_startup operational value
+            if config.has_option('Sprinkler', 'sprinkler_on_at_startup'):
+                startup_value = _parse_config_value('Sprinkler', 'sprinkler_on_at_startup', config, preferred_index=1)
+                simplified_status['sprinkler_on_at_startup'] = startup_value
+        
+        # Water temperature targets (read operational value = second comma-separated value)
+        if config.has_section('WaterTemperature'):
+            simplified_status['target_water_temperature'] = float(config.get('WaterTemperature', 'target_water_temperature').split(',')[1].strip())
+            simplified_status['target_water_temperature_min'] = float(config.get('WaterTemperature', 'target_water_temperature_min').split(',')[1].strip())
+            simplified_status['target_water_temperature_max'] = float(config.get('WaterTemperature', 'target_water_temperature_max').split(',')[1].strip())
+        
+        # Plumbing operational values
+        if config.has_section('PLUMBING'):
+            simplified_status['plumbing'] = {}
+            for key in config.options('PLUMBING'):
+                operational_value = _parse_config_value('PLUMBING', key, config, preferred_index=1)
+                api_key = key.lower()
+                simplified_status['plumbing'][api_key] = operational_value
+            
+    except Exception as e:
+        logger.warning(f"Error reading config targets: {e}")
+    
+    # Extract relay states in the desired format
+    if 'data' in sensor_data and 'relay_metrics' in sensor_data['data']:
+        relay_points = sensor_data['data']['relay_metrics']['measurements']['points']
+        relay_list = []
+        for point in relay_points:
+            if 'tags' in point and 'fields' in point:
+                relay_list.append({
+                    "port": str(point['tags']['port_index']),
+                    "status": bool(point['fields']['status']),
+                    "as": point['tags']['device']
+                })
+        simplified_status['relays'] = relay_list
+    
+    # Add timestamp; the status cache keeps it while the reported values are unchanged
+    simplified_status['timestamp'] = helpers.datetime_to_iso8601()
+    
+    return simplified_status
+
 @app.get("/api/v1/status", tags=["Status"])
-async def get_system_status(username: str = Depends(verify_credentials)):
+async def get_system_status(request: Request, username: str = Depends(verify_credentials)):
     """
     Get current system status in a simplified format.
     
@@ -685,133 +914,49 @@ async def get_system_status(username: str = Depends(verify_credentials)):
             
     Note:
         - Requires HTTP Basic Authentication
-        - Reads data from saved_sensor_data.json and device.conf
+        - Reads data from saved_sensor_data.json and device.conf only when
+          either changes; otherwise serves the cached body
+        - Sends an ETag over the reported values (not timestamp); a matching
+          If-None-Match gets an empty 304
+        - timestamp is when the reported values last changed
         - Returns 500 error if data cannot be read or processed
         - Used for system monitoring and dashboard display
     """
+    def build():
+        snapshot = _config_snapshot()
+        version = (snapshot.version, response_cache.file_signature(globals.SAVED_SENSOR_DATA_PATH))
+        return _response_cache.get_or_build("status", version, lambda: _build_system_status(snapshot),
+                                            volatile_keys=("timestamp",))
+
     try:
-        # Read current sensor data
-        with open('data/saved_sensor_data.json', 'r') as f:
-            sensor_data = json.load(f)
-        
-        # Extract essential sensor values
-        simplified_status = {}
-        
-        # Extract sensor values
-        if 'data' in sensor_data and 'water_metrics' in sensor_data['data']:
-            water_metrics = sensor_data['data']['water_metrics']
-            
-            # Extract pH value
-            if 'ph' in water_metrics and 'measurements' in water_metrics['ph']:
-                ph_points = water_metrics['ph']['measurements']['points']
-                if ph_points:
-                    simplified_status['ph'] = ph_points[-1]['fields']['value']
-                    simplified_status['ph_temperature'] = ph_points[-1]['fields']['temperature']
-            
-            # Extract EC value
-            if 'ec' in water_metrics and 'measurements' in water_metrics['ec']:
-                ec_points = water_metrics['ec']['measurements']['points']
-                if ec_points:
-                    simplified_status['ec'] = ec_points[-1]['fields']['value']
-                    # Extract additional EC data
-                    simplified_status['ec_tds'] = ec_points[-1]['fields'].get('tds')
-                    simplified_status['ec_salinity'] = ec_points[-1]['fields'].get('salinity')
-                    simplified_status['ec_temperature'] = ec_points[-1]['fields'].get('temperature')
-            
-            # Extract water level
-            if 'water_level' in water_metrics and 'measurements' in water_metrics['water_level']:
-                water_level_points = water_metrics['water_level']['measurements']['points']
-                if water_level_points:
-                    simplified_status['water_level'] = water_level_points[-1]['fields']['value']
-
-        # Extract soil metrics
-        if 'data' in sensor_data and 'soil_metrics' in sensor_data['data']:
-            soil_metrics = sensor_data['data']['soil_metrics']
-
-            if 'npk' in soil_metrics and 'measurements' in soil_metrics['npk']:
-                npk_points = soil_metrics['npk']['measurements']['points']
-                if npk_points:
-                    simplified_status['nitrogen'] = npk_points[-1]['fields'].get('nitrogen')
-                    simplified_status['phosphorus'] = npk_points[-1]['fields'].get('phosphorus')
-                    simplified_status['potassium'] = npk_points[-1]['fields'].get('potassium')
-
-        # Extract target values from config file
-        try:
-            config = configparser.ConfigParser()
-            config.read('config/device.conf')
-            
-            # pH targets (read operational value = second comma-separated value)
-            if config.has_section('pH'):
-                simplified_status['target_ph'] = float(config.get('pH', 'ph_target').split(',')[1].strip())
-                simplified_status['ph_deadband'] = float(config.get('pH', 'ph_deadband').split(',')[1].strip())
-                simplified_status['ph_min'] = float(config.get('pH', 'ph_min').split(',')[1].strip())
-                simplified_status['ph_max'] = float(config.get('pH', 'ph_max').split(',')[1].strip())
-
-            # EC targets (read operational value = second comma-separated value)
-            if config.has_section('EC'):
-                simplified_status['target_ec'] = float(config.get('EC', 'ec_target').split(',')[1].strip())
-                simplified_status['ec_deadband'] = float(config.get('EC', 'ec_deadband').split(',')[1].strip())
-                simplified_status['ec_min'] = float(config.get('EC', 'ec_min').split(',')[1].strip())
-                simplified_status['ec_max'] = float(config.get('EC', 'ec_max').split(',')[1].strip())
-
-            # Water level targets (read operational value = second comma-separated value)
-            if config.has_section('WaterLevel'):
-                simplified_status['target_water_level'] = float(config.get('WaterLevel', 'water_level_target').split(',')[1].strip())
-                simplified_status['water_level_deadband'] = float(config.get('WaterLevel', 'water_level_deadband').split(',')[1].strip())
-                simplified_status['water_level_min'] = float(config.get('WaterLevel', 'water_level_min').split(',')[1].strip())
-                simplified_status['water_level_max'] = float(config.get('WaterLevel', 'water_level_max').split(',')[1].strip())
-
-            # Nutrient pump settings (read operational value = second comma-separated value)
-            if config.has_section('NutrientPump'):
-                simplified_status['abc_ratio'] = config.get('NutrientPump', 'abc_ratio').split(',')[1].strip().strip('"')
-
-            # Sprinkler settings (read operational value = second comma-separated value)
-            if config.has_section('Sprinkler'):
-                simplified_status['sprinkler_on_duration'] = config.get('Sprinkler', 'sprinkler_on_duration').split(',')[1].strip().strip('"')
-                simplified_status['sprinkler_wait_duration'] = config.get('Sprinkler', 'sprinkler_wait_duration').split(',')[1].strip().strip('"')
-                # Add sprinkler_on_at_startup operational value
-                if config.has_option('Sprinkler', 'sprinkler_on_at_startup'):
-                    startup_value = _parse_config_value('Sprinkler', 'sprinkler_on_at_startup', config, preferred_index=1)
-                    simplified_status['sprinkler_on_at_startup'] = startup_value
-            
-            # Water temperature targets (read operational value = second comma-separated value)
-            if config.has_section('WaterTemperature'):
-                simplified_status['target_water_temperature'] = float(config.get('WaterTemperature', 'target_water_temperature').split(',')[1].strip())
-                simplified_status['target_water_temperature_min'] = float(config.get('WaterTemperature', 'target_water_temperature_min').split(',')[1].strip())
-                simplified_status['target_water_temperature_max'] = float(config.get('WaterTemperature', 'target_water_temperature_max').split(',')[1].strip())
-            
-            # Plumbing operational values
-            if config.has_section('PLUMBING'):
-                simplified_status['plumbing'] = {}
-                for key in config.options('PLUMBING'):
-                    operational_value = _parse_config_value('PLUMBING', key, config, preferred_index=1)
-                    api_key = key.lower()
-                    simplified_status['plumbing'][api_key] = operational_value
-                
-        except Exception as e:
-            logger.warning(f"Error reading config targets: {e}")
-        
-        # Extract relay states in the desired format
-        if 'data' in sensor_data and 'relay_metrics' in sensor_data['data']:
-            relay_points = sensor_data['data']['relay_metrics']['measurements']['points']
-            relay_list = []
-            for point in relay_points:
-                if 'tags' in point and 'fields' in point:
-                    relay_list.append({
-                        "port": str(point['tags']['port_index']),
-                        "status": bool(point['fields']['status']),
-                        "as": point['tags']['device']
-                    })
-            simplified_status['relays'] = relay_list
-        
-        # Add timestamp
-        simplified_status['timestamp'] = helpers.datetime_to_iso8601()
-        
-        return simplified_status
+        cached = await api_workers.run_blocking(build)
+        return response_cache.conditional_response(request, cached)
     except Exception as e:
         logger.error(f"Error getting system status: {e}")
         raise HTTPException(status_code=500, detail=f"Error getting system status: {str(e)}")
 
+@app.get("/api/v1/status/text", tags=["Status"])
+async def get_system_status_text(username: str = Depends(verify_credentials)):
+    """
+    Render the human-readable status report (same format as data/system_status.txt).
+
+    main.py only rewrites system_status.txt when displayed values change, so
+    this endpoint renders a fresh report on demand from saved_sensor_data.json.
+    Controller states live in main.py and are not included.
+    """
+    from fastapi.responses import PlainTextResponse
+    from src import status_report
+
+    def render():
+        try:
+            with open(globals.SAVED_SENSOR_DATA_PATH, 'rb') as f:
+                sensor_data = orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError):
+            sensor_data = {}
+        return status_report.render_status(status_report.extract_status_values(sensor_data))
+
+    return PlainTextResponse(await api_workers.run_blocking(render))
+
 @app.post("/api/v1/action", tags=["Control"])
 async def update_action(request: dict, username: str = Depends(verify_credentials)):
     """
@@ -846,7 +991,11 @@ async def update_action(request: dict, username: str = Depends(verify_credential
         - Special handling for sprinkler control with device_id support
         - Saves processed request to config/action.json
         - Returns error for invalid fields or types
+        - Runs on the API worker pool; relay writes and file I/O stay off the event loop
     """
+    return await api_workers.run_blocking(_update_action, request, username)
+
+def _update_action(request: dict, username: str):
     try:
         logger.info(f"Received raw action request: {request}")
         
@@ -916,70 +1065,35 @@ async def update_action(request: dict, username: str = Depends(verify_credential
                 processed_request['sprinkler_b'] = sprinkler_value
                 logger.info(f"Mapped 'sprinkler' to both sprinkler_a and sprinkler_b with value {sprinkler_value}")
 
-        # Execute relay commands directly for immediate feedback
-        # This ensures the action is actually performed, not just written to file
-        execution_results = {}
-        failed_actions = []
-
-        if processed_request:
-            try:
-                from src.sensors.Relay import Relay
-                relay = Relay()
-
-                if relay:
-                    # API field name to device name mapping
-                    api_to_device = {
-                        'nutrient_pump_a': 'NutrientPumpA',
-                        'nutrient_pump_b': 'NutrientPumpB',
-                        'nutrient_pump_c': 'NutrientPumpC',
-                        'ph_up_pump': 'pHUpPump',
-                        'ph_down_pump': 'pHDownPump',
-                        'valve_outside_to_tank': 'ValveOutsideToTank',
-                        'valve_tank_to_outside': 'ValveTankToOutside',
-                        'mixing_pump': 'MixingPump',
-                        'pump_from_tank_to_gutters': 'PumpFromTankToGutters',
-                        'sprinkler_a': 'SprinklerA',
-                        'sprinkler_b': 'SprinklerB',
-                        'pump_from_collector_tray_to_tank': 'PumpFromCollectorTrayToTank',
-                        'nanobubbler': 'Nanobubbler'
-                    }
-
-                    for action, state in processed_request.items():
-                        device_name = api_to_device.get(action)
-                        if device_name:
-                            try:
-                                result = relay.set_relay(device_name, state)
-                                execution_results[action] = {"success": True, "result": result}
-                                logger.info(f"Executed {action} -> {device_name} = {state}, result: {result}")
-                            except Exception as e:
-                                execution_results[action] = {"success": False, "error": str(e)}
-                                failed_actions.append(action)
-                                logger.error(f"Failed to execute {action}: {e}")
-                        else:
-                            logger.warning(f"No device mapping for action: {action}")
-                            execution_results[action] = {"success": False, "error": "No device mapping"}
-                            failed_actions.append(action)
-                else:
-                    logger.warning("No relay hardware available")
-                    for action in processed_request:
-                        execution_results[action] = {"success": False, "error": "No relay hardware"}
-                        failed_actions.append(action)
+        audit_resource = ",".join(original_actions) if original_actions else None
+        audit_value = dict(zip(original_actions, [request.get(k) for k in original_actions])) if original_actions else None
 
-            except Exception as e:
-                logger.error(f"Error executing relay commands: {e}")
-                for action in processed_request:
-                    execution_results[action] = {"success": False, "error": str(e)}
-                    failed_actions.append(action)
-
-        # Save to action.json as backup/log (main.py will also see this)
-        with open('config/action.json', 'w') as f:
-            json.dump(processed_request, f, indent=2)
+        # main.py applies the actions and confirms them over the controller channel;
+        # if it cannot be reached, run them here and leave action.json for main.py as before
+        try:
+            report = _apply_actions_via_controller(processed_request) if processed_request else None
+        except (controller_ipc.ControllerUnavailable, controller_ipc.ControllerCallError) as e:
+            if audit:
+                audit.emit("user_command", "relay_action", resource=audit_resource,
+                           source="user_cloud", user_name=username, value=audit_value,
+                           status="failed", details=str(e))
+            return {
+                "status": "error",
+                "message": f"Controller did not apply the actions: {e}"
+            }
+        if report is not None:
+            execution_results, failed_actions = _results_from_report(processed_request, report)
+        else:
+            execution_results, failed_actions = _execute_actions_here(processed_request)
+            # Save to action.json as backup/log (main.py will also see this)
+            with io_accounting.open_accounted("action_json", 'config/action.json', 'w') as f:
+                json.dump(processed_request, f, indent=2)
 
         if audit:
             audit.emit("user_command", "relay_action",
-                       resource=",".join(original_actions) if original_actions else None,
+                       resource=audit_resource,
                        source="user_cloud", user_name=username,
-                       value=dict(zip(original_actions, [request.get(k) for k in original_actions])) if original_actions else None,
+                       value=audit_value,
                        status="success" if not failed_actions else "partial",
                        details=f"Failed: {failed_actions}" if failed_actions else None)
 
@@ -1005,6 +1119,104 @@ async def update_action(request: dict, username: str = Depends(verify_credential
             "message": f"Error updating action: {str(e)}"
         }
 
+def _apply_actions_via_controller(actions: dict):
+    """
+    Have main.py apply actions now.
+
+    Returns:
+        dict: main.py's apply report, or None if the request never reached it
+            and this process has its own Modbus connection to apply them with
+
+    Raises:
+        ControllerUnavailable: If the request was sent (the actions may have
+            run) or the relay bus itself is proxied through main.py
+        ControllerCallError: If main.py failed while applying the actions
+    """
+    try:
+        return _controller().call("actions.apply", reply_timeout=CONTROLLER_ACTION_TIMEOUT, actions=actions)
+    except controller_ipc.ControllerUnavailable as e:
+        if e.sent or os.environ.get("RIPPLE_MODBUS_VIA_CONTROLLER") == "1":
+            logger.error(f"Controller did not confirm actions ({e}), not applying them here")
+            raise
+        logger.warning(f"Controller not reachable ({e}), applying actions here and via action.json")
+        return None
+    except controller_ipc.ControllerCallError as e:
+        logger.error(f"Controller failed to apply actions ({e})")
+        raise
+
+def _results_from_report(actions: dict, report: dict):
+    """Per-action results and failures from the controller's apply report."""
+    execution_results, failed_actions = {}, []
+    for action in actions:
+        if action in report["unknown"]:
+            execution_results[action] = {"success": False, "error": "No device mapping"}
+        elif not report["confirmed"]:
+            execution_results[action] = {"success": False, "error": "Relay write not confirmed"}
+        else:
+            execution_results[action] = {"success": True, "result": True}
+            continue
+        failed_actions.append(action)
+    logger.info(f"Controller applied {report['devices']} device(s) in {report['writes']} write(s) "
+                f"in {report.get('apply_ms', 0):.0f} ms")
+    return execution_results, failed_actions
+
+def _execute_actions_here(processed_request: dict):
+    """Execute relay commands directly in this process (controller not reachable)."""
+    execution_results = {}
+    failed_actions = []
+
+    if processed_request:
+        try:
+            from src.sensors.Relay import Relay
+            relay = Relay()
+
+            if relay:
+                # API field name to device name mapping
+                api_to_device = {
+                    'nutrient_pump_a': 'NutrientPumpA',
+                    'nutrient_pump_b': 'NutrientPumpB',
+                    'nutrient_pump_c': 'NutrientPumpC',
+                    'ph_up_pump': 'pHUpPump',
+                    'ph_down_pump': 'pHDownPump',
+                    'valve_outside_to_tank': 'ValveOutsideToTank',
+                    'valve_tank_to_outside': 'ValveTankToOutside',
+                    'mixing_pump': 'MixingPump',
+                    'pump_from_tank_to_gutters': 'PumpFromTankToGutters',
+                    'sprinkler_a': 'SprinklerA',
+                    'sprinkler_b': 'SprinklerB',
+                    'pump_from_collector_tray_to_tank': 'PumpFromCollectorTrayToTank',
+                    'nanobubbler': 'Nanobubbler'
+                }
+
+                for action, state in processed_request.items():
+                    device_name = api_to_device.get(action)
+                    if device_name:
+                        try:
+                            result = relay.set_relay(device_name, state)
+                            execution_results[action] = {"success": True, "result": result}
+                            logger.info(f"Executed {action} -> {device_name} = {state}, result: {result}")
+                        except Exception as e:
+                            execution_results[action] = {"success": False, "error": str(e)}
+                            failed_actions.append(action)
+                            logger.error(f"Failed to execute {action}: {e}")
+                    else:
+                        logger.warning(f"No device mapping for action: {action}")
+                        execution_results[action] = {"success": False, "error": "No device mapping"}
+                        failed_actions.append(action)
+            else:
+                logger.warning("No relay hardware available")
+                for action in processed_request:
+                    execution_results[action] = {"success": False, "error": "No relay hardware"}
+                    failed_actions.append(action)
+
+        except Exception as e:
+            logger.error(f"Error executing relay commands: {e}")
+            for action in processed_request:
+                execution_results[action] = {"success": False, "error": str(e)}
+                failed_actions.append(action)
+
+    return execution_results, failed_actions
+
 @app.post("/api/v1/system/reboot", tags=["System"])
 async def system_reboot(username: str = Depends(verify_credentials)):
     """
@@ -1077,8 +1289,25 @@ async def system_restart(username: str = Depends(verify_credentials)):
         logger.error(f"Error restarting Ripple application: {e}")
         raise HTTPException(status_code=500, detail=f"Error restarting Ripple application: {str(e)}")
 
+def _build_plumbing_config(config):
+    plumbing_config = {}
+    
+    if config.has_section('PLUMBING'):
+        # Read operational values (index 1) from PLUMBING section
+        for key in config.options('PLUMBING'):
+            operational_value = _parse_config_value('PLUMBING', key, config, preferred_index=1)
+            # Convert to snake_case for API consistency
+            api_key = key.lower()
+            if isinstance(operational_value, str) and operational_value.lower() in ('true', 'false'):
+                plumbing_config[api_key] = operational_value.lower() == 'true'
+            else:
+                plumbing_config[api_key] = operational_value
+    
+    logger.info(f"Retrieved plumbing configuration: {plumbing_config}")
+    return plumbing_config
+
 @app.get("/api/v1/plumbing", tags=["Plumbing"])
-async def get_plumbing_config(username: str = Depends(verify_credentials)):
+async def get_plumbing_config(request: Request, username: str = Depends(verify_credentials)):
     """
     Get current plumbing configuration (operational values).
     
@@ -1093,27 +1322,10 @@ async def get_plumbing_config(username: str = Depends(verify_credentials)):
         - Requires HTTP Basic Authentication
         - Reads operational values (second value) from PLUMBING section
         - Returns 500 error if configuration cannot be read
+        - Cached per device.conf version; sends an ETag and answers a matching If-None-Match with 304
     """
     try:
-        config = configparser.ConfigParser()
-        config.read('config/device.conf')
-        
-        plumbing_config = {}
-        
-        if config.has_section('PLUMBING'):
-            # Read operational values (index 1) from PLUMBING section
-            for key in config.options('PLUMBING'):
-                operational_value = _parse_config_value('PLUMBING', key, config, preferred_index=1)
-                # Convert to snake_case for API consistency
-                api_key = key.lower()
-                if isinstance(operational_value, str) and operational_value.lower() in ('true', 'false'):
-                    plumbing_config[api_key] = operational_value.lower() == 'true'
-                else:
-                    plumbing_config[api_key] = operational_value
-        
-        logger.info(f"Retrieved plumbing configuration: {plumbing_config}")
-        return plumbing_config
-        
+        return await _cached_config_response(request, "plumbing", _build_plumbing_config)
     except Exception as e:
         logger.error(f"Error getting plumbing configuration: {e}")
         raise HTTPException(status_code=500, detail=f"Error getting plumbing configuration: {str(e)}")
@@ -1141,6 +1353,8 @@ async def update_plumbing_config(plumbing_config: PlumbingConfig, username: str
         - Requires HTTP Basic Authentication
         - Updates operational values (second value) in device.conf
         - Preserves default values (first value) in configuration
+        - Written in one atomic device.conf transaction with any other config
+          updates arriving within the same short window
         - Immediately applies changes to relay hardware
         - Returns 500 error if configuration update fails
     """
@@ -1155,10 +1369,7 @@ async def update_plumbing_config(plumbing_config: PlumbingConfig, username: str
         'valve_co2_on_at_startup': ('ValveCO2_on_at_startup', 'ValveCO2'),
     }
 
-    try:
-        config = configparser.ConfigParser()
-        config.read('config/device.conf')
-
+    def apply_plumbing(config):
         applied_changes = {}
 
         # Ensure PLUMBING section exists
@@ -1187,32 +1398,36 @@ async def update_plumbing_config(plumbing_config: PlumbingConfig, username: str
                 applied_changes[api_field] = value
 
                 logger.info(f"Updated {config_field}: {new_value}")
+        return applied_changes
+
+    def apply_to_relays(applied_changes):
+        relay = Relay()
+        if relay:
+            for api_field, value in applied_changes.items():
+                _, device_name = field_mapping[api_field]
+                try:
+                    relay.set_relay(device_name, value)
+                    logger.info(f"Applied {device_name} = {value} to relay hardware")
+                except Exception as e:
+                    logger.warning(f"Failed to apply {device_name} to hardware: {e}")
+        else:
+            logger.warning("No relay hardware available to apply plumbing changes")
 
-        # Write updated config back to file
-        with open('config/device.conf', 'w') as configfile:
-            config.write(configfile)
+    try:
+        # Written together with any other config updates arriving in the same window
+        applied_changes = await _config_writer.apply_async(apply_plumbing, label="plumbing")
 
         # Apply changes to relay hardware immediately
         if applied_changes:
-            relay = Relay()
-            if relay:
-                for api_field, value in applied_changes.items():
-                    _, device_name = field_mapping[api_field]
-                    try:
-                        relay.set_relay(device_name, value)
-                        logger.info(f"Applied {device_name} = {value} to relay hardware")
-                    except Exception as e:
-                        logger.warning(f"Failed to apply {device_name} to hardware: {e}")
-            else:
-                logger.warning("No relay hardware available to apply plumbing changes")
+            await api_workers.run_blocking(apply_to_relays, applied_changes)
 
         logger.info(f"Successfully updated plumbing configuration: {applied_changes}")
 
         if audit and applied_changes:
-            audit.emit("config_change", "plumbing_config_update",
-                       resource="plumbing", source="user_cloud",
-                       value=applied_changes, user_name=username,
-                       details=f"Updated {len(applied_changes)} plumbing fields")
+            await api_workers.run_blocking(audit.emit, "config_change", "plumbing_config_update",
+                                           resource="plumbing", source="user_cloud",
+                                           value=applied_changes, user_name=username,
+                                           details=f"Updated {len(applied_changes)} plumbing fields")
 
         return {
             "status": "success",
@@ -1220,12 +1435,28 @@ async def update_plumbing_config(plumbing_config: PlumbingConfig, username: str
             "applied_changes": applied_changes
         }
 
+    except config_transaction.ConfigValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error updating plumbing configuration: {e}")
         raise HTTPException(status_code=500, detail=f"Error updating plumbing configuration: {str(e)}")
 
+def _build_sprinkler_config(config):
+    sprinkler_config = {}
+    
+    if config.has_section('Sprinkler'):
+        # Read operational values (index 1) from Sprinkler section
+        for key in config.options('Sprinkler'):
+            operational_value = _parse_config_value('Sprinkler', key, config, preferred_index=1)
+            # Convert to snake_case for API consistency
+            api_key = key.lower()
+            sprinkler_config[api_key] = operational_value
+    
+    logger.info(f"Retrieved sprinkler configuration: {sprinkler_config}")
+    return sprinkler_config
+
 @app.get("/api/v1/sprinkler", tags=["Sprinkler"])
-async def get_sprinkler_config(username: str = Depends(verify_credentials)):
+async def get_sprinkler_config(request: Request, username: str = Depends(verify_credentials)):
     """
     Get current sprinkler configuration (operational values).
     
@@ -1243,24 +1474,10 @@ async def get_sprinkler_config(username: str = Depends(verify_credentials)):
         - Requires HTTP Basic Authentication
         - Reads operational values (second value) from Sprinkler section
         - Returns 500 error if configuration cannot be read
+        - Cached per device.conf version; sends an ETag and answers a matching If-None-Match with 304
     """
     try:
-        config = configparser.ConfigParser()
-        config.read('config/device.conf')
-        
-        sprinkler_config = {}
-        
-        if config.has_section('Sprinkler'):
-            # Read operational values (index 1) from Sprinkler section
-            for key in config.options('Sprinkler'):
-                operational_value = _parse_config_value('Sprinkler', key, config, preferred_index=1)
-                # Convert to snake_case for API consistency
-                api_key = key.lower()
-                sprinkler_config[api_key] = operational_value
-        
-        logger.info(f"Retrieved sprinkler configuration: {sprinkler_config}")
-        return sprinkler_config
-        
+        return await _cached_config_response(request, "sprinkler", _build_sprinkler_config)
     except Exception as e:
         logger.error(f"Error getting sprinkler configuration: {e}")
         raise HTTPException(status_code=500, detail=f"Error getting sprinkler configuration: {str(e)}")
@@ -1290,13 +1507,13 @@ async def update_sprinkler_config(sprinkler_config: SprinklerConfig, username: s
         - Requires HTTP Basic Authentication
         - Updates operational values (second value) in device.conf
         - Preserves default values (first value) in configuration
+        - Written in one atomic device.conf transaction with any other config
+          updates arriving within the same short window
         - For sprinkler_on_at_startup changes, applies immediately to hardware
+        - Returns 400 if a value is invalid (e.g. duration not HH:MM:SS)
         - Returns 500 error if configuration update fails
     """
-    try:
-        config = configparser.ConfigParser()
-        config.read('config/device.conf')
-        
+    def apply_sprinkler(config):
         applied_changes = {}
         
         # Ensure Sprinkler section exists
@@ -1330,29 +1547,31 @@ async def update_sprinkler_config(sprinkler_config: SprinklerConfig, username: s
                 applied_changes[api_field] = value
                 
                 logger.info(f"Updated {api_field}: {new_value}")
-        
-        # Write updated config back to file
-        with open('config/device.conf', 'w') as configfile:
-            config.write(configfile)
+        return applied_changes
+
+    def apply_startup_to_relays(startup_value):
+        relay = Relay()
+        if relay:
+            try:
+                if startup_value:
+                    # Turn on sprinklers if startup is enabled
+                    relay.set_sprinklers(True)
+                    logger.info(f"Applied sprinkler_on_at_startup = {startup_value} - sprinklers turned ON")
+                else:
+                    # Turn off sprinklers if startup is disabled
+                    relay.set_sprinklers(False)
+                    logger.info(f"Applied sprinkler_on_at_startup = {startup_value} - sprinklers turned OFF")
+            except Exception as e:
+                logger.warning(f"Failed to apply sprinkler_on_at_startup to hardware: {e}")
+        else:
+            logger.warning("No relay hardware available to apply sprinkler startup changes")
+
+    try:
+        applied_changes = await _config_writer.apply_async(apply_sprinkler, label="sprinkler")
         
         # Apply sprinkler_on_at_startup changes immediately if present
         if 'sprinkler_on_at_startup' in applied_changes:
-            startup_value = applied_changes['sprinkler_on_at_startup']
-            relay = Relay()
-            if relay:
-                try:
-                    if startup_value:
-                        # Turn on sprinklers if startup is enabled
-                        relay.set_sprinklers(True)
-                        logger.info(f"Applied sprinkler_on_at_startup = {startup_value} - sprinklers turned ON")
-                    else:
-                        # Turn off sprinklers if startup is disabled
-                        relay.set_sprinklers(False)
-                        logger.info(f"Applied sprinkler_on_at_startup = {startup_value} - sprinklers turned OFF")
-                except Exception as e:
-                    logger.warning(f"Failed to apply sprinkler_on_at_startup to hardware: {e}")
-            else:
-                logger.warning("No relay hardware available to apply sprinkler startup changes")
+            await api_workers.run_blocking(apply_startup_to_relays, applied_changes['sprinkler_on_at_startup'])
         
         # NOTE: No need to reschedule future cycles here
         # The file system watcher will handle config changes and the sprinkler controller
@@ -1363,10 +1582,10 @@ async def update_sprinkler_config(sprinkler_config: SprinklerConfig, username: s
         logger.info(f"Successfully updated sprinkler configuration: {applied_changes}")
 
         if audit and applied_changes:
-            audit.emit("config_change", "sprinkler_config_update",
-                       resource="sprinkler", source="user_cloud",
-                       value=applied_changes, user_name=username,
-                       details=f"Updated {len(applied_changes)} sprinkler fields")
+            await api_workers.run_blocking(audit.emit, "config_change", "sprinkler_config_update",
+                                           resource="sprinkler", source="user_cloud",
+                                           value=applied_changes, user_name=username,
+                                           details=f"Updated {len(applied_changes)} sprinkler fields")
 
         return {
             "status": "success",
@@ -1374,61 +1593,65 @@ async def update_sprinkler_config(sprinkler_config: SprinklerConfig, username: s
             "applied_changes": applied_changes
         }
         
+    except config_transaction.ConfigValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error updating sprinkler configuration: {e}")
         raise HTTPException(status_code=500, detail=f"Error updating sprinkler configuration: {str(e)}")
 
+def _build_water_level_config(config):
+    water_level_config = {}
+
+    if config.has_section('WaterLevel'):
+        # Map config keys (lowercase from configparser) to API field names and types
+        field_types = {
+            'water_level_control_enabled': 'bool',
+            'water_level_target': 'float',
+            'water_level_deadband': 'float',
+            'water_level_min': 'float',
+            'water_level_max': 'float',
+            'tank_dump_safety_floor': 'float',
+            'tank_dump_max_duration_seconds': 'int',
+            'supply_water_ph_estimate': 'float',
+            'valid_level_min': 'float',
+            'valid_level_max': 'float',
+        }
+        for key in config.options('WaterLevel'):
+            api_key = key.lower()
+            val = _parse_config_value('WaterLevel', key, config, preferred_index=1)
+            if api_key in field_types:
+                ft = field_types[api_key]
+                if ft == 'bool':
+                    # _parse_config_value already converts bools
+                    water_level_config[api_key] = val
+                elif ft == 'float':
+                    try:
+                        water_level_config[api_key] = float(val) if not isinstance(val, bool) else val
+                    except (ValueError, TypeError):
+                        water_level_config[api_key] = val
+                elif ft == 'int':
+                    try:
+                        water_level_config[api_key] = int(float(val)) if not isinstance(val, bool) else val
+                    except (ValueError, TypeError):
+                        water_level_config[api_key] = val
+            else:
+                water_level_config[api_key] = val
+
+    logger.info(f"Retrieved water level configuration: {water_level_config}")
+    return water_level_config
+
 @app.get("/api/v1/config/water-level", tags=["WaterLevel"])
-async def get_water_level_config(username: str = Depends(verify_credentials)):
+async def get_water_level_config(request: Request, username: str = Depends(verify_credentials)):
     """
     Get current water level configuration (operational values).
 
     Returns the operational values from the WaterLevel section of device.conf.
+
+    Cached per device.conf version; sends an ETag and answers a matching
+    If-None-Match with 304.
     """
     try:
-        config = configparser.ConfigParser()
-        config.read('config/device.conf')
-
-        water_level_config = {}
-
-        if config.has_section('WaterLevel'):
-            # Map config keys (lowercase from configparser) to API field names and types
-            field_types = {
-                'water_level_control_enabled': 'bool',
-                'water_level_target': 'float',
-                'water_level_deadband': 'float',
-                'water_level_min': 'float',
-                'water_level_max': 'float',
-                'tank_dump_safety_floor': 'float',
-                'tank_dump_max_duration_seconds': 'int',
-                'supply_water_ph_estimate': 'float',
-                'valid_level_min': 'float',
-                'valid_level_max': 'float',
-            }
-            for key in config.options('WaterLevel'):
-                api_key = key.lower()
-                val = _parse_config_value('WaterLevel', key, config, preferred_index=1)
-                if api_key in field_types:
-                    ft = field_types[api_key]
-                    if ft == 'bool':
-                        # _parse_config_value already converts bools
-                        water_level_config[api_key] = val
-                    elif ft == 'float':
-                        try:
-                            water_level_config[api_key] = float(val) if not isinstance(val, bool) else val
-                        except (ValueError, TypeError):
-                            water_level_config[api_key] = val
-                    elif ft == 'int':
-                        try:
-                            water_level_config[api_key] = int(float(val)) if not isinstance(val, bool) else val
-                        except (ValueError, TypeError):
-                            water_level_config[api_key] = val
-                else:
-                    water_level_config[api_key] = val
-
-        logger.info(f"Retrieved water level configuration: {water_level_config}")
-        return water_level_config
-
+        return await _cached_config_response(request, "water_level", _build_water_level_config)
     except Exception as e:
         logger.error(f"Error getting water level configuration: {e}")
         raise HTTPException(status_code=500, detail=f"Error getting water level configuration: {str(e)}")
@@ -1439,12 +1662,11 @@ async def update_water_level_config(water_level_config: WaterLevelConfig, userna
     Update water level configuration operational values.
 
     Updates the operational values (second values) in the WaterLevel section of device.conf
-    while preserving the default values (first values).
+    while preserving the default values (first values). The change is written in one
+    atomic transaction with any other config updates arriving within the same short window.
+    Values are validated together (e.g. min <= target <= max) and rejected with 400.
     """
-    try:
-        config = configparser.ConfigParser()
-        config.read('config/device.conf')
-
+    def apply_water_level(config):
         applied_changes = {}
 
         if not config.has_section('WaterLevel'):
@@ -1464,17 +1686,18 @@ async def update_water_level_config(water_level_config: WaterLevelConfig, userna
                 applied_changes[api_field] = value
 
                 logger.info(f"Updated WaterLevel.{api_field}: {new_value}")
+        return applied_changes
 
-        with open('config/device.conf', 'w') as configfile:
-            config.write(configfile)
+    try:
+        applied_changes = await _config_writer.apply_async(apply_water_level, label="water_level")
 
         logger.info(f"Successfully updated water level configuration: {applied_changes}")
 
         if audit and applied_changes:
-            audit.emit("config_change", "water_level_config_update",
-                       resource="water_level", source="user_cloud",
-                       value=applied_changes, user_name=username,
-                       details=f"Updated {len(applied_changes)} water level fields")
+            await api_workers.run_blocking(audit.emit, "config_change", "water_level_config_update",
+                                           resource="water_level", source="user_cloud",
+                                           value=applied_changes, user_name=username,
+                                           details=f"Updated {len(applied_changes)} water level fields")
 
         return {
             "status": "success",
@@ -1482,32 +1705,36 @@ async def update_water_level_config(water_level_config: WaterLevelConfig, userna
             "applied_changes": applied_changes
         }
 
+    except config_transaction.ConfigValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error updating water level configuration: {e}")
         raise HTTPException(status_code=500, detail=f"Error updating water level configuration: {str(e)}")
 
+def _build_mixing_config(config):
+    mixing_config = {}
+
+    if config.has_section('Mixing'):
+        for key in config.options('Mixing'):
+            api_key = key.lower()
+            val = _parse_config_value('Mixing', key, config, preferred_index=1)
+            mixing_config[api_key] = val
+
+    logger.info(f"Retrieved mixing configuration: {mixing_config}")
+    return mixing_config
+
 @app.get("/api/v1/config/mixing", tags=["Mixing"])
-async def get_mixing_config(username: str = Depends(verify_credentials)):
+async def get_mixing_config(request: Request, username: str = Depends(verify_credentials)):
     """
     Get current mixing configuration (operational values).
 
     Returns the operational values from the Mixing section of device.conf.
+
+    Cached per device.conf version; sends an ETag and answers a matching
+    If-None-Match with 304.
     """
     try:
-        config = configparser.ConfigParser()
-        config.read('config/device.conf')
-
-        mixing_config = {}
-
-        if config.has_section('Mixing'):
-            for key in config.options('Mixing'):
-                api_key = key.lower()
-                val = _parse_config_value('Mixing', key, config, preferred_index=1)
-                mixing_config[api_key] = val
-
-        logger.info(f"Retrieved mixing configuration: {mixing_config}")
-        return mixing_config
-
+        return await _cached_config_response(request, "mixing", _build_mixing_config)
     except Exception as e:
         logger.error(f"Error getting mixing configuration: {e}")
         raise HTTPException(status_code=500, detail=f"Error getting mixing configuration: {str(e)}")
@@ -1518,12 +1745,11 @@ async def update_mixing_config(mixing_config: MixingConfig, username: str = Depe
     Update mixing configuration operational values.
 
     Updates the operational values (second values) in the Mixing section of device.conf
-    while preserving the default values (first values).
+    while preserving the default values (first values). The change is written in one
+    atomic transaction with any other config updates arriving within the same short window.
+    Durations must be HH:MM:SS; invalid values are rejected with 400.
     """
-    try:
-        config = configparser.ConfigParser()
-        config.read('config/device.conf')
-
+    def apply_mixing(config):
         applied_changes = {}
 
         if not config.has_section('Mixing'):
@@ -1538,17 +1764,18 @@ async def update_mixing_config(mixing_config: MixingConfig, username: str = Depe
                 applied_changes[api_field] = value
 
                 logger.info(f"Updated Mixing.{api_field}: {new_value}")
+        return applied_changes
 
-        with open('config/device.conf', 'w') as configfile:
-            config.write(configfile)
+    try:
+        applied_changes = await _config_writer.apply_async(apply_mixing, label="mixing")
 
         logger.info(f"Successfully updated mixing configuration: {applied_changes}")
 
         if audit and applied_changes:
-            audit.emit("config_change", "mixing_config_update",
-                       resource="mixing", source="user_cloud",
-                       value=applied_changes, user_name=username,
-                       details=f"Updated {len(applied_changes)} mixing fields")
+            await api_workers.run_blocking(audit.emit, "config_change", "mixing_config_update",
+                                           resource="mixing", source="user_cloud",
+                                           value=applied_changes, user_name=username,
+                                           details=f"Updated {len(applied_changes)} mixing fields")
 
         return {
             "status": "success",
@@ -1556,6 +1783,8 @@ async def update_mixing_config(mixing_config: MixingConfig, username: str = Depe
             "applied_changes": applied_changes
         }
 
+    except config_transaction.ConfigValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error updating mixing configuration: {e}")
         raise HTTPException(status_code=500, detail=f"Error updating mixing configuration: {str(e)}")
@@ -1566,10 +1795,11 @@ async def drain_control(request: DrainRequest, username: str = Depends(verify_cr
     from src.water_level_static import start_drain, stop_drain
 
     if request.action == 'stop':
-        stop_drain("API stop")
+        await api_workers.run_blocking(stop_drain, "API stop")
         return {"status": "ok", "message": "Drain stopped"}
     elif request.action == 'start':
-        result = start_drain(
+        result = await api_workers.run_blocking(
+            start_drain,
             target_level=request.target_level,
             drain_amount=request.drain_amount,
             duration_seconds=request.duration_seconds,
@@ -1586,42 +1816,274 @@ async def drain_control(request: DrainRequest, username: str = Depends(verify_cr
 async def drain_status(username: str = Depends(verify_credentials)):
     """Get current drain status."""
     from src.water_level_static import get_drain_status
-    return get_drain_status()
+    return await api_workers.run_blocking(get_drain_status)
+
+@app.get("/api/v1/history", tags=["Status"])
+async def get_history(metric: Optional[str] = None, start: Optional[float] = None,
+                      end: Optional[float] = None, step: Optional[float] = None,
+                      username: str = Depends(verify_credentials)):
+    """
+    Get aggregated sensor history from the minute/hour/day rollups.
+
+    Args:
+        metric (str): Metric name, e.g. "water_metrics.ph.ph_main.value".
+            Omit to list available metrics and tier statistics.
+        start (float): Range start in epoch seconds (default: end - 24h)
+        end (float): Range end in epoch seconds (default: now)
+        step (float): Desired point spacing in seconds. The coarsest tier
+            whose bucket fits within step and still retains start is used.
+
+    Returns:
+        dict: Aggregated points with count/avg/min/max/last per bucket
+    """
+    from src.sensor_rollup import get_rollup_store
+    store = get_rollup_store()
+    if metric is None:
+        return await api_workers.run_blocking(lambda: {"metrics": store.metrics(), **store.stats()})
+
+    end = time.time() if end is None else end
+    start = end - 86400 if start is None else start
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if step is not None and step <= 0:
+        raise HTTPException(status_code=400, detail="step must be positive")
+    return await api_workers.run_blocking(store.query, metric, start, end, step)
+
+@app.get("/api/v1/logs", tags=["Diagnostics"])
+async def get_log_tail(prefix: str = "ripple_", lines: int = 100,
+                       username: str = Depends(verify_credentials)):
+    """
+    Tail application logs across rotated segments.
+
+    Compressed (.log.gz) and active (.log) segments are streamed in order,
+    so the tail spans rotations transparently.
+
+    Args:
+        prefix (str): Log file prefix, e.g. "ripple_" or "ripple_server_"
+        lines (int): Number of trailing lines to return (1-5000)
+    """
+    from src.lumina_logger import list_app_log_segments, tail_log_lines
+    if not prefix.replace("_", "").isalnum():
+        raise HTTPException(status_code=400, detail="Invalid log prefix")
+    lines = max(1, min(lines, 5000))
+
+    def tail():
+        segments = list_app_log_segments(prefix, globals.LOG_FOLDER_PATH)
+        return {"prefix": prefix, "segments": len(segments), "lines": tail_log_lines(segments, lines)}
+
+    return await api_workers.run_blocking(tail)
+
+@app.get("/api/v1/logs/sensor_data", tags=["Diagnostics"])
+async def get_sensor_data_log(path: str = "data.water_metrics.ph", lines: int = 100,
+                              username: str = Depends(verify_credentials)):
+    """
+    Tail the raw sensor data log for one data path, including compressed history.
+
+    Args:
+        path (str): Dotted data path, e.g. "data.water_metrics.ec"
+        lines (int): Number of trailing entries to return (1-5000)
+    """
+    from src.lumina_logger import list_sensor_data_segments, tail_log_lines
+    path_list = path.split(".")
+    if not all(part.replace("_", "").isalnum() for part in path_list):
+        raise HTTPException(status_code=400, detail="Invalid data path")
+    lines = max(1, min(lines, 5000))
+
+    def tail():
+        segments = list_sensor_data_segments(path_list, globals.SENSOR_DATA_LOG_PATH)
+        entries = []
+        for line in tail_log_lines(segments, lines):
+            timestamp, _, rest = line.rstrip("\n").partition("\t")
+            _, _, value = rest.partition("\t")
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+            entries.append({"timestamp": timestamp, "value": value})
+        return {"path": path, "segments": len(segments), "entries": entries}
+
+    return await api_workers.run_blocking(tail)
+
+@app.get("/api/v1/logs/compression", tags=["Diagnostics"])
+async def get_log_compression_report(username: str = Depends(verify_credentials)):
+    """Report bytes-on-disk savings from compressed log and sensor data segments."""
+    from src.lumina_logger import get_compression_report
+    return await api_workers.run_blocking(get_compression_report,
+                                          [globals.LOG_FOLDER_PATH, globals.DATA_FOLDER_PATH])
+
+@app.get("/api/v1/io", tags=["Diagnostics"])
+async def get_io_report(hours: int = 24, username: str = Depends(verify_credentials)):
+    """
+    Report SD-card writes per subsystem and per hour.
+
+    Merges the io_accounting snapshots of main.py and server.py. Each entry
+    counts bytes, write calls, file opens and fsyncs. proc_io holds kernel
+    totals per process, which also cover writers that are not wrapped
+    (APScheduler jobstore, application log handlers).
+
+    Args:
+        hours (int): Number of recent hours to include (1-48)
+    """
+    hours = max(1, min(hours, io_accounting.IO_HOURS_KEPT))
+    return await api_workers.run_blocking(io_accounting.get_report, globals.DATA_FOLDER_PATH, hours=hours)
 
-@app.post("/api/v1/scan", tags=["Diagnostics"])
+def _scan_jobs():
+    return scan_jobs.get_scan_jobs(globals.modbus_client)
+
+def _scan_job_or_404(job_id: str):
+    job = _scan_jobs().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown scan job: {job_id}")
+    return job
+
+@app.post("/api/v1/scan", status_code=202, tags=["Diagnostics"])
 async def scan_sensors(request: ScanRequest = None, username: str = Depends(verify_credentials)):
-    """Scan for Modbus sensors across ports, baud rates, and addresses."""
+    """
+    Start a scan for Modbus sensors across ports, baud rates, and addresses.
+
+    The scan runs as a background job; this returns its ID at once. Follow it
+    with GET /api/v1/scan/jobs/{job_id} (progress), .../events (Server-Sent
+    Events), .../results, and cancel it with DELETE /api/v1/scan/jobs/{job_id}.
+
+    Note:
+        - Only one scan runs at a time; 409 while another one is unfinished
+    """
     if request is None:
         request = ScanRequest()
+    try:
+        job = _scan_jobs().submit(request)
+    except scan_jobs.ScanBusyError as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "job_id": e.job_id})
+    base = f"/api/v1/scan/jobs/{job.id}"
+    return {
+        "status": "accepted",
+        "job_id": job.id,
+        "total_probes": job.total,
+        "progress_url": base,
+        "events_url": f"{base}/events",
+        "results_url": f"{base}/results",
+    }
 
-    scanner = SensorScanner(
-        modbus_client=globals.modbus_client,
-        ports=request.ports,
-        baud_rates=request.baud_rates,
-        addr_start=request.addr_start,
-        addr_end=request.addr_end,
-        sensor_types=request.sensor_types,
-        short_circuit=request.short_circuit,
-    )
+@app.get("/api/v1/scan/jobs", tags=["Diagnostics"])
+async def list_scan_jobs(username: str = Depends(verify_credentials)):
+    """Progress of the running scan and the most recent finished ones, newest first."""
+    return {"jobs": [job.progress() for job in _scan_jobs().jobs()]}
+
+@app.get("/api/v1/scan/jobs/{job_id}", tags=["Diagnostics"])
+async def get_scan_job(job_id: str, username: str = Depends(verify_credentials)):
+    """Scan progress: addresses probed, current address, sensors found so far and ETA."""
+    return _scan_job_or_404(job_id).progress()
+
+@app.get("/api/v1/scan/jobs/{job_id}/results", tags=["Diagnostics"])
+async def get_scan_job_results(job_id: str, username: str = Depends(verify_credentials)):
+    """Scan results; status tells whether they are final (completed/cancelled/failed) or partial."""
+    return _scan_job_or_404(job_id).results()
+
+@app.delete("/api/v1/scan/jobs/{job_id}", tags=["Diagnostics"])
+async def cancel_scan_job(job_id: str, username: str = Depends(verify_credentials)):
+    """Cancel a scan; it stops before its next probe and keeps the sensors found so far."""
+    _scan_job_or_404(job_id)
+    return _scan_jobs().cancel(job_id).progress()
+
+@app.get("/api/v1/scan/jobs/{job_id}/events", tags=["Diagnostics"])
+async def stream_scan_job(job_id: str, username: str = Depends(verify_credentials)):
+    """
+    Stream scan progress as Server-Sent Events.
+
+    Each change is sent as a "progress" event with the same body as
+    GET /api/v1/scan/jobs/{job_id}; the last one is a "done" event, after
+    which the stream closes. Changes that arrive faster than the client reads
+    are merged into the latest state. A comment line is sent every
+    SSE_KEEPALIVE_SECONDS to keep proxies from closing an idle stream.
+    """
+    from fastapi.responses import StreamingResponse
 
-    start_time = time.time()
-    results = scanner.scan()
-    duration = time.time() - start_time
+    manager = _scan_jobs()
+    job = _scan_job_or_404(job_id)
+    loop = asyncio.get_running_loop()
+    changed = asyncio.Event()
 
-    return {
-        "status": "completed",
-        "sensors_found": results,
-        "scan_parameters": {
-            "ports": request.ports,
-            "baud_rates": request.baud_rates,
-            "addr_start": f"0x{request.addr_start:02x}",
-            "addr_end": f"0x{request.addr_end:02x}",
-            "sensor_types": request.sensor_types,
-            "short_circuit": request.short_circuit,
-        },
-        "total_probes": len(request.ports) * len(request.baud_rates) * (request.addr_end - request.addr_start + 1),
-        "duration_seconds": round(duration, 1),
-    }
+    def listener(changed_job):
+        if changed_job is job:
+            try:
+                loop.call_soon_threadsafe(changed.set)
+            except RuntimeError:
+                pass  # event loop already closed
+
+    async def events():
+        manager.add_listener(listener)
+        try:
+            sent = None
+            while True:
+                changed.clear()
+                if job.version != sent:
+                    progress = job.progress()
+                    sent = progress["version"]
+                    kind = "done" if progress["state"] in scan_jobs.FINISHED_STATES else "progress"
+                    yield f"id: {sent}\nevent: {kind}\ndata: {orjson.dumps(progress).decode()}\n\n"
+                    if kind == "done":
+                        return
+                try:
+                    await asyncio.wait_for(changed.wait(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            manager.remove_listener(listener)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/api/v1/stream", tags=["Status"])
+async def stream_telemetry(topics: Optional[str] = None, username: str = Depends(verify_credentials)):
+    """
+    Push live telemetry as Server-Sent Events instead of polling /api/v1/status.
+
+    Events are sent as they happen, with the topic as the SSE event name:
+    - reading: {"metric", "tags", "fields", "timestamp"} per saved sensor reading
+    - relay: {"device", "relay_board", "port_index", "status", "timestamp"} per channel change
+    - mode: {"mode", "previous", "timestamp"}
+    - alarm: the alarm audit event
+
+    Args:
+        topics (str, optional): Comma-separated topics to receive (default: all)
+
+    Note:
+        - Each client has a bounded send queue; a client that falls
+          telemetry_stream.QUEUE_SIZE events behind gets a final "dropped"
+          event and the stream closes
+        - A comment line is sent every SSE_KEEPALIVE_SECONDS when idle
+    """
+    from fastapi.responses import StreamingResponse
+
+    hub = _telemetry()
+    wanted = [topic.strip() for topic in topics.split(",") if topic.strip()] if topics else None
+    try:
+        subscriber = hub.subscribe(wanted, asyncio.get_running_loop())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def events():
+        try:
+            yield b": subscribed " + ",".join(sorted(subscriber.topics)).encode() + b"\n\n"
+            while True:
+                frames = await subscriber.next_frames(SSE_KEEPALIVE_SECONDS)
+                if frames:
+                    yield b"".join(frames)
+                elif subscriber.dropped:
+                    yield b"event: dropped\ndata: {\"reason\": \"send queue full\"}\n\n"
+                    return
+                else:
+                    yield b": keepalive\n\n"
+        finally:
+            hub.unsubscribe(subscriber)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/api/v1/stream/stats", tags=["Diagnostics"])
+async def telemetry_stream_stats(username: str = Depends(verify_credentials)):
+    """Telemetry stream subscribers, events published and slow clients dropped."""
+    return _telemetry().stats()
 
 
 # --- Calibration Endpoints ---
@@ -1705,6 +2167,9 @@ def _modbus_read_registers(cfg, address, count, timeout=2.0):
 @app.get("/api/v1/calibration/live", tags=["Calibration"])
 async def get_calibration_live(sensor: str, username: str = Depends(verify_credentials)):
     """Read live sensor value directly from Modbus (bypasses cached data)."""
+    return await api_workers.run_blocking(_read_calibration_live, sensor)
+
+def _read_calibration_live(sensor: str):
     try:
         sensor = sensor.lower()
         cfg = _get_sensor_config(sensor)
@@ -1730,6 +2195,9 @@ async def get_calibration_live(sensor: str, username: str = Depends(verify_crede
 @app.get("/api/v1/calibration/offset", tags=["Calibration"])
 async def get_calibration_offset(sensor: str, username: str = Depends(verify_credentials)):
     """Read current calibration offset (pH) or EC constant."""
+    return await api_workers.run_blocking(_read_calibration_offset, sensor)
+
+def _read_calibration_offset(sensor: str):
     try:
         sensor = sensor.lower()
         cfg = _get_sensor_config(sensor)
@@ -1798,6 +2266,9 @@ def _write_ec_constant(cfg, value):
 @app.post("/api/v1/calibration/apply", tags=["Calibration"])
 async def apply_calibration(request: CalibrationApplyRequest, username: str = Depends(verify_credentials)):
     """Calculate and apply sensor calibration."""
+    return await api_workers.run_blocking(_apply_calibration, request)
+
+def _apply_calibration(request: CalibrationApplyRequest):
     try:
         sensor = request.sensor.lower()
         points = request.points
@@ -1867,4 +2338,5 @@ async def apply_calibration(request: CalibrationApplyRequest, username: str = De
 # Run the server if script is executed directly
 if __name__ == "__main__":
     logger.info("Starting Ripple API Server on 0.0.0.0:5000")
+    io_accounting.configure("server", globals.DATA_FOLDER_PATH, globals.get_io_write_budget_mb())
     uvicorn.run("server:app", host="0.0.0.0", port=5000, reload=False)
\ No newline at end of file
@@ -0,0 +1,161 @@
+"""
+Action dispatch table compiled once per device.conf version.
+
+ConfigFileHandler.process_actions used to re-read device.conf for every
+action.json it saw, build one lambda per [RELAY_CONTROLS] entry (with
+special cases for adjacent sprinkler and nutrient pump groups) and run the
+actions one by one with a 0.2 s sleep after each.
+
+ActionDispatchTable maps each API action name to its relay device names.
+get_action_table() compiles it from the current ConfigSnapshot and keeps it
+until the snapshot version changes. resolve() turns a whole action.json
+payload into one {device: state} dict, which Relay.apply_states() sends as
+one write per contiguous run on each board, so grouped devices need no
+special cases.
+
+Usage:
+    table = get_action_table(config_snapshot.get_config_snapshot())
+    states, unknown = table.resolve({"nutrient_pump_a": True, "mixing_pump": False})
+    relay.apply_states(states)
+
+apply_actions() does all of that and waits for the relay echoes; it is
+shared by the action.json watcher and the controller channel
+(src/controller_ipc.py).
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from src.lumina_logger import GlobalLogger
+    logger = GlobalLogger("RippleActionDispatch", log_prefix="ripple_").logger
+except Exception:
+    import logging
+    logger = logging.getLogger(__name__)
+
+
+# Used when device.conf has no [RELAY_CONTROLS] section
+DEFAULT_RELAY_CONTROLS = {
+    'nutrient_pump_a': 'NutrientPumpA',
+    'nutrient_pump_b': 'NutrientPumpB',
+    'nutrient_pump_c': 'NutrientPumpC',
+    'ph_up_pump': 'pHUpPump',
+    'ph_down_pump': 'pHDownPump',
+    'valve_outside_to_tank': 'ValveOutsideToTank',
+    'valve_tank_to_outside': 'ValveTankToOutside',
+    'mixing_pump': 'MixingPump',
+    'pump_from_tank_to_gutters': 'PumpFromTankToGutters',
+    'sprinkler_a': 'SprinklerA',
+    'sprinkler_b': 'SprinklerB',
+    'pump_from_collector_tray_to_tank': 'PumpFromCollectorTrayToTank'
+}
+
+
+class ActionDispatchTable:
+    """
+    API action name -> relay device names, for one config version.
+
+    Args:
+        version (int): ConfigSnapshot version the table was compiled from
+        controls (dict): {action: "Device" or "DeviceA, DeviceB"}
+    """
+
+    __slots__ = ("version", "devices")
+
+    def __init__(self, version: int, controls: Dict[str, str]):
+        self.version = version
+        self.devices: Dict[str, Tuple[str, ...]] = {
+            action: tuple(device.strip() for device in value.split(',') if device.strip())
+            for action, value in controls.items()
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot) -> "ActionDispatchTable":
+        controls = snapshot.sections.get('RELAY_CONTROLS')
+        if not controls:
+            logger.warning("No [RELAY_CONTROLS] in device.conf, using the default action mappings")
+            controls = DEFAULT_RELAY_CONTROLS
+        return cls(snapshot.version, dict(controls))
+
+    def resolve(self, actions: Dict[str, object]) -> Tuple[Dict[str, bool], List[str]]:
+        """
+        Map an action payload to relay states.
+
+        Args:
+            actions (dict): {action: state} as written to action.json
+
+        Returns:
+            tuple: ({device: bool}, [unknown action names]); a device named by
+                several actions takes the state of the last one
+        """
+        states, unknown = {}, []
+        for action, state in actions.items():
+            devices = self.devices.get(action)
+            if devices is None:
+                unknown.append(action)
+                continue
+            for device in devices:
+                states[device] = bool(state)
+        return states, unknown
+
+    def __repr__(self):
+        return f"ActionDispatchTable(version={self.version}, actions={len(self.devices)})"
+
+
+_table: Optional[ActionDispatchTable] = None
+_table_key = None
+_lock = threading.Lock()
+
+
+def get_action_table(snapshot) -> ActionDispatchTable:
+    """The dispatch table for snapshot, compiled on the first call per config version."""
+    global _table, _table_key
+    key = (snapshot.path, snapshot.version)
+    with _lock:
+        if _table is None or _table_key != key:
+            _table = ActionDispatchTable.from_snapshot(snapshot)
+            _table_key = key
+            logger.info(f"Compiled action dispatch table v{snapshot.version}: "
+                        f"{len(_table.devices)} action(s)")
+        return _table
+
+
+def apply_actions(snapshot, actions: Dict[str, object], relay, confirm_timeout: float) -> Dict[str, Any]:
+    """
+    Apply an action payload as one relay batch and wait for its confirmation.
+
+    Args:
+        snapshot: ConfigSnapshot the dispatch table is compiled from
+        actions (dict): {action: state}
+        relay: Relay instance
+        confirm_timeout (float): Seconds to wait for the relay echoes
+
+    Returns:
+        dict: actions, devices, unknown, writes, confirmed, config_version
+    """
+    table = get_action_table(snapshot)
+    states, unknown = table.resolve(actions)
+    for action in unknown:
+        logger.warning(f"Unknown action: {action}")
+
+    writes, confirmed = 0, True
+    if states:
+        try:
+            acks = relay.apply_states(states)
+            writes = len(acks)
+            # Only this batch's echoes count; a failed write is not confirmed
+            deadline = time.monotonic() + confirm_timeout
+            confirmed = all(ack.wait(max(0.0, deadline - time.monotonic())) for ack in acks)
+        except Exception as e:
+            confirmed = False
+            logger.error(f"Error applying actions {states}: {e}")
+            logger.exception("Full exception details:")
+    return {
+        "actions": len(actions),
+        "devices": len(states),
+        "unknown": unknown,
+        "writes": writes,
+        "confirmed": confirmed,
+        "config_version": table.version,
+    }
@@ -0,0 +1,36 @@
+"""
+Bounded worker pool for the blocking parts of the API handlers.
+
+server.py's handlers are async, but many of them did their work directly on
+the event loop: relay writes and action.json I/O, sensor scans that take
+minutes, calibration reads polling the Modbus client with time.sleep(), and
+sensor data / device.conf reads. While one of them ran, Edge heartbeats and
+status polls waited behind it.
+
+Blocking calls now go through run_blocking(), a fixed pool of worker
+threads; the event loop only awaits the result. Sensor scans run as
+background jobs on their own thread (src/scan_jobs.py). The pool is
+separate from the threadpool Starlette uses for sync dependencies such as
+verify_credentials, so a busy pool cannot stall authentication of a
+heartbeat.
+
+Usage:
+    body = await api_workers.run_blocking(_build_status, snapshot)
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+# Short blocking work: file reads/writes, relay commands, single Modbus reads
+BLOCKING_WORKERS = 4
+
+_blocking = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="ripple_api_worker")
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """Run func(*args, **kwargs) on the API worker pool and await its result (or exception)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_blocking, functools.partial(func, *args, **kwargs))
+
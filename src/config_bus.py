@@ -0,0 +1,211 @@
+"""
+Key-level device.conf change notifications.
+
+Replaces the section-level diff in ConfigFileHandler and the if-chain in
+RippleController.reload_specific_sections. Each time a new ConfigSnapshot is
+swapped in, the bus diffs it key by key against the previously published one
+and calls every subscriber whose patterns match, with only the keys that
+matched. A sprinkler duration edit therefore never reaches the pH or EC
+handlers, and an unrelated key in a section no longer restarts that
+section's controller.
+
+Patterns are "Section.key" with shell-style wildcards (fnmatch), e.g.
+"Sprinkler.sprinkler_on_duration", "WaterLevel.*" or "PLUMBING.*_on_at_startup".
+Keys are lower-case as in ConfigParser; section names are matched exactly.
+
+Usage:
+    bus = ConfigChangeBus()
+    bus.subscribe(["EC.ec_target", "EC.ec_deadband"], on_ec_target_changed)
+    bus.publish(get_config_snapshot())
+"""
+
+import fnmatch
+import threading
+from typing import Callable, List, Optional, Sequence, Union
+
+try:
+    from src.lumina_logger import GlobalLogger
+    logger = GlobalLogger("RippleConfigBus", log_prefix="ripple_").logger
+except Exception:
+    import logging
+    logger = logging.getLogger(__name__)
+
+
+def operational_value(raw: Optional[str]) -> Optional[str]:
+    """
+    Operational value of a raw "reference, operational" entry.
+
+    Same rules as RippleController._parse_config_value(preferred_index=1):
+    the second field if present, else the whole value, with quotes stripped.
+    """
+    if raw is None:
+        return None
+    parts = raw.split(',')
+    value = parts[1] if len(parts) > 1 else parts[0]
+    return value.strip().strip('"\'')
+
+
+class ConfigChange:
+    """
+    One changed key between two snapshots.
+
+    Args:
+        section (str): Section name, e.g. "Sprinkler"
+        key (str): Lower-case key, e.g. "sprinkler_on_duration"
+        old (str): Raw value before the change, None if the key was added
+        new (str): Raw value after the change, None if the key was removed
+    """
+
+    __slots__ = ("section", "key", "old", "new")
+
+    def __init__(self, section: str, key: str, old: Optional[str], new: Optional[str]):
+        self.section = section
+        self.key = key
+        self.old = old
+        self.new = new
+
+    @property
+    def name(self) -> str:
+        return f"{self.section}.{self.key}"
+
+    @property
+    def old_operational(self) -> Optional[str]:
+        return operational_value(self.old)
+
+    @property
+    def new_operational(self) -> Optional[str]:
+        return operational_value(self.new)
+
+    def __repr__(self):
+        return f"ConfigChange({self.name}: {self.old!r} -> {self.new!r})"
+
+
+def diff_snapshots(old, new) -> List[ConfigChange]:
+    """
+    Key-level differences between two snapshots (or section mappings).
+
+    Args:
+        old: Previous ConfigSnapshot, {section: {key: value}} mapping, or None
+        new: Current ConfigSnapshot or mapping
+
+    Returns:
+        list: ConfigChange per added, removed or modified key, in file order
+    """
+    old_sections = getattr(old, "sections", old) or {}
+    new_sections = getattr(new, "sections", new) or {}
+    changes = []
+    for section, keys in new_sections.items():
+        previous = old_sections.get(section, {})
+        for key, value in keys.items():
+            if previous.get(key) != value:
+                changes.append(ConfigChange(section, key, previous.get(key), value))
+        for key, value in previous.items():
+            if key not in keys:
+                changes.append(ConfigChange(section, key, value, None))
+    for section, keys in old_sections.items():
+        if section not in new_sections:
+            changes.extend(ConfigChange(section, key, value, None) for key, value in keys.items())
+    return changes
+
+
+class _Subscription:
+    __slots__ = ("patterns", "callback", "name")
+
+    def __init__(self, patterns: Sequence[str], callback: Callable, name: str):
+        self.patterns = tuple(patterns)
+        self.callback = callback
+        self.name = name
+
+    def matches(self, change: ConfigChange) -> bool:
+        return any(fnmatch.fnmatchcase(change.name, pattern) for pattern in self.patterns)
+
+
+class ConfigChangeBus:
+    """
+    Dispatches key-level config changes to subscribers.
+
+    Note:
+        - Subscribers are called in subscription order, once per publish, with
+          only their matching changes: callback(changes, snapshot)
+        - An exception in one subscriber is logged and does not stop the others
+        - The first publish only records a baseline
+        - A snapshot whose version is not newer than the baseline's is
+          ignored, so a reload that lost a race cannot roll the config back
+    """
+
+    def __init__(self):
+        self._subscriptions: List[_Subscription] = []
+        self._last = None
+        self._lock = threading.RLock()
+
+    def subscribe(self, patterns: Union[str, Sequence[str]], callback: Callable,
+                  name: Optional[str] = None) -> _Subscription:
+        """
+        Register a callback for keys matching one or more patterns.
+
+        Args:
+            patterns (str or list): "Section.key" patterns (fnmatch wildcards)
+            callback (callable): Called as callback(changes, snapshot)
+            name (str): Label for logs. Defaults to the callback name.
+
+        Returns:
+            Subscription handle for unsubscribe()
+        """
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        subscription = _Subscription(patterns, callback, name or getattr(callback, "__name__", repr(callback)))
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: _Subscription):
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def set_baseline(self, snapshot):
+        """Record the snapshot later publishes are diffed against."""
+        with self._lock:
+            self._last = snapshot
+
+    @property
+    def baseline(self):
+        return self._last
+
+    def publish(self, snapshot) -> List[ConfigChange]:
+        """
+        Diff a new snapshot against the last one and notify subscribers.
+
+        Args:
+            snapshot: New ConfigSnapshot
+
+        Returns:
+            list: All ConfigChange objects found (empty if nothing changed or
+                the snapshot is older than the baseline)
+        """
+        with self._lock:
+            previous = self._last
+            old_version = getattr(previous, "version", None)
+            new_version = getattr(snapshot, "version", None)
+            if old_version is not None and new_version is not None and new_version <= old_version:
+                if new_version < old_version:
+                    logger.debug(f"[CONFIG CHANGE] Ignoring stale snapshot v{new_version} (baseline v{old_version})")
+                return []
+            self._last = snapshot
+            if previous is None or previous is snapshot:
+                return []
+            changes = diff_snapshots(previous, snapshot)
+            for change in changes:
+                logger.info(f"[CONFIG CHANGE] {change.name}: {change.old!r} -> {change.new!r}")
+
+            for subscription in list(self._subscriptions):
+                matched = [change for change in changes if subscription.matches(change)]
+                if not matched:
+                    continue
+                logger.debug(f"[CONFIG CHANGE] Notifying {subscription.name} of {len(matched)} change(s)")
+                try:
+                    subscription.callback(matched, snapshot)
+                except Exception as e:
+                    logger.error(f"[CONFIG CHANGE] Subscriber {subscription.name} failed: {e}")
+                    logger.exception("Full exception details:")
+            return changes
@@ -0,0 +1,445 @@
+"""
+Immutable, typed snapshot of device.conf.
+
+The *_static getters used to build a ConfigParser and re-read device.conf on
+every call, several of them once per sensor reading. The file is now parsed
+once into a ConfigSnapshot: the "reference, operational" pairs are split and
+converted up front, and each getter reads an attribute.
+
+A snapshot carries a version number and is replaced as a whole, never
+modified. main.py's ConfigFileHandler calls reload_config_snapshot() when the
+watchdog sees device.conf change and registers the path with watch_config();
+watched paths are served without touching the disk. Processes without a
+watcher (server.py, scripts, tests) fall back to a cheap os.stat() check.
+
+Usage:
+    snapshot = get_config_snapshot()
+    target, deadband = snapshot.ec_target, snapshot.ec_deadband
+"""
+
+import configparser
+import os
+import threading
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    from src.lumina_logger import GlobalLogger
+    logger = GlobalLogger("RippleConfigSnapshot", log_prefix="ripple_").logger
+except Exception:
+    import logging
+    logger = logging.getLogger(__name__)
+
+
+# Seconds between polls per sensor class ([POLLING] <name>_interval_seconds).
+# Relay writes are confirmed by their echo (relay_shadow), so the coil read
+# only reconciles the shadow state and runs slowly.
+DEFAULT_POLL_INTERVALS = {"water_level": 2.0, "relay": 60.0, "ph": 10.0, "ec": 10.0, "npk": 60.0}
+DEFAULT_BUS_MIN_FRAME_GAP = 0.1
+# Realtime mode: boosted intervals while an actuator runs ([POLLING] realtime_<name>_interval_seconds)
+DEFAULT_REALTIME_INTERVALS = {"water_level": 1.0, "ec": 2.0, "ph": 2.0}
+DEFAULT_REALTIME_MAX_POLLS_PER_SECOND = 2.0
+DEFAULT_REALTIME_SETTLE_SECONDS = 120.0
+# Minimum seconds between reactive dosing evaluations per sensor kind
+DEFAULT_REACTIVE_EVALUATION_INTERVAL = 30.0
+# Seconds between unified control ticks ([CONTROL] tick_interval_seconds)
+DEFAULT_CONTROL_TICK_INTERVAL = 2.0
+# Seconds relay changes per board are collected before one write ([CONTROL] relay_coalesce_window_seconds)
+DEFAULT_RELAY_COALESCE_WINDOW = 0.05
+
+
+def _operational(raw: str) -> str:
+    return raw.split(',')[1].strip()
+
+
+def _reference(raw: str) -> str:
+    return raw.split(',')[0].strip()
+
+
+class ConfigSnapshot:
+    """
+    One parsed version of device.conf.
+
+    Args:
+        version (int): Monotonic version, bumped on every swap
+        path (str): Absolute path of the parsed file
+        signature (tuple): (mtime_ns, size, inode) of the file when parsed
+        sections (dict): {section: {key: raw value}} as read by ConfigParser
+        text (str): Raw file contents the sections were parsed from (None if unknown)
+
+    Note:
+        - Keys are lower-cased like ConfigParser; section names are not
+        - Typed attributes keep the defaults of the getters they replace,
+          including the all-or-nothing fallback per group
+        - Instances are read-only; assigning an attribute raises AttributeError
+    """
+
+    __slots__ = (
+        "version", "path", "signature", "sections", "text",
+        "nutrient_pump_on_duration", "nutrient_pump_wait_duration",
+        "ec_target", "ec_deadband", "ec_min", "ec_max", "abc_ratio",
+        "ph_pump_on_duration", "ph_pump_wait_duration", "ph_pump_max_on_duration",
+        "ph_target", "ph_deadband", "ph_min", "ph_max",
+        "water_level_target", "water_level_deadband", "water_level_min", "water_level_max",
+        "water_level_control_enabled", "tank_dump_safety_floor", "tank_dump_max_duration_seconds",
+        "sprinkler_on_duration", "sprinkler_wait_duration", "sprinkler_scheduling_enabled",
+        "mixing_duration", "mixing_interval",
+        "poll_intervals", "bus_min_frame_gap",
+        "realtime_enabled", "realtime_intervals", "realtime_max_polls_per_second", "realtime_settle_seconds",
+        "reactive_dosing_enabled", "reactive_evaluation_interval",
+        "control_tick_enabled", "control_tick_interval", "relay_coalesce_window",
+        "_frozen",
+    )
+
+    def __init__(self, version: int, path: str, signature: Optional[Tuple[int, int, int]],
+                 sections: Dict[str, Dict[str, str]], text: Optional[str] = None):
+        set_ = object.__setattr__
+        set_(self, "_frozen", False)
+        self.version = version
+        self.path = path
+        self.signature = signature
+        self.text = text
+        self.sections = MappingProxyType({s: MappingProxyType(dict(kv)) for s, kv in sections.items()})
+        self._parse_typed()
+        set_(self, "_frozen", True)
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError(f"ConfigSnapshot is immutable (tried to set {name})")
+        object.__setattr__(self, name, value)
+
+    def __repr__(self):
+        return f"ConfigSnapshot(version={self.version}, path={self.path!r}, sections={len(self.sections)})"
+
+    # Raw access
+
+    def has_option(self, section: str, key: str) -> bool:
+        return key.lower() in self.sections.get(section, ())
+
+    def get(self, section: str, key: str, fallback: Any = None) -> Any:
+        """Raw value of section.key, or fallback."""
+        return self.sections.get(section, {}).get(key.lower(), fallback)
+
+    def operational(self, section: str, key: str, fallback: Any = None) -> Any:
+        """Operational (second) value of a "reference, operational" pair, or fallback."""
+        raw = self.get(section, key)
+        if raw is None:
+            return fallback
+        try:
+            return _operational(raw)
+        except IndexError:
+            return fallback
+
+    def field(self, section: str, key: str, index: int, fallback: Any = None) -> Any:
+        """Stripped comma-separated field `index` of section.key, or fallback."""
+        raw = self.get(section, key)
+        if raw is None:
+            return fallback
+        parts = raw.split(',')
+        if index >= len(parts):
+            return fallback
+        return parts[index].strip()
+
+    # Typed values
+
+    def _group(self, error_message: str, defaults: Dict[str, Any], parse):
+        # Parse one getter's worth of values; any failure falls back to all defaults
+        try:
+            values = parse()
+        except Exception as e:
+            logger.error(f"{error_message}: {e}")
+            values = defaults
+        for name, value in values.items():
+            setattr(self, name, value)
+
+    def _parse_typed(self):
+        get = lambda section, key: self.sections[section][key]  # noqa: E731 - raises KeyError like config.get
+
+        self._group("Error reading nutrient config", {
+            "nutrient_pump_on_duration": "00:00:00", "nutrient_pump_wait_duration": "00:00:00",
+        }, lambda: {
+            "nutrient_pump_on_duration": _operational(get('NutrientPump', 'nutrient_pump_on_duration')),
+            "nutrient_pump_wait_duration": _operational(get('NutrientPump', 'nutrient_pump_wait_duration')),
+        })
+
+        self._group("Error reading EC config", {"ec_target": 1.0, "ec_deadband": 0.1}, lambda: {
+            "ec_target": float(_operational(get('EC', 'ec_target'))),
+            "ec_deadband": float(_operational(get('EC', 'ec_deadband'))),
+        })
+
+        self._group("Error reading EC min/max config", {"ec_min": 0.0, "ec_max": 99.0}, lambda: {
+            "ec_min": float(_operational(get('EC', 'ec_min'))),
+            "ec_max": float(_operational(get('EC', 'ec_max'))),
+        })
+
+        def abc_ratio():
+            parts = _operational(get('NutrientPump', 'abc_ratio')).strip('"').strip("'").split(':')
+            return {"abc_ratio": (int(parts[0].strip()), int(parts[1].strip()), int(parts[2].strip()))}
+        self._group("Error reading ABC ratio", {"abc_ratio": (1, 1, 0)}, abc_ratio)
+
+        self._group("Error reading pH config", {
+            "ph_pump_on_duration": "00:00:03", "ph_pump_wait_duration": "00:02:00",
+            "ph_pump_max_on_duration": "00:00:05",
+        }, lambda: {
+            "ph_pump_on_duration": _operational(get('NutrientPump', 'ph_pump_on_duration')),
+            "ph_pump_max_on_duration": _reference(get('NutrientPump', 'ph_pump_on_duration')),
+            "ph_pump_wait_duration": _operational(get('NutrientPump', 'ph_pump_wait_duration')),
+        })
+
+        def ph_targets():
+            values = {
+                "ph_target": float(_operational(get('pH', 'ph_target'))),
+                "ph_deadband": float(_operational(get('pH', 'ph_deadband'))),
+            }
+            try:
+                values["ph_min"] = float(_operational(get('pH', 'ph_min')))
+                values["ph_max"] = float(_operational(get('pH', 'ph_max')))
+            except Exception:
+                # Default limits if not configured
+                values["ph_min"], values["ph_max"] = 4.0, 8.0
+            return values
+        self._group("Error reading pH targets", {
+            "ph_target": 6.0, "ph_deadband": 0.2, "ph_min": 4.0, "ph_max": 8.0,
+        }, ph_targets)
+
+        self._group("Error reading water level targets", {
+            "water_level_target": 80.0, "water_level_deadband": 10.0,
+            "water_level_min": 50.0, "water_level_max": 100.0,
+        }, lambda: {
+            "water_level_target": float(_operational(get('WaterLevel', 'water_level_target'))),
+            "water_level_deadband": float(_operational(get('WaterLevel', 'water_level_deadband'))),
+            "water_level_min": float(_operational(get('WaterLevel', 'water_level_min'))),
+            "water_level_max": float(_operational(get('WaterLevel', 'water_level_max'))),
+        })
+
+        # Enabled flags default to True when the option is absent (backward compatibility)
+        self._group("Error reading water_level_control_enabled", {"water_level_control_enabled": True}, lambda: {
+            "water_level_control_enabled": (
+                _operational(get('WaterLevel', 'water_level_control_enabled')).lower() == 'true'
+                if self.has_option('WaterLevel', 'water_level_control_enabled') else True
+            ),
+        })
+
+        self._group("Error reading drain config", {
+            "tank_dump_safety_floor": 30.0, "tank_dump_max_duration_seconds": 1800,
+        }, lambda: {
+            "tank_dump_safety_floor": (
+                float(_operational(get('WaterLevel', 'tank_dump_safety_floor')))
+                if self.has_option('WaterLevel', 'tank_dump_safety_floor') else 30.0
+            ),
+            "tank_dump_max_duration_seconds": (
+                int(_operational(get('WaterLevel', 'tank_dump_max_duration_seconds')))
+                if self.has_option('WaterLevel', 'tank_dump_max_duration_seconds') else 1800
+            ),
+        })
+
+        self._group("Error reading sprinkler config", {
+            "sprinkler_on_duration": "00:00:00", "sprinkler_wait_duration": "00:00:00",
+        }, lambda: {
+            "sprinkler_on_duration": _operational(get('Sprinkler', 'sprinkler_on_duration')),
+            "sprinkler_wait_duration": _operational(get('Sprinkler', 'sprinkler_wait_duration')),
+        })
+
+        self._group("Error checking sprinkler_scheduling_enabled", {"sprinkler_scheduling_enabled": True}, lambda: {
+            "sprinkler_scheduling_enabled": (
+                _operational(get('Sprinkler', 'sprinkler_scheduling_enabled')).lower() == 'true'
+                if self.has_option('Sprinkler', 'sprinkler_scheduling_enabled') else True
+            ),
+        })
+
+        self._group("Error reading mixing config", {
+            "mixing_duration": "00:20:00", "mixing_interval": "02:00:00",
+        }, lambda: {
+            "mixing_duration": _operational(get('Mixing', 'mixing_duration')),
+            "mixing_interval": _operational(get('Mixing', 'mixing_interval')),
+        })
+
+        def polling():
+            # Each key is optional; devices without a [POLLING] section keep the defaults
+            intervals = {}
+            for name, default in DEFAULT_POLL_INTERVALS.items():
+                key = f'{name}_interval_seconds'
+                intervals[name] = float(_operational(get('POLLING', key))) if self.has_option('POLLING', key) else default
+                if intervals[name] <= 0:
+                    raise ValueError(f"{key} must be positive")
+            gap = (float(_operational(get('POLLING', 'bus_min_frame_gap_seconds')))
+                   if self.has_option('POLLING', 'bus_min_frame_gap_seconds') else DEFAULT_BUS_MIN_FRAME_GAP)
+            return {"poll_intervals": MappingProxyType(intervals), "bus_min_frame_gap": gap}
+        self._group("Error reading polling config", {
+            "poll_intervals": MappingProxyType(dict(DEFAULT_POLL_INTERVALS)),
+            "bus_min_frame_gap": DEFAULT_BUS_MIN_FRAME_GAP,
+        }, polling)
+
+        def realtime():
+            def number(key, default):
+                return float(_operational(get('POLLING', key))) if self.has_option('POLLING', key) else default
+            enabled = (_operational(get('POLLING', 'realtime_enabled')).lower() == 'true'
+                       if self.has_option('POLLING', 'realtime_enabled') else True)
+            intervals = {name: number(f'realtime_{name}_interval_seconds', default)
+                         for name, default in DEFAULT_REALTIME_INTERVALS.items()}
+            if any(interval <= 0 for interval in intervals.values()):
+                raise ValueError("realtime intervals must be positive")
+            return {
+                "realtime_enabled": enabled,
+                "realtime_intervals": MappingProxyType(intervals),
+                "realtime_max_polls_per_second": number('realtime_max_polls_per_second',
+                                                        DEFAULT_REALTIME_MAX_POLLS_PER_SECOND),
+                "realtime_settle_seconds": number('realtime_settle_seconds', DEFAULT_REALTIME_SETTLE_SECONDS),
+            }
+        self._group("Error reading realtime polling config", {
+            "realtime_enabled": True,
+            "realtime_intervals": MappingProxyType(dict(DEFAULT_REALTIME_INTERVALS)),
+            "realtime_max_polls_per_second": DEFAULT_REALTIME_MAX_POLLS_PER_SECOND,
+            "realtime_settle_seconds": DEFAULT_REALTIME_SETTLE_SECONDS,
+        }, realtime)
+
+        def reactive_dosing():
+            # Opt-in; devices without the keys keep the scheduled chain only
+            enabled = (_operational(get('NutrientPump', 'reactive_dosing_enabled')).lower() == 'true'
+                       if self.has_option('NutrientPump', 'reactive_dosing_enabled') else False)
+            key = 'reactive_min_evaluation_interval_seconds'
+            interval = (float(_operational(get('NutrientPump', key)))
+                        if self.has_option('NutrientPump', key) else DEFAULT_REACTIVE_EVALUATION_INTERVAL)
+            if interval < 0:
+                raise ValueError(f"{key} must not be negative")
+            return {"reactive_dosing_enabled": enabled, "reactive_evaluation_interval": interval}
+        self._group("Error reading reactive dosing config", {
+            "reactive_dosing_enabled": False,
+            "reactive_evaluation_interval": DEFAULT_REACTIVE_EVALUATION_INTERVAL,
+        }, reactive_dosing)
+
+        def control_tick():
+            # Opt-in; without a [CONTROL] section each controller keeps its own schedule
+            enabled = (_operational(get('CONTROL', 'unified_tick_enabled')).lower() == 'true'
+                       if self.has_option('CONTROL', 'unified_tick_enabled') else False)
+            interval = (float(_operational(get('CONTROL', 'tick_interval_seconds')))
+                        if self.has_option('CONTROL', 'tick_interval_seconds') else DEFAULT_CONTROL_TICK_INTERVAL)
+            if interval <= 0:
+                raise ValueError("tick_interval_seconds must be positive")
+            return {"control_tick_enabled": enabled, "control_tick_interval": interval}
+        self._group("Error reading control tick config", {
+            "control_tick_enabled": False,
+            "control_tick_interval": DEFAULT_CONTROL_TICK_INTERVAL,
+        }, control_tick)
+
+        def relay_coalescing():
+            key = 'relay_coalesce_window_seconds'
+            window = (float(_operational(get('CONTROL', key)))
+                      if self.has_option('CONTROL', key) else DEFAULT_RELAY_COALESCE_WINDOW)
+            if window < 0:
+                raise ValueError(f"{key} must not be negative")
+            return {"relay_coalesce_window": window}
+        self._group("Error reading relay coalescing config", {
+            "relay_coalesce_window": DEFAULT_RELAY_COALESCE_WINDOW,
+        }, relay_coalescing)
+
+
+_snapshots: Dict[str, ConfigSnapshot] = {}
+_watched = set()
+_versions: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def _default_path() -> str:
+    try:
+        import src.globals as globals_module
+    except ImportError:
+        import globals as globals_module
+    return globals_module.DEVICE_CONF_PATH
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _parse_sections(path: str) -> Tuple[Dict[str, Dict[str, str]], str]:
+    # Read once: the same text is parsed and kept for the cloud-sync hash
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    config = configparser.ConfigParser(empty_lines_in_values=False, interpolation=None)
+    config.read_string(text, source=path)
+    return {section: dict(config.items(section, raw=True)) for section in config.sections()}, text
+
+
+def get_config_snapshot(path: Optional[str] = None) -> ConfigSnapshot:
+    """
+    Return the current snapshot of device.conf.
+
+    Args:
+        path (str): Config file path. Defaults to globals.DEVICE_CONF_PATH.
+
+    Returns:
+        ConfigSnapshot: Current snapshot; treat as read-only
+
+    Note:
+        - Watched paths (see watch_config) are returned without any disk access
+        - Unwatched paths are re-parsed only when mtime, size or inode change
+    """
+    path = os.path.abspath(path or _default_path())
+    snapshot = _snapshots.get(path)
+    if snapshot is not None and (path in _watched or snapshot.signature == _file_signature(path)):
+        return snapshot
+    return reload_config_snapshot(path)
+
+
+def reload_config_snapshot(path: Optional[str] = None) -> ConfigSnapshot:
+    """
+    Re-parse device.conf and atomically swap in a new snapshot.
+
+    The version only advances when the file changed. If the file is missing
+    or cannot be parsed (e.g. mid-rename during sed -i), the previous snapshot
+    is kept.
+
+    Args:
+        path (str): Config file path. Defaults to globals.DEVICE_CONF_PATH.
+
+    Returns:
+        ConfigSnapshot: The snapshot now in effect
+    """
+    path = os.path.abspath(path or _default_path())
+    with _lock:
+        previous = _snapshots.get(path)
+        signature = _file_signature(path)
+        if previous is not None and previous.signature == signature:
+            return previous
+        try:
+            if signature is None and previous is not None:
+                raise FileNotFoundError(path)
+            sections, text = _parse_sections(path) if signature is not None else ({}, None)
+        except (OSError, UnicodeDecodeError, configparser.Error) as e:
+            if previous is not None:
+                logger.warning(f"[CONFIG] Keeping config v{previous.version}: could not read {path}: {e}")
+                return previous
+            logger.error(f"[CONFIG] Device configuration file is corrupt: {e}. Using defaults.")
+            sections, text = {}, None
+
+        version = _versions.get(path, 0) + 1
+        _versions[path] = version
+        snapshot = ConfigSnapshot(version, path, signature, sections, text)
+        _snapshots[path] = snapshot
+        if previous is not None:
+            logger.info(f"[CONFIG] device.conf snapshot v{version} loaded ({len(sections)} sections)")
+        return snapshot
+
+
+def watch_config(path: Optional[str] = None):
+    """
+    Mark a config path as watched by a file watcher.
+
+    Getters then trust the current snapshot until reload_config_snapshot() is
+    called for the path, instead of checking the file on every call.
+    """
+    path = os.path.abspath(path or _default_path())
+    with _lock:
+        _watched.add(path)
+
+
+def unwatch_config(path: Optional[str] = None):
+    """Go back to stat-validated reads for a path (e.g. when the watcher stops)."""
+    path = os.path.abspath(path or _default_path())
+    with _lock:
+        _watched.discard(path)
@@ -0,0 +1,293 @@
+"""
+Coalesced, transactional writes of device.conf.
+
+Every config POST in server.py used to re-read device.conf, change a few
+keys and rewrite the whole file in place. Each rewrite fired a watchdog
+event in main.py, so an Edge push touching plumbing, sprinkler, mixing,
+water level and the instruction set in quick succession meant as many
+write/reload cycles, and a reader could catch the file half written.
+
+Requests now submit a mutation to a ConfigTransactionWriter. Mutations that
+arrive within a short window are applied to one in-memory copy of the file,
+validated as a group, written once (temp file, fsync, rename) and announced
+once with the full key-level diff. A mutation that fails validation is
+rolled back on its own and only its request fails.
+
+Usage:
+    writer = ConfigTransactionWriter('config/device.conf')
+    applied = await writer.apply_async(lambda config: set_mixing(config, body), label="mixing")
+"""
+
+import asyncio
+import concurrent.futures
+import configparser
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from src import io_accounting
+    from src.config_bus import ConfigChange, diff_snapshots, operational_value
+    from src.lumina_logger import GlobalLogger
+    logger = GlobalLogger("RippleConfigTxn", log_prefix="ripple_").logger
+except ImportError:
+    import io_accounting
+    from config_bus import ConfigChange, diff_snapshots, operational_value
+    import logging
+    logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_SECONDS = 0.05   # How long the first request of a batch waits for others
+MAX_BATCH_SIZE = 64             # Flush early once this many mutations are queued
+
+_DURATION_RE = re.compile(r"^\d{1,3}:[0-5]\d:[0-5]\d$")
+
+# (section, key prefix) groups whose min <= target <= max must hold
+_RANGE_GROUPS = (("pH", "ph"), ("EC", "ec"), ("WaterLevel", "water_level"))
+
+_NUMERIC_KEYS = {
+    "ph_target", "ph_deadband", "ph_min", "ph_max",
+    "ec_target", "ec_deadband", "ec_min", "ec_max",
+    "water_level_target", "water_level_deadband", "water_level_min", "water_level_max",
+    "tank_dump_safety_floor", "tank_dump_max_duration_seconds", "supply_water_ph_estimate",
+    "valid_level_min", "valid_level_max",
+    "target_water_temperature", "target_water_temperature_min", "target_water_temperature_max",
+}
+
+
+class ConfigValidationError(ValueError):
+    """A mutation would leave device.conf with values the controller cannot use."""
+
+
+def sections_of(config: configparser.ConfigParser) -> Dict[str, Dict[str, str]]:
+    """{section: {key: raw value}} copy of a ConfigParser."""
+    return {section: dict(config.items(section, raw=True)) for section in config.sections()}
+
+
+def _parser_from(sections: Dict[str, Dict[str, str]]) -> configparser.ConfigParser:
+    config = configparser.ConfigParser(interpolation=None)
+    config.read_dict(sections)
+    return config
+
+
+def validate_changes(sections: Dict[str, Dict[str, str]], changes: List[ConfigChange]):
+    """
+    Check changed keys against the rules main.py relies on when loading them.
+
+    Args:
+        sections (dict): Config after the changes, {section: {key: raw value}}
+        changes (list): ConfigChange objects to check
+
+    Raises:
+        ConfigValidationError: On the first invalid value or inconsistent range
+
+    Note:
+        - Only changed keys are checked, so an existing odd value elsewhere in
+          the file does not block unrelated updates
+        - Durations must be HH:MM:SS, booleans true/false, known numeric keys floats
+        - pH, EC and water level ranges are checked as a group when any
+          of their target/min/max keys changed
+    """
+    touched_groups = set()
+    for change in changes:
+        if change.new is None:
+            continue
+        key, value = change.key, change.new_operational
+        if key in _NUMERIC_KEYS:
+            try:
+                float(value)
+            except (TypeError, ValueError):
+                raise ConfigValidationError(f"{change.name} must be a number, got {value!r}")
+        elif key.endswith("_duration") or key.endswith("_interval"):
+            if not _DURATION_RE.match(value or ""):
+                raise ConfigValidationError(f"{change.name} must be HH:MM:SS, got {value!r}")
+        elif key.endswith("_on_at_startup") or key.endswith("_enabled"):
+            if (value or "").lower() not in ("true", "false"):
+                raise ConfigValidationError(f"{change.name} must be true or false, got {value!r}")
+        for section, prefix in _RANGE_GROUPS:
+            if change.section == section and key in (f"{prefix}_target", f"{prefix}_min", f"{prefix}_max"):
+                touched_groups.add((section, prefix))
+
+    for section, prefix in touched_groups:
+        values = sections.get(section, {})
+        try:
+            low = float(operational_value(values[f"{prefix}_min"]))
+            target = float(operational_value(values[f"{prefix}_target"]))
+            high = float(operational_value(values[f"{prefix}_max"]))
+        except (KeyError, TypeError, ValueError):
+            continue  # Incomplete group; the controller falls back to defaults
+        if not low <= target <= high:
+            raise ConfigValidationError(
+                f"{section}: {prefix}_min <= {prefix}_target <= {prefix}_max does not hold "
+                f"({low} / {target} / {high})")
+
+
+class _Pending:
+    __slots__ = ("mutate", "label", "future", "submitted_at")
+
+    def __init__(self, mutate: Callable, label: str):
+        self.mutate = mutate
+        self.label = label
+        self.future = concurrent.futures.Future()
+        self.submitted_at = time.monotonic()
+
+
+class ConfigTransactionWriter:
+    """
+    Batches device.conf mutations into single atomic writes.
+
+    Args:
+        path (str): Config file to write
+        window (float): Seconds the first mutation of a batch waits for more
+        validator (callable): validator(sections, changes); raises to reject a
+            mutation. Defaults to validate_changes.
+
+    Note:
+        - mutate(config) receives a ConfigParser (no interpolation) holding the
+          file as already changed by earlier mutations in the batch; its
+          return value is the request's result
+        - The file is re-read at the start of each batch, so edits made by
+          other writers (main.py, sed) between batches are kept
+        - Listeners are called once per written batch as callback(changes)
+        - A batch that changes nothing is not written
+    """
+
+    def __init__(self, path: str, window: float = DEFAULT_WINDOW_SECONDS,
+                 validator: Optional[Callable] = None):
+        self.path = path
+        self.window = window
+        self._validator = validator or validate_changes
+        self._pending: List[_Pending] = []
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._commit_lock = threading.Lock()
+        self._listeners: List[Callable[[List[ConfigChange]], None]] = []
+        self._stats = {
+            "batches": 0, "writes": 0, "requests": 0, "rejected": 0,
+            "last_batch_size": 0, "last_latency_ms": 0.0, "max_latency_ms": 0.0,
+            "last_write_ms": 0.0,
+        }
+
+    def add_listener(self, callback: Callable[[List[ConfigChange]], None]):
+        """Call callback(changes) after every batch that changed the file."""
+        self._listeners.append(callback)
+
+    def submit(self, mutate: Callable[[configparser.ConfigParser], Any],
+               label: str = "") -> concurrent.futures.Future:
+        """
+        Queue a mutation for the next batch.
+
+        Args:
+            mutate (callable): Applies the change to a ConfigParser, returns the result
+            label (str): Name for logs, e.g. "plumbing"
+
+        Returns:
+            Future: Resolves to mutate's return value once the batch is on disk,
+            or raises its exception / ConfigValidationError
+        """
+        pending = _Pending(mutate, label)
+        flush_now = False
+        with self._lock:
+            self._pending.append(pending)
+            if len(self._pending) >= MAX_BATCH_SIZE:
+                flush_now = True
+            elif self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if flush_now:
+            self.flush()
+        return pending.future
+
+    def apply(self, mutate: Callable, label: str = "", timeout: Optional[float] = 10.0) -> Any:
+        """Blocking submit(); returns the mutation's result."""
+        return self.submit(mutate, label).result(timeout=timeout)
+
+    async def apply_async(self, mutate: Callable, label: str = "") -> Any:
+        """submit() for async endpoints; waits without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(mutate, label))
+
+    def flush(self):
+        """Apply, validate and write everything queued so far."""
+        with self._lock:
+            batch, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if batch:
+            with self._commit_lock:
+                self._commit(batch)
+
+    def _commit(self, batch: List[_Pending]):
+        try:
+            config = configparser.ConfigParser(interpolation=None)
+            config.read(self.path)
+            original = sections_of(config)
+        except Exception as e:
+            logger.error(f"[CONFIG TXN] Could not read {self.path}: {e}")
+            for pending in batch:
+                pending.future.set_exception(e)
+            return
+
+        accepted = []
+        current = original
+        for pending in batch:
+            try:
+                result = pending.mutate(config)
+                updated = sections_of(config)
+                self._validator(updated, diff_snapshots(current, updated))
+            except Exception as e:
+                logger.warning(f"[CONFIG TXN] Rejected {pending.label or 'update'}: {e}")
+                config = _parser_from(current)
+                self._stats["rejected"] += 1
+                pending.future.set_exception(e)
+                continue
+            current = updated
+            accepted.append((pending, result))
+
+        changes = diff_snapshots(original, current)
+        if changes:
+            started = time.monotonic()
+            try:
+                self._write(config)
+            except Exception as e:
+                logger.error(f"[CONFIG TXN] Failed to write {self.path}: {e}")
+                for pending, _ in accepted:
+                    pending.future.set_exception(e)
+                return
+            self._stats["writes"] += 1
+            self._stats["last_write_ms"] = (time.monotonic() - started) * 1000
+
+        now = time.monotonic()
+        latencies = [(now - pending.submitted_at) * 1000 for pending, _ in accepted]
+        self._stats["batches"] += 1
+        self._stats["requests"] += len(batch)
+        self._stats["last_batch_size"] = len(batch)
+        if latencies:
+            self._stats["last_latency_ms"] = max(latencies)
+            self._stats["max_latency_ms"] = max(self._stats["max_latency_ms"], max(latencies))
+        labels = ", ".join(pending.label or "update" for pending, _ in accepted)
+        logger.info(f"[CONFIG TXN] {len(accepted)}/{len(batch)} update(s) [{labels}] -> "
+                    f"{len(changes)} key(s) changed, push-to-write {max(latencies, default=0):.1f} ms")
+
+        for pending, result in accepted:
+            pending.future.set_result(result)
+        if changes:
+            for callback in list(self._listeners):
+                try:
+                    callback(changes)
+                except Exception as e:
+                    logger.error(f"[CONFIG TXN] Listener failed: {e}")
+
+    def _write(self, config: configparser.ConfigParser):
+        # Same directory as the target so the rename is atomic
+        tmp_path = self.path + ".tmp"
+        with io_accounting.open_accounted("device_conf", tmp_path, "w") as configfile:
+            config.write(configfile)
+            configfile.fsync()
+        os.replace(tmp_path, self.path)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and latencies of the batches written so far."""
+        return dict(self._stats)
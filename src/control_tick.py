@@ -0,0 +1,486 @@
+"""
+Single-pass control tick.
+
+Nutrient, pH, mixing, sprinkler and water level control normally run as
+separate APScheduler chains and sensor callbacks. Each one reads its own
+config values and sensor data and switches its own relays, so two
+controllers acting at the same moment send separate frames to the same
+board, and their decisions can be based on different config versions.
+
+With [CONTROL] unified_tick_enabled, main.py runs one ControlTick instead.
+Every tick_interval_seconds it:
+  1. takes one sensor snapshot (the in-memory saved sensor data)
+  2. takes one ConfigSnapshot
+  3. asks every controller for the state of its devices
+  4. writes the devices whose state changed with Relay.apply_states(),
+     one batched frame per board
+and records how long each of those steps took.
+
+The dosing decisions reuse the hysteresis checks of nutrient_static and
+ph_static, and the refill decision of water_level_static, so both modes
+dose and fill the same way. A device a controller leaves out of its
+decision (e.g. the inlet valve during a drain) is not touched that tick.
+Timed runs are backed by a deadline-service failsafe in case ticks stop.
+
+Usage:
+    tick = ControlTick()
+    timing = tick.run()          # one pass; called by the poll scheduler
+    tick.stats()
+"""
+
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from src.lumina_logger import GlobalLogger
+    logger = GlobalLogger("RippleControlTick", log_prefix="ripple_").logger
+except Exception:
+    import logging
+    logger = logging.getLogger(__name__)
+
+try:
+    from src import config_snapshot, helpers, nutrient_static, ph_static, water_level_static
+    from src.deadline_service import get_deadline_service
+    from src.poll_scheduler import realtime_boost, realtime_release
+    from src.relay_coalescer import safety_priority
+except ImportError:
+    import config_snapshot, helpers, nutrient_static, ph_static, water_level_static
+    from deadline_service import get_deadline_service
+    from relay_coalescer import safety_priority
+    from poll_scheduler import realtime_boost, realtime_release
+
+try:
+    from audit_event import audit
+except Exception:
+    audit = None
+
+parse_duration = nutrient_static.parse_duration
+
+MAX_READING_AGE = 120.0     # Seconds before a reading is too old to act on (as the pH chain)
+FAILSAFE_GRACE = 30.0       # Seconds past the end of a timed run before the failsafe switches it off
+TIMING_HISTORY = 100        # Ticks kept for stats()
+SPRINKLER_DISABLED_WAIT = parse_duration("99:99:99")   # Wait sentinel that disables scheduling
+
+NUTRIENT_PUMPS = ("NutrientPumpA", "NutrientPumpB", "NutrientPumpC")
+PH_PUMPS = ("pHUpPump", "pHDownPump")
+
+
+class SensorSnapshot:
+    """
+    Latest EC, pH and water level readings, taken once per tick.
+
+    A value is None when the sensor has no reading or its reading is older
+    than max_age seconds.
+    """
+
+    __slots__ = ("ec", "ph", "water_level")
+
+    def __init__(self, ec: Optional[float] = None, ph: Optional[float] = None,
+                 water_level: Optional[float] = None):
+        self.ec = ec
+        self.ph = ph
+        self.water_level = water_level
+
+    @classmethod
+    def from_saved_data(cls, data, max_age: float = MAX_READING_AGE) -> "SensorSnapshot":
+        """Build from the saved_sensor_data structure (first point per metric, as the chains)."""
+        water = data.get('data', {}).get('water_metrics', {}) if isinstance(data, dict) else {}
+        return cls(*(_latest_value(water.get(name), max_age) for name in ("ec", "ph", "water_level")))
+
+    def __repr__(self):
+        return f"SensorSnapshot(ec={self.ec}, ph={self.ph}, water_level={self.water_level})"
+
+
+def _latest_value(metric, max_age):
+    points = (metric or {}).get('measurements', {}).get('points', [])
+    if not points:
+        return None
+    value = points[0].get('fields', {}).get('value')
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    stamp = points[0].get('timestamp')
+    if stamp and max_age:
+        try:
+            taken = datetime.fromisoformat(stamp.replace('Z', '+00:00'))
+            if (datetime.now(taken.tzinfo) - taken).total_seconds() > max_age:
+                return None
+        except ValueError:
+            pass
+    return float(value)
+
+
+# Controllers. decide() returns {device: state} for the devices it controls
+# this tick; run_until is the end of the current timed run (None if idle).
+
+class DutyCycle:
+    """
+    Fixed on/off cycle: on for on_seconds, then off for off_seconds.
+
+    Args:
+        name (str): Controller name for logs and timings
+        devices (tuple): Devices switched together
+        durations (callable): durations(config) -> (on_seconds, off_seconds);
+            on_seconds <= 0 keeps the devices off, off_seconds <= 0 runs once
+        start_on (bool): Start with an on phase (mixing) or a wait (sprinklers)
+    """
+
+    def __init__(self, name: str, devices: Iterable[str],
+                 durations: Callable[[object], Tuple[float, float]], start_on: bool = True):
+        self.name = name
+        self.devices = tuple(devices)
+        self._durations = durations
+        self._start_on = start_on
+        self.run_until: Optional[float] = None
+        self._next_start: Optional[float] = None
+
+    def decide(self, sensors: SensorSnapshot, config, now: float) -> Dict[str, bool]:
+        on_seconds, off_seconds = self._durations(config)
+        if on_seconds <= 0:
+            # Disabled; start afresh when re-enabled
+            self.run_until = self._next_start = None
+            return dict.fromkeys(self.devices, False)
+        if self.run_until is not None:
+            if now < self.run_until:
+                return dict.fromkeys(self.devices, True)
+            self.run_until = None
+            self._next_start = now + off_seconds if off_seconds > 0 else float('inf')
+            logger.info(f"[TICK] {self.name} off for {off_seconds:g}s")
+        if self._next_start is None:
+            self._next_start = now if self._start_on else now + off_seconds
+        if now < self._next_start:
+            return dict.fromkeys(self.devices, False)
+        self.run_until = now + on_seconds
+        logger.info(f"[TICK] {self.name} on for {on_seconds:g}s")
+        return dict.fromkeys(self.devices, True)
+
+
+class TimedDose:
+    """
+    Sensor-driven dose: check, run the pumps for a duration, wait, check again.
+
+    Subclasses implement _plan() with the dosing rules. Between doses the
+    check runs at most once per reactive_evaluation_interval, and never
+    within the wait duration after the previous dose stopped.
+    """
+
+    name = "dose"
+    devices: Tuple[str, ...] = ()
+
+    def __init__(self):
+        self.run_until: Optional[float] = None
+        self._running: Dict[str, bool] = {}
+        self._last_stop: Optional[float] = None
+        self._next_check = 0.0
+
+    def decide(self, sensors: SensorSnapshot, config, now: float) -> Dict[str, bool]:
+        idle = dict.fromkeys(self.devices, False)
+        if self.run_until is not None:
+            if now < self.run_until:
+                return dict(self._running)
+            self.run_until = None
+            self._last_stop = now
+            logger.info(f"[TICK] {self.name} dose finished")
+        on_seconds, wait_seconds = self._durations(config)
+        if on_seconds <= 0:
+            return idle
+        if self._last_stop is not None and now - self._last_stop < wait_seconds:
+            return idle
+        if now < self._next_check:
+            return idle
+        self._next_check = now + config.reactive_evaluation_interval
+        plan = self._plan(sensors, config, on_seconds)
+        if plan is None:
+            return idle
+        self._running, seconds = plan
+        self.run_until = now + seconds
+        return dict(self._running)
+
+    def _durations(self, config) -> Tuple[float, float]:
+        raise NotImplementedError
+
+    def _plan(self, sensors: SensorSnapshot, config, on_seconds: float):
+        """Return ({device: state}, seconds) to start a dose, or None."""
+        raise NotImplementedError
+
+
+class NutrientDosing(TimedDose):
+    name = "nutrient"
+    devices = NUTRIENT_PUMPS
+
+    def _durations(self, config):
+        return (parse_duration(config.nutrient_pump_on_duration),
+                parse_duration(config.nutrient_pump_wait_duration))
+
+    def _plan(self, sensors, config, on_seconds):
+        if sensors.ec is None or not nutrient_static.check_if_nutrient_dosing_needed(sensors.ec):
+            return None
+        states = {pump: ratio > 0 for pump, ratio in zip(self.devices, config.abc_ratio)}
+        pumps = [pump[-1] for pump, on in states.items() if on]
+        logger.info(f"[TICK] Nutrient pumps {pumps} on for {on_seconds}s (EC {sensors.ec})")
+        if audit:
+            audit.emit("dosing", "nutrient_start",
+                       resource=",".join(f"NutrientPump{p}" for p in pumps),
+                       source="autonomous",
+                       value={"abc_ratio": config.abc_ratio, "duration_s": on_seconds, "pumps": pumps},
+                       details=f"Control tick dosing, pumps {pumps} for {on_seconds}s")
+        realtime_boost("ec", "nutrient_dose", duration=on_seconds, settle=True)
+        return states, on_seconds
+
+
+class PhDosing(TimedDose):
+    name = "ph"
+    devices = PH_PUMPS
+
+    def _durations(self, config):
+        return (parse_duration(config.ph_pump_on_duration),
+                parse_duration(config.ph_pump_wait_duration))
+
+    def _plan(self, sensors, config, on_seconds):
+        if sensors.ph is None:
+            return None
+        needed, use_ph_up, dose_factor = ph_static.check_if_ph_adjustment_needed(sensors.ph)
+        if not needed:
+            return None
+        max_seconds = parse_duration(config.ph_pump_max_on_duration)
+        seconds = max(1, min(int(on_seconds * dose_factor), max_seconds))
+        pump = "pHUpPump" if use_ph_up else "pHDownPump"
+        logger.info(f"[TICK] {pump} on for {seconds}s (pH {sensors.ph}, factor {dose_factor:.0%})")
+        if audit:
+            audit.emit("dosing", "ph_up_start" if use_ph_up else "ph_down_start",
+                       resource="pHPlusPump" if use_ph_up else "pHMinusPump",
+                       source="autonomous",
+                       value={"duration_s": seconds, "dose_factor": round(dose_factor, 2),
+                              "base_duration_s": on_seconds},
+                       details=f"Control tick {pump} for {seconds}s (factor {dose_factor:.0%})")
+        realtime_boost("ph", "ph_dose", duration=seconds, settle=True)
+        return {name: name == pump for name in self.devices}, seconds
+
+
+class WaterLevelRefill:
+    """Inlet valve hysteresis; leaves the valve alone while a drain inhibits refill."""
+
+    name = "water_level"
+    devices = ("ValveOutsideToTank",)
+
+    def __init__(self):
+        self.run_until = None
+        self._open = False
+
+    def decide(self, sensors: SensorSnapshot, config, now: float) -> Dict[str, bool]:
+        if not config.water_level_control_enabled:
+            self._set(False)
+            return {self.devices[0]: False}
+        level = sensors.water_level
+        if level is None:
+            return {self.devices[0]: self._open}
+        if water_level_static.check_drain(level):
+            return {}
+        decision = water_level_static.refill_decision(level, (
+            config.water_level_target, config.water_level_deadband,
+            config.water_level_min, config.water_level_max))
+        if decision is not None and decision != self._open:
+            logger.info(f"[TICK] Water level {level} cm - inlet valve {'OPEN' if decision else 'CLOSED'}")
+            self._set(decision)
+        return {self.devices[0]: self._open}
+
+    def _set(self, state):
+        if state:
+            realtime_boost("water_level", "fill")
+        elif self._open:
+            realtime_release("water_level", "fill")
+        self._open = state
+
+
+def _mixing_durations(config):
+    return parse_duration(config.mixing_duration), parse_duration(config.mixing_interval)
+
+
+def _sprinkler_durations(config):
+    wait_seconds = parse_duration(config.sprinkler_wait_duration)
+    if not config.sprinkler_scheduling_enabled or wait_seconds == 0 or wait_seconds >= SPRINKLER_DISABLED_WAIT:
+        return 0, 0
+    return parse_duration(config.sprinkler_on_duration), wait_seconds
+
+
+def _sprinkler_devices(relay) -> List[str]:
+    """Sprinkler device names for this board layout (single, A/B or 1/2)."""
+    mapping = relay._get_sprinkler_mapping() if relay else {}
+    return [mapping[key] for key in ("sprinkler_single", "sprinkler_a", "sprinkler_b", "sprinkler1", "sprinkler2")
+            if key in mapping]
+
+
+def default_controllers(relay, sprinkler_on_at_startup: bool = False) -> list:
+    """The five controllers in evaluation order."""
+    return [
+        WaterLevelRefill(),
+        NutrientDosing(),
+        PhDosing(),
+        DutyCycle("mixing", ("MixingPump",), _mixing_durations, start_on=True),
+        DutyCycle("sprinkler", _sprinkler_devices(relay), _sprinkler_durations,
+                  start_on=sprinkler_on_at_startup),
+    ]
+
+
+class ControlTick:
+    """
+    Evaluates all controllers once per tick and batches their relay writes.
+
+    Args:
+        relay_factory (callable): Returns the Relay instance (or None)
+        controllers (list): Controllers with decide() and run_until; default_controllers() when None
+        config_path (str): device.conf path for the config snapshot
+        clock (callable): Monotonic clock, injectable for tests
+        sensor_source (callable): Returns the saved sensor data structure
+
+    Note:
+        - Only changed devices are written; the first tick writes every device
+        - A controller that raises keeps its devices as they are for that tick
+        - timings: sensors/config/relay/total in ms plus decide_ms per controller
+    """
+
+    def __init__(self, relay_factory: Optional[Callable] = None, controllers: Optional[list] = None,
+                 config_path: Optional[str] = None, clock: Callable[[], float] = time.monotonic,
+                 sensor_source: Callable[[], dict] = helpers.get_saved_sensor_data):
+        self._relay_factory = relay_factory or _default_relay
+        self._config_path = config_path
+        self._clock = clock
+        self._sensor_source = sensor_source
+        self._controllers = controllers if controllers is not None else default_controllers(self._relay_factory())
+        self._commanded: Dict[str, bool] = {}
+        self._failsafes = {}
+        self.ticks = 0
+        self.overruns = 0
+        self.interval: Optional[float] = None
+        self.timings = deque(maxlen=TIMING_HISTORY)
+
+    def run(self) -> Dict[str, object]:
+        """
+        Run one tick.
+
+        Returns:
+            dict: Timing breakdown in ms, plus the number of changes and board writes
+        """
+        started = time.perf_counter()
+        timing: Dict[str, object] = {"tick": self.ticks + 1}
+
+        mark = time.perf_counter()
+        sensors = SensorSnapshot.from_saved_data(self._sensor_source())
+        timing["sensors_ms"] = _ms_since(mark)
+
+        mark = time.perf_counter()
+        config = config_snapshot.get_config_snapshot(self._config_path)
+        timing["config_ms"] = _ms_since(mark)
+        timing["config_version"] = config.version
+
+        now = self._clock()
+        desired: Dict[str, bool] = {}
+        decide_ms = {}
+        for controller in self._controllers:
+            mark = time.perf_counter()
+            try:
+                decision = controller.decide(sensors, config, now)
+            except Exception as e:
+                logger.error(f"[TICK] {controller.name} decision failed: {e}")
+                decision = {}
+            decide_ms[controller.name] = _ms_since(mark)
+            for device in controller.devices:
+                if device in decision:
+                    desired[device] = bool(decision[device])
+                else:
+                    # Not managed this tick; write the next decision whatever we sent before
+                    self._commanded.pop(device, None)
+        timing["decide_ms"] = decide_ms
+
+        changes = {device: state for device, state in desired.items() if self._commanded.get(device) != state}
+        mark = time.perf_counter()
+        timing["writes"] = self._write(changes) if changes else 0
+        timing["relay_ms"] = _ms_since(mark)
+        timing["changes"] = len(changes)
+        if changes:
+            self._arm_failsafes(changes, now)
+
+        timing["total_ms"] = _ms_since(started)
+        self.ticks += 1
+        self.timings.append(timing)
+        if self.interval and timing["total_ms"] > self.interval * 1000:
+            self.overruns += 1
+            logger.warning(f"[TICK] Tick {self.ticks} took {timing['total_ms']:.1f} ms "
+                           f"(interval {self.interval:g}s): {timing}")
+        elif changes:
+            logger.info(f"[TICK] {changes} in {timing['writes']} write(s): {timing}")
+        else:
+            logger.debug(f"[TICK] {timing}")
+        return timing
+
+    def stats(self) -> Dict[str, object]:
+        """Tick count, overruns and mean/max of each timing over the recent ticks."""
+        result: Dict[str, object] = {"ticks": self.ticks, "overruns": self.overruns}
+        if not self.timings:
+            return result
+        for key in ("sensors_ms", "config_ms", "relay_ms", "total_ms"):
+            values = [timing[key] for timing in self.timings]
+            result[key] = {"mean": round(sum(values) / len(values), 3), "max": round(max(values), 3)}
+        result["decide_ms"] = {
+            name: round(max(timing["decide_ms"].get(name, 0.0) for timing in self.timings), 3)
+            for name in self.timings[-1]["decide_ms"]
+        }
+        result["last"] = self.timings[-1]
+        return result
+
+    def shutdown(self):
+        """Switch off every device the tick turned on."""
+        on = {device: False for device, state in self._commanded.items() if state}
+        if on:
+            self._write(on)
+        for handle in self._failsafes.values():
+            handle.cancel()
+        self._failsafes.clear()
+
+    # Relay writes
+
+    def _write(self, changes: Dict[str, bool]) -> int:
+        """Write changes with the fewest frames per board; returns the number of frames sent."""
+        relay = self._relay_factory()
+        if not relay:
+            logger.warning(f"[TICK] No relay available for {changes}")
+            return 0
+        writes = len(relay.apply_states(changes))
+        self._commanded.update(changes)
+        return writes
+
+    def _arm_failsafes(self, changes, now):
+        """Back each timed run with a deadline in case ticks stop arriving."""
+        for controller in self._controllers:
+            switched = [device for device in controller.devices if device in changes]
+            if not switched:
+                continue
+            previous = self._failsafes.pop(controller.name, None)
+            if previous is not None:
+                previous.cancel()
+            if controller.run_until is None or not any(changes[device] for device in switched):
+                continue
+            devices = [device for device in controller.devices if self._commanded.get(device)]
+            self._failsafes[controller.name] = get_deadline_service().call_later(
+                controller.run_until - now + FAILSAFE_GRACE,
+                lambda devices=devices, name=controller.name: self._failsafe_off(name, devices),
+                name=f"tick_{controller.name}_failsafe")
+
+    def _failsafe_off(self, name, devices):
+        logger.warning(f"[FAILSAFE] Control tick did not end the {name} run - switching off {devices}")
+        relay = self._relay_factory()
+        if relay:
+            with safety_priority():
+                for device in devices:
+                    relay.set_relay(device, False)
+                    self._commanded[device] = False
+
+
+def _ms_since(mark: float) -> float:
+    return round((time.perf_counter() - mark) * 1000, 3)
+
+
+def _default_relay():
+    from src.sensors.Relay import Relay
+    return Relay()
@@ -0,0 +1,400 @@
+"""
+Unix-domain-socket RPC channel from the API process (server.py) to the controller (main.py).
+
+The two processes used to coordinate through files and duplicate state:
+- actions went to config/action.json and waited for the watcher or the
+  next 10 s loop in main.py;
+- the Edge IP went to data/edge_ip.txt;
+- main.py imported server to read the heartbeat mode, which only gave it
+  its own never-updated copy of server.py's module state;
+- both processes opened their own LuminaModbusClient connection.
+
+The controller now owns a ControllerIPCServer on SOCKET_PATH and registers
+handlers for commands, mode/heartbeat and Modbus. server.py calls them with
+ControllerClient.call(), which reuses connected sockets, so a round trip
+costs well under a millisecond. Messages are one JSON object per line:
+    {"id": 1, "method": "mode.heartbeat", "params": {"edge_ip": "10.0.0.2"}}
+    {"id": 1, "result": {...}}  or  {"id": 1, "error": "...", "error_type": "ValueError"}
+
+ControllerModbusProxy stands in for LuminaModbusClient in the API process
+(see globals.modbus_client): send_command() forwards each frame to the
+controller's client and stores/emits the response exactly like the real
+client, so Relay, scans and calibration reads work unchanged.
+
+When the controller is not reachable, calls raise ControllerUnavailable and
+server.py falls back to the old file-based paths. Commands fall back only if
+the request never left the API process (ControllerUnavailable.sent is False)
+and server.py has a Modbus connection of its own.
+
+Usage:
+    server = ControllerIPCServer()
+    server.register("ping", lambda: {"pid": os.getpid()})
+    server.start()
+
+    get_controller_client().call("ping")
+"""
+
+import itertools
+import os
+import socket
+import socketserver
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import orjson
+
+try:
+    from src.lumina_logger import GlobalLogger
+    logger = GlobalLogger("RippleControllerIPC", log_prefix="ripple_").logger
+except Exception:
+    import logging
+    logger = logging.getLogger(__name__)
+
+try:
+    from lumina_modbus_client import LuminaModbusClient, PendingCommand, PRIORITY_EMERGENCY
+    from lumina_modbus_event_emitter import ModbusEventEmitter, ModbusResponse
+except ImportError:
+    from src.lumina_modbus_client import LuminaModbusClient, PendingCommand, PRIORITY_EMERGENCY
+    from src.lumina_modbus_event_emitter import ModbusEventEmitter, ModbusResponse
+
+# Overridable so tests and a second install on the same Pi do not collide
+SOCKET_PATH = os.environ.get(
+    "RIPPLE_CONTROLLER_SOCKET",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "controller.sock"))
+CALL_TIMEOUT = 2.0        # Seconds to wait for a reply unless the call says otherwise
+MODBUS_MARGIN = 1.5       # Extra seconds over a Modbus command's own timeout
+MODBUS_POLL = 0.002       # Controller-side poll for a Modbus response
+PROXY_WORKERS = 4         # API-process threads waiting on forwarded Modbus commands
+
+
+class ControllerUnavailable(ConnectionError):
+    """
+    The controller socket is missing, refused the connection, closed it or timed out.
+
+    Attributes:
+        sent (bool): True if the request was written to the controller and may
+            have run there; False if it never left this process
+    """
+
+    def __init__(self, message: str, sent: bool = False):
+        super().__init__(message)
+        self.sent = sent
+
+
+class ControllerCallError(RuntimeError):
+    """The controller ran the call and its handler raised."""
+
+    def __init__(self, method: str, message: str, error_type: Optional[str] = None):
+        super().__init__(f"{method}: {message}")
+        self.method = method
+        self.error_type = error_type
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """One client connection; serves requests until the client disconnects."""
+
+    def setup(self):
+        super().setup()
+        with self.server.connections_lock:
+            self.server.connections.add(self.connection)
+
+    def finish(self):
+        with self.server.connections_lock:
+            self.server.connections.discard(self.connection)
+        super().finish()
+
+    def handle(self):
+        handlers = self.server.handlers
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            request_id, method = None, None
+            try:
+                request = orjson.loads(line)
+                request_id, method = request.get("id"), request.get("method")
+                handler = handlers.get(method)
+                if handler is None:
+                    raise LookupError(f"Unknown method: {method}")
+                reply = {"id": request_id, "result": handler(**(request.get("params") or {}))}
+            except Exception as e:
+                logger.warning(f"[IPC] {method or 'request'} failed: {e}")
+                reply = {"id": request_id, "error": str(e), "error_type": type(e).__name__}
+            try:
+                self.wfile.write(orjson.dumps(reply, default=str) + b"\n")
+            except OSError:
+                return  # client went away
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, handler_class, handlers):
+        self.handlers = handlers
+        self.connections = set()
+        self.connections_lock = threading.Lock()
+        super().__init__(path, handler_class)
+
+    def close_connections(self):
+        with self.connections_lock:
+            connections = list(self.connections)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class ControllerIPCServer:
+    """
+    Controller-side RPC endpoint.
+
+    Args:
+        path (str): Socket path (default SOCKET_PATH)
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or SOCKET_PATH
+        self.handlers: Dict[str, Callable[..., Any]] = {}
+        self._server: Optional[_UnixServer] = None
+
+    def register(self, method: str, handler: Callable[..., Any]):
+        """Serve method by calling handler(**params); its return value must be JSON-serialisable."""
+        self.handlers[method] = handler
+
+    def start(self):
+        """Bind the socket (replacing a stale one) and serve on a daemon thread."""
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._server = _UnixServer(self.path, _RequestHandler, self.handlers)
+        os.chmod(self.path, 0o660)
+        threading.Thread(target=self._server.serve_forever, name="controller_ipc", daemon=True).start()
+        logger.info(f"[IPC] Controller channel listening on {self.path} ({', '.join(sorted(self.handlers))})")
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server.close_connections()
+        self._server = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class _Connection:
+    def __init__(self, path: str):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.connect(path)
+        except OSError:
+            self.sock.close()
+            raise
+        self.rfile = self.sock.makefile("rb")
+
+    def close(self):
+        try:
+            self.rfile.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class ControllerClient:
+    """
+    API-side RPC caller. Thread-safe; each concurrent call uses its own socket.
+
+    Args:
+        path (str): Socket path (default SOCKET_PATH)
+        timeout (float): Default seconds to wait for a reply
+    """
+
+    def __init__(self, path: Optional[str] = None, timeout: float = CALL_TIMEOUT):
+        self.path = path or SOCKET_PATH
+        self.timeout = timeout
+        self._idle: List[_Connection] = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def call(self, method: str, reply_timeout: Optional[float] = None, **params) -> Any:
+        """
+        Run method on the controller and return its result.
+
+        Raises:
+            ControllerUnavailable: If the controller could not be reached or did not answer in time
+            ControllerCallError: If the controller's handler raised
+        """
+        request_id = next(self._ids)
+        payload = orjson.dumps({"id": request_id, "method": method, "params": params}) + b"\n"
+        # A pooled socket may belong to a controller that has since restarted;
+        # its request never ran, so it is retried once on a fresh connection.
+        for attempt in (0, 1):
+            connection, pooled = self._checkout()
+            sent = False
+            try:
+                connection.sock.settimeout(reply_timeout or self.timeout)
+                connection.sock.sendall(payload)
+                sent = True
+                line = connection.rfile.readline()
+                if not line:
+                    raise ConnectionResetError("controller closed the connection")
+                reply = orjson.loads(line)
+            except socket.timeout as e:
+                connection.close()
+                raise ControllerUnavailable(f"{method}: no reply from controller within "
+                                            f"{reply_timeout or self.timeout}s", sent=sent) from e
+            except (OSError, orjson.JSONDecodeError) as e:
+                connection.close()
+                if pooled and attempt == 0:
+                    continue
+                raise ControllerUnavailable(f"{method}: {e}", sent=sent) from e
+            self._checkin(connection)
+            if "error" in reply:
+                raise ControllerCallError(method, reply["error"], reply.get("error_type"))
+            return reply.get("result")
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+    def _checkout(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        try:
+            return _Connection(self.path), False
+        except OSError as e:
+            raise ControllerUnavailable(f"controller not reachable at {self.path}: {e}") from e
+
+    def _checkin(self, connection: _Connection):
+        with self._lock:
+            self._idle.append(connection)
+
+
+_client: Optional[ControllerClient] = None
+_client_lock = threading.Lock()
+
+
+def get_controller_client() -> ControllerClient:
+    """Process-wide client for the controller channel."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ControllerClient()
+        return _client
+
+
+# Modbus proxying
+
+def modbus_command_handler(modbus_client) -> Callable[..., Dict[str, Any]]:
+    """
+    Controller-side handler for "modbus.command": send one frame on the
+    controller's own client and wait for its response.
+    """
+    def modbus_command(device_type: str, port: str, command: str, baudrate: int = 9600,
+                       response_length: int = 0, timeout: float = 5.0, priority: Optional[int] = None):
+        kwargs = {"baudrate": baudrate, "response_length": response_length, "timeout": timeout}
+        if priority is not None:
+            kwargs["priority"] = priority
+        command_id = modbus_client.send_command(device_type=device_type, port=port,
+                                                command=bytes.fromhex(command), **kwargs)
+        deadline = time.monotonic() + timeout + 1.0
+        while command_id in modbus_client.pending_commands and time.monotonic() < deadline:
+            time.sleep(MODBUS_POLL)
+        response = modbus_client.command_responses.pop(command_id, None)
+        if response is None:
+            return {"status": "timeout", "data": None, "timestamp": time.time()}
+        return {
+            "status": response.status,
+            "data": response.data.hex() if response.data else None,
+            "timestamp": response.timestamp,
+        }
+    return modbus_command
+
+
+class ControllerModbusProxy:
+    """
+    LuminaModbusClient stand-in for the API process.
+
+    Every command goes through the controller, which owns the only
+    connection to lumina-modbus-server. Responses land in
+    command_responses and on event_emitter like the real client's, and the
+    PyModbus-style helpers are shared with LuminaModbusClient.
+
+    Args:
+        client (ControllerClient): Channel to the controller (default: process-wide client)
+        workers (int): Threads waiting on forwarded commands
+    """
+
+    def __init__(self, client: Optional[ControllerClient] = None, workers: int = PROXY_WORKERS):
+        self._client = client
+        self.event_emitter = ModbusEventEmitter()
+        self.pending_commands: Dict[str, PendingCommand] = {}
+        self.command_responses: Dict[str, ModbusResponse] = {}
+        self.is_connected = True
+        self._ids = itertools.count(1)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ripple_modbus_proxy")
+
+    def connect(self, host=None, port=None) -> bool:
+        """Nothing to open: the controller holds the bus connection."""
+        return True
+
+    def stop(self):
+        self._executor.shutdown(wait=False)
+
+    def send_command(self, device_type: str, port: str, command: bytes, **kwargs) -> str:
+        """Forward a command to the controller; returns its command ID at once."""
+        command = bytes(command)
+        command_id = (f"{port.split('/')[-1]}_{device_type}_{command.hex()[:12]}_"
+                      f"{time.strftime('%Y%m%d%H%M%S')}_p{next(self._ids)}")
+        timeout = kwargs.get('timeout', 5.0)
+        self.pending_commands[command_id] = PendingCommand(
+            id=command_id, device_type=device_type, timestamp=time.time(),
+            response_length=kwargs.get('response_length', 0), timeout=timeout)
+        args = (command_id, device_type, port, command, kwargs)
+        if kwargs.get('priority') == PRIORITY_EMERGENCY:
+            # Never queue an emergency command behind slow reads in the pool
+            threading.Thread(target=self._forward, args=args, daemon=True).start()
+        else:
+            self._executor.submit(self._forward, *args)
+        return command_id
+
+    def _forward(self, command_id: str, device_type: str, port: str, command: bytes, kwargs: Dict[str, Any]):
+        timeout = kwargs.get('timeout', 5.0)
+        try:
+            client = self._client or get_controller_client()
+            reply = client.call("modbus.command", reply_timeout=timeout + MODBUS_MARGIN,
+                                device_type=device_type, port=port, command=command.hex(),
+                                baudrate=kwargs.get('baudrate', 9600),
+                                response_length=kwargs.get('response_length', 0),
+                                timeout=timeout, priority=kwargs.get('priority'))
+            self.is_connected = True
+            response = ModbusResponse(command_id=command_id,
+                                      data=bytes.fromhex(reply["data"]) if reply.get("data") else None,
+                                      device_type=device_type, status=reply.get("status", "error"),
+                                      timestamp=reply.get("timestamp"))
+        except ControllerUnavailable as e:
+            logger.warning(f"[IPC] Modbus command {command_id} not sent: {e}")
+            self.is_connected = False
+            response = ModbusResponse(command_id=command_id, data=None, device_type=device_type,
+                                      status="connection_lost")
+        except Exception as e:
+            logger.error(f"[IPC] Modbus command {command_id} failed: {e}")
+            response = ModbusResponse(command_id=command_id, data=None, device_type=device_type, status="error")
+        self.command_responses[command_id] = response
+        self.pending_commands.pop(command_id, None)
+        self.event_emitter.emit_response(response)
+
+    # Same synchronous helpers as the real client, built on send_command()
+    write_register = LuminaModbusClient.write_register
+    write_registers = LuminaModbusClient.write_registers
+    read_coils = LuminaModbusClient.read_coils
+    read_holding_registers = LuminaModbusClient.read_holding_registers
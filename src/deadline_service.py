@@ -0,0 +1,251 @@
+"""
+Monotonic deadline service for pump stop timers.
+
+The simplified controllers used to back up every APScheduler stop with a
+non-daemon thread that slept for the whole pump duration. Each cycle left
+one more idle thread behind, a sleeping thread could not be cancelled when
+the primary stop fired first, and pending sleeps held up process exit.
+
+DeadlineService keeps all timers in one heap ordered by time.monotonic()
+deadline, so wall-clock jumps (NTP sync after boot) do not shift them. One
+timer thread waits for the earliest deadline and hands due callbacks to one
+worker thread, so a slow relay write never delays the next deadline check.
+Both threads are daemons and start on first use.
+
+call_later() returns a DeadlineHandle that can be cancelled until the
+callback starts. Every fired timer records its jitter (actual minus
+scheduled firing time), per handle and in aggregate for stats().
+
+Usage:
+    handle = get_deadline_service().call_later(30, stop_pumps, name="nutrient_failsafe")
+    handle.cancel()   # primary stop fired first
+"""
+
+import heapq
+import itertools
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+try:
+    from src.lumina_logger import GlobalLogger
+    logger = GlobalLogger("RippleDeadlines", log_prefix="ripple_").logger
+except Exception:
+    import logging
+    logger = logging.getLogger(__name__)
+
+
+class DeadlineHandle:
+    """
+    One scheduled callback.
+
+    Attributes:
+        name (str): Label for logs and stats
+        due (float): Deadline on the service clock
+        jitter (float): Seconds between due and the callback starting, None until fired
+    """
+
+    __slots__ = ("name", "due", "callback", "jitter", "_cancelled", "_fired")
+
+    def __init__(self, name: str, due: float, callback: Callable[[], None]):
+        self.name = name
+        self.due = due
+        self.callback = callback
+        self.jitter: Optional[float] = None
+        self._cancelled = False
+        self._fired = False
+
+    def cancel(self) -> bool:
+        """Cancel the callback; False if it already started or was cancelled."""
+        if self._cancelled or self._fired:
+            return False
+        self._cancelled = True
+        return True
+
+    @property
+    def active(self) -> bool:
+        """True while the callback is still pending."""
+        return not (self._cancelled or self._fired)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    @property
+    def fired(self) -> bool:
+        return self._fired
+
+    def __repr__(self):
+        state = "cancelled" if self._cancelled else "fired" if self._fired else "pending"
+        return f"DeadlineHandle({self.name!r}, due={self.due:.3f}, {state})"
+
+
+class DeadlineService:
+    """
+    Heap of monotonic deadlines served by a fixed pair of threads.
+
+    Args:
+        clock (callable): Monotonic clock, injectable for tests
+        start_threads (bool): False to drive the service with run_due() only
+
+    Note:
+        - Callbacks run one at a time on the worker thread, in deadline order
+        - A callback that raises is logged; later deadlines are unaffected
+        - Cancelled handles are dropped lazily when they reach the top of the heap
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, start_threads: bool = True):
+        self._clock = clock
+        self._start_threads = start_threads
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._condition = threading.Condition()
+        self._ready: "queue.Queue[Optional[DeadlineHandle]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._stopped = False
+        self.counts = {"scheduled": 0, "fired": 0, "cancelled": 0, "errors": 0}
+        self._jitter_total = 0.0
+        self._jitter_max = 0.0
+        self._jitter_last = 0.0
+
+    def call_later(self, delay: float, callback: Callable[[], None], name: str = "") -> DeadlineHandle:
+        """
+        Run callback after delay seconds.
+
+        Args:
+            delay (float): Seconds from now; negative values fire immediately
+            callback (callable): Called with no arguments on the worker thread
+            name (str): Label for logs and stats
+
+        Returns:
+            DeadlineHandle: Handle to cancel the callback
+        """
+        handle = DeadlineHandle(name or getattr(callback, "__name__", "deadline"),
+                                self._clock() + max(0.0, delay), callback)
+        with self._condition:
+            if self._stopped:
+                raise RuntimeError("DeadlineService is shut down")
+            heapq.heappush(self._heap, (handle.due, next(self._seq), handle))
+            self.counts["scheduled"] += 1
+            self._ensure_threads()
+            self._condition.notify()
+        return handle
+
+    def pending(self) -> int:
+        """Number of callbacks still waiting for their deadline."""
+        with self._condition:
+            return sum(1 for _, _, handle in self._heap if handle.active)
+
+    def run_due(self) -> List[str]:
+        """
+        Fire every due callback on the calling thread (for start_threads=False).
+
+        Returns:
+            list: Names of the callbacks that ran
+        """
+        ran = []
+        for handle in self._pop_due():
+            if self._run(handle):
+                ran.append(handle.name)
+        return ran
+
+    def stats(self) -> Dict[str, float]:
+        """Counters plus last, mean and max firing jitter in milliseconds."""
+        with self._condition:
+            fired = self.counts["fired"]
+            return dict(
+                self.counts,
+                pending=sum(1 for _, _, handle in self._heap if handle.active),
+                threads=sum(1 for thread in self._threads if thread.is_alive()),
+                last_jitter_ms=round(self._jitter_last * 1000, 2),
+                mean_jitter_ms=round(self._jitter_total / fired * 1000, 2) if fired else 0.0,
+                max_jitter_ms=round(self._jitter_max * 1000, 2),
+            )
+
+    def shutdown(self):
+        """Cancel pending callbacks and stop the threads (does not wait for a running callback)."""
+        with self._condition:
+            self._stopped = True
+            for _, _, handle in self._heap:
+                if handle.cancel():
+                    self.counts["cancelled"] += 1
+            self._heap.clear()
+            self._condition.notify_all()
+        self._ready.put(None)
+
+    # Internals
+
+    def _ensure_threads(self):
+        # Called with self._condition held
+        if not self._start_threads or self._threads:
+            return
+        self._threads = [
+            threading.Thread(target=self._timer_loop, name="DeadlineTimer", daemon=True),
+            threading.Thread(target=self._worker_loop, name="DeadlineWorker", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _pop_due(self) -> List[DeadlineHandle]:
+        now = self._clock()
+        due = []
+        with self._condition:
+            while self._heap and (self._heap[0][2].cancelled or self._heap[0][0] <= now):
+                _, _, handle = heapq.heappop(self._heap)
+                if handle.cancelled:
+                    self.counts["cancelled"] += 1
+                    continue
+                due.append(handle)
+        return due
+
+    def _timer_loop(self):
+        while True:
+            with self._condition:
+                if self._stopped:
+                    return
+                timeout = None
+                if self._heap:
+                    timeout = max(0.0, self._heap[0][0] - self._clock())
+                if timeout is None or timeout > 0:
+                    self._condition.wait(timeout)
+            for handle in self._pop_due():
+                self._ready.put(handle)
+
+    def _worker_loop(self):
+        while True:
+            handle = self._ready.get()
+            if handle is None:
+                return
+            self._run(handle)
+
+    def _run(self, handle: DeadlineHandle) -> bool:
+        with self._condition:
+            if handle.cancelled:
+                self.counts["cancelled"] += 1
+                return False
+            handle._fired = True
+            handle.jitter = self._clock() - handle.due
+            self.counts["fired"] += 1
+            self._jitter_last = handle.jitter
+            self._jitter_total += self._jitter_last
+            self._jitter_max = max(self._jitter_max, self._jitter_last)
+        try:
+            handle.callback()
+        except Exception as e:
+            self.counts["errors"] += 1
+            logger.error(f"[DEADLINE] {handle.name} failed: {e}")
+        return True
+
+
+_service: Optional[DeadlineService] = None
+_service_lock = threading.Lock()
+
+
+def get_deadline_service() -> DeadlineService:
+    """Process-wide deadline service shared by all controllers."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = DeadlineService()
+        return _service
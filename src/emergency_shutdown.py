@@ -11,39 +11,61 @@ try:
 except Exception:
     audit = None
 
+try:
+    from src.relay_coalescer import safety_priority
+except ImportError:
+    from relay_coalescer import safety_priority
+
 
 def trigger_emergency_shutdown(reason: str, flag_path: str, relay=None):
     """
     Trigger emergency shutdown.
 
     Actions:
-    1. Stop all dosing pumps immediately
+    1. Switch every relay output off through the all-off fast path
+       (Relay.emergency_all_off), falling back to stopping the dosing
+       pumps one by one if it is unavailable or cannot verify the result
     2. Create persistent emergency flag
-    3. Log reason
+    3. Log reason and the all-off latency
     4. Block automatic restarts
 
     Args:
         reason: Why emergency shutdown was triggered
         flag_path: Path to emergency flag file
         relay: Relay controller instance (optional for testing)
+
+    Returns:
+        dict: The all-off latency report, None if no relay was given or the
+        fast path was not available
     """
     logger.error(f"EMERGENCY SHUTDOWN TRIGGERED: {reason}")
 
-    # Stop all dosing pumps
+    report = None
     if relay is not None:
-        dosing_pumps = [
-            "NutrientPumpA",
-            "NutrientPumpB",
-            "NutrientPumpC",
-            "pHPlusPump",
-            "pHMinusPump"
-        ]
-
-        for pump in dosing_pumps:
+        all_off = getattr(relay, "emergency_all_off", None)
+        if callable(all_off):
             try:
-                relay.set_relay(pump, False)
+                result = all_off()
+                report = result if isinstance(result, dict) else None
             except Exception as e:
-                logger.error(f"Failed to stop {pump}: {e}")
+                logger.error(f"Emergency all-off failed: {e}")
+
+        if report is None or not report.get("ok"):
+            # Stop all dosing pumps
+            dosing_pumps = [
+                "NutrientPumpA",
+                "NutrientPumpB",
+                "NutrientPumpC",
+                "pHPlusPump",
+                "pHMinusPump"
+            ]
+
+            with safety_priority():
+                for pump in dosing_pumps:
+                    try:
+                        relay.set_relay(pump, False)
+                    except Exception as e:
+                        logger.error(f"Failed to stop {pump}: {e}")
 
     # Create persistent flag file
     flag_file = Path(flag_path)
@@ -51,13 +73,20 @@ def trigger_emergency_shutdown(reason: str, flag_path: str, relay=None):
     flag_file.write_text(f"Emergency shutdown: {reason}\n")
 
     logger.critical(f"Emergency flag created at {flag_path}. Manual intervention required.")
+    if report is not None:
+        logger.critical(f"Emergency all-off: {report.get('all_off_ms')} ms, "
+                        f"verified={report.get('ok')}")
 
     if audit:
         audit.emit("alarm", "emergency_shutdown",
                    source="autonomous", status="success",
-                   value={"reason": reason, "flag_path": flag_path},
+                   value={"reason": reason, "flag_path": flag_path,
+                          "all_off_ms": report.get("all_off_ms") if report else None,
+                          "verified": report.get("ok") if report else None},
                    details=f"EMERGENCY SHUTDOWN: {reason}")
 
+    return report
+
 
 def is_emergency_active(flag_path: str) -> bool:
     """
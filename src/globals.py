@@ -35,7 +35,7 @@ from lumina_modbus_client import LuminaModbusClient
 SENSOR_DATA_FETCH_INTERVAL = 30
 SENSOR_DATA_UPLOAD_INTERVAL = 60
 
-REALTIME_MODE = False
+REALTIME_MODE = False  # True while poll_scheduler runs any sensor at a boosted (realtime) rate
 REALTIME_MODE_SENSOR_DATA_FETCH_INTERVAL = 10
 REALTIME_MODE_SENSOR_DATA_UPLOAD_INTERVAL = 10
 
@@ -75,6 +75,12 @@ else:
     except (configparser.MissingSectionHeaderError, configparser.ParsingError) as e:
         logger.error(f"Device configuration file is corrupt: {e}. Using defaults.")
 
+# Typed, versioned view of device.conf for the device getters below
+try:
+    from src.config_snapshot import get_config_snapshot
+except ImportError:
+    from config_snapshot import get_config_snapshot
+
 
 # Get availabilities from device config
 def get_availability(key, default=0):
@@ -213,38 +219,27 @@ def get_device_address(section, key, default_hex='0x00'):
         - Used for Modbus RTU communication setup
         - Supports both '0x' prefixed and plain hex strings
     """
+    value = get_config_snapshot(DEVICE_CONF_PATH).field(section, key, 4)  # Address is the 5th field
     try:
-        if section in DEVICE_CONFIG_FILE and key in DEVICE_CONFIG_FILE[section]:
-            value = DEVICE_CONFIG_FILE[section][key].split(',')[4].strip()  # Get address from 5th field
-            return int(value, 16)
-        return int(default_hex, 16)
+        return int(value, 16) if value is not None else int(default_hex, 16)
     except Exception:
         return int(default_hex, 16)
 
 def get_device_port(section, key, default_port='/dev/ttyAMA2'):
     """Get device port from appropriate section"""
-    try:
-        if section in DEVICE_CONFIG_FILE and key in DEVICE_CONFIG_FILE[section]:
-            return DEVICE_CONFIG_FILE[section][key].split(',')[3].strip()  # Get port from 4th field
-        return default_port
-    except Exception:
-        return default_port
+    value = get_config_snapshot(DEVICE_CONF_PATH).field(section, key, 3)  # Port is the 4th field
+    return value if value is not None else default_port
 
 def get_device_position(section, key, default_position=''):
     """Get device position from appropriate section"""
-    try:
-        if section in DEVICE_CONFIG_FILE and key in DEVICE_CONFIG_FILE[section]:
-            return DEVICE_CONFIG_FILE[section][key].split(',')[1].strip()  # Get position from 2nd field
-        return default_position
-    except Exception:
-        return default_position
+    value = get_config_snapshot(DEVICE_CONF_PATH).field(section, key, 1)  # Position is the 2nd field
+    return value if value is not None else default_position
 
 def get_device_baudrate(section, key, default_baudrate=9600):
     """Get device baudrate from appropriate section"""
+    value = get_config_snapshot(DEVICE_CONF_PATH).field(section, key, 5)  # Baudrate is the 6th field
     try:
-        if section in DEVICE_CONFIG_FILE and key in DEVICE_CONFIG_FILE[section]:
-            return int(DEVICE_CONFIG_FILE[section][key].split(',')[5].strip())  # Get baudrate from 6th field
-        return default_baudrate
+        return int(value) if value is not None else default_baudrate
     except Exception:
         return default_baudrate
 
@@ -264,17 +259,36 @@ def get_relay_channels(section, key, default_channels=16):
         int: Number of relay channels (4, 8, or 16)
     """
     try:
-        if section in DEVICE_CONFIG_FILE and key in DEVICE_CONFIG_FILE[section]:
-            parts = DEVICE_CONFIG_FILE[section][key].split(',')
-            if len(parts) >= 7:
-                channels = int(parts[6].strip())
-                if channels in [4, 8, 16]:
-                    return channels
-                logger.warning(f"Invalid channel count {channels} for {key}, using default {default_channels}")
+        value = get_config_snapshot(DEVICE_CONF_PATH).field(section, key, 6)  # Channels is the 7th field
+        if value is not None:
+            channels = int(value)
+            if channels in [4, 8, 16]:
+                return channels
+            logger.warning(f"Invalid channel count {channels} for {key}, using default {default_channels}")
         return default_channels
     except Exception:
         return default_channels
 
+def get_io_write_budget_mb():
+    """
+    Get the optional SD-card soft write budget in MB per hour.
+
+    Reads [SYSTEM] io_write_budget_mb_per_hour. Accepts a single value or a
+    "reference, operational" pair (operational value wins).
+
+    Returns:
+        float or None: Budget in MB/hour, or None when unset/disabled
+    """
+    try:
+        value = DEVICE_CONFIG_FILE.get("SYSTEM", "io_write_budget_mb_per_hour", fallback="")
+        parts = [p.strip() for p in value.split(',') if p.strip()]
+        if not parts:
+            return None
+        budget = float(parts[-1])
+        return budget if budget > 0 else None
+    except (ValueError, TypeError):
+        return None
+
 # Map system values to availabilities
 MOTOR_SET = get_availability_value("motor_set")
 HAS_LASER = get_availability("laser")
@@ -382,29 +396,52 @@ RELAY_ADDRESS = get_device_address('RELAY_CONTROL', 'RelayOne', '0x10')
 
 #############################################
 #############################################
-# APScheduler with SQLite persistence
-from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+# APScheduler: hybrid job stores
+#
+# The nutrient, pH, sprinkler and mixing chains add, replace and remove a
+# 'date' job on every start and stop. Those jobs live in the in-memory
+# 'default' store; main.py rebuilds the chains from device.conf at startup
+# (pumps off, then initialize_*_schedule), so persisting them only cost
+# SQLite writes and fsyncs on the SD card. Long-lived schedules (cron jobs
+# such as the weekly reboot) go to the SQLite 'durable' store by passing
+# jobstore=DURABLE_JOBSTORE. SQLAlchemy is imported only when the scheduler
+# starts, so processes that just import globals do not load it.
 from apscheduler.jobstores.memory import MemoryJobStore as APMemoryJobStore
 
 # Configure unified scheduler database path
 SCHEDULER_DB_PATH = os.path.join(BASE_DIR, "..", "data", "scheduler_jobs.sqlite")
+DURABLE_JOBSTORE = 'durable'
 scheduler = None
 _scheduler_running = False  # Add this flag to track scheduler state
 
 
+def _start_with_durable_store(durable_store):
+    global scheduler, _scheduler_running
+    scheduler = BackgroundScheduler(jobstores={'default': APMemoryJobStore(), DURABLE_JOBSTORE: durable_store})
+    # Paused until transient jobs left by older versions are dropped
+    scheduler.start(paused=True)
+    _scheduler_running = True
+
+
+def _drop_transient_durable_jobs():
+    """Remove chain jobs persisted before the stores were split; they are rebuilt from config."""
+    from apscheduler.triggers.cron import CronTrigger
+    for job in scheduler.get_jobs(jobstore=DURABLE_JOBSTORE):
+        if not isinstance(job.trigger, CronTrigger):
+            scheduler.remove_job(job.id, jobstore=DURABLE_JOBSTORE)
+            logger.info(f"Dropped transient job {job.id} from durable store (rebuilt at startup)")
+
+
 def start_scheduler():
     global scheduler, _scheduler_running
     if not _scheduler_running:
-        jobstore = None
+        from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
         engine_options = {'connect_args': {'timeout': 10}}
 
         # Attempt 1: Try to open existing SQLite database
         try:
-            jobstore = SQLAlchemyJobStore(url=f'sqlite:///{SCHEDULER_DB_PATH}', engine_options=engine_options)
-            scheduler = BackgroundScheduler(jobstores={'default': jobstore})
-            scheduler.start()
-            _scheduler_running = True
-            logger.info(f"Scheduler started with unified database: {SCHEDULER_DB_PATH}")
+            _start_with_durable_store(SQLAlchemyJobStore(url=f'sqlite:///{SCHEDULER_DB_PATH}', engine_options=engine_options))
+            logger.info(f"Scheduler started; durable jobs in {SCHEDULER_DB_PATH}, chain jobs in memory")
         except Exception as e:
             logger.warning(f"Scheduler failed to start with existing database: {e}")
             # Attempt 2: Delete corrupt DB and retry with fresh database
@@ -412,23 +449,23 @@ def start_scheduler():
                 if os.path.exists(SCHEDULER_DB_PATH):
                     os.remove(SCHEDULER_DB_PATH)
                     logger.info(f"Deleted corrupt scheduler database: {SCHEDULER_DB_PATH}")
-                jobstore = SQLAlchemyJobStore(url=f'sqlite:///{SCHEDULER_DB_PATH}', engine_options=engine_options)
-                scheduler = BackgroundScheduler(jobstores={'default': jobstore})
-                scheduler.start()
-                _scheduler_running = True
+                _start_with_durable_store(SQLAlchemyJobStore(url=f'sqlite:///{SCHEDULER_DB_PATH}', engine_options=engine_options))
                 logger.info(f"Scheduler started with fresh database: {SCHEDULER_DB_PATH}")
             except Exception as e2:
                 # Attempt 3: Fall back to in-memory job store
                 logger.warning(f"Scheduler failed with fresh database: {e2}. Falling back to MemoryJobStore.")
                 try:
-                    jobstore = APMemoryJobStore()
-                    scheduler = BackgroundScheduler(jobstores={'default': jobstore})
-                    scheduler.start()
-                    _scheduler_running = True
-                    logger.warning("Scheduler started with in-memory job store (jobs will not persist across restarts)")
+                    _start_with_durable_store(APMemoryJobStore())
+                    logger.warning("Scheduler started with in-memory job stores (durable jobs will not persist across restarts)")
                 except Exception as e3:
                     logger.error(f"Scheduler failed to start entirely: {e3}")
 
+        if _scheduler_running:
+            try:
+                _drop_transient_durable_jobs()
+            except Exception as e:
+                logger.error(f"Error cleaning durable job store: {e}")
+
         # Add weekly reboot job if enabled (with replace_existing to avoid conflicts)
         if _scheduler_running and WEEKLY_REBOOT_ENABLED:
             # Use string reference instead of direct function reference to avoid import issues
@@ -439,10 +476,14 @@ def start_scheduler():
                 hour=WEEKLY_REBOOT_HOUR,
                 minute=WEEKLY_REBOOT_MINUTE,
                 id='weekly_system_reboot',
+                jobstore=DURABLE_JOBSTORE,
                 replace_existing=True
             )
             logger.info(f"Scheduled weekly system reboot for Sunday at {WEEKLY_REBOOT_HOUR:02d}:{WEEKLY_REBOOT_MINUTE:02d}")
 
+        if _scheduler_running:
+            scheduler.resume()
+
 
 def shutdown_scheduler():
     global _scheduler_running
@@ -575,6 +616,11 @@ def should_task_be_executing(task_id):
 
 modbus_command_queue = queue.Queue()
 
-# TCP client connecting to lumina-modbus-server at 127.0.0.1:8888
-modbus_client = LuminaModbusClient()
-modbus_client.connect(host='127.0.0.1', port=8888)  # Connect to lumina-modbus-server TCP service
+if os.environ.get("RIPPLE_MODBUS_VIA_CONTROLLER") == "1":
+    # API process (server.py): every command goes through main.py's connection
+    from controller_ipc import ControllerModbusProxy
+    modbus_client = ControllerModbusProxy()
+else:
+    # TCP client connecting to lumina-modbus-server at 127.0.0.1:8888
+    modbus_client = LuminaModbusClient()
+    modbus_client.connect(host='127.0.0.1', port=8888)  # Connect to lumina-modbus-server TCP service
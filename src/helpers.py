@@ -4,14 +4,17 @@ import tzlocal
 from datetime import datetime, timedelta
 import os, sys
 import json
+import threading
 try:
     # Try importing when running from main directory
     import src.globals as globals
     from src.lumina_logger import GlobalLogger
+    from src import io_accounting
 except ImportError:
     # Import when running from src directory
     import globals
     from lumina_logger import GlobalLogger
+    import io_accounting
 
 logger = GlobalLogger("RippleHelpers", log_prefix="ripple_").logger
 
@@ -182,7 +185,7 @@ def is_within_time(dt, seconds):
 def scheduler_safe_now():
     return datetime.now() + timedelta(seconds=1)
 
-def save_sensor_data(subpath, data):
+def save_sensor_data(subpath, data, rollup=None):
     """
     Save sensor data to the designated sensor data file.
     
@@ -193,6 +196,8 @@ def save_sensor_data(subpath, data):
     Args:
         subpath (list): List of path components for nested data organization
         data (dict): Sensor data dictionary to save
+        rollup (dict, optional): Measurements payload to fold into the rollups
+            instead of data, e.g. only the points that changed
         
     Note:
         - Docstring created by Claude 3.5 Sonnet on 2024-09-22
@@ -200,8 +205,81 @@ def save_sensor_data(subpath, data):
         - Supports nested path structures for data organization
         - Handles file creation and JSON formatting automatically
         - Formats float values to 2 decimal places for consistency
+        - Numeric measurement fields are also folded into the minute/hour/day
+          rollups (see src/sensor_rollup.py)
     """
-    save_data(subpath, data, globals.SAVED_SENSOR_DATA_PATH)
+    global _sensor_data_cache
+    with _sensor_data_lock:
+        _sensor_data_cache = None
+        _sensor_data_cache = save_data(subpath, data, globals.SAVED_SENSOR_DATA_PATH)
+    _rollup_measurements(data if rollup is None else rollup)
+
+
+def save_readings(subpath, readings):
+    """
+    Save a sensor poll given as a ReadingSet (see src/reading.py).
+
+    Rollups are fed straight from the slotted readings; the legacy nested
+    dict is only built for the saved_sensor_data.json snapshot, and is cached
+    on the ReadingSet so the raw sensor log reuses the same object.
+
+    Args:
+        subpath (list): List of path components, e.g. ['data', 'water_metrics', 'ec']
+        readings (ReadingSet): Readings from one sensor poll
+    """
+    global _sensor_data_cache
+    with _sensor_data_lock:
+        # Drop the old copy first so two full trees are never alive at once
+        _sensor_data_cache = None
+        _sensor_data_cache = save_data(subpath, readings.to_legacy(), globals.SAVED_SENSOR_DATA_PATH)
+    try:
+        try:
+            from src.sensor_rollup import get_rollup_store
+        except ImportError:
+            from sensor_rollup import get_rollup_store
+        get_rollup_store().ingest_readings(readings)
+    except Exception as e:
+        logger.warning(f"Failed to update sensor rollups: {e}")
+
+
+_sensor_data_cache = None
+_sensor_data_lock = threading.Lock()
+
+
+def get_saved_sensor_data():
+    """
+    Return the in-memory copy of saved_sensor_data.json.
+
+    The copy is refreshed by every save_sensor_data() call in this process, so
+    readers such as the status report never have to re-read the file. The
+    file is read once only if nothing has been saved yet.
+
+    Returns:
+        dict: Merged sensor data (treat as read-only)
+    """
+    global _sensor_data_cache
+    with _sensor_data_lock:
+        if _sensor_data_cache is None:
+            try:
+                with open(globals.SAVED_SENSOR_DATA_PATH, "rb") as file:
+                    _sensor_data_cache = orjson.loads(file.read())
+            except (OSError, orjson.JSONDecodeError):
+                return {}
+        return _sensor_data_cache
+
+
+def _rollup_measurements(data):
+    """Feed measurement payloads into the rollup store; never raises."""
+    if not isinstance(data, dict) or "measurements" not in data:
+        return
+    try:
+        try:
+            from src.sensor_rollup import get_rollup_store
+        except ImportError:
+            from sensor_rollup import get_rollup_store
+        get_rollup_store().ingest_measurements(data)
+    except Exception as e:
+        logger.warning(f"Failed to update sensor rollups: {e}")
 
 
 def save_data(subpath, data, path):
@@ -220,6 +298,20 @@ def save_data(subpath, data, path):
         globals.logger.info(f"Corrupt binary data in {path}. Initializing a new one.")
         config = {}
 
+    # Format float values to 2 decimal places. Only the incoming data needs
+    # it: everything already in the file was formatted when it was written,
+    # so re-walking the whole tree on every save only churns allocations.
+    def format_floats(obj):
+        if isinstance(obj, float):
+            return round(obj, 2)
+        elif isinstance(obj, dict):
+            return {k: format_floats(v) for k, v in obj.items()}
+        elif isinstance(obj, list):
+            return [format_floats(item) for item in obj]
+        return obj
+
+    data = format_floats(data)
+
     if not subpath:
         config.update(data)
     else:
@@ -235,23 +327,14 @@ def save_data(subpath, data, path):
         for key, value in data.items():
             current_level[last_key][key] = value
 
-    # Format all float values to 2 decimal places
-    def format_floats(obj):
-        if isinstance(obj, float):
-            return round(obj, 2)
-        elif isinstance(obj, dict):
-            return {k: format_floats(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [format_floats(item) for item in obj]
-        return obj
-
-    config = format_floats(config)
-
     # Changed from orjson.dump to orjson.dumps and manual write
-    with open(path, "wb") as file:  # Note: changed to "wb" mode
+    subsystem = "sensor_data_json" if path == globals.SAVED_SENSOR_DATA_PATH else "json_data"
+    with io_accounting.open_accounted(subsystem, path, "wb") as file:  # Note: changed to "wb" mode
         json_bytes = orjson.dumps(config, option=orjson.OPT_INDENT_2)
         file.write(json_bytes)
 
+    return config
+
 
 def remove_file(file_path):
     try:
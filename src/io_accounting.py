@@ -0,0 +1,342 @@
+"""
+Per-subsystem disk write accounting for SD-card wear tracking.
+
+Every write path that touches the SD card (saved_sensor_data.json, the
+status file, sensor logs, runtime tracker, audit DB, action.json,
+device.conf, ...) reports bytes written, file opens and fsyncs under a
+subsystem name. Totals are kept per hour, logged when the hour rolls over,
+and published through GET /api/v1/io.
+
+main.py and server.py are separate processes, so each process snapshots its
+own counters to data/io_accounting.<process>.json and the report merges them.
+
+An optional soft budget (device.conf [SYSTEM] io_write_budget_mb_per_hour)
+makes low-priority writers hold back writes once the hourly budget is spent,
+so they write at most once per IO_BUDGET_DEFER_SECONDS. The status file is
+simply rewritten later; sensor log entries are buffered and appended with
+the next allowed write, and any that overflow the buffer are counted as
+dropped in the report.
+
+Usage:
+    from src import io_accounting
+
+    with io_accounting.open_accounted("device_conf", path, "w") as f:
+        config.write(f)
+
+    if not io_accounting.should_defer("status_file"):
+        ...
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Subsystems whose writes may be held back while over budget. Their data is
+# either rewritten on the next loop or buffered until the next allowed write.
+LOW_PRIORITY_SUBSYSTEMS = {"status_file", "sensor_log"}
+
+IO_HOURS_KEPT = 48              # Hourly buckets retained in memory and snapshots
+IO_SNAPSHOT_INTERVAL = 300      # Seconds between snapshot flushes
+IO_BUDGET_DEFER_SECONDS = 60    # Min spacing of low-priority writes when over budget
+
+_lock = threading.Lock()
+_hours: "OrderedDict[int, Dict[str, Dict[str, int]]]" = OrderedDict()
+_deferred: Dict[str, int] = {}
+_dropped: Dict[str, int] = {}
+_last_write: Dict[str, float] = {}
+_process_name: Optional[str] = None
+_snapshot_dir: Optional[str] = None
+_budget_bytes_per_hour: Optional[int] = None
+_last_snapshot = 0.0
+
+
+def _get_logger():
+    # Imported lazily: lumina_logger itself reports through this module
+    try:
+        from src.lumina_logger import GlobalLogger
+    except ImportError:
+        from lumina_logger import GlobalLogger
+    return GlobalLogger("RippleIO", log_prefix="ripple_").logger
+
+
+def _hour_start(timestamp: float) -> int:
+    return int(timestamp // 3600) * 3600
+
+
+def configure(process_name: str, snapshot_dir: str, budget_mb_per_hour: Optional[float] = None):
+    """
+    Enable snapshots for this process and set the optional soft budget.
+
+    Until configure() is called, counters are only kept in memory.
+
+    Args:
+        process_name (str): Snapshot name, e.g. "main" or "server"
+        snapshot_dir (str): Directory for io_accounting.<process>.json
+        budget_mb_per_hour (float): Soft write budget across all subsystems
+            of this process. None or <= 0 disables the budget.
+    """
+    global _process_name, _snapshot_dir, _budget_bytes_per_hour
+    with _lock:
+        _process_name = process_name
+        _snapshot_dir = snapshot_dir
+        _budget_bytes_per_hour = (
+            int(budget_mb_per_hour * 1024 * 1024)
+            if budget_mb_per_hour and budget_mb_per_hour > 0 else None
+        )
+
+
+def record_write(subsystem: str, nbytes: int = 0, opens: int = 0, fsyncs: int = 0, writes: int = 1):
+    """
+    Add a write to the current hour's counters for a subsystem.
+
+    Args:
+        subsystem (str): Subsystem name, e.g. "sensor_data_json"
+        nbytes (int): Bytes written
+        opens (int): Files opened for writing
+        fsyncs (int): fsync() calls issued
+        writes (int): Write operations to count
+    """
+    now = time.time()
+    hour = _hour_start(now)
+    rolled_over = None
+    with _lock:
+        if _hours and hour not in _hours:
+            rolled_over = next(reversed(_hours))
+        bucket = _hours.setdefault(hour, {})
+        counters = bucket.setdefault(subsystem, {"bytes": 0, "writes": 0, "opens": 0, "fsyncs": 0})
+        counters["bytes"] += nbytes
+        counters["writes"] += writes
+        counters["opens"] += opens
+        counters["fsyncs"] += fsyncs
+        _last_write[subsystem] = now
+        while len(_hours) > IO_HOURS_KEPT:
+            _hours.popitem(last=False)
+
+    if rolled_over is not None:
+        _log_hour_summary(rolled_over)
+    if subsystem != "io_accounting" and (rolled_over is not None or now - _last_snapshot >= IO_SNAPSHOT_INTERVAL):
+        snapshot()
+
+
+def _log_hour_summary(hour: int):
+    with _lock:
+        bucket = {k: dict(v) for k, v in _hours.get(hour, {}).items()}
+    if not bucket:
+        return
+    total = sum(c["bytes"] for c in bucket.values())
+    parts = ", ".join(
+        f"{name}={c['bytes'] / 1024:.1f}KB/{c['opens']}o/{c['fsyncs']}f"
+        for name, c in sorted(bucket.items(), key=lambda item: -item[1]["bytes"])
+    )
+    _get_logger().info(
+        f"[IO] Hour {time.strftime('%Y-%m-%d %H:00', time.localtime(hour))}: "
+        f"{total / 1024:.1f}KB written - {parts}"
+    )
+
+
+def current_hour_bytes() -> int:
+    """Bytes written by this process in the current hour across all subsystems."""
+    with _lock:
+        bucket = _hours.get(_hour_start(time.time()), {})
+        return sum(c["bytes"] for c in bucket.values())
+
+
+def over_budget() -> bool:
+    """True when a soft budget is set and this hour's writes exceed it."""
+    return _budget_bytes_per_hour is not None and current_hour_bytes() > _budget_bytes_per_hour
+
+
+def should_defer(subsystem: str) -> bool:
+    """
+    Decide whether a low-priority writer should hold back this write.
+
+    Returns True only when the soft budget is exceeded, the subsystem is in
+    LOW_PRIORITY_SUBSYSTEMS and it wrote less than IO_BUDGET_DEFER_SECONDS
+    ago. Held-back writes are counted as deferred in the report.
+    """
+    if subsystem not in LOW_PRIORITY_SUBSYSTEMS or not over_budget():
+        return False
+    if time.time() - _last_write.get(subsystem, 0.0) < IO_BUDGET_DEFER_SECONDS:
+        with _lock:
+            _deferred[subsystem] = _deferred.get(subsystem, 0) + 1
+        return True
+    return False
+
+
+def record_dropped(subsystem: str, count: int = 1):
+    """Count writes a subsystem had to discard (e.g. an overflowing defer buffer)."""
+    with _lock:
+        _dropped[subsystem] = _dropped.get(subsystem, 0) + count
+
+
+class AccountedFile:
+    """File wrapper that counts bytes passed to write()/writelines()."""
+
+    def __init__(self, subsystem: str, fileobj):
+        self._subsystem = subsystem
+        self._file = fileobj
+        self._bytes = 0
+        self._writes = 0
+        self._fsyncs = 0
+
+    def write(self, data):
+        result = self._file.write(data)
+        self._bytes += len(data.encode("utf-8")) if isinstance(data, str) else len(data)
+        self._writes += 1
+        return result
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def fsync(self):
+        """Flush and fsync the underlying file, counting the fsync."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._fsyncs += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+            record_write(self._subsystem, self._bytes, opens=1, fsyncs=self._fsyncs,
+                         writes=max(self._writes, 1))
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def open_accounted(subsystem: str, file, mode: str = "w", **kwargs) -> AccountedFile:
+    """Open a file for writing and account its bytes/open/fsyncs to subsystem."""
+    return AccountedFile(subsystem, open(file, mode, **kwargs))
+
+
+def _read_proc_io() -> Dict[str, int]:
+    # Kernel-level totals for this process, including writes we do not wrap
+    # (e.g. the APScheduler SQLAlchemy jobstore and application log handlers).
+    stats = {}
+    try:
+        with open("/proc/self/io", "r") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("write_bytes", "wchar", "syscw"):
+                    stats[key] = int(value)
+    except (OSError, ValueError):
+        pass
+    return stats
+
+
+def local_snapshot() -> Dict[str, Any]:
+    """Return this process's counters in report form."""
+    with _lock:
+        hours = {
+            str(hour): {name: dict(c) for name, c in bucket.items()}
+            for hour, bucket in _hours.items()
+        }
+        deferred = dict(_deferred)
+        dropped = dict(_dropped)
+    return {
+        "process": _process_name or "unknown",
+        "pid": os.getpid(),
+        "updated": time.time(),
+        "budget_bytes_per_hour": _budget_bytes_per_hour,
+        "deferred": deferred,
+        "dropped": dropped,
+        "proc_io": _read_proc_io(),
+        "hours": hours,
+    }
+
+
+def snapshot():
+    """Persist this process's counters for other processes to report."""
+    global _last_snapshot
+    _last_snapshot = time.time()
+    if not _snapshot_dir or not _process_name:
+        return
+    path = os.path.join(_snapshot_dir, f"io_accounting.{_process_name}.json")
+    tmp_path = path + ".tmp"
+    try:
+        payload = json.dumps(local_snapshot())
+        with open_accounted("io_accounting", tmp_path, "w") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def get_report(snapshot_dir: Optional[str] = None, hours: int = 24) -> Dict[str, Any]:
+    """
+    Build the write-budget report across all processes.
+
+    Args:
+        snapshot_dir (str): Directory holding io_accounting.*.json snapshots.
+            Defaults to the configured snapshot directory.
+        hours (int): Number of most recent hours to include
+
+    Returns:
+        dict: {"hours": {hour: {subsystem: counters}}, "totals": {subsystem:
+            counters}, "processes": {name: {...}}}
+    """
+    snapshot_dir = snapshot_dir or _snapshot_dir
+    processes = {}
+    if snapshot_dir and os.path.isdir(snapshot_dir):
+        for name in os.listdir(snapshot_dir):
+            if name.startswith("io_accounting.") and name.endswith(".json"):
+                try:
+                    with open(os.path.join(snapshot_dir, name), "r") as f:
+                        data = json.load(f)
+                    processes[data.get("process", name)] = data
+                except (OSError, ValueError):
+                    continue
+    # Live counters for this process supersede its last snapshot
+    processes[_process_name or "unknown"] = local_snapshot()
+
+    cutoff = _hour_start(time.time()) - (hours - 1) * 3600
+    merged: Dict[str, Dict[str, Dict[str, int]]] = {}
+    totals: Dict[str, Dict[str, int]] = {}
+    for data in processes.values():
+        for hour, bucket in data.get("hours", {}).items():
+            if int(hour) < cutoff:
+                continue
+            hour_label = time.strftime("%Y-%m-%dT%H:00", time.localtime(int(hour)))
+            for subsystem, counters in bucket.items():
+                for target in (merged.setdefault(hour_label, {}).setdefault(subsystem, {}),
+                               totals.setdefault(subsystem, {})):
+                    for key, value in counters.items():
+                        target[key] = target.get(key, 0) + value
+
+    return {
+        "hours": dict(sorted(merged.items())),
+        "totals": dict(sorted(totals.items(), key=lambda item: -item[1].get("bytes", 0))),
+        "processes": {
+            name: {
+                "pid": data.get("pid"),
+                "updated": data.get("updated"),
+                "budget_bytes_per_hour": data.get("budget_bytes_per_hour"),
+                "deferred": data.get("deferred", {}),
+                "dropped": data.get("dropped", {}),
+                "proc_io": data.get("proc_io", {}),
+            }
+            for name, data in processes.items()
+        },
+    }
+
+
+def reset():
+    """Clear all in-memory counters (used by tests)."""
+    global _last_snapshot
+    with _lock:
+        _hours.clear()
+        _deferred.clear()
+        _dropped.clear()
+        _last_write.clear()
+    _last_snapshot = 0.0
@@ -1,3 +1,4 @@
+import atexit
 import logging
 import os
 import json
@@ -6,9 +7,18 @@ import threading
 import datetime
 import shutil
 import glob
+import gzip
+import queue
+import collections
+import re
 import tzlocal
 import orjson
 
+try:
+    from src import io_accounting
+except ImportError:
+    import io_accounting
+
 # Define constants locally to avoid circular imports
 LOG_FOLDER_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "log")
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
@@ -21,6 +31,395 @@ SENSOR_DATA_LOG_MAX_SIZE = 20 * 1024 * 1024  # 20 MB
 
 MIN_FREE_SPACE_MB = 500  # Minimum free space in MB before cleanup
 
+# Rotated application logs and sensor data segments are gzip-compressed in the
+# background. Level 6 is the zlib default; the worker runs at the lowest CPU
+# priority so compression never competes with the control loop.
+LOG_COMPRESSION_ENABLED = True
+LOG_COMPRESSION_LEVEL = 6
+LOG_COMPRESSION_NICE = 19
+SENSOR_DATA_MAX_SEGMENTS = 20  # Compressed sensor data segments kept per sensor
+# main.py and server.py both write the "ripple_" segments; each rotates away
+# from a full segment at its next size check, so a rotated segment is only
+# compressed once it has been untouched for two check intervals.
+LOG_COMPRESSION_IDLE = 2 * LOG_SIZE_CHECK_INTERVAL + 60
+
+LOG_FORMAT = "%(asctime)s - %(filename)s - %(funcName)s - %(message)s"
+
+# Sensor log entries held back while the IO budget defers "sensor_log" writes.
+# They are appended with the next write that is allowed; past this bound the
+# oldest entries are dropped and counted in the IO report.
+SENSOR_LOG_DEFER_MAX_ENTRIES = 5000
+
+_deferred_sensor_entries = collections.OrderedDict()  # log path -> [entry, ...]
+_deferred_sensor_count = 0
+_deferred_sensor_lock = threading.Lock()
+
+_compression_queue = queue.Queue()
+_compression_thread = None
+_compression_thread_lock = threading.Lock()
+
+
+def compress_file(file_path, level=LOG_COMPRESSION_LEVEL):
+    """
+    Gzip a rotated log segment in place.
+
+    Writes to a temporary file first and renames it into place so a crash
+    never leaves a truncated .gz next to a deleted original.
+
+    Args:
+        file_path (str): Path of the plain text segment
+        level (int): gzip compression level (1-9)
+
+    Returns:
+        str: Path of the compressed file, or None if compression failed
+    """
+    if not os.path.exists(file_path) or file_path.endswith(".gz"):
+        return None
+    gz_path = file_path + ".gz"
+    if os.path.exists(gz_path):
+        return None  # never replace an existing segment; the plain file stays readable
+    # Per-process temp name: main.py and server.py may both pick up a leftover segment
+    tmp_path = f"{gz_path}.{os.getpid()}.tmp"
+    try:
+        with open(file_path, "rb") as src, gzip.open(tmp_path, "wb", compresslevel=level) as dst:
+            shutil.copyfileobj(src, dst, 64 * 1024)
+        os.replace(tmp_path, gz_path)
+        os.remove(file_path)
+        return gz_path
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return None
+
+
+def _compression_worker():
+    # Linux applies setpriority to a single thread when given its native id,
+    # so only this worker is deprioritised, not the whole process.
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), LOG_COMPRESSION_NICE)
+    except (AttributeError, OSError):
+        pass
+    while True:
+        file_path = _compression_queue.get()
+        try:
+            compress_file(file_path)
+        finally:
+            _compression_queue.task_done()
+
+
+def compress_in_background(file_path):
+    """Queue a rotated segment for low-priority background compression."""
+    global _compression_thread
+    if not LOG_COMPRESSION_ENABLED:
+        return
+    with _compression_thread_lock:
+        if _compression_thread is None or not _compression_thread.is_alive():
+            _compression_thread = threading.Thread(
+                target=_compression_worker, name="log-compression", daemon=True
+            )
+            _compression_thread.start()
+    _compression_queue.put(file_path)
+
+
+def open_log_segment(file_path):
+    """Open a plain or gzip-compressed log segment for text reading."""
+    if file_path.endswith(".gz"):
+        return gzip.open(file_path, "rt", encoding="utf-8", errors="replace")
+    return open(file_path, "r", encoding="utf-8", errors="replace")
+
+
+def iter_log_lines(file_paths):
+    """
+    Stream lines from a sequence of log segments, oldest first.
+
+    Compressed and plain segments are read transparently and never loaded
+    into memory in full. Segments that disappear mid-read are skipped.
+    """
+    for file_path in file_paths:
+        try:
+            with open_log_segment(file_path) as f:
+                for line in f:
+                    yield line
+        except (FileNotFoundError, EOFError, OSError):
+            continue
+
+
+def _tail_plain_file(file_path, lines, block_size=64 * 1024):
+    # Read backwards in blocks until enough newlines are seen
+    with open(file_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        while position > 0 and data.count(b"\n") <= lines:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    text = data.decode("utf-8", errors="replace")
+    return text.splitlines(keepends=True)[-lines:]
+
+
+def tail_log_lines(file_paths, lines=100):
+    """
+    Return the last `lines` lines across the given segments.
+
+    Segments are read newest first and reading stops once enough lines are
+    collected, so a short tail never decompresses older segments. Plain
+    segments are read backwards from the end.
+    """
+    collected = []
+    for file_path in reversed(list(file_paths)):
+        remaining = lines - len(collected)
+        if remaining <= 0:
+            break
+        try:
+            if file_path.endswith(".gz"):
+                chunk = list(collections.deque(iter_log_lines([file_path]), maxlen=remaining))
+            else:
+                chunk = _tail_plain_file(file_path, remaining)
+        except OSError:
+            continue
+        collected = chunk + collected
+    return collected
+
+
+def list_app_log_segments(log_prefix, log_folder=None):
+    """
+    List application log segments for a prefix, oldest first.
+
+    Segment names are <prefix><YYYYMMDD>_<NNN>.log with an optional .gz
+    suffix once rotated, so sorting on (date, number) gives write order.
+    """
+    log_folder = log_folder or LOG_FOLDER_PATH
+    segments = []
+    for pattern in (f"{log_prefix}*_*.log", f"{log_prefix}*_*.log.gz"):
+        for file_path in glob.glob(os.path.join(log_folder, pattern)):
+            stem = os.path.basename(file_path)[len(log_prefix):]
+            stem = stem[:-3] if stem.endswith(".gz") else stem
+            date_part, _, number_part = os.path.splitext(stem)[0].rpartition("_")
+            if date_part.isdigit() and number_part.isdigit():
+                segments.append(((date_part, int(number_part)), file_path))
+    return [file_path for _, file_path in sorted(segments)]
+
+
+def sensor_data_log_path(path_list, base_path=None):
+    """Return the active sensor data log path for a data path list."""
+    base_path = base_path or SENSOR_DATA_LOG_PATH
+    return f"{base_path}.{'.'.join(path_list)}.log"
+
+
+_SEGMENT_STAMP = re.compile(r"\.(\d{8}T\d{12})(\.gz)?$")
+
+
+def list_sensor_data_segments(path_list, base_path=None):
+    """
+    List rotated and active sensor data segments, oldest first.
+
+    Rotated segments are <log>.<stamp>.gz, or <log>.<stamp> while still
+    waiting for compression.
+    """
+    log_file_path = sensor_data_log_path(path_list, base_path)
+    rotated = []
+    for file_path in glob.glob(f"{log_file_path}.*"):
+        match = _SEGMENT_STAMP.search(file_path[len(log_file_path):])
+        if match:
+            rotated.append((match.group(1), file_path))
+    segments = [file_path for _, file_path in sorted(rotated)]
+    if os.path.exists(log_file_path):
+        segments.append(log_file_path)
+    return segments
+
+
+def requeue_leftover_segments(base_path=None):
+    """
+    Queue sensor data segments that were rotated but never compressed.
+
+    rotate_sensor_data_log() renames the full log and queues it; if the
+    process exits before the worker gets to it, the plain segment would sit
+    there forever. Call once at startup.
+
+    Returns:
+        int: Segments queued
+    """
+    base_path = base_path or SENSOR_DATA_LOG_PATH
+    queued = 0
+    for file_path in glob.glob(f"{base_path}.*.log.*"):
+        match = _SEGMENT_STAMP.search(file_path)
+        if match and not match.group(2):
+            compress_in_background(file_path)
+            queued += 1
+    return queued
+
+
+def _gzip_original_size(file_path):
+    # gzip stores the uncompressed size modulo 2**32 in the last 4 bytes
+    with open(file_path, "rb") as f:
+        f.seek(-4, os.SEEK_END)
+        return int.from_bytes(f.read(4), "little")
+
+
+def get_compression_report(folders=None):
+    """
+    Measure bytes-on-disk savings from compressed log segments.
+
+    Args:
+        folders (list): Directories to scan. Defaults to the log folder and
+            the sensor data folder.
+
+    Returns:
+        dict: Per-folder and total counts of compressed segments, original
+            bytes, on-disk bytes, bytes saved and compression ratio
+    """
+    folders = folders or [LOG_FOLDER_PATH, os.path.dirname(SENSOR_DATA_LOG_PATH)]
+    report = {"folders": {}, "segments": 0, "original_bytes": 0, "disk_bytes": 0}
+    for folder in folders:
+        entry = {"segments": 0, "original_bytes": 0, "disk_bytes": 0}
+        for file_path in glob.glob(os.path.join(folder, "*.gz")):
+            try:
+                entry["original_bytes"] += _gzip_original_size(file_path)
+                entry["disk_bytes"] += os.path.getsize(file_path)
+                entry["segments"] += 1
+            except OSError:
+                continue
+        entry["saved_bytes"] = entry["original_bytes"] - entry["disk_bytes"]
+        report["folders"][folder] = entry
+        for key in ("segments", "original_bytes", "disk_bytes"):
+            report[key] += entry[key]
+    report["saved_bytes"] = report["original_bytes"] - report["disk_bytes"]
+    report["ratio"] = (
+        round(report["disk_bytes"] / report["original_bytes"], 3)
+        if report["original_bytes"] else None
+    )
+    return report
+
+
+def _defer_sensor_entry(log_file_path, log_entry):
+    global _deferred_sensor_count
+    dropped = 0
+    with _deferred_sensor_lock:
+        _deferred_sensor_entries.setdefault(log_file_path, []).append(log_entry)
+        _deferred_sensor_count += 1
+        while _deferred_sensor_count > SENSOR_LOG_DEFER_MAX_ENTRIES:
+            # Drop from the path that has waited longest
+            oldest_path = next(iter(_deferred_sensor_entries))
+            entries = _deferred_sensor_entries[oldest_path]
+            entries.pop(0)
+            if not entries:
+                del _deferred_sensor_entries[oldest_path]
+            _deferred_sensor_count -= 1
+            dropped += 1
+    if dropped:
+        io_accounting.record_dropped("sensor_log", dropped)
+
+
+def _take_deferred_sensor_entries():
+    global _deferred_sensor_count
+    with _deferred_sensor_lock:
+        pending = collections.OrderedDict(_deferred_sensor_entries)
+        _deferred_sensor_entries.clear()
+        _deferred_sensor_count = 0
+    return pending
+
+
+class _PrefixLogFile:
+    """
+    The one FileHandler, and the rotation state, for a log prefix.
+
+    About 30 "ripple_" loggers write the same ripple_YYYYMMDD_NNN.log. With a
+    FileHandler each, the first one to rotate compressed and deleted the file
+    while the others kept writing to the deleted inode and, finding no file,
+    never rotated again. Every GlobalLogger with the same prefix now adds this
+    shared handler, so a rotation re-points all of them at once.
+
+    Args:
+        log_prefix (str): Segment name prefix, e.g. "ripple_"
+        log_folder (str): Directory of the segments (default LOG_FOLDER_PATH)
+    """
+
+    def __init__(self, log_prefix, log_folder=None):
+        self.log_prefix = log_prefix
+        self.log_folder = log_folder or LOG_FOLDER_PATH
+        self.lock = threading.RLock()
+        self.current_date = datetime.datetime.now().strftime("%Y%m%d")
+        self.current_log_number = self._first_free_number(self.current_date, 1)
+        self.path = self.segment_path(self.current_date, self.current_log_number)
+        self.owner = None  # the GlobalLogger that runs the cleanup timer
+
+        self.handler = logging.FileHandler(self.path)
+        self.handler.setLevel(logging.INFO)
+        self.handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+        # Plain segments left by an earlier run are compressed once idle
+        self.rotated = [
+            file_path for file_path in list_app_log_segments(log_prefix, self.log_folder)
+            if not file_path.endswith(".gz") and file_path != self.path
+        ]
+
+    def segment_path(self, date, number):
+        return os.path.join(self.log_folder, f"{self.log_prefix}{date}_{number:03d}.log")
+
+    def _first_free_number(self, date, number):
+        # Skip numbers already compressed; reusing one would need a second .gz of the same name
+        while number < 999 and os.path.exists(self.segment_path(date, number) + ".gz"):
+            number += 1
+        return number
+
+    def repoint(self, date, number):
+        """
+        Switch the shared handler to another segment.
+
+        Returns:
+            str: The segment that was being written until now
+        """
+        with self.lock:
+            self.current_date = date
+            self.current_log_number = self._first_free_number(date, number)
+            old_path, self.path = self.path, self.segment_path(date, self.current_log_number)
+            self.handler.acquire()
+            try:
+                old_stream = self.handler.stream
+                self.handler.baseFilename = os.path.abspath(self.path)
+                self.handler.stream = self.handler._open()
+                if old_stream is not None:
+                    old_stream.close()
+            finally:
+                self.handler.release()
+            if old_path != self.path:
+                self.rotated.append(old_path)
+            return old_path
+
+    def compress_idle_segments(self, now=None):
+        """Queue rotated segments nobody has written for LOG_COMPRESSION_IDLE seconds."""
+        now = datetime.datetime.now().timestamp() if now is None else now
+        with self.lock:
+            pending = []
+            for file_path in self.rotated:
+                if file_path == self.path:
+                    continue
+                try:
+                    idle = now - os.path.getmtime(file_path)
+                except OSError:
+                    continue  # already compressed or deleted
+                if idle >= LOG_COMPRESSION_IDLE:
+                    compress_in_background(file_path)
+                else:
+                    pending.append(file_path)
+            self.rotated = pending
+
+
+_prefix_log_files = {}
+_prefix_log_files_lock = threading.Lock()
+
+
+def _get_prefix_log_file(log_prefix):
+    with _prefix_log_files_lock:
+        log_file = _prefix_log_files.get(log_prefix)
+        if log_file is None:
+            log_file = _prefix_log_files[log_prefix] = _PrefixLogFile(log_prefix)
+        return log_file
+
 
 class CustomLogger(logging.Logger):
 
@@ -59,30 +458,17 @@ class GlobalLogger:
         logging.getLogger("requests").setLevel(logging.WARNING)
         logging.getLogger("apscheduler").setLevel(logging.WARNING)
 
-        # Initialize the current date and log number
-        self.current_date = datetime.datetime.now().strftime("%Y%m%d")
-        self.current_log_number = 1
+        # Every logger with this prefix shares one file handler and its rotation
         self.log_prefix = log_prefix
-
-        # Generate the initial log file name without checking existing files
-        log_file_name = f"{self.log_prefix}{self.current_date}_{self.current_log_number:03d}.log"
-        self.LOG_FILE_PATH = os.path.join(
-            LOG_FOLDER_PATH, log_file_name
-        )
-
-        file_handler = logging.FileHandler(self.LOG_FILE_PATH)
-        file_handler.setLevel(logging.INFO)
+        self._log_file = _get_prefix_log_file(log_prefix)
+        file_handler = self._log_file.handler
 
         # Set up console handler to print logs to console
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.INFO)
 
         # Define log format with time
-        formatter = logging.Formatter(
-            "%(asctime)s - %(filename)s - %(funcName)s - %(message)s"
-        )
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
+        console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
 
         # Add handlers to the logger
         logger.addHandler(file_handler)
@@ -93,11 +479,35 @@ class GlobalLogger:
         # Add the log_sensor_data method to the logger instance
         self.logger.log_sensor_data = self.log_sensor_data
 
-        self.schedule_cleanup()  # Schedule log file cleanup
+        # One cleanup timer per prefix is enough: they all check the same file
+        with self._log_file.lock:
+            if self._log_file.owner is None:
+                self._log_file.owner = self
+                self.schedule_cleanup()  # Schedule log file cleanup
 
         # Explicitly set the level for the root logger
         logging.getLogger().setLevel(logging.INFO)
 
+    @property
+    def LOG_FILE_PATH(self):
+        return self._log_file.path
+
+    @property
+    def current_date(self):
+        return self._log_file.current_date
+
+    @current_date.setter
+    def current_date(self, value):
+        self._log_file.current_date = value
+
+    @property
+    def current_log_number(self):
+        return self._log_file.current_log_number
+
+    @current_log_number.setter
+    def current_log_number(self, value):
+        self._log_file.current_log_number = value
+
     def schedule_cleanup(self):
         # Schedule the `clean_up_if_needed` function to run every `LOG_SIZE_CHECK_INTERVAL` seconds
         timer = threading.Timer(LOG_SIZE_CHECK_INTERVAL, self.clean_up_if_needed)
@@ -105,6 +515,16 @@ class GlobalLogger:
         timer.start()
 
     def clean_up_if_needed(self):
+        with self._log_file.lock:
+            self._clean_up_log_file()
+            self._log_file.compress_idle_segments()
+
+        # Schedule the next cleanup
+        self.schedule_cleanup()
+
+    def _clean_up_log_file(self):
+        log_file = self._log_file
+
         # Check free space first
         free_space = self.get_free_space()
         if free_space < MIN_FREE_SPACE_MB:
@@ -117,97 +537,43 @@ class GlobalLogger:
             self.logger.info(f"After cleanup: {new_free_space:.2f}MB free")
 
             # Create a new log file if the current one was deleted
-            if not os.path.exists(self.LOG_FILE_PATH):
-                self.current_log_number = 1
-                new_log_file_name = (
-                    f"{self.log_prefix}{self.current_date}_{self.current_log_number:03d}.log"
-                )
-                self.LOG_FILE_PATH = os.path.join(
-                    LOG_FOLDER_PATH, new_log_file_name
-                )
-
-                # Create new file handler
-                file_handler = logging.FileHandler(self.LOG_FILE_PATH)
-                file_handler.setLevel(logging.INFO)
-                formatter = logging.Formatter(
-                    "%(asctime)s - %(filename)s - %(funcName)s - %(message)s"
-                )
-                file_handler.setFormatter(formatter)
-
-                # Update handlers
-                self.logger.handlers = [
-                    h
-                    for h in self.logger.handlers
-                    if not isinstance(h, logging.FileHandler)
-                ]
-                self.logger.addHandler(file_handler)
-
+            if not os.path.exists(log_file.path):
+                log_file.repoint(log_file.current_date, 1)
                 self.logger.info(
-                    f"Created new log file after cleanup: {new_log_file_name}"
+                    f"Created new log file after cleanup: {os.path.basename(log_file.path)}"
                 )
 
         # Only check file size if the file exists
-        if os.path.exists(self.LOG_FILE_PATH):
-            file_size = os.path.getsize(self.LOG_FILE_PATH) / (
-                1024 * 1024
-            )  # Convert size to MB
-            current_date = datetime.datetime.now().strftime("%Y%m%d")
-
-            # Check if we need a new log file
-            need_new_file = (
-                file_size > LOG_MAX_SIZE or current_date != self.current_date
-            )
-
-            if need_new_file:
-                self.logger.info(
-                    f"Log file size is over {LOG_MAX_SIZE} MB or date has changed. Current size: {file_size:.5f} MB"
-                )
-
-                # Send the current log file to the cloud
-                self.send_log_to_cloud()
-
-                # Update the log number or reset it for a new day
-                if current_date != self.current_date:
-                    self.current_date = current_date
-                    self.current_log_number = 1
-                else:
-                    self.current_log_number += 1
-                    if self.current_log_number > 999:
-                        self.current_log_number = 1
+        if not os.path.exists(log_file.path):
+            return
+        file_size = os.path.getsize(log_file.path) / (1024 * 1024)  # Convert size to MB
+        current_date = datetime.datetime.now().strftime("%Y%m%d")
 
-                # Create the new log file name
-                new_log_file_name = (
-                    f"{self.log_prefix}{self.current_date}_{self.current_log_number:03d}.log"
-                )
-                new_log_file_path = os.path.join(
-                    LOG_FOLDER_PATH, new_log_file_name
-                )
+        # Check if we need a new log file
+        if file_size <= LOG_MAX_SIZE and current_date == log_file.current_date:
+            self.logger.info(
+                f"Log file size is under {LOG_MAX_SIZE} MB and date hasn't changed. Current size: {file_size:.5f} MB"
+            )
+            return
 
-                # Update the log file path and create a new file handler
-                self.LOG_FILE_PATH = new_log_file_path
-                file_handler = logging.FileHandler(self.LOG_FILE_PATH)
-                file_handler.setLevel(logging.INFO)
-                formatter = logging.Formatter(
-                    "%(asctime)s - %(filename)s - %(funcName)s - %(message)s"
-                )
-                file_handler.setFormatter(formatter)
+        self.logger.info(
+            f"Log file size is over {LOG_MAX_SIZE} MB or date has changed. Current size: {file_size:.5f} MB"
+        )
 
-                # Remove the old file handler and add the new one
-                self.logger.handlers = [
-                    h
-                    for h in self.logger.handlers
-                    if not isinstance(h, logging.FileHandler)
-                ]
-                self.logger.addHandler(file_handler)
+        # Send the current log file to the cloud
+        self.send_log_to_cloud()
 
-                self.logger.info(f"Created new log file: {new_log_file_name}")
-            else:
-                self.logger.info(
-                    f"Log file size is under {LOG_MAX_SIZE} MB and date hasn't changed. Current size: {file_size:.5f} MB"
-                )
+        # Update the log number or reset it for a new day
+        if current_date != log_file.current_date:
+            new_log_number = 1
+        else:
+            new_log_number = log_file.current_log_number + 1
+            if new_log_number > 999:
+                new_log_number = 1
 
-        # Schedule the next cleanup
-        self.schedule_cleanup()
+        # Re-point every logger sharing the file; the old segment is compressed once idle
+        log_file.repoint(current_date, new_log_number)
+        self.logger.info(f"Created new log file: {os.path.basename(log_file.path)}")
 
     def get_free_space(self):
         _, _, free = shutil.disk_usage(BASE_DIR)
@@ -237,6 +603,7 @@ class GlobalLogger:
 
     def delete_oldest_log_files(self):
         log_files = glob.glob(os.path.join(LOG_FOLDER_PATH, f"{self.log_prefix}*_*.log"))
+        log_files += glob.glob(os.path.join(LOG_FOLDER_PATH, f"{self.log_prefix}*_*.log.gz"))
         if log_files:
             oldest_date = min(
                 log_files, key=lambda x: os.path.splitext(x)[0].split("_")[1]
@@ -244,6 +611,8 @@ class GlobalLogger:
             oldest_date = oldest_date.split("_")[1]
             oldest_log_files = glob.glob(
                 os.path.join(LOG_FOLDER_PATH, f"{self.log_prefix}{oldest_date}_*.log")
+            ) + glob.glob(
+                os.path.join(LOG_FOLDER_PATH, f"{self.log_prefix}{oldest_date}_*.log.gz")
             )
             for log_file in oldest_log_files:
                 try:
@@ -266,9 +635,7 @@ class GlobalLogger:
         )
 
     def log_sensor_data(self, path_list, value=None):
-        # Convert path_list to a string for the filename
-        sensor_name = ".".join(path_list)
-        log_file_path = f"{SENSOR_DATA_LOG_PATH}.{sensor_name}.log"
+        log_file_path = sensor_data_log_path(path_list)
 
         # Get current datetime in the specified format
         local_timezone = datetime.datetime.now().astimezone().tzinfo
@@ -287,17 +654,60 @@ class GlobalLogger:
         # Construct the log entry
         log_entry = f"{current_datetime}\t{'.'.join(path_list)}\t{value_string}\n"
 
+        # Over the IO budget: hold the entry and write it with a later burst
+        if io_accounting.should_defer("sensor_log"):
+            _defer_sensor_entry(log_file_path, log_entry)
+            return
+
+        pending = _take_deferred_sensor_entries()
+        pending.setdefault(log_file_path, []).append(log_entry)
+        for file_path, entries in pending.items():
+            self._append_sensor_entries(file_path, entries)
+
+    def _append_sensor_entries(self, log_file_path, entries):
         # Check if the file exists and its size
         if os.path.exists(log_file_path):
             file_size = os.path.getsize(log_file_path)
             if file_size > SENSOR_DATA_LOG_MAX_SIZE:
-                self.truncate_log_file(
-                    log_file_path, capped_size=SENSOR_DATA_LOG_MAX_SIZE
-                )
+                if LOG_COMPRESSION_ENABLED:
+                    self.rotate_sensor_data_log(log_file_path)
+                else:
+                    self.truncate_log_file(
+                        log_file_path, capped_size=SENSOR_DATA_LOG_MAX_SIZE
+                    )
 
-        # Append the log entry to the sensor data log file
-        with open(log_file_path, "a") as f:
-            f.write(log_entry)
+        # Append the log entries to the sensor data log file
+        with io_accounting.open_accounted("sensor_log", log_file_path, "a") as f:
+            f.write("".join(entries))
+
+    def rotate_sensor_data_log(self, log_file_path, max_segments=SENSOR_DATA_MAX_SEGMENTS):
+        """
+        Move a full sensor data log into a timestamped segment and compress it.
+
+        Replaces in-place truncation: the full file is renamed (cheap, no data
+        rewritten) and gzip-compressed in the background. Only the newest
+        max_segments compressed segments are kept per sensor.
+
+        Args:
+            log_file_path (str): Active sensor data log path
+            max_segments (int): Compressed segments to keep for this sensor
+        """
+        stamp = datetime.datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        segment_path = f"{log_file_path}.{stamp}"
+        try:
+            os.replace(log_file_path, segment_path)
+        except OSError as e:
+            self.logger.error(f"Failed to rotate sensor log {log_file_path}: {e}")
+            return
+        compress_in_background(segment_path)
+
+        segments = sorted(glob.glob(f"{log_file_path}.*.gz"))
+        for old_segment in segments[:max(0, len(segments) - max_segments)]:
+            try:
+                os.remove(old_segment)
+            except OSError:
+                pass
+        self.logger.debug(f"Rotated sensor log file: {log_file_path} -> {segment_path}")
 
     def truncate_log_file(self, file_path, capped_size=5 * 1024 * 1024):
         with open(file_path, "r+") as f:
@@ -321,6 +731,19 @@ class GlobalLogger:
         self.logger.debug(f"Truncated sensor log file: {file_path}")
 
 
+def _flush_deferred_sensor_entries_at_exit():
+    """Append sensor log entries still held back by the IO budget; rotation waits for the next run."""
+    for file_path, entries in _take_deferred_sensor_entries().items():
+        try:
+            with io_accounting.open_accounted("sensor_log", file_path, "a") as f:
+                f.write("".join(entries))
+        except OSError:
+            pass
+
+
+atexit.register(_flush_deferred_sensor_entries_at_exit)
+
+
 class JsonSerializable:
     @property
     def status_json(self):
@@ -1,3 +1,4 @@
+import itertools
 import logging
 import time
 import socket
@@ -16,6 +17,10 @@ logger = logging.getLogger(__name__)
 
 from lumina_modbus_event_emitter import ModbusEventEmitter, ModbusResponse
 
+# Queue priorities for send_command(priority=...); lower is sent first
+PRIORITY_EMERGENCY = 0
+PRIORITY_NORMAL = 10
+
 @dataclass
 class PendingCommand:
     id: str
@@ -46,7 +51,9 @@ class LuminaModbusClient:
         
         # Threading components
         self._running = True
-        self.command_queue = queue.Queue(maxsize=command_queue_size)
+        # (priority, sequence, command); FIFO within a priority
+        self.command_queue = queue.PriorityQueue(maxsize=command_queue_size)
+        self._command_seq = itertools.count()
         self.pending_commands: Dict[str, PendingCommand] = {}
         self.command_responses: Dict[str, ModbusResponse] = {}  # Store responses by command_id
         self._socket_lock = threading.Lock()
@@ -128,11 +135,15 @@ class LuminaModbusClient:
             device_type: Type of device (e.g., 'THC', 'EC', etc.)
             port: Serial port to use
             command: Command bytes to send
-            **kwargs: Additional arguments (baudrate, response_length, timeout)
+            **kwargs: Additional arguments (baudrate, response_length, timeout,
+                priority). priority=PRIORITY_EMERGENCY queues the command ahead of
+                everything not yet sent.
         
         Returns:
             str: Command ID for tracking the response
         """
+        priority = kwargs.pop('priority', PRIORITY_NORMAL)
+
         # Generate unique command ID
         truncated_hex = command.hex()[:12]
         random_suffix = ''.join(random.choices(string.ascii_letters + string.digits, k=2))
@@ -165,13 +176,13 @@ class LuminaModbusClient:
         try:
             logger.debug(f"Queueing command - ID: {command_id}, Device: {device_type}")
             
-            self.command_queue.put({
+            self.command_queue.put((priority, next(self._command_seq), {
                 'id': command_id,
                 'device_type': device_type,
                 'command': command_str.encode(),
                 'kwargs': kwargs,
                 'timeout': kwargs.get('timeout', 5.0)  # Use command-specific timeout or default to 5.0
-            }, timeout=1.0)
+            }), timeout=1.0)
             
             logger.debug(f"Command queued successfully - ID: {command_id}")
             
@@ -245,7 +256,7 @@ class LuminaModbusClient:
         """Process commands from the queue and send to server."""
         while self._running:
             try:
-                command = self.command_queue.get(timeout=0.1)
+                _, _, command = self.command_queue.get(timeout=0.1)
                 port = command['command'].decode().split(':')[2]  # Extract port from command string
                 _, send_lock, _ = self._get_port_locks(port)
                 logger.debug(f"Processing command from queue - ID: {command['id']}")
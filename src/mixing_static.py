@@ -9,7 +9,6 @@ Created: 2025-09-23
 Author: Linus-style simplification
 """
 
-import configparser
 import os
 import time
 from datetime import datetime, timedelta
@@ -23,6 +22,11 @@ except Exception:
     import logging
     logger = logging.getLogger(__name__)
 
+try:
+    from src.config_snapshot import get_config_snapshot
+except ImportError:
+    from config_snapshot import get_config_snapshot
+
 def get_scheduler():
     """Get the global scheduler instance from globals.py"""
     try:
@@ -32,24 +36,15 @@ def get_scheduler():
         logger.error(f"Error getting global scheduler: {e}")
         return None
 
+def _config():
+    """Current device.conf snapshot; re-parsed only when the file changes"""
+    config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'device.conf')
+    return get_config_snapshot(config_path)
+
 def get_mixing_config():
     """Get mixing pump configuration from device.conf"""
-    try:
-        config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'device.conf')
-        config = configparser.ConfigParser()
-        config.read(config_path)
-        
-        # Get operational values (second value after comma)
-        duration_str = config.get('Mixing', 'mixing_duration')
-        interval_str = config.get('Mixing', 'mixing_interval')
-        
-        duration = duration_str.split(',')[1].strip()
-        interval = interval_str.split(',')[1].strip()
-        
-        return duration, interval
-    except Exception as e:
-        logger.error(f"Error reading mixing config: {e}")
-        return "00:20:00", "02:00:00"  # Default: 20min duration, 2hr interval
+    config = _config()
+    return config.mixing_duration, config.mixing_interval
 
 def parse_duration(duration_str):
     """Parse HH:MM:SS to seconds"""
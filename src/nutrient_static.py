@@ -9,7 +9,6 @@ Created: 2025-09-23
 Author: Linus-style simplification
 """
 
-import configparser
 import os
 import time
 import threading
@@ -19,6 +18,10 @@ from datetime import datetime, timedelta
 # Global lock to prevent race conditions in scheduling
 _scheduling_lock = threading.Lock()
 
+# Serialises check-and-start and stop between the chain jobs (APScheduler
+# threads) and reactive evaluations (reactive worker thread)
+_dosing_lock = threading.Lock()
+
 # Global logger import
 try:
     from src.lumina_logger import GlobalLogger
@@ -27,6 +30,16 @@ except Exception:
     import logging
     logger = logging.getLogger(__name__)
 
+try:
+    from src.config_snapshot import get_config_snapshot
+except ImportError:
+    from config_snapshot import get_config_snapshot
+
+try:
+    from src.poll_scheduler import realtime_boost
+except ImportError:
+    from poll_scheduler import realtime_boost
+
 try:
     from audit_event import audit
 except Exception:
@@ -41,24 +54,15 @@ def get_scheduler():
         logger.error(f"Error getting global scheduler: {e}")
         return None
 
+def _config():
+    """Current device.conf snapshot; re-parsed only when the file changes"""
+    config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'device.conf')
+    return get_config_snapshot(config_path)
+
 def get_nutrient_config():
     """Get nutrient pump configuration from device.conf"""
-    try:
-        config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'device.conf')
-        config = configparser.ConfigParser()
-        config.read(config_path)
-        
-        # Get operational values (second value after comma)
-        on_str = config.get('NutrientPump', 'nutrient_pump_on_duration')
-        wait_str = config.get('NutrientPump', 'nutrient_pump_wait_duration')
-        
-        on_duration = on_str.split(',')[1].strip()
-        wait_duration = wait_str.split(',')[1].strip()
-        
-        return on_duration, wait_duration
-    except Exception as e:
-        logger.error(f"Error reading nutrient config: {e}")
-        return "00:00:00", "00:00:00"
+    config = _config()
+    return config.nutrient_pump_on_duration, config.nutrient_pump_wait_duration
 
 def parse_duration(duration_str):
     """Parse HH:MM:SS to seconds"""
@@ -70,91 +74,68 @@ def parse_duration(duration_str):
 
 def get_ec_targets():
     """Get EC target and deadband from config"""
-    try:
-        config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'device.conf')
-        config = configparser.ConfigParser()
-        config.read(config_path)
-        
-        # Get operational values (second value after comma)
-        target_str = config.get('EC', 'ec_target')
-        deadband_str = config.get('EC', 'ec_deadband')
-        
-        target = float(target_str.split(',')[1].strip())
-        deadband = float(deadband_str.split(',')[1].strip())
-        
-        return target, deadband
-    except Exception as e:
-        logger.error(f"Error reading EC config: {e}")
-        return 1.0, 0.1  # Default values
+    config = _config()
+    return config.ec_target, config.ec_deadband
 
 def get_ec_min_max():
     """Get EC min and max from config"""
-    try:
-        config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'device.conf')
-        config = configparser.ConfigParser()
-        config.read(config_path)
-        ec_min = float(config.get('EC', 'ec_min').split(',')[1].strip())
-        ec_max = float(config.get('EC', 'ec_max').split(',')[1].strip())
-        return ec_min, ec_max
-    except Exception as e:
-        logger.error(f"Error reading EC min/max config: {e}")
-        return 0.0, 99.0  # Safe defaults (never alert)
+    config = _config()
+    return config.ec_min, config.ec_max
 
 # Hysteresis flag: tracks whether a dosing sequence is active.
 # Initialized True so that after a restart, if EC is between
 # lower_threshold and target, we dose up to target.
 _dosing_active = True
 
-def get_abc_ratio_from_config():
-    """Get ABC ratio from config"""
-    try:
-        config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'device.conf')
-        config = configparser.ConfigParser()
-        config.read(config_path)
+# time.monotonic() when the pumps were last stopped; the wait duration between
+# doses is measured from here. Seeded with the process start: a restart may
+# have cut a dose short, so reactive doses wait one full wait duration first.
+_last_dose_stopped_at = time.monotonic()
 
-        # Get operational values (second value after comma)
-        ratio_str = config.get('NutrientPump', 'abc_ratio')
-        ratio_values = ratio_str.split(',')[1].strip().strip('"').strip("'")
+# True from a successful start until the pumps are stopped again
+_dose_running = False
 
-        # Parse "1:1:0" format (strip quotes/whitespace from each part)
-        parts = ratio_values.split(':')
-        return [int(parts[0].strip()), int(parts[1].strip()), int(parts[2].strip())]
-    except Exception as e:
-        logger.error(f"Error reading ABC ratio: {e}")
-        return [1, 1, 0]  # Default ratio
+def get_abc_ratio_from_config():
+    """Get ABC ratio from config"""
+    return list(_config().abc_ratio)
 
-def check_if_nutrient_dosing_needed():
+def check_if_nutrient_dosing_needed(current_ec=None):
     """Check EC levels to determine if nutrient dosing is needed.
 
     Uses hysteresis: dosing triggers when EC drops below (target - deadband),
     then continues until EC reaches the actual target. This prevents EC from
     settling at the bottom of the deadband.
+
+    Args:
+        current_ec (float): Fresh validated reading (reactive mode). When None
+            the latest value is read from the saved sensor data file.
     """
     global _dosing_active
     try:
-        # Get current EC reading from saved sensor data file
-        # Note: We read from file instead of EC singleton because APScheduler
-        # jobs run in separate threads where the singleton may not be properly
-        # initialized with current readings
-        import src.globals as globals
-        sensor_data = globals.saved_sensor_data()
-
-        if not sensor_data:
-            logger.error("[SENSOR-CHECK] Failed to load sensor data file")
-            return False
-
-        # Navigate to EC data: data -> water_metrics -> ec -> measurements -> points[0] -> fields -> value
-        ec_data = sensor_data.get('data', {}).get('water_metrics', {}).get('ec', {})
-        ec_points = ec_data.get('measurements', {}).get('points', [])
-
-        if not ec_points:
-            logger.error("[SENSOR-CHECK] No EC data points found in saved data")
-            return False
-
-        current_ec = ec_points[0].get('fields', {}).get('value')
         if current_ec is None:
-            logger.error("[SENSOR-CHECK] Failed to get EC reading from saved data")
-            return False
+            # Get current EC reading from saved sensor data file
+            # Note: We read from file instead of EC singleton because APScheduler
+            # jobs run in separate threads where the singleton may not be properly
+            # initialized with current readings
+            import src.globals as globals
+            sensor_data = globals.saved_sensor_data()
+
+            if not sensor_data:
+                logger.error("[SENSOR-CHECK] Failed to load sensor data file")
+                return False
+
+            # Navigate to EC data: data -> water_metrics -> ec -> measurements -> points[0] -> fields -> value
+            ec_data = sensor_data.get('data', {}).get('water_metrics', {}).get('ec', {})
+            ec_points = ec_data.get('measurements', {}).get('points', [])
+
+            if not ec_points:
+                logger.error("[SENSOR-CHECK] No EC data points found in saved data")
+                return False
+
+            current_ec = ec_points[0].get('fields', {}).get('value')
+            if current_ec is None:
+                logger.error("[SENSOR-CHECK] Failed to get EC reading from saved data")
+                return False
 
         # Get target configuration
         target_ec, deadband = get_ec_targets()
@@ -205,19 +186,35 @@ def check_if_nutrient_dosing_needed():
 
 def start_nutrient_pumps_static():
     """Static function to start nutrient pumps - SENSOR DRIVEN - safe for APScheduler"""
+    global _dose_running
     try:
         logger.info("==== SENSOR-DRIVEN NUTRIENT CHECK TRIGGERED ====")
-        
-        # STEP 1: Check if nutrient dosing is actually needed
-        dosing_needed = check_if_nutrient_dosing_needed()
-        
-        if not dosing_needed:
-            logger.info("[SENSOR-DRIVEN] EC levels adequate - skipping nutrient dosing")
-            # Schedule next check (don't dose, just check again later)
-            schedule_next_nutrient_cycle_static()
-            return
-            
-        # STEP 2: EC is low - proceed with dosing
+
+        with _dosing_lock:
+            if _dose_running:
+                # A reactive dose started meanwhile; its stop re-arms the chain
+                logger.info("[SENSOR-DRIVEN] Nutrient dose already running - skipping chain check")
+                return
+
+            # STEP 1: Check if nutrient dosing is actually needed
+            dosing_needed = check_if_nutrient_dosing_needed()
+
+            if not dosing_needed:
+                logger.info("[SENSOR-DRIVEN] EC levels adequate - skipping nutrient dosing")
+                # Schedule next check (don't dose, just check again later)
+                schedule_next_nutrient_cycle_static()
+                return
+
+            # STEP 2: EC is low - proceed with dosing
+            _dose_running = _dose_nutrients()
+
+    except Exception as e:
+        logger.error(f"[SENSOR-DRIVEN] Error in nutrient pump logic: {e}")
+        logger.exception("[SENSOR-DRIVEN] Full exception details:")
+
+def _dose_nutrients(trigger="EC-driven"):
+    """Start the nutrient pumps for one dose and schedule their stop; True if started"""
+    try:
         logger.info("🧪 [SENSOR-DRIVEN] EC below target - starting nutrient dosing")
         
         # Get configuration  
@@ -226,14 +223,14 @@ def start_nutrient_pumps_static():
         
         if on_seconds == 0:
             logger.warning("[SENSOR-DRIVEN] Nutrient pump duration is 0, skipping")
-            return
+            return False
             
         # STEP 3: Start nutrient pumps based on ABC ratio
         from src.sensors.Relay import Relay
         relay = Relay()
         if not relay:
             logger.error("[SENSOR-DRIVEN] No relay available for nutrient pump start")
-            return
+            return False
             
         # Get ABC ratio from config and start appropriate pumps
         abc_ratio = get_abc_ratio_from_config()
@@ -256,17 +253,62 @@ def start_nutrient_pumps_static():
                        resource=",".join(f"NutrientPump{p}" for p in pumps_started),
                        source="autonomous",
                        value={"abc_ratio": abc_ratio, "duration_s": on_seconds, "pumps": pumps_started},
-                       details=f"EC-driven dosing, pumps {pumps_started} for {on_duration_str}")
+                       details=f"{trigger} dosing, pumps {pumps_started} for {on_duration_str}")
 
         # Schedule stop
         schedule_nutrient_stop_static(on_seconds)
+        # Follow the EC response closely while the dose mixes in
+        realtime_boost("ec", "nutrient_dose", duration=on_seconds, settle=True)
+        return True
         
     except Exception as e:
-        logger.error(f"[SENSOR-DRIVEN] Error in nutrient pump logic: {e}")
+        logger.error(f"[SENSOR-DRIVEN] Error starting nutrient dose: {e}")
         logger.exception("[SENSOR-DRIVEN] Full exception details:")
+        return False
+
+def seconds_until_dose_allowed():
+    """Seconds before another dose may start (0 if now; inf while pumps are on).
+
+    Keeps the scheduled chain's spacing in force for reactive evaluations:
+    no new dose while one is running, and at least the configured wait
+    duration between the end of one dose and the start of the next.
+    """
+    scheduler = get_scheduler()
+    if scheduler and (scheduler.get_job('nutrient_stop') or scheduler.get_job('controller_nutrient_stop')):
+        return float('inf')
+    if _last_dose_stopped_at is None:
+        return 0.0
+    _, wait_duration_str = get_nutrient_config()
+    elapsed = time.monotonic() - _last_dose_stopped_at
+    return max(0.0, parse_duration(wait_duration_str) - elapsed)
+
+def evaluate_nutrient_dosing_now(current_ec):
+    """Reactive mode: decide on a fresh EC reading instead of waiting for the chain.
+
+    Args:
+        current_ec (float): Validated EC reading
+
+    Returns:
+        bool: True if a dose was started
+    """
+    global _dose_running
+    with _dosing_lock:
+        if seconds_until_dose_allowed() > 0:
+            return False
+        if not check_if_nutrient_dosing_needed(current_ec):
+            return False
+        if not _dose_nutrients(trigger="Reactive EC"):
+            return False  # chain check stays armed
+        _dose_running = True
+        # The pending chain check is superseded; stopping this dose re-arms it
+        scheduler = get_scheduler()
+        if scheduler and scheduler.get_job('nutrient_start'):
+            scheduler.remove_job('nutrient_start')
+        return True
 
 def stop_nutrient_pumps_static():
     """Static function to stop nutrient pumps - safe for APScheduler"""
+    global _last_dose_stopped_at, _dose_running
     try:
         logger.info("==== STATIC NUTRIENT PUMP STOP TRIGGERED ====")
         
@@ -276,10 +318,15 @@ def stop_nutrient_pumps_static():
         if not relay:
             logger.error("[STATIC] No relay available for nutrient pump stop")
             return
-            
-        relay.set_relay("NutrientPumpA", False)
-        relay.set_relay("NutrientPumpB", False)
-        relay.set_relay("NutrientPumpC", False)
+
+        # The stop job is already gone while this runs: hold the dosing lock
+        # so no reactive dose starts before the stop time is recorded
+        with _dosing_lock:
+            relay.set_relay("NutrientPumpA", False)
+            relay.set_relay("NutrientPumpB", False)
+            relay.set_relay("NutrientPumpC", False)
+            _last_dose_stopped_at = time.monotonic()
+            _dose_running = False
         logger.info("[STATIC] Nutrient pumps stopped")
 
         if audit:
@@ -379,6 +426,7 @@ def initialize_nutrient_schedule():
 
 def stop_nutrient_schedule():
     """Stop all nutrient pump scheduling"""
+    global _dose_running
     try:
         scheduler = get_scheduler()
         if scheduler:
@@ -397,6 +445,7 @@ def stop_nutrient_schedule():
             relay.set_relay("NutrientPumpA", False)
             relay.set_relay("NutrientPumpB", False)
             relay.set_relay("NutrientPumpC", False)
+            _dose_running = False
             logger.info("[STOP] Nutrient pumps turned off")
             
     except Exception as e:
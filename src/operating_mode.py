@@ -0,0 +1,129 @@
+"""
+Operating mode and Edge heartbeat state, owned by the controller process.
+
+Ripple runs "passive" while Lumina-Edge sends heartbeats and "autonomous"
+otherwise. The state used to live in server.py, and main.py's heartbeat
+timeout check imported server to read it. In the controller process that
+import only gave it a fresh copy of the module that never saw a
+heartbeat, so the timeout could not fire.
+
+ModeState now lives in the controller. server.py reports each heartbeat
+over the controller channel (src/controller_ipc.py), and main.py checks
+the timeout against the same object. The Edge IP is kept here for
+audit_sync. It is also written to data/edge_ip.txt when it changes, so it
+survives a controller restart.
+
+Usage:
+    state = get_mode_state()
+    state.heartbeat("10.0.0.2")           # -> {"mode": "passive", "previous_mode": "autonomous", ...}
+    elapsed = state.check_timeout()       # seconds since the last heartbeat if it just timed out
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+try:
+    from src.lumina_logger import GlobalLogger
+    logger = GlobalLogger("RippleMode", log_prefix="ripple_").logger
+except Exception:
+    import logging
+    logger = logging.getLogger(__name__)
+
+try:
+    from src import io_accounting
+except ImportError:
+    import io_accounting
+
+PASSIVE, AUTONOMOUS = "passive", "autonomous"
+HEARTBEAT_TIMEOUT_S = 60      # Switch to autonomous after 60s without heartbeat
+
+EDGE_IP_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "edge_ip.txt")
+
+
+class ModeState:
+    """
+    Thread-safe mode, last heartbeat time and Edge IP.
+
+    Args:
+        edge_ip_file (str): File the Edge IP is persisted to (None to skip)
+        clock (callable): Wall clock, for the heartbeat timestamp
+    """
+
+    def __init__(self, edge_ip_file: Optional[str] = EDGE_IP_FILE, clock: Callable[[], float] = time.time):
+        self._lock = threading.Lock()
+        self._edge_ip_file = edge_ip_file
+        self._clock = clock
+        self.mode = AUTONOMOUS         # Autonomous until Edge checks in
+        self.last_heartbeat = 0.0
+        self.edge_ip: Optional[str] = None
+
+    def heartbeat(self, edge_ip: Optional[str] = None) -> Dict[str, Any]:
+        """Record a heartbeat and switch to passive; returns the new and previous mode."""
+        with self._lock:
+            previous = self.mode
+            self.mode = PASSIVE
+            self.last_heartbeat = self._clock()
+            ip_changed = bool(edge_ip) and edge_ip != self.edge_ip
+            if ip_changed:
+                self.edge_ip = edge_ip
+        if previous != PASSIVE:
+            logger.info(f"Mode changed: {previous} -> {PASSIVE}")
+        if ip_changed:
+            self._persist_edge_ip(edge_ip)
+        return {"mode": PASSIVE, "previous_mode": previous, "changed": previous != PASSIVE,
+                "last_heartbeat": self.last_heartbeat}
+
+    def set_mode(self, mode: str) -> str:
+        """Set the mode; returns the previous one."""
+        with self._lock:
+            previous, self.mode = self.mode, mode
+        if previous != mode:
+            logger.info(f"Mode changed: {previous} -> {mode}")
+        return previous
+
+    def check_timeout(self, timeout: float = HEARTBEAT_TIMEOUT_S) -> Optional[float]:
+        """
+        Switch to autonomous if passive and no heartbeat arrived within timeout.
+
+        Returns:
+            float: Seconds since the last heartbeat when it just timed out, else None
+        """
+        with self._lock:
+            if self.mode != PASSIVE or not self.last_heartbeat:
+                return None
+            elapsed = self._clock() - self.last_heartbeat
+            if elapsed <= timeout:
+                return None
+            self.mode = AUTONOMOUS
+        logger.info(f"Mode changed: {PASSIVE} -> {AUTONOMOUS}")
+        return elapsed
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"mode": self.mode, "last_heartbeat": self.last_heartbeat,
+                    "edge_ip": self.edge_ip, "timeout_s": HEARTBEAT_TIMEOUT_S}
+
+    def _persist_edge_ip(self, edge_ip: str):
+        if not self._edge_ip_file:
+            return
+        try:
+            with io_accounting.open_accounted("edge_ip", self._edge_ip_file, "w") as f:
+                f.write(edge_ip)
+            logger.info(f"Persisted edge_ip={edge_ip} to {self._edge_ip_file}")
+        except Exception as e:
+            logger.error(f"Failed to persist edge_ip: {e}")
+
+
+_state: Optional[ModeState] = None
+_state_lock = threading.Lock()
+
+
+def get_mode_state() -> ModeState:
+    """Process-wide mode state (meaningful in the controller process)."""
+    global _state
+    with _state_lock:
+        if _state is None:
+            _state = ModeState()
+        return _state
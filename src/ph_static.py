@@ -9,10 +9,10 @@ Created: 2025-09-23
 Author: Linus-style simplification
 """
 
-import configparser
 import os
 import time
 import json
+import threading
 from datetime import datetime, timedelta
 # APScheduler imports removed - using global scheduler from globals.py
 
@@ -23,6 +23,16 @@ except Exception:
     import logging
     logger = logging.getLogger(__name__)
 
+try:
+    from src.config_snapshot import get_config_snapshot
+except ImportError:
+    from config_snapshot import get_config_snapshot
+
+try:
+    from src.poll_scheduler import realtime_boost
+except ImportError:
+    from poll_scheduler import realtime_boost
+
 try:
     from audit_event import audit
 except Exception:
@@ -43,25 +53,27 @@ def get_scheduler():
 # than assume dosing is needed — avoids saw-tooth oscillation on restart.
 _ph_dosing_active = False
 
-def get_ph_config():
-    """Get pH pump configuration from device.conf"""
-    try:
-        config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'device.conf')
-        config = configparser.ConfigParser()
-        config.read(config_path)
-        
-        # Get both default (first) and operational (second) values
-        on_str = config.get('NutrientPump', 'ph_pump_on_duration')
-        wait_str = config.get('NutrientPump', 'ph_pump_wait_duration')
+# time.monotonic() when the pH pumps were last stopped; the wait duration
+# between doses is measured from here. Seeded with the process start since a
+# restart may have cut a dose short.
+_last_ph_dose_stopped_at = time.monotonic()
 
-        on_duration = on_str.split(',')[1].strip()
-        max_on_duration = on_str.split(',')[0].strip()
-        wait_duration = wait_str.split(',')[1].strip()
+# True from a successful start until the pumps are stopped again
+_ph_dose_running = False
 
-        return on_duration, wait_duration, max_on_duration
-    except Exception as e:
-        logger.error(f"Error reading pH config: {e}")
-        return "00:00:03", "00:02:00", "00:00:05"
+# Serialises check-and-start and stop between the chain jobs and reactive
+# evaluations
+_ph_dosing_lock = threading.Lock()
+
+def _config():
+    """Current device.conf snapshot; re-parsed only when the file changes"""
+    config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'device.conf')
+    return get_config_snapshot(config_path)
+
+def get_ph_config():
+    """Get pH pump configuration from device.conf"""
+    config = _config()
+    return config.ph_pump_on_duration, config.ph_pump_wait_duration, config.ph_pump_max_on_duration
 
 def parse_duration(duration_str):
     """Parse HH:MM:SS to seconds"""
@@ -73,80 +85,59 @@ def parse_duration(duration_str):
 
 def get_ph_targets():
     """Get pH target, deadband, and limits from device.conf"""
-    try:
-        config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'device.conf')
-        config = configparser.ConfigParser()
-        config.read(config_path)
-        
-        # Get operational values (second value after comma)
-        target_str = config.get('pH', 'ph_target')
-        deadband_str = config.get('pH', 'ph_deadband')
-        
-        target = float(target_str.split(',')[1].strip())
-        deadband = float(deadband_str.split(',')[1].strip())
-        
-        # Get pH limits if available
-        try:
-            min_str = config.get('pH', 'ph_min')
-            max_str = config.get('pH', 'ph_max')
-            ph_min = float(min_str.split(',')[1].strip())
-            ph_max = float(max_str.split(',')[1].strip())
-        except:
-            # Default limits if not configured
-            ph_min = 4.0
-            ph_max = 8.0
-        
-        return target, deadband, ph_min, ph_max
-    except Exception as e:
-        logger.error(f"Error reading pH targets: {e}")
-        return 6.0, 0.2, 4.0, 8.0  # Default: target=6.0, deadband=0.2, min=4.0, max=8.0
+    config = _config()
+    return config.ph_target, config.ph_deadband, config.ph_min, config.ph_max
 
-def check_if_ph_adjustment_needed():
+def check_if_ph_adjustment_needed(ph_value=None):
     """Check pH levels to determine if adjustment is needed and which pump to use.
 
+    Args:
+        ph_value (float): Fresh validated reading (reactive mode). When None
+            the latest value is read from the pH log, subject to its age limit.
+
     Returns:
         (needs_adjustment, use_ph_up, dose_factor):
             dose_factor (0.5–1.0) scales the configured pump duration proportionally.
             Full dose far from target, half dose near target.
     """
     try:
-        # Get current pH reading from log file (same approach as scheduler)
-        ph_value = None
-        data_timestamp = None
-        max_data_age = timedelta(minutes=2)
-        ph_log_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'sensor_data.data.water_metrics.ph.log')
+        if ph_value is None:
+            # Get current pH reading from log file (same approach as scheduler)
+            data_timestamp = None
+            max_data_age = timedelta(minutes=2)
+            ph_log_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'sensor_data.data.water_metrics.ph.log')
         
-        try:
-            if os.path.exists(ph_log_path):
-                with open(ph_log_path, 'r') as f:
-                    lines = f.readlines()
-                    if lines:
-                        last_line = lines[-1].strip()
-                        if last_line:
-                            parts = last_line.split('\t', 2)
-                            if len(parts) >= 3:
-                                timestamp_str = parts[0]
-                                json_data = parts[2]
-                                data = json.loads(json_data)
+            try:
+                if os.path.exists(ph_log_path):
+                    with open(ph_log_path, 'r') as f:
+                        lines = f.readlines()
+                        if lines:
+                            last_line = lines[-1].strip()
+                            if last_line:
+                                parts = last_line.split('\t', 2)
+                                if len(parts) >= 3:
+                                    timestamp_str = parts[0]
+                                    json_data = parts[2]
+                                    data = json.loads(json_data)
                                 
-                                if ('measurements' in data 
-                                    and 'points' in data['measurements'] 
-                                    and len(data['measurements']['points']) > 0
-                                    and 'fields' in data['measurements']['points'][0]
-                                    and 'value' in data['measurements']['points'][0]['fields']):
-                                    ph_value = float(data['measurements']['points'][0]['fields']['value'])
-                                    data_timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-        except Exception as e:
-            logger.error(f"[SENSOR] Error reading pH log: {e}")
+                                    if ('measurements' in data 
+                                        and 'points' in data['measurements'] 
+                                        and len(data['measurements']['points']) > 0
+                                        and 'fields' in data['measurements']['points'][0]
+                                        and 'value' in data['measurements']['points'][0]['fields']):
+                                        ph_value = float(data['measurements']['points'][0]['fields']['value'])
+                                        data_timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
+            except Exception as e:
+                logger.error(f"[SENSOR] Error reading pH log: {e}")
             
-        if ph_value is None:
-            logger.warning("[SENSOR] Could not read pH sensor, skipping adjustment decision")
-            return False, None, 1.0
-
-        # Check data freshness
-        if data_timestamp and datetime.now(data_timestamp.tzinfo) - data_timestamp > max_data_age:
-            logger.warning(f"[SENSOR] pH data too old ({data_timestamp}), skipping adjustment")
-            return False, None, 1.0
+            if ph_value is None:
+                logger.warning("[SENSOR] Could not read pH sensor, skipping adjustment decision")
+                return False, None, 1.0
+
+            # Check data freshness
+            if data_timestamp and datetime.now(data_timestamp.tzinfo) - data_timestamp > max_data_age:
+                logger.warning(f"[SENSOR] pH data too old ({data_timestamp}), skipping adjustment")
+                return False, None, 1.0
             
         # Get targets and limits
         target_ph, ph_deadband, ph_min, ph_max = get_ph_targets()
@@ -210,17 +201,33 @@ def check_if_ph_adjustment_needed():
 
 def start_ph_pump_static():
     """Static function to start pH pump - SENSOR DRIVEN - safe for APScheduler"""
+    global _ph_dose_running
     try:
         logger.info("==== SENSOR-DRIVEN pH CHECK TRIGGERED ====")
-        
-        # Check if adjustment needed
-        adjustment_needed, use_ph_up, dose_factor = check_if_ph_adjustment_needed()
 
-        if not adjustment_needed:
-            logger.info("[SENSOR-DRIVEN] pH levels adequate - skipping adjustment")
-            schedule_next_ph_cycle_static()  # Schedule next check
-            return
+        with _ph_dosing_lock:
+            if _ph_dose_running:
+                # A reactive dose started meanwhile; its stop re-arms the chain
+                logger.info("[SENSOR-DRIVEN] pH dose already running - skipping chain check")
+                return
+
+            # Check if adjustment needed
+            adjustment_needed, use_ph_up, dose_factor = check_if_ph_adjustment_needed()
 
+            if not adjustment_needed:
+                logger.info("[SENSOR-DRIVEN] pH levels adequate - skipping adjustment")
+                schedule_next_ph_cycle_static()  # Schedule next check
+                return
+
+            _ph_dose_running = _dose_ph(use_ph_up, dose_factor)
+
+    except Exception as e:
+        logger.error(f"[SENSOR-DRIVEN] Error in pH pump logic: {e}")
+        logger.exception("[SENSOR-DRIVEN] Full exception details:")
+
+def _dose_ph(use_ph_up, dose_factor, trigger=""):
+    """Start one pH pump for a scaled dose and schedule its stop; True if started"""
+    try:
         # Get configuration and apply proportional scaling
         on_duration_str, wait_duration_str, max_on_duration_str = get_ph_config()
         on_seconds = parse_duration(on_duration_str)
@@ -229,14 +236,14 @@ def start_ph_pump_static():
 
         if on_seconds == 0:
             logger.warning("[SENSOR-DRIVEN] pH pump duration is 0, skipping")
-            return
+            return False
 
         # Turn on appropriate pH pump
         from src.sensors.Relay import Relay
         relay = Relay()
         if not relay:
             logger.error("[SENSOR-DRIVEN] No relay available for pH pump start")
-            return
+            return False
 
         if use_ph_up:
             result = relay.set_ph_plus_pump(True)
@@ -253,17 +260,62 @@ def start_ph_pump_static():
                        source="autonomous",
                        value={"duration_s": scaled_seconds, "dose_factor": round(dose_factor, 2),
                               "base_duration_s": on_seconds},
-                       details=f"{pump_type} pump for {scaled_seconds}s (factor {dose_factor:.0%})")
+                       details=f"{trigger}{pump_type} pump for {scaled_seconds}s (factor {dose_factor:.0%})")
 
         # Schedule stop
         schedule_ph_stop_static(scaled_seconds, use_ph_up)
+        # Follow the pH response closely while the dose mixes in
+        realtime_boost("ph", "ph_dose", duration=scaled_seconds, settle=True)
+        return True
         
     except Exception as e:
-        logger.error(f"[SENSOR-DRIVEN] Error in pH pump logic: {e}")
+        logger.error(f"[SENSOR-DRIVEN] Error starting pH dose: {e}")
         logger.exception("[SENSOR-DRIVEN] Full exception details:")
+        return False
+
+def seconds_until_ph_dose_allowed():
+    """Seconds before another pH dose may start (0 if now; inf while a pump is on).
+
+    Reactive evaluations keep the chain's spacing: no dose while one is
+    running, and at least the pH wait duration after the previous one.
+    """
+    scheduler = get_scheduler()
+    if scheduler and scheduler.get_job('ph_stop'):
+        return float('inf')
+    if _last_ph_dose_stopped_at is None:
+        return 0.0
+    _, wait_duration_str, _ = get_ph_config()
+    elapsed = time.monotonic() - _last_ph_dose_stopped_at
+    return max(0.0, parse_duration(wait_duration_str) - elapsed)
+
+def evaluate_ph_adjustment_now(ph_value):
+    """Reactive mode: decide on a fresh pH reading instead of waiting for the chain.
+
+    Args:
+        ph_value (float): Validated pH reading
+
+    Returns:
+        bool: True if a dose was started
+    """
+    global _ph_dose_running
+    with _ph_dosing_lock:
+        if seconds_until_ph_dose_allowed() > 0:
+            return False
+        adjustment_needed, use_ph_up, dose_factor = check_if_ph_adjustment_needed(ph_value)
+        if not adjustment_needed:
+            return False
+        if not _dose_ph(use_ph_up, dose_factor, trigger="Reactive: "):
+            return False  # chain check stays armed
+        _ph_dose_running = True
+        # The pending chain check is superseded; stopping this dose re-arms it
+        scheduler = get_scheduler()
+        if scheduler and scheduler.get_job('ph_start'):
+            scheduler.remove_job('ph_start')
+        return True
 
 def stop_ph_pump_static():
     """Static function to stop pH pumps - safe for APScheduler"""
+    global _last_ph_dose_stopped_at, _ph_dose_running
     try:
         logger.info("==== STATIC pH PUMP STOP TRIGGERED ====")
         
@@ -274,8 +326,13 @@ def stop_ph_pump_static():
             logger.error("[STATIC] No relay available for pH pump stop")
             return
             
-        relay.set_ph_plus_pump(False)
-        relay.set_ph_minus_pump(False)
+        # The stop job is already gone while this runs: hold the dosing lock
+        # so no reactive dose starts before the stop time is recorded
+        with _ph_dosing_lock:
+            relay.set_ph_plus_pump(False)
+            relay.set_ph_minus_pump(False)
+            _last_ph_dose_stopped_at = time.monotonic()
+            _ph_dose_running = False
         logger.info("[STATIC] pH pumps stopped")
 
         if audit:
@@ -365,6 +422,7 @@ def initialize_ph_schedule():
 
 def stop_ph_schedule():
     """Stop all pH pump scheduling"""
+    global _ph_dose_running
     try:
         scheduler = get_scheduler()
         if scheduler:
@@ -382,6 +440,7 @@ def stop_ph_schedule():
         if relay:
             relay.set_ph_plus_pump(False)
             relay.set_ph_minus_pump(False)
+            _ph_dose_running = False
             logger.info("[STOP] pH pumps turned off")
             
     except Exception as e:
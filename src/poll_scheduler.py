@@ -0,0 +1,376 @@
+"""
+Deadline-based sensor polling.
+
+The main loop used to poll water level, relays, pH, EC and NPK in a fixed
+order with 0.5 s sleeps between them (plus 0.3 s per EC sensor) and then
+sleep 10 s, so every sensor ran at the same ~12 s rate and the sleeps held
+the loop even when the sensors sat on different serial buses.
+
+Each sensor class is now a PollTask with its own interval (device.conf
+[POLLING], e.g. water level 2 s, EC/pH 10 s, NPK 60 s). Deadlines sit on a
+fixed grid (start + n * interval), so a slow poll does not push every later
+poll back. If the loop falls more than a whole interval behind, the missed
+deadlines are counted as skipped rather than run back to back.
+
+Spacing between Modbus frames is enforced per serial bus by a BusGate:
+frames for the same port are at least bus_min_frame_gap_seconds apart,
+frames for different ports do not wait for each other.
+
+Realtime mode: while an actuator is running, the sensors that matter for it
+are polled faster (water level every 1 s during a drain or fill, EC/pH for
+a settle window after a dose). Actuator code calls realtime_boost() and
+realtime_release(); boosts also expire on their own so a missed release
+cannot pin a fast rate. Boosted tasks share a budget of polls per second
+(realtime_max_polls_per_second); when the requested rates exceed it, every
+boosted interval is stretched by the same factor so the rest of the bus
+keeps its share.
+
+Usage:
+    scheduler = PollScheduler()
+    scheduler.add("water_level", 2.0, WaterLevel.get_statuses_async)
+    while True:
+        scheduler.run_pending()
+        time.sleep(scheduler.time_until_next())
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    from src.lumina_logger import GlobalLogger
+    logger = GlobalLogger("RipplePollScheduler", log_prefix="ripple_").logger
+except Exception:
+    import logging
+    logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_FRAME_GAP = 0.1     # Seconds between frames on one serial bus
+MAX_IDLE_SLEEP = 1.0            # Upper bound on one idle sleep so interval changes apply promptly
+DEFAULT_MAX_BOOST_SECONDS = 600.0   # Expiry of a realtime boost given without a duration
+
+
+class BusGate:
+    """
+    Minimum gap between Modbus frames queued for the same serial bus.
+
+    Args:
+        min_gap (float): Seconds between two frames on one bus
+        clock (callable): Monotonic clock, injectable for tests
+        sleep (callable): Sleep function, injectable for tests
+    """
+
+    def __init__(self, min_gap: float = DEFAULT_MIN_FRAME_GAP,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.min_gap = min_gap
+        self._clock = clock
+        self._sleep = sleep
+        self._last_frame: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, bus: Optional[str]) -> float:
+        """
+        Block until a frame may be queued on bus, and claim the slot.
+
+        Args:
+            bus (str): Serial port, e.g. "/dev/ttyAMA1". None never waits.
+
+        Returns:
+            float: Seconds waited
+        """
+        if bus is None:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            ready_at = self._last_frame.get(bus, float("-inf")) + self.min_gap
+            delay = max(0.0, ready_at - now)
+            # Claim the slot before sleeping so concurrent callers queue up behind it
+            self._last_frame[bus] = now + delay
+        if delay:
+            self._sleep(delay)
+        return delay
+
+
+_bus_gate = BusGate()
+
+
+def get_bus_gate() -> BusGate:
+    """Process-wide gate shared by all sensor classes."""
+    return _bus_gate
+
+
+class PollTask:
+    """
+    One periodically polled sensor class.
+
+    Args:
+        name (str): Task name, e.g. "ec"
+        interval (float): Seconds between deadlines
+        poll (callable): Queues the reads, e.g. EC.get_statuses_async
+        next_deadline (float): First deadline on the scheduler clock
+    """
+
+    __slots__ = ("name", "interval", "base_interval", "poll", "next_deadline", "runs", "skipped",
+                 "errors", "max_lateness", "last_duration")
+
+    def __init__(self, name: str, interval: float, poll: Callable[[], None], next_deadline: float):
+        self.name = name
+        self.interval = interval
+        self.base_interval = interval
+        self.poll = poll
+        self.next_deadline = next_deadline
+        self.runs = 0
+        self.skipped = 0
+        self.errors = 0
+        self.max_lateness = 0.0
+        self.last_duration = 0.0
+
+
+class PollScheduler:
+    """
+    Runs PollTasks on jitter-free deadlines.
+
+    Args:
+        clock (callable): Monotonic clock, injectable for tests
+        on_realtime_change (callable): Called with True/False when the first
+            boost starts and the last one ends
+
+    Note:
+        - Tasks due at the same time run in deadline order, then in the
+          order they were added
+        - A task that raises is logged and keeps its schedule
+        - After a run the next deadline is the previous one plus the
+          interval; whole intervals already in the past are skipped and counted
+        - A boost never makes a task slower than its configured interval
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic,
+                 on_realtime_change: Optional[Callable[[bool], None]] = None):
+        self._clock = clock
+        self._tasks: List[PollTask] = []
+        self._lock = threading.Lock()
+        self._on_realtime_change = on_realtime_change
+        # {task name: {reason: (interval, expires_at)}}
+        self._boosts: Dict[str, Dict[str, Tuple[float, float]]] = {}
+        self._realtime_active = False
+        self.realtime_enabled = True
+        self.realtime_intervals: Dict[str, float] = {}
+        self.realtime_max_polls_per_second = 2.0
+        self.realtime_settle_seconds = 0.0
+
+    def add(self, name: str, interval: float, poll: Callable[[], None], offset: float = 0.0) -> PollTask:
+        """
+        Register a task; its first deadline is now + offset.
+
+        Args:
+            name (str): Unique task name
+            interval (float): Seconds between polls, must be > 0
+            poll (callable): Called with no arguments at each deadline
+            offset (float): Delay of the first poll, to stagger tasks
+
+        Returns:
+            PollTask: The registered task
+        """
+        if interval <= 0:
+            raise ValueError(f"Poll interval for {name} must be positive, got {interval}")
+        task = PollTask(name, float(interval), poll, self._clock() + offset)
+        with self._lock:
+            self._tasks.append(task)
+        logger.info(f"[POLL] {name} every {interval:g}s")
+        return task
+
+    def set_interval(self, name: str, interval: float):
+        """Change a task's configured interval; the new grid starts at its next deadline."""
+        if interval <= 0:
+            raise ValueError(f"Poll interval for {name} must be positive, got {interval}")
+        with self._lock:
+            for task in self._tasks:
+                if task.name == name and task.base_interval != interval:
+                    logger.info(f"[POLL] {name} interval {task.base_interval:g}s -> {interval:g}s")
+                    task.base_interval = float(interval)
+            self._apply_intervals()
+
+    def configure_realtime(self, enabled: bool, intervals: Dict[str, float],
+                           max_polls_per_second: float, settle_seconds: float):
+        """
+        Set realtime-mode limits (device.conf [POLLING] realtime_* keys).
+
+        Args:
+            enabled (bool): False drops active boosts and ignores new ones
+            intervals (dict): Boosted interval per task name
+            max_polls_per_second (float): Budget shared by all boosted tasks
+            settle_seconds (float): Extra boost time after a dose ends
+        """
+        with self._lock:
+            self.realtime_enabled = enabled
+            self.realtime_intervals = dict(intervals)
+            self.realtime_max_polls_per_second = max_polls_per_second
+            self.realtime_settle_seconds = settle_seconds
+            if not enabled:
+                self._boosts.clear()
+            self._apply_intervals()
+
+    def boost(self, name: str, reason: str, duration: Optional[float] = None) -> bool:
+        """
+        Poll a task at its realtime interval until released or expired.
+
+        Args:
+            name (str): Task name, e.g. "water_level"
+            reason (str): Actuator holding the boost, e.g. "drain"; boosting
+                again with the same reason refreshes the expiry
+            duration (float): Seconds until the boost expires on its own
+                (DEFAULT_MAX_BOOST_SECONDS if None)
+
+        Returns:
+            bool: False if realtime mode is off or the task has no realtime interval
+        """
+        with self._lock:
+            interval = self.realtime_intervals.get(name)
+            if not self.realtime_enabled or not interval or interval <= 0:
+                return False
+            expires_at = self._clock() + (DEFAULT_MAX_BOOST_SECONDS if duration is None else duration)
+            self._boosts.setdefault(name, {})[reason] = (float(interval), expires_at)
+            self._apply_intervals()
+            return True
+
+    def release(self, name: str, reason: str):
+        """End the boost reason holds on a task; the task reverts once no boost is left."""
+        with self._lock:
+            if self._boosts.get(name, {}).pop(reason, None) is not None:
+                self._apply_intervals()
+
+    def realtime_active(self) -> bool:
+        """True while any task runs at a boosted interval."""
+        return self._realtime_active
+
+    def _apply_intervals(self):
+        # Called with self._lock held. Drops expired boosts, fits the boosted
+        # rates into the budget and moves deadlines forward for faster tasks.
+        now = self._clock()
+        for reasons in self._boosts.values():
+            for reason in [r for r, (_, expires_at) in reasons.items() if expires_at <= now]:
+                del reasons[reason]
+        requested = {name: min(interval for interval, _ in reasons.values())
+                     for name, reasons in self._boosts.items() if reasons}
+        rate = sum(1.0 / interval for interval in requested.values())
+        stretch = 1.0
+        if self.realtime_max_polls_per_second > 0 and rate > self.realtime_max_polls_per_second:
+            stretch = rate / self.realtime_max_polls_per_second
+        for task in self._tasks:
+            interval = task.base_interval
+            if task.name in requested:
+                interval = min(interval, requested[task.name] * stretch)
+            if interval != task.interval:
+                logger.info(f"[REALTIME] {task.name} interval {task.interval:g}s -> {interval:g}s"
+                            + (f" (budget x{stretch:.2f})" if task.name in requested and stretch > 1 else ""))
+                task.next_deadline = min(task.next_deadline, now + interval)
+                task.interval = interval
+        active = bool(requested)
+        if active != self._realtime_active:
+            self._realtime_active = active
+            logger.info(f"[REALTIME] Realtime mode {'on' if active else 'off'}")
+            if self._on_realtime_change:
+                try:
+                    self._on_realtime_change(active)
+                except Exception as e:
+                    logger.error(f"[REALTIME] Realtime change callback failed: {e}")
+
+    def time_until_next(self) -> float:
+        """Seconds until the earliest deadline (0 if one is already due)."""
+        with self._lock:
+            if not self._tasks:
+                return MAX_IDLE_SLEEP
+            earliest = min(task.next_deadline for task in self._tasks)
+        return max(0.0, min(earliest - self._clock(), MAX_IDLE_SLEEP))
+
+    def run_pending(self) -> List[str]:
+        """
+        Run every task whose deadline has passed.
+
+        Returns:
+            list: Names of the tasks that ran
+        """
+        now = self._clock()
+        with self._lock:
+            if self._realtime_active:
+                self._apply_intervals()
+            due = sorted((task for task in self._tasks if task.next_deadline <= now),
+                         key=lambda task: task.next_deadline)
+        ran = []
+        for task in due:
+            started = self._clock()
+            lag = started - task.next_deadline
+            if lag >= task.interval:
+                # More than a whole interval behind: drop the stale deadlines and
+                # run the latest one, rather than all of them back to back
+                missed = int(lag // task.interval)
+                task.skipped += missed
+                task.next_deadline += missed * task.interval
+                logger.warning(f"[POLL] {task.name} skipped {missed} deadline(s); "
+                               f"{task.skipped} skipped in total")
+            task.max_lateness = max(task.max_lateness, started - task.next_deadline)
+            try:
+                task.poll()
+            except Exception as e:
+                task.errors += 1
+                logger.error(f"[POLL] {task.name} failed: {e}")
+            task.runs += 1
+            task.last_duration = self._clock() - started
+            task.next_deadline += task.interval
+            ran.append(task.name)
+        return ran
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-task interval, runs, skipped deadlines, errors and worst lateness."""
+        with self._lock:
+            return {
+                task.name: {
+                    "interval_s": task.interval,
+                    "base_interval_s": task.base_interval,
+                    "boosted_by": sorted(self._boosts.get(task.name, {})),
+                    "runs": task.runs,
+                    "skipped": task.skipped,
+                    "errors": task.errors,
+                    "max_lateness_ms": round(task.max_lateness * 1000, 1),
+                    "last_duration_ms": round(task.last_duration * 1000, 1),
+                }
+                for task in self._tasks
+            }
+
+
+_active_scheduler: Optional[PollScheduler] = None
+
+
+def set_active_scheduler(scheduler: Optional[PollScheduler]):
+    """Make scheduler the target of realtime_boost/realtime_release (main.py only)."""
+    global _active_scheduler
+    _active_scheduler = scheduler
+
+
+def realtime_boost(name: str, reason: str, duration: Optional[float] = None, settle: bool = False) -> bool:
+    """
+    Boost a task on the controller's scheduler; a no-op in other processes.
+
+    Args:
+        name (str): Task name
+        reason (str): Actuator holding the boost
+        duration (float): Seconds until it expires (see PollScheduler.boost)
+        settle (bool): Add the configured settle window, e.g. for mixing after a dose
+    """
+    scheduler = _active_scheduler
+    if scheduler is None:
+        return False
+    if settle and duration is not None:
+        duration += scheduler.realtime_settle_seconds
+    try:
+        return scheduler.boost(name, reason, duration)
+    except Exception as e:
+        logger.error(f"[REALTIME] Could not boost {name} for {reason}: {e}")
+        return False
+
+
+def realtime_release(name: str, reason: str):
+    """Release a boost on the controller's scheduler; a no-op in other processes."""
+    scheduler = _active_scheduler
+    if scheduler is not None:
+        scheduler.release(name, reason)
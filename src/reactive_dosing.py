@@ -0,0 +1,169 @@
+"""
+Event-driven dosing evaluation on fresh sensor readings.
+
+EC and pH dosing decisions run in APScheduler chains: check, dose, wait,
+check again. A drift that starts just after a check is only seen at the next
+one, up to a full wait duration later, even though the sensors report every
+few seconds.
+
+With reactive_dosing_enabled in [NutrientPump], each EC/pH reading that
+passes sensor_validation (range, and change against the previous reading of
+the same sensor) also triggers a dosing evaluation against that value, at
+most once per reactive_min_evaluation_interval_seconds per kind. The dosing
+rules are unchanged: the evaluation goes through the same hysteresis check
+as the chain, and no dose starts while a pump is running or before the
+configured wait duration has passed since the previous dose stopped. The
+chain keeps running as the fallback when readings stop arriving.
+
+Evaluators are registered only by main.py, so readings taken in other
+processes (server.py, scripts) never dose.
+
+Usage:
+    register(ReactiveEvaluator("ec", nutrient_static.evaluate_nutrient_dosing_now,
+                               is_valid_ec, is_ec_change_valid))
+    notify_reading("ec", 1.12, sensor_id="ec_1")
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+try:
+    from src.lumina_logger import GlobalLogger
+    logger = GlobalLogger("RippleReactiveDosing", log_prefix="ripple_").logger
+except Exception:
+    import logging
+    logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_EVALUATION_INTERVAL = 30.0   # Seconds between evaluations per kind
+
+
+class ReactiveEvaluator:
+    """
+    Rate-limited dosing evaluation for one sensor kind.
+
+    Args:
+        kind (str): "ec" or "ph"
+        evaluate (callable): evaluate(value) -> bool, True if a dose started.
+            Applies the dosing rules (hysteresis, wait between doses).
+        is_valid (callable): Range check for a single reading
+        is_change_valid (callable): is_change_valid(previous, current)
+        min_interval (float): Seconds between evaluations
+        enabled (bool): Evaluate at all; readings are still tracked when off
+        clock (callable): Monotonic clock, injectable for tests
+        run_async (bool): Evaluate on a worker thread so the Modbus response
+            thread is never held by relay writes
+
+    Note:
+        - The first reading of a sensor only sets its baseline; a value is
+          acted on once a following reading confirms the change is plausible
+        - A rejected reading still becomes the baseline, so a real step change
+          is accepted on the next reading instead of being rejected forever
+        - Readings that arrive while an evaluation is still running are dropped
+    """
+
+    def __init__(self, kind: str, evaluate: Callable[[float], bool],
+                 is_valid: Callable[[float], bool],
+                 is_change_valid: Callable[[float, float], bool],
+                 min_interval: float = DEFAULT_MIN_EVALUATION_INTERVAL,
+                 enabled: bool = False,
+                 clock: Callable[[], float] = time.monotonic,
+                 run_async: bool = True):
+        self.kind = kind
+        self.min_interval = min_interval
+        self.enabled = enabled
+        self._evaluate = evaluate
+        self._is_valid = is_valid
+        self._is_change_valid = is_change_valid
+        self._clock = clock
+        self._run_async = run_async
+        self._previous: Dict[Optional[str], float] = {}
+        self._last_evaluation: Optional[float] = None
+        self._busy = False
+        self._lock = threading.Lock()
+        self.counts = {"readings": 0, "rejected": 0, "throttled": 0, "evaluations": 0, "doses": 0}
+
+    def configure(self, enabled: bool, min_interval: float):
+        """Apply device.conf changes."""
+        if enabled != self.enabled or min_interval != self.min_interval:
+            logger.info(f"[REACTIVE] {self.kind}: enabled={enabled}, min interval {min_interval:g}s")
+        self.enabled = enabled
+        self.min_interval = min_interval
+
+    def on_reading(self, value, sensor_id: Optional[str] = None) -> str:
+        """
+        Handle one fresh reading.
+
+        Args:
+            value (float): Reading as reported by the sensor
+            sensor_id (str): Sensor the reading came from; change checks are per sensor
+
+        Returns:
+            str: "disabled", "rejected", "baseline", "throttled", "busy" or "evaluating"
+        """
+        with self._lock:
+            self.counts["readings"] += 1
+            if not self._is_valid(value):
+                self.counts["rejected"] += 1
+                return "rejected"
+            previous = self._previous.get(sensor_id)
+            self._previous[sensor_id] = value
+            if not self.enabled:
+                return "disabled"
+            if previous is None:
+                return "baseline"
+            if not self._is_change_valid(previous, value):
+                self.counts["rejected"] += 1
+                logger.warning(f"[REACTIVE] {self.kind} {previous} -> {value} rejected as implausible")
+                return "rejected"
+            now = self._clock()
+            if self._last_evaluation is not None and now - self._last_evaluation < self.min_interval:
+                self.counts["throttled"] += 1
+                return "throttled"
+            if self._busy:
+                return "busy"
+            self._busy = True
+            self._last_evaluation = now
+            self.counts["evaluations"] += 1
+
+        if self._run_async:
+            threading.Thread(target=self._run, args=(value,), daemon=True,
+                             name=f"reactive-{self.kind}").start()
+        else:
+            self._run(value)
+        return "evaluating"
+
+    def _run(self, value):
+        try:
+            if self._evaluate(value):
+                with self._lock:
+                    self.counts["doses"] += 1
+                logger.info(f"[REACTIVE] {self.kind} dose started on reading {value}")
+        except Exception as e:
+            logger.error(f"[REACTIVE] {self.kind} evaluation failed: {e}")
+        finally:
+            with self._lock:
+                self._busy = False
+
+
+_evaluators: Dict[str, ReactiveEvaluator] = {}
+
+
+def register(evaluator: ReactiveEvaluator):
+    """Route readings of evaluator.kind to evaluator (main.py only)."""
+    _evaluators[evaluator.kind] = evaluator
+
+
+def get_evaluator(kind: str) -> Optional[ReactiveEvaluator]:
+    return _evaluators.get(kind)
+
+
+def notify_reading(kind: str, value, sensor_id: Optional[str] = None):
+    """Called by the sensor classes after saving a reading; no-op without an evaluator."""
+    evaluator = _evaluators.get(kind)
+    if evaluator is None or value is None:
+        return
+    try:
+        evaluator.on_reading(value, sensor_id)
+    except Exception as e:
+        logger.error(f"[REACTIVE] Error handling {kind} reading: {e}")
@@ -0,0 +1,136 @@
+"""
+Slotted sensor reading types.
+
+A sensor poll used to be turned straight into the nested
+{"measurements": {"name", "points": [{"tags", "fields", "timestamp"}]}} dict
+before anything looked at it. Readings now travel as small slotted objects.
+The legacy dict is built lazily, once, only when the saved_sensor_data.json
+snapshot or the raw sensor log actually needs it.
+
+Usage:
+    readings = ReadingSet("water_metrics", "ph", "ph", self.sensor_id, self.last_updated, [
+        Reading("value", self.sensor_id, self.ph, "pH"),
+        Reading("temperature", self.sensor_id, self.temperature, "°C"),
+    ])
+    helpers.save_readings(['data', 'water_metrics', 'ph'], readings)
+"""
+
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+QUALITY_GOOD = "good"
+QUALITY_MISSING = "missing"  # Sensor did not answer or value failed validation
+
+
+class Reading:
+    """
+    One measured value from one sensor.
+
+    Args:
+        metric (str): Field name, e.g. "value", "temperature", "tds"
+        sensor_id (str): Sensor instance id (location tag), e.g. "ec_main"
+        value: Measured value; numbers, strings or None
+        unit (str): Display unit, e.g. "mS/cm"
+        timestamp (str): ISO 8601 time of the reading
+        quality (str): QUALITY_GOOD, or QUALITY_MISSING when value is None
+    """
+
+    __slots__ = ("metric", "sensor_id", "value", "unit", "timestamp", "quality")
+
+    def __init__(self, metric: str, sensor_id: str, value: Any, unit: Optional[str] = None,
+                 timestamp: Optional[str] = None, quality: Optional[str] = None):
+        self.metric = metric
+        self.sensor_id = sensor_id
+        self.value = value
+        self.unit = unit
+        self.timestamp = timestamp
+        self.quality = quality or (QUALITY_MISSING if value is None else QUALITY_GOOD)
+
+    def __repr__(self):
+        return (f"Reading({self.metric!r}, {self.sensor_id!r}, {self.value!r}, "
+                f"unit={self.unit!r}, quality={self.quality!r})")
+
+    def __eq__(self, other):
+        if not isinstance(other, Reading):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+
+def _legacy_value(value):
+    return round(value, 2) if isinstance(value, float) else value
+
+
+class ReadingSet:
+    """
+    All readings from one sensor poll, plus the tags of the legacy point.
+
+    Args:
+        name (str): Measurement group, e.g. "water_metrics"
+        sensor (str): Sensor type tag, e.g. "ec"
+        measurement (str): Measurement tag, e.g. "ec" or "level"
+        sensor_id (str): Location tag / sensor instance id
+        timestamp (str): ISO 8601 time of the poll
+        readings (iterable): Reading objects in legacy field order
+
+    Note:
+        - to_legacy() is computed on first use and cached; the set must not be
+          mutated afterwards
+        - Readings inherit the set timestamp when they have none
+    """
+
+    __slots__ = ("name", "sensor", "measurement", "sensor_id", "timestamp", "readings", "_legacy")
+
+    def __init__(self, name: str, sensor: str, measurement: str, sensor_id: str,
+                 timestamp: Optional[str], readings: Iterable[Reading]):
+        self.name = name
+        self.sensor = sensor
+        self.measurement = measurement
+        self.sensor_id = sensor_id
+        self.timestamp = timestamp
+        self.readings: Tuple[Reading, ...] = tuple(readings)
+        for reading in self.readings:
+            if reading.timestamp is None:
+                reading.timestamp = timestamp
+        self._legacy = None
+
+    def __iter__(self) -> Iterator[Reading]:
+        return iter(self.readings)
+
+    def __len__(self):
+        return len(self.readings)
+
+    def get(self, metric: str, default=None):
+        """Return the value of one metric, or default."""
+        for reading in self.readings:
+            if reading.metric == metric:
+                return reading.value
+        return default
+
+    def metric_name(self, reading: Reading) -> str:
+        """Dotted name used by the rollups, e.g. "water_metrics.ec.ec_main.value"."""
+        return f"{self.name}.{self.sensor}.{self.sensor_id}.{reading.metric}"
+
+    def to_legacy(self) -> Dict[str, Any]:
+        """
+        Build (once) the nested measurements dict written to saved_sensor_data.json.
+
+        Returns:
+            dict: {"measurements": {"name", "points": [{"tags", "fields", "timestamp"}]}}
+        """
+        if self._legacy is None:
+            self._legacy = {
+                "measurements": {
+                    "name": self.name,
+                    "points": [
+                        {
+                            "tags": {
+                                "sensor": self.sensor,
+                                "measurement": self.measurement,
+                                "location": self.sensor_id,
+                            },
+                            "fields": {r.metric: _legacy_value(r.value) for r in self.readings},
+                            "timestamp": self.timestamp,
+                        }
+                    ],
+                }
+            }
+        return self._legacy
@@ -0,0 +1,182 @@
+"""
+Relay write coalescing with an anti-chatter window.
+
+Edge /action retries, controller failsafes, safety monitors and startup
+routines often switch the same relay, or switch it back, within a few
+milliseconds. Each command used to become its own Modbus write and its own
+relay click.
+
+RelayCoalescer collects the requested {port: state} changes per board for a
+short window (CONTROL.relay_coalesce_window_seconds). A later command for a
+port replaces the earlier one, so an on/off pair inside the window collapses
+to its final state. When the window closes, ports whose final state equals
+the settled shadow state (confirmed, no write in flight, board read back
+recently) are dropped, and the rest go out as one write per contiguous run
+(Relay.apply_states() planning).
+
+Off commands issued inside safety_priority() skip the window: they are sent
+at once, never dropped as redundant, and cancel any pending change to the
+same port.
+
+Usage:
+    with safety_priority():
+        relay.set_relay("NutrientPumpA", False)
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+try:
+    from src.lumina_logger import GlobalLogger
+    logger = GlobalLogger("RippleRelayCoalescer", log_prefix="ripple_").logger
+except Exception:
+    import logging
+    logger = logging.getLogger(__name__)
+
+
+_priority = threading.local()
+
+
+@contextmanager
+def safety_priority():
+    """Send relay off commands issued on this thread immediately, bypassing coalescing."""
+    previous = getattr(_priority, "active", False)
+    _priority.active = True
+    try:
+        yield
+    finally:
+        _priority.active = previous
+
+
+def in_safety_priority() -> bool:
+    return getattr(_priority, "active", False)
+
+
+class RelayCoalescer:
+    """
+    Per-board coalescing window in front of the relay writes.
+
+    Args:
+        send (callable): send(board, {port: state}, fill_gaps) -> list of the
+            writes sent (their WriteAcks)
+        settled (callable): settled(board, port) -> confirmed state with no write
+            in flight, or None
+        window (callable): Returns the window in seconds; 0 sends at once
+        call_later (callable): call_later(delay, callback, name) -> handle with
+            cancel(); defaults to the shared deadline service
+
+    Note:
+        - Requests, flushes and sends for all boards are serialized, so the
+          writes for one port always leave in command order
+        - A flush runs on the deadline worker thread
+    """
+
+    def __init__(self, send: Callable[..., int], settled: Callable[[str, int], Optional[bool]],
+                 window: Callable[[], float], call_later: Optional[Callable] = None):
+        self._send = send
+        self._settled = settled
+        self._window = window
+        self._call_later = call_later
+        self._lock = threading.RLock()
+        self._pending: Dict[str, Dict[int, bool]] = {}
+        self._timers: Dict[str, object] = {}
+        self.counts = {"requested": 0, "coalesced": 0, "redundant": 0, "bypassed": 0, "writes": 0}
+
+    def request(self, board: str, ports: Dict[int, bool], flush: bool = False, fill_gaps: bool = True) -> List:
+        """
+        Queue state changes for one board.
+
+        Args:
+            board (str): Relay board config key
+            ports (dict): {port: bool}
+            flush (bool): Send this board's pending changes now instead of at
+                the end of the window (for callers that already batch)
+            fill_gaps (bool): Passed to send() for a flush triggered here
+
+        Returns:
+            list: WriteAcks of the writes sent during this call
+        """
+        safety = in_safety_priority()
+        with self._lock:
+            self.counts["requested"] += len(ports)
+            pending = self._pending.setdefault(board, {})
+            urgent = {}
+            for port, state in ports.items():
+                state = bool(state)
+                if pending.pop(port, None) is not None:
+                    self.counts["coalesced"] += 1
+                if safety and not state:
+                    urgent[port] = False
+                else:
+                    pending[port] = state
+
+            writes = []
+            if urgent:
+                self.counts["bypassed"] += len(urgent)
+                writes += self._write(board, urgent, fill_gaps=False)
+            if flush or self._window() <= 0:
+                writes += self._flush_board(board, fill_gaps)
+            elif pending and board not in self._timers:
+                self._timers[board] = self._schedule(board)
+            return writes
+
+    def flush(self, board: Optional[str] = None) -> List:
+        """Send pending changes now (all boards by default); returns the WriteAcks of the writes sent."""
+        with self._lock:
+            boards = [board] if board is not None else list(self._pending)
+            return [ack for name in boards for ack in self._flush_board(name)]
+
+    def discard(self) -> int:
+        """Drop all pending changes without sending them (emergency all-off); returns how many."""
+        with self._lock:
+            dropped = sum(len(ports) for ports in self._pending.values())
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+            self._pending.clear()
+            return dropped
+
+    def stats(self) -> Dict[str, int]:
+        """Counters, bus writes saved (requested port changes minus writes) and pending changes."""
+        with self._lock:
+            return dict(
+                self.counts,
+                saved=max(0, self.counts["requested"] - self.counts["writes"]),
+                pending=sum(len(ports) for ports in self._pending.values()),
+            )
+
+    # Internals
+
+    def _schedule(self, board: str):
+        delay = self._window()
+        if self._call_later is not None:
+            return self._call_later(delay, lambda: self.flush(board), f"relay_coalesce_{board}")
+        try:
+            from src.deadline_service import get_deadline_service
+        except ImportError:
+            from deadline_service import get_deadline_service
+        return get_deadline_service().call_later(delay, lambda: self.flush(board), name=f"relay_coalesce_{board}")
+
+    def _flush_board(self, board: str, fill_gaps: bool = True) -> List:
+        # Called with self._lock held
+        timer = self._timers.pop(board, None)
+        if timer is not None:
+            timer.cancel()
+        pending = self._pending.pop(board, None) or {}
+        changes = {}
+        for port, state in pending.items():
+            if self._settled(board, port) == state:
+                self.counts["redundant"] += 1
+            else:
+                changes[port] = state
+        return self._write(board, changes, fill_gaps) if changes else []
+
+    def _write(self, board: str, ports: Dict[int, bool], fill_gaps: bool) -> List:
+        try:
+            writes = self._send(board, ports, fill_gaps)
+        except Exception as e:
+            logger.error(f"Relay write to {board} failed: {e}")
+            return []
+        self.counts["writes"] += len(writes)
+        return writes
@@ -0,0 +1,276 @@
+"""
+Authoritative shadow of the relay coil states.
+
+Relay.relay_statuses used to be filled only by the periodic coil read, and
+writes were never confirmed. A controller asking whether its pump was on got
+either the state of the last poll or nothing at all, so the coils were polled
+every loop to keep the answer fresh.
+
+RelayShadow keeps the confirmed state of every port per board as two
+bitmasks: which ports are on, and which ports are known at all. It changes
+only on evidence from the hardware:
+
+- a coil read-back (record_read) replaces the board's state;
+- a write echo (confirm) applies the written states to their ports.
+
+Every change bumps one monotonically increasing version and stamps the board
+with the time of its last confirmation, so readers can tell how stale a value
+is. Each write sent is recorded as a WriteAck that resolves on its echo or on
+the command's timeout/error; callers can wait() on it. Until an ack resolves,
+expected() overlays its states on the confirmed ones, so planning a second
+write does not revert the first.
+
+Usage:
+    ack = shadow.record_write("relayone", 0, [True, False])
+    ...  # echo arrives: shadow.confirm(ack)
+    ack.wait(5.0)
+    shadow.state("relayone", 0), shadow.age("relayone")
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class WriteAck:
+    """
+    One relay write awaiting its echo.
+
+    Attributes:
+        board (str): Relay board name
+        start (int): First port written
+        states (list): Written states, one per port from start
+        sent_at (float): Shadow clock time the write was recorded
+        confirmed (bool): True once the echo matched the write
+        error (str): Failure reason, None unless the write failed
+        version (int): Shadow version after the echo, None until confirmed
+    """
+
+    __slots__ = ("board", "start", "states", "sent_at", "confirmed", "error", "version",
+                 "mask", "bits", "_event")
+
+    def __init__(self, board: str, start: int, states: List[bool], sent_at: float):
+        self.board = board
+        self.start = start
+        self.states = [bool(state) for state in states]
+        self.sent_at = sent_at
+        self.mask = ((1 << len(self.states)) - 1) << start
+        self.bits = to_mask(self.states) << start
+        self.confirmed = False
+        self.error: Optional[str] = None
+        self.version: Optional[int] = None
+        self._event = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        """True once the write was confirmed or failed."""
+        return self._event.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the write resolves.
+
+        Returns:
+            bool: True if the echo confirmed the write, False on failure or timeout
+        """
+        self._event.wait(timeout)
+        return self.confirmed
+
+    def __repr__(self):
+        state = "confirmed" if self.confirmed else f"failed: {self.error}" if self.error else "pending"
+        return f"WriteAck({self.board!r}, {self.start}, {self.states}, {state})"
+
+
+def to_mask(states) -> int:
+    """Bitmask with bit i set when states[i] is truthy."""
+    mask = 0
+    for index, state in enumerate(states):
+        if state:
+            mask |= 1 << index
+    return mask
+
+
+class RelayShadow:
+    """
+    Confirmed relay states per board, versioned and timestamped.
+
+    Args:
+        clock (callable): Monotonic clock, injectable for tests
+
+    Note:
+        - Ports never read or confirmed are None (unknown) in the list views;
+          masks() gives the raw (on, known) bitmasks
+        - Thread-safe; responses arrive on the Modbus event thread
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._on: Dict[str, int] = {}
+        self._known: Dict[str, int] = {}
+        self._width: Dict[str, int] = {}
+        self._confirmed_at: Dict[str, float] = {}
+        self._read_at: Dict[str, float] = {}
+        self._board_version: Dict[str, int] = {}
+        self._pending: List[WriteAck] = []
+        self.version = 0
+        self.counts = {"reads": 0, "writes": 0, "confirmed": 0, "failed": 0}
+
+    # Evidence from the hardware
+
+    def record_read(self, board: str, states: List[int]) -> int:
+        """
+        Replace a board's state with a coil read-back.
+
+        Returns:
+            int: New shadow version
+        """
+        with self._condition:
+            self._on[board] = to_mask(states)
+            self._known[board] = (1 << len(states)) - 1
+            self._width[board] = len(states)
+            self._read_at[board] = self._clock()
+            self.counts["reads"] += 1
+            return self._bump(board)
+
+    def record_write(self, board: str, start: int, states: List[bool]) -> WriteAck:
+        """Track a write that was just sent; its states count as expected until it resolves."""
+        with self._condition:
+            ack = WriteAck(board, start, states, self._clock())
+            self._pending.append(ack)
+            self.counts["writes"] += 1
+            return ack
+
+    def confirm(self, ack: WriteAck) -> int:
+        """
+        Apply a write whose echo matched, and resolve its ack.
+
+        Returns:
+            int: New shadow version
+        """
+        with self._condition:
+            self._on[ack.board] = (self._on.get(ack.board, 0) & ~ack.mask) | ack.bits
+            self._known[ack.board] = self._known.get(ack.board, 0) | ack.mask
+            self._width[ack.board] = max(self._width.get(ack.board, 0), ack.start + len(ack.states))
+            self._discard(ack)
+            self.counts["confirmed"] += 1
+            ack.confirmed = True
+            ack.version = self._bump(ack.board)
+        ack._event.set()
+        return ack.version
+
+    def fail(self, ack: WriteAck, reason: str):
+        """Resolve an ack whose write timed out or was not echoed correctly."""
+        with self._condition:
+            self._discard(ack)
+            self.counts["failed"] += 1
+            ack.error = reason
+            self._condition.notify_all()
+        ack._event.set()
+
+    # Queries
+
+    def state(self, board: str, index: int) -> Optional[bool]:
+        """Confirmed state of one port, None if unknown."""
+        with self._condition:
+            if index < 0 or not self._known.get(board, 0) >> index & 1:
+                return None
+            return bool(self._on[board] >> index & 1)
+
+    def settled(self, board: str, index: int) -> Optional[bool]:
+        """Confirmed state of one port with no write to it in flight, else None."""
+        with self._condition:
+            if any(ack.board == board and ack.mask >> index & 1 for ack in self._pending):
+                return None
+            if index < 0 or not self._known.get(board, 0) >> index & 1:
+                return None
+            return bool(self._on[board] >> index & 1)
+
+    def masks(self, board: str) -> Tuple[int, int]:
+        """Confirmed (on, known) bitmasks of a board."""
+        with self._condition:
+            return self._on.get(board, 0), self._known.get(board, 0)
+
+    def states(self, board: str) -> List[Optional[bool]]:
+        """A board's confirmed states as a list, None for unknown ports."""
+        with self._condition:
+            return _unpack(self._on.get(board, 0), self._known.get(board, 0), self._width.get(board, 0))
+
+    def expected(self, board: str) -> List[Optional[bool]]:
+        """Confirmed states with the unresolved writes applied on top, in send order."""
+        with self._condition:
+            on, known, width = self._on.get(board, 0), self._known.get(board, 0), self._width.get(board, 0)
+            for ack in self._pending:
+                if ack.board == board:
+                    on = (on & ~ack.mask) | ack.bits
+                    known |= ack.mask
+                    width = max(width, ack.start + len(ack.states))
+            return _unpack(on, known, width)
+
+    def age(self, board: str) -> Optional[float]:
+        """Seconds since the board's state was last confirmed, None if never."""
+        with self._condition:
+            confirmed_at = self._confirmed_at.get(board)
+            return None if confirmed_at is None else self._clock() - confirmed_at
+
+    def read_age(self, board: str) -> Optional[float]:
+        """Seconds since the board's last coil read-back, None if never read."""
+        with self._condition:
+            read_at = self._read_at.get(board)
+            return None if read_at is None else self._clock() - read_at
+
+    def board_version(self, board: str) -> int:
+        """Shadow version of the board's last confirmation (0 if never)."""
+        with self._condition:
+            return self._board_version.get(board, 0)
+
+    def wait_for_update(self, board: str, after_version: int, timeout: float) -> bool:
+        """Block until the board is confirmed at a version above after_version."""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._board_version.get(board, 0) > after_version, timeout)
+
+    def wait_for_writes(self, timeout: float) -> bool:
+        """Block until every recorded write has resolved."""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending, timeout)
+
+    def snapshot(self) -> Dict[str, object]:
+        """Version, counters and per-board states and ages for status reporting."""
+        now = self._clock()
+        with self._condition:
+            return dict(
+                self.counts,
+                version=self.version,
+                pending=len(self._pending),
+                boards={
+                    board: {
+                        "states": _unpack(self._on[board], self._known[board], self._width[board]),
+                        "version": self._board_version.get(board, 0),
+                        "age_seconds": round(now - self._confirmed_at[board], 3)
+                        if board in self._confirmed_at else None,
+                    }
+                    for board in self._on
+                },
+            )
+
+    # Internals
+
+    def _bump(self, board: str) -> int:
+        # Called with self._condition held
+        self.version += 1
+        self._board_version[board] = self.version
+        self._confirmed_at[board] = self._clock()
+        self._condition.notify_all()
+        return self.version
+
+    def _discard(self, ack: WriteAck):
+        # Called with self._condition held
+        try:
+            self._pending.remove(ack)
+        except ValueError:
+            pass
+
+
+def _unpack(on: int, known: int, width: int) -> List[Optional[bool]]:
+    return [bool(on >> index & 1) if known >> index & 1 else None for index in range(width)]
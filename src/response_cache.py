@@ -0,0 +1,169 @@
+"""
+Pre-serialized, ETag-tagged bodies for frequently polled GET endpoints.
+
+The Edge polls /api/v1/status and the config GET endpoints continually, and
+each poll used to re-read device.conf and/or saved_sensor_data.json and
+serialize a fresh body. Bodies are now built once per state version and kept
+as orjson bytes with a strong ETag. A poll costs a version check (an
+os.stat of the inputs); when the client sends a matching If-None-Match, the
+answer is an empty 304.
+
+Bodies may carry volatile fields such as a build timestamp. Those are left
+out of the ETag, and a rebuild whose other content is unchanged keeps the
+previous bytes, so a new input version with the same reported values (e.g. a
+sensor save of identical readings) still answers 304.
+
+Usage:
+    cached = response_cache.get_or_build("plumbing", (config.version,), build_plumbing)
+    return conditional_response(request, cached)
+"""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import orjson
+
+
+class CachedBody:
+    """
+    One serialized response body.
+
+    Args:
+        version (tuple): State version the body was built from
+        body (bytes): Serialized body
+        etag (str): Quoted strong ETag derived from the body bytes
+        built_at (float): time.time() when the body was built
+    """
+
+    __slots__ = ("version", "body", "etag", "built_at")
+
+    def __init__(self, version: Hashable, body: bytes, etag: str, built_at: float):
+        self.version = version
+        self.body = body
+        self.etag = etag
+        self.built_at = built_at
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag from the body bytes; identical content gets the same tag."""
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    """(mtime_ns, size, inode) of a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag (RFC 9110 weak comparison).
+
+    Args:
+        if_none_match (str): Raw header value, may list several tags or be "*"
+        etag (str): Current quoted ETag
+
+    Returns:
+        bool: True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == current:
+            return True
+    return False
+
+
+class ResponseCache:
+    """
+    Serialized bodies keyed by endpoint name and state version.
+
+    Note:
+        - A body is rebuilt only when the version passed in differs from the
+          cached one; builders that raise are not cached
+        - Builders must return orjson-serializable objects
+    """
+
+    def __init__(self, dumps_option: int = 0):
+        self._entries: Dict[str, CachedBody] = {}
+        self._lock = threading.Lock()
+        self._dumps_option = dumps_option
+        self.hits = 0
+        self.builds = 0
+
+    def get_or_build(self, name: str, version: Hashable, builder: Callable[[], Any],
+                     volatile_keys: Tuple[str, ...] = ()) -> CachedBody:
+        """
+        Return the cached body for name at version, building it if needed.
+
+        Args:
+            name (str): Endpoint key, e.g. "status"
+            version (hashable): Current state version, e.g. (config_version, sensor_signature)
+            builder (callable): Returns the payload when a rebuild is needed
+            volatile_keys (tuple): Top-level payload keys left out of the ETag,
+                e.g. ("timestamp",). If nothing else changed, the previous
+                body (with its old values for these keys) is kept.
+
+        Returns:
+            CachedBody: Body, ETag and build time
+        """
+        entry = self._entries.get(name)
+        if entry is not None and entry.version == version:
+            self.hits += 1
+            return entry
+        payload = builder()
+        if volatile_keys and isinstance(payload, dict):
+            stable = {k: v for k, v in payload.items() if k not in volatile_keys}
+            etag = make_etag(orjson.dumps(stable, option=self._dumps_option))
+        else:
+            etag = None
+        if etag is not None and entry is not None and entry.etag == etag:
+            # Same reported content: keep the bytes so the ETag stays truthful
+            entry = CachedBody(version, entry.body, etag, entry.built_at)
+        else:
+            body = orjson.dumps(payload, option=self._dumps_option)
+            entry = CachedBody(version, body, etag or make_etag(body), time.time())
+        with self._lock:
+            self._entries[name] = entry
+            self.builds += 1
+        return entry
+
+    def invalidate(self, name: Optional[str] = None):
+        """Drop one cached body, or all of them."""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+
+def conditional_response(request, cached: CachedBody, media_type: str = "application/json"):
+    """
+    Build a 304 or 200 response for a cached body.
+
+    Args:
+        request: Starlette/FastAPI Request (only headers are used)
+        cached (CachedBody): Output of ResponseCache.get_or_build()
+        media_type (str): Content type of the body
+
+    Returns:
+        Response: 304 with the ETag if If-None-Match matches, else the body
+    """
+    from starlette.responses import Response
+
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type=media_type, headers=headers)
@@ -5,6 +5,11 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, Optional
 
+try:
+    from src import io_accounting
+except ImportError:
+    import io_accounting
+
 
 class DosingRuntimeTracker:
     """
@@ -41,7 +46,7 @@ class DosingRuntimeTracker:
     def save_history(self):
         """Save runtime history to disk"""
         self.storage_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.storage_path, 'w') as f:
+        with io_accounting.open_accounted("runtime_tracker", self.storage_path, 'w') as f:
             json.dump(self.history, f, indent=2)
 
     def get_today_key(self) -> str:
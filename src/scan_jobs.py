@@ -0,0 +1,280 @@
+"""
+Background sensor-scan jobs.
+
+POST /api/v1/scan used to run SensorScanner.scan() inside the request. A
+full scan (3 ports x 3 baud rates x 154 addresses, up to four probes each)
+takes long enough that clients and proxies time the request out.
+
+ScanJobManager runs each scan as a job on its own worker thread and returns
+at once. Scans share the sensor buses with normal polling, so only one runs
+at a time; submitting while one is active raises ScanBusyError. A job
+records progress after every address:
+- addresses probed out of the total;
+- the address being probed;
+- the sensors found so far;
+- an ETA based on the average time per address.
+
+Cancelling sets the scanner's cancel event, and the job stops before its
+next probe. Listeners are called on the worker thread on every change,
+which is how the SSE endpoint gets live updates. The last MAX_FINISHED_JOBS
+finished jobs are kept for their results.
+
+Usage:
+    job = get_scan_jobs().submit(ScanRequest(ports=['/dev/ttyAMA2']))
+    get_scan_jobs().get(job.id).progress()
+    get_scan_jobs().cancel(job.id)
+"""
+
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from src.lumina_logger import GlobalLogger
+    logger = GlobalLogger("RippleScanJobs", log_prefix="ripple_").logger
+except Exception:
+    import logging
+    logger = logging.getLogger(__name__)
+
+try:
+    from src.sensor_scanner import SensorScanner
+except ImportError:
+    from sensor_scanner import SensorScanner
+
+MAX_FINISHED_JOBS = 10
+
+QUEUED, RUNNING, COMPLETED, CANCELLED, FAILED = "queued", "running", "completed", "cancelled", "failed"
+FINISHED_STATES = (COMPLETED, CANCELLED, FAILED)
+
+
+class ScanBusyError(Exception):
+    """A scan is already queued or running."""
+
+    def __init__(self, job_id: str):
+        super().__init__(f"Scan {job_id} is still running")
+        self.job_id = job_id
+
+
+class ScanJob:
+    """
+    One background scan and its progress.
+
+    Attributes:
+        id (str): Job ID
+        request: The ScanRequest the job was submitted with
+        state (str): queued, running, completed, cancelled or failed
+        total (int): Addresses to probe (ports x baud rates x addresses)
+        probed (int): Addresses probed so far
+        current (dict): Port, baud rate and address last probed
+        sensors (list): Sensors found so far, in SensorScanner.scan() format
+        version (int): Bumped on every change, for change detection by streams
+    """
+
+    def __init__(self, request, total: int, clock: Callable[[], float]):
+        self.id = uuid.uuid4().hex[:12]
+        self.request = request
+        self.state = QUEUED
+        self.total = total
+        self.probed = 0
+        self.current: Optional[Dict[str, Any]] = None
+        self.sensors: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+        self.version = 0
+        self.created_at = time.time()
+        self._clock = clock
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished if self.finished is not None else self._clock()) - self.started
+
+    def eta(self) -> Optional[float]:
+        """Seconds left at the average pace so far; None before the first address."""
+        if self.done:
+            return 0.0
+        if not self.probed:
+            return None
+        return self.elapsed() / self.probed * (self.total - self.probed)
+
+    def progress(self) -> Dict[str, Any]:
+        eta = self.eta()
+        return {
+            "job_id": self.id,
+            "state": self.state,
+            "total_probes": self.total,
+            "probed": self.probed,
+            "percent": round(100.0 * self.probed / self.total, 1) if self.total else 100.0,
+            "current": self.current,
+            "sensors_found": len(self.sensors),
+            "sensors": list(self.sensors),
+            "elapsed_seconds": round(self.elapsed(), 1),
+            "eta_seconds": None if eta is None else round(eta, 1),
+            "created_at": datetime.fromtimestamp(self.created_at, timezone.utc).isoformat(),
+            "error": self.error,
+            "version": self.version,
+        }
+
+    def results(self) -> Dict[str, Any]:
+        """Final results in the format POST /api/v1/scan used to return."""
+        request = self.request
+        return {
+            "job_id": self.id,
+            "status": self.state,
+            "sensors_found": list(self.sensors),
+            "scan_parameters": {
+                "ports": request.ports,
+                "baud_rates": request.baud_rates,
+                "addr_start": f"0x{request.addr_start:02x}",
+                "addr_end": f"0x{request.addr_end:02x}",
+                "sensor_types": request.sensor_types,
+                "short_circuit": request.short_circuit,
+            },
+            "total_probes": self.total,
+            "probed": self.probed,
+            "duration_seconds": round(self.elapsed(), 1),
+            "error": self.error,
+        }
+
+
+class ScanJobManager:
+    """
+    Runs scan jobs one at a time on a worker thread.
+
+    Args:
+        modbus_client: Client passed to each SensorScanner
+        clock (callable): Monotonic clock for elapsed time and ETA
+        start_threads (bool): False to run jobs with run_pending() (tests)
+    """
+
+    def __init__(self, modbus_client, clock: Callable[[], float] = time.monotonic, start_threads: bool = True):
+        self._client = modbus_client
+        self._clock = clock
+        self._start_threads = start_threads
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, ScanJob] = {}
+        self._listeners: List[Callable[[ScanJob], None]] = []
+        self._pending: Optional[ScanJob] = None
+
+    def submit(self, request) -> ScanJob:
+        """Queue a scan; raises ScanBusyError while another one is unfinished."""
+        with self._lock:
+            active = next((job for job in self._jobs.values() if not job.done), None)
+            if active is not None:
+                raise ScanBusyError(active.id)
+            scanner = self._scanner(request, None)
+            job = ScanJob(request, scanner.total_addresses, self._clock)
+            self._jobs[job.id] = job
+            self._prune()
+        logger.info(f"[SCAN] Job {job.id} queued: {job.total} address(es) on {request.ports}")
+        if self._start_threads:
+            threading.Thread(target=self._run, args=(job,), name=f"scan_{job.id}", daemon=True).start()
+        else:
+            self._pending = job
+        return job
+
+    def get(self, job_id: str) -> Optional[ScanJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[ScanJob]:
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: str) -> Optional[ScanJob]:
+        """Ask a job to stop before its next probe; returns the job, None if unknown."""
+        job = self.get(job_id)
+        if job is not None and not job.done:
+            job.cancel_event.set()
+            logger.info(f"[SCAN] Job {job.id} cancel requested")
+        return job
+
+    def add_listener(self, listener: Callable[[ScanJob], None]):
+        """Call listener(job) on every job change (on the scan thread)."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[ScanJob], None]):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def run_pending(self):
+        """Run the queued job on the calling thread (start_threads=False)."""
+        job, self._pending = self._pending, None
+        if job is not None:
+            self._run(job)
+
+    # Internals
+
+    def _scanner(self, request, job: Optional[ScanJob]):
+        return SensorScanner(
+            modbus_client=self._client,
+            ports=request.ports,
+            baud_rates=request.baud_rates,
+            addr_start=request.addr_start,
+            addr_end=request.addr_end,
+            sensor_types=request.sensor_types,
+            short_circuit=request.short_circuit,
+            on_progress=(lambda info: self._on_progress(job, info)) if job is not None else None,
+            cancel=job.cancel_event if job is not None else None,
+        )
+
+    def _run(self, job: ScanJob):
+        job.started = self._clock()
+        self._update(job, state=RUNNING)
+        try:
+            self._scanner(job.request, job).scan()
+            state = CANCELLED if job.cancel_event.is_set() else COMPLETED
+            self._update(job, state=state)
+        except Exception as e:
+            logger.error(f"[SCAN] Job {job.id} failed: {e}")
+            self._update(job, state=FAILED, error=str(e))
+        logger.info(f"[SCAN] Job {job.id} {job.state}: {job.probed}/{job.total} address(es), "
+                    f"{len(job.sensors)} sensor(s) in {job.elapsed():.1f}s")
+
+    def _on_progress(self, job: ScanJob, info: Dict[str, Any]):
+        job.sensors.extend(info.get('sensors') or [])
+        self._update(job, probed=job.probed + 1,
+                     current={key: info[key] for key in ('port', 'baud_rate', 'address')})
+
+    def _update(self, job: ScanJob, **changes):
+        with self._lock:
+            if changes.get('state') in FINISHED_STATES:
+                job.finished = self._clock()
+            for name, value in changes.items():
+                setattr(job, name, value)
+            job.version += 1
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(job)
+            except Exception as e:
+                logger.error(f"[SCAN] Progress listener failed: {e}")
+
+    def _prune(self):
+        # Called with self._lock held
+        finished = [job for job in self._jobs.values() if job.done]   # oldest first
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job.id]
+
+
+_manager: Optional[ScanJobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_scan_jobs(modbus_client=None) -> ScanJobManager:
+    """Process-wide scan job manager (created on first use with modbus_client)."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ScanJobManager(modbus_client)
+        return _manager
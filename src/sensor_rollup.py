@@ -0,0 +1,440 @@
+"""
+Incremental rollup aggregates for sensor readings.
+
+Every numeric reading is folded into minute, hour and day buckets at the
+moment it arrives, so long-term history never requires rescanning raw data.
+Each bucket stores count, sum, min, max and last for one metric. Tiers have
+independent retention, which keeps months of history in a few megabytes on
+the SD card.
+
+Usage:
+    from src.sensor_rollup import get_rollup_store
+
+    store = get_rollup_store()
+    store.ingest("water_metrics.ph.ph_main.value", 6.12)
+    store.query("water_metrics.ph.ph_main.value", start, end, step=3600)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+try:
+    import src.globals as globals
+    from src.lumina_logger import GlobalLogger
+    from src import io_accounting
+except ImportError:
+    import globals
+    from lumina_logger import GlobalLogger
+    import io_accounting
+
+logger = GlobalLogger("RippleRollup", log_prefix="ripple_").logger
+
+# (tier name, bucket size in seconds, retention in seconds) - finest first
+ROLLUP_TIERS = (
+    ("1m", 60, 7 * 86400),          # 1-minute buckets kept for 7 days
+    ("1h", 3600, 90 * 86400),       # 1-hour buckets kept for 90 days
+    ("1d", 86400, 5 * 365 * 86400), # 1-day buckets kept for 5 years
+)
+
+ROLLUP_DB_FILENAME = "sensor_rollups.db"
+# Point tags that name a series, in metric-name order. relay_board/port_index
+# keep each relay port in its own series instead of all ports sharing one.
+METRIC_TAGS = ("sensor", "location", "relay_board", "port_index")
+PRUNE_INTERVAL_SECONDS = 600  # Expired buckets are removed at most every 10 minutes
+
+
+def _bucket_start(timestamp: float, bucket_seconds: int) -> int:
+    """
+    Align a timestamp to the start of its bucket in local time.
+
+    Day buckets must start at local midnight, not UTC midnight, otherwise a
+    device in UTC+8 would split each day at 08:00. The local UTC offset is
+    applied before flooring and removed afterwards.
+    """
+    offset = time.localtime(timestamp).tm_gmtoff
+    return int(((int(timestamp) + offset) // bucket_seconds) * bucket_seconds - offset)
+
+
+def select_tier(step: Optional[float], start: Optional[float] = None, now: Optional[float] = None):
+    """
+    Pick the coarsest tier whose bucket size still satisfies the requested step
+    and whose retention still covers the range start.
+
+    A tier that has already pruned start would silently return a truncated
+    range (a 30-day query at step=300 would only see 7 days of minute
+    buckets), so coarser tiers are tried until one reaches back far enough.
+
+    Args:
+        step (float): Requested spacing between points in seconds. None selects
+            the finest tier.
+        start (float): Range start in epoch seconds. None skips the retention check.
+        now (float): Reference epoch seconds for retention. Defaults to now.
+
+    Returns:
+        tuple: (tier name, bucket seconds, retention seconds) from ROLLUP_TIERS
+    """
+    index = 0
+    if step is not None:
+        for i, tier in enumerate(ROLLUP_TIERS):
+            if tier[1] <= step:
+                index = i
+    if start is not None:
+        now = time.time() if now is None else now
+        while index < len(ROLLUP_TIERS) - 1 and start < now - ROLLUP_TIERS[index][2]:
+            index += 1
+    return ROLLUP_TIERS[index]
+
+
+def _point_timestamp(value: Any) -> Optional[float]:
+    """Epoch seconds of a point timestamp (epoch number or ISO 8601 string), else None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromisoformat(value).timestamp()  # naive strings are local time
+        except ValueError:
+            return None
+    return None
+
+
+class SensorRollupStore:
+    """
+    SQLite-backed minute/hour/day aggregates maintained on ingest.
+
+    Each ingest performs one upsert per tier inside a single transaction, so
+    the cost per reading is constant regardless of history length. Queries
+    read at most (end - start) / bucket rows from the selected tier.
+
+    Args:
+        db_path (str): SQLite database path. Defaults to
+            data/sensor_rollups.db under globals.DATA_FOLDER_PATH.
+
+    Note:
+        - Uses WAL mode so server.py can query while main.py ingests
+        - Non-numeric and boolean values are ignored
+        - Expired buckets are pruned lazily from ingest()
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.path.join(globals.DATA_FOLDER_PATH, ROLLUP_DB_FILENAME)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._last_prune = 0.0
+        self._newest: Dict[str, float] = {}  # metric -> newest ingested timestamp
+        self._init_db()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn = conn
+        return self._conn
+
+    def _init_db(self):
+        with self._lock:
+            conn = self._get_connection()
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rollups (
+                    tier TEXT NOT NULL,
+                    metric TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    sum REAL NOT NULL,
+                    min REAL NOT NULL,
+                    max REAL NOT NULL,
+                    last REAL NOT NULL,
+                    last_ts REAL NOT NULL,
+                    PRIMARY KEY (tier, metric, bucket)
+                ) WITHOUT ROWID
+            """)
+            conn.commit()
+
+    def close(self):
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def ingest(self, metric: str, value: Any, timestamp: Optional[float] = None) -> bool:
+        """
+        Fold a single reading into every tier.
+
+        Args:
+            metric (str): Dotted metric name, e.g. "water_metrics.ec.ec_main.value"
+            value: Reading value. Only int/float (not bool) values are stored.
+            timestamp (float): Epoch seconds of the reading. Defaults to now.
+
+        Returns:
+            bool: True if the reading was stored, False if it was skipped
+        """
+        return self.ingest_many([(metric, value)], timestamp) == 1
+
+    def ingest_many(self, items, timestamp: Optional[float] = None) -> int:
+        """
+        Fold several readings into every tier in a single transaction.
+
+        A reading whose timestamp is not newer than the last one stored for
+        its metric is skipped, so re-saving an unchanged point (relay ports
+        keep the timestamp of their last change) does not count it twice.
+
+        Args:
+            items (iterable): (metric, value) or (metric, value, timestamp)
+                tuples. Non-numeric values are skipped. A per-item timestamp
+                (epoch seconds or ISO 8601) buckets that reading by when it
+                was taken rather than when it arrived.
+            timestamp (float): Epoch seconds for items without their own. Defaults to now.
+
+        Returns:
+            int: Number of values ingested
+        """
+        default_ts = time.time() if timestamp is None else float(timestamp)
+        readings = []
+        for item in items:
+            metric, value = item[0], item[1]
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            if value != value:  # NaN
+                continue
+            ts = _point_timestamp(item[2]) if len(item) > 2 else None
+            readings.append((metric, float(value), default_ts if ts is None else ts))
+        if not readings:
+            return 0
+
+        latest = default_ts
+        rows = []
+        with self._lock:
+            conn = self._get_connection()
+            newest = self._newest_timestamps(conn, {reading[0] for reading in readings})
+            for metric, value, ts in readings:
+                if metric in newest and ts <= newest[metric]:
+                    continue
+                newest[metric] = ts
+                latest = max(latest, ts)
+                rows.extend(
+                    (name, metric, _bucket_start(ts, size), value, value, value, value, ts)
+                    for name, size, _ in ROLLUP_TIERS
+                )
+            if not rows:
+                return 0
+            conn.executemany("""
+                INSERT INTO rollups (tier, metric, bucket, count, sum, min, max, last, last_ts)
+                VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?)
+                ON CONFLICT (tier, metric, bucket) DO UPDATE SET
+                    count = count + 1,
+                    sum = sum + excluded.sum,
+                    min = MIN(min, excluded.min),
+                    max = MAX(max, excluded.max),
+                    last = excluded.last,
+                    last_ts = excluded.last_ts
+            """, rows)
+            conn.commit()
+        # Row payload estimate; SQLite page writes are amortised by WAL
+        io_accounting.record_write("rollup_db", sum(len(row[1]) + 48 for row in rows))
+
+        if latest - self._last_prune >= PRUNE_INTERVAL_SECONDS:
+            self.prune(now=latest)
+        return len(rows) // len(ROLLUP_TIERS)
+
+    def _newest_timestamps(self, conn: sqlite3.Connection, metrics) -> Dict[str, float]:
+        """
+        Newest stored timestamp per metric, loaded from the day tier on first use.
+
+        Must be called with self._lock held. The returned dict is the live
+        cache, so updates made by the caller are kept for the next ingest.
+        """
+        missing = [metric for metric in metrics if metric not in self._newest]
+        # Stay well below SQLite's host parameter limit
+        for i in range(0, len(missing), 500):
+            chunk = missing[i:i + 500]
+            self._newest.update(conn.execute(
+                f"SELECT metric, MAX(last_ts) FROM rollups WHERE tier = ? "
+                f"AND metric IN ({','.join('?' * len(chunk))}) GROUP BY metric",
+                (ROLLUP_TIERS[-1][0], *chunk),
+            ))
+        return self._newest
+
+    def ingest_measurements(self, data: Dict[str, Any], timestamp: Optional[float] = None) -> int:
+        """
+        Ingest every numeric field of a sensor module's save_data() payload.
+
+        Sensor modules publish {"measurements": {"name": ..., "points": [...]}}
+        where each point carries tags (sensor, location) and fields. Each
+        numeric field becomes the metric "<name>.<sensor>.<location>.<field>"
+        and is bucketed by the point's own timestamp. Relay points are named
+        by their tags instead: "relay_metrics.<relay_board>.<port_index>.<field>".
+
+        Args:
+            data (dict): Payload passed to helpers.save_sensor_data()
+            timestamp (float): Epoch seconds for points without a timestamp. Defaults to now.
+
+        Returns:
+            int: Number of values ingested
+        """
+        measurements = data.get("measurements") if isinstance(data, dict) else None
+        if not isinstance(measurements, dict):
+            return 0
+
+        name = measurements.get("name", "metrics")
+        items = []
+        for point in measurements.get("points") or []:
+            tags = point.get("tags") or {}
+            parts = [name]
+            for tag in METRIC_TAGS:
+                tag_value = tags.get(tag)
+                if tag == "sensor" and not tag_value:
+                    tag_value = tags.get("measurement")
+                if tag_value is not None and tag_value != "":
+                    parts.append(str(tag_value))
+            prefix = ".".join(parts)
+            point_ts = point.get("timestamp")
+            items.extend((f"{prefix}.{field}", value, point_ts)
+                         for field, value in (point.get("fields") or {}).items())
+        return self.ingest_many(items, timestamp)
+
+    def ingest_readings(self, readings, timestamp: Optional[float] = None) -> int:
+        """
+        Ingest a ReadingSet (src/reading.py) without building the legacy dict.
+
+        Args:
+            readings (ReadingSet): Readings from one sensor poll
+            timestamp (float): Epoch seconds for readings without a timestamp. Defaults to now.
+
+        Returns:
+            int: Number of values ingested
+        """
+        return self.ingest_many(((readings.metric_name(r), r.value, r.timestamp) for r in readings), timestamp)
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """
+        Delete buckets older than each tier's retention.
+
+        Args:
+            now (float): Reference epoch seconds. Defaults to now.
+
+        Returns:
+            int: Number of buckets removed
+        """
+        now = time.time() if now is None else now
+        removed = 0
+        with self._lock:
+            conn = self._get_connection()
+            for name, _, retention in ROLLUP_TIERS:
+                cursor = conn.execute(
+                    "DELETE FROM rollups WHERE tier = ? AND bucket < ?",
+                    (name, int(now - retention)),
+                )
+                removed += cursor.rowcount
+            conn.commit()
+            self._last_prune = now
+        if removed:
+            logger.info(f"[ROLLUP] Pruned {removed} expired buckets")
+        return removed
+
+    def query(self, metric: str, start: float, end: float, step: Optional[float] = None,
+              now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Return aggregated history for one metric.
+
+        The coarsest tier whose bucket size is <= step is read, moving to a
+        coarser tier when the finer one has already pruned start. When step is
+        larger than the tier bucket, buckets are merged into step-sized groups.
+
+        Args:
+            metric (str): Metric name as produced by ingest_measurements()
+            start (float): Range start in epoch seconds (inclusive)
+            end (float): Range end in epoch seconds (inclusive)
+            step (float): Desired point spacing in seconds. None = finest tier.
+            now (float): Reference epoch seconds for tier retention. Defaults to now.
+
+        Returns:
+            dict: {"metric", "tier", "step", "points": [{"timestamp", "count",
+                "avg", "min", "max", "last"}, ...]}
+        """
+        tier_name, bucket_seconds, _ = select_tier(step, start, now)
+        group = max(int(step or bucket_seconds), bucket_seconds)
+        group -= group % bucket_seconds
+        offset = time.localtime(start).tm_gmtoff
+
+        with self._lock:
+            conn = self._get_connection()
+            # SQLite returns the bare 'last' column from the row holding MAX(last_ts)
+            rows = conn.execute("""
+                SELECT ((bucket + ?) / ?) * ? - ? AS grp,
+                       SUM(count), SUM(sum), MIN(min), MAX(max), last, MAX(last_ts)
+                FROM rollups
+                WHERE tier = ? AND metric = ? AND bucket >= ? AND bucket <= ?
+                GROUP BY grp
+                ORDER BY grp
+            """, (offset, group, group, offset, tier_name, metric,
+                  _bucket_start(start, bucket_seconds), int(end))).fetchall()
+
+        points = [
+            {
+                "timestamp": grp,
+                "count": count,
+                "avg": round(total / count, 4) if count else None,
+                "min": minimum,
+                "max": maximum,
+                "last": last,
+            }
+            for grp, count, total, minimum, maximum, last, _ in rows
+        ]
+        return {"metric": metric, "tier": tier_name, "step": group, "points": points}
+
+    def metrics(self) -> List[str]:
+        """Return the names of all metrics with at least one bucket."""
+        with self._lock:
+            conn = self._get_connection()
+            rows = conn.execute(
+                "SELECT DISTINCT metric FROM rollups WHERE tier = ? ORDER BY metric",
+                (ROLLUP_TIERS[-1][0],),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return bucket counts per tier and the database size in bytes."""
+        with self._lock:
+            conn = self._get_connection()
+            rows = conn.execute("SELECT tier, COUNT(*) FROM rollups GROUP BY tier").fetchall()
+        counts = dict(rows)
+        size = 0
+        for suffix in ("", "-wal"):
+            try:
+                size += os.path.getsize(self.db_path + suffix)
+            except OSError:
+                pass
+        return {
+            "tiers": {
+                name: {
+                    "bucket_seconds": bucket,
+                    "retention_seconds": retention,
+                    "buckets": counts.get(name, 0),
+                }
+                for name, bucket, retention in ROLLUP_TIERS
+            },
+            "db_bytes": size,
+        }
+
+
+_rollup_store = None
+_rollup_store_lock = threading.Lock()
+
+
+def get_rollup_store() -> SensorRollupStore:
+    """Get singleton instance of the rollup store"""
+    global _rollup_store
+    if _rollup_store is None:
+        with _rollup_store_lock:
+            if _rollup_store is None:
+                _rollup_store = SensorRollupStore()
+    return _rollup_store
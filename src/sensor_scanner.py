@@ -8,6 +8,7 @@ register reads and validating responses to identify connected sensors.
 import logging
 import math
 import struct
+import threading
 import time
 from typing import Any, Callable, Dict, List, Optional
 
@@ -58,6 +59,7 @@ class SensorScanner:
         sensor_types: Optional[List[str]] = None,
         short_circuit: bool = True,
         on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        cancel: Optional[threading.Event] = None,
     ):
         self.client = modbus_client
         self.ports = ports if ports is not None else list(DEFAULT_PORTS)
@@ -67,17 +69,37 @@ class SensorScanner:
         self.sensor_types = sensor_types if sensor_types is not None else list(DEFAULT_SENSOR_TYPES)
         self.short_circuit = short_circuit
         self.on_progress = on_progress
+        # Set to stop the scan before the next probe; scan() returns what it found so far
+        self.cancel = cancel
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel is not None and self.cancel.is_set()
+
+    @property
+    def total_addresses(self) -> int:
+        """Number of (port, baud, address) combinations scan() visits."""
+        return len(self.ports) * len(self.baud_rates) * max(0, self.addr_end - self.addr_start + 1)
 
     # ── public API ──────────────────────────────────────────────────────────
 
     def scan(self) -> List[Dict[str, Any]]:
-        """Scan all configured ports/baud/addresses and return found sensors."""
+        """Scan all configured ports/baud/addresses and return found sensors.
+
+        on_progress, if given, is called after each address with its port,
+        baud rate, address, whether anything was found and the sensors found
+        there. Setting the cancel event stops the scan early.
+        """
         results: List[Dict[str, Any]] = []
 
         for port in self.ports:
             for baud in self.baud_rates:
                 for addr in range(self.addr_start, self.addr_end + 1):
+                    if self.cancelled:
+                        logger.info("Scan cancelled at %s/%d 0x%02X", port, baud, addr)
+                        return results
                     found = self._probe_address(port, baud, addr)
+                    sensors: List[Dict[str, Any]] = []
                     if found is not None:
                         metadata = {
                             'port': port,
@@ -85,13 +107,10 @@ class SensorScanner:
                             'address': f'0x{addr:02x}',
                             'address_decimal': addr,
                         }
-                        if isinstance(found, list):
-                            for item in found:
-                                item.update(metadata)
-                                results.append(item)
-                        else:
-                            found.update(metadata)
-                            results.append(found)
+                        sensors = found if isinstance(found, list) else [found]
+                        for item in sensors:
+                            item.update(metadata)
+                            results.append(item)
 
                     if self.on_progress is not None:
                         self.on_progress({
@@ -99,6 +118,7 @@ class SensorScanner:
                             'baud_rate': baud,
                             'address': f'0x{addr:02x}',
                             'found': found is not None,
+                            'sensors': sensors,
                         })
 
         return results
@@ -116,6 +136,8 @@ class SensorScanner:
         matches: List[Dict[str, Any]] = []
 
         for idx, sensor_type in enumerate(self.sensor_types):
+            if self.cancelled:
+                break
             if idx > 0:
                 time.sleep(INTER_PROBE_DELAY)
 
@@ -1,3 +1,4 @@
+import threading
 import time
 import os, sys
 
@@ -10,10 +11,25 @@ sys.path.insert(0, project_root)
 from src.lumina_modbus_event_emitter import ModbusResponse
 import src.globals as globals
 from src.lumina_logger import GlobalLogger
+from src.poll_scheduler import get_bus_gate
+from src.relay_shadow import RelayShadow, to_mask
+from src.relay_coalescer import RelayCoalescer, in_safety_priority
+from src import config_snapshot
 import src.helpers as helpers
 
+from lumina_modbus_client import PRIORITY_EMERGENCY, PRIORITY_NORMAL
+
 logger = GlobalLogger("RippleRelay", log_prefix="ripple_").logger
 
+# Seconds get_relay_state() waits for a coil read when the shadow has no state
+STATUS_WAIT_SECONDS = 2.5
+# Seconds a coil read-back is trusted for dropping redundant writes and filling
+# gaps; other processes (server.py) write the boards without updating this shadow
+SHADOW_TRUST_SECONDS = 2.0
+# Emergency all-off: latency target, and how long to wait for echoes and read-back
+EMERGENCY_OFF_TARGET_MS = 100
+EMERGENCY_VERIFY_TIMEOUT = 1.0
+
 
 class Relay:
     """
@@ -114,6 +130,8 @@ class Relay:
         # Get baud rate from config file
         self.baud_rate = globals.get_device_baudrate('RELAY_CONTROL', 'RelayOne', 38400)
         self.relay_statuses = {}  # Changed to dict to store multiple relay states
+        self.shadow = RelayShadow()  # Confirmed states; relay_statuses mirrors it for saved data
+        self.coalescer = RelayCoalescer(self._send_ports, self._settled_state, self._coalesce_window)
         self.last_updated = None
         self.load_addresses()  # Changed from load_address to load_addresses
 
@@ -130,13 +148,19 @@ class Relay:
                 if command_info["type"] == "get_status":
                     self._process_status_response(response.data, command_info)
                 elif command_info["type"] in ["turn_on", "turn_off"]:
-                    self._process_control_response(response.data, command_info)
+                    self._resolve_write(command_info, self._process_control_response(response.data, command_info))
+                elif "ack" in command_info:
+                    self._resolve_write(command_info, self._process_write_response(response.data, command_info))
             elif response.status in ["timeout", "error", "connection_lost"]:
                 logger.warning(
                     f"Command failed with status {response.status} for command id {response.command_id}"
                 )
+                if "ack" in command_info:
+                    self.shadow.fail(command_info["ack"], response.status)
                 self.save_null_data()
             del self.pending_commands[response.command_id]
+            if "done" in command_info:
+                command_info["done"].set()
 
     def _process_status_response(self, data, command_info):
         """Process the raw response data from the sensor."""
@@ -165,6 +189,7 @@ class Relay:
                     
                     # Ensure exactly 16 ports
                     self.relay_statuses[relay_name] = port_statuses[:16]
+                    self.shadow.record_read(relay_name, port_statuses[:self.relay_channels.get(relay_name, 16)])
                     
                     self.last_updated = helpers.datetime_to_iso8601()
                     logger.info(f"{relay_name} statuses: {self.relay_statuses[relay_name]}")
@@ -179,66 +204,79 @@ class Relay:
             return
 
     def _process_control_response(self, data, command_info):
-        """Process response from turn on/off commands."""
+        """Process response from turn on/off commands; True if the echo matches the command."""
         logger.info(f"Processing control response - Data: {[hex(b) for b in data] if data else None}")
         logger.info(f"Command info: {command_info}")
         
         if not data:
             logger.warning("No data received in control response")
-            return
+            return False
         
         if len(data) < 8:
             logger.warning(f"Invalid control response length: {len(data)}")
-            return
+            return False
 
         try:
             # Get the correct address for the device
-            device_name = command_info.get('device', '').upper()
-            expected_address = None
-            
-            # Try exact match first
-            if device_name in self.relay_addresses:
-                expected_address = self.relay_addresses[device_name]
-            else:
-                # Try case-insensitive match
-                for key, value in self.relay_addresses.items():
-                    if key.upper() == device_name:
-                        expected_address = value
-                        device_name = key  # Use the correct case for the key
-                        break
-            
-            # Fall back to default address if still not found
-            if expected_address is None:
-                expected_address = self.address
+            device_name, expected_address = self._resolve_board(command_info.get('device', ''))
             
             # Verify response format
             logger.info(f"Verifying response: Device: {device_name}, Expected address: 0x{expected_address:02X}")
             
             if data[0] != expected_address:
                 logger.warning(f"Address mismatch - Expected: 0x{expected_address:02X}, Got: 0x{data[0]:02X}")
-                return
+                return False
             
             if data[1] != 0x05:  # Function code for single coil write
                 logger.warning(f"Unexpected function code: 0x{data[1]:02X}")
-                return
+                return False
             
             # Check if the response matches the command
             relay_index = command_info.get('relay')
             if data[2] != 0x00 or data[3] != relay_index:
                 logger.warning(f"Relay index mismatch - Expected: {relay_index}, Got: {data[3]}")
-                return
+                return False
             
             # Verify the status matches (0xFF00 for ON, 0x0000 for OFF)
             expected_status = 0xFF if command_info['type'] == 'turn_on' else 0x00
             if data[4] != expected_status:
                 logger.warning(f"Status mismatch - Expected: 0x{expected_status:02X}, Got: 0x{data[4]:02X}")
-                return
+                return False
             
             logger.info(f"Relay {command_info['type']} command successful for {device_name}[{relay_index}]")
+            return True
             
         except Exception as e:
             logger.warning(f"Error processing relay control response: {e}")
             logger.exception("Full exception details:")
+            return False
+
+    def _process_write_response(self, data, command_info):
+        """Check the echo of a write multiple registers command (0x10); True if it matches."""
+        states = command_info.get("states") or []
+        start = command_info.get("starting_relay")
+        _, address = self._resolve_board(command_info.get("device", ""))
+        if not data or len(data) < 8:
+            logger.warning(f"Invalid write response length: {len(data) if data else 0}")
+            return False
+        if data[0] != address or data[1] != 0x10 or bytes(data[2:6]) != bytes([0x00, start, 0x00, len(states)]):
+            logger.warning(f"Write echo mismatch - Expected start {start}, count {len(states)}, "
+                           f"got: {[hex(b) for b in data[:6]]}")
+            return False
+        return True
+
+    def _resolve_write(self, command_info, matched):
+        """Confirm or fail the write's ack; a confirmed board is mirrored into relay_statuses and published."""
+        ack = command_info.get("ack")
+        if ack is None:
+            return
+        if not matched:
+            self.shadow.fail(ack, "echo mismatch")
+            return
+        self.shadow.confirm(ack)
+        self.relay_statuses[ack.board] = [1 if state else 0 for state in self.shadow.states(ack.board)]
+        self.last_updated = helpers.datetime_to_iso8601()
+        self.save_data(relay_name=ack.board)
 
     def get_status(self):
         """
@@ -260,45 +298,60 @@ class Relay:
             - Requests status for configured number of coils on each board
             - Uses configured timeout and baud rate for each relay board
             - Tracks pending commands for response correlation
+            - Status frames share the per-bus gap with the sensors (poll_scheduler.BusGate)
         """
-        for relay_name, address in self.relay_addresses.items():
-            logger.info(f"Sending status request to {relay_name} at address 0x{address:02X}")
+        for relay_name in self.relay_addresses:
             try:
-                # Get channel count for this relay (default 16)
-                channels = self.relay_channels.get(relay_name, 16)
-
-                # Calculate response length dynamically:
-                # Response format: [addr][func][byte_count][data...][crc_lo][crc_hi]
-                # byte_count = ceil(num_coils / 8), using integer math: (channels + 7) // 8
-                data_bytes = (channels + 7) // 8
-                response_length = 5 + data_bytes  # 1+1+1+data_bytes+2
-
-                # Build command to request status for configured number of coils
-                command = bytearray([address, 0x01, 0x00, 0x00, 0x00, channels])
-                logger.info(f"Command bytes: {[f'0x{b:02X}' for b in command]}, channels: {channels}, response_length: {response_length}")
-
-                timeout = 2.0
-                command_id = self.modbus_client.send_command(
-                    device_type="relay",
-                    port=self.port,  # Use the port from config
-                    command=command,
-                    baudrate=self.baud_rate,
-                    response_length=response_length,
-                    timeout=timeout,
-                )
-                logger.info(f"baudrate: {self.baud_rate}")
-                # Track the pending command with timestamp
-                self.pending_commands[command_id] = {
-                    "type": "get_status",
-                    "relay_name": relay_name,
-                    "timestamp": time.time(),
-                    "timeout": timeout
-                }
-
+                get_bus_gate().wait(self.port)
+                self._send_status_request(relay_name)
             except Exception as e:
                 logger.error(f"Failed to send command for {relay_name}: {e}")
                 self.save_null_data()
 
+    def _send_status_request(self, relay_name, priority=PRIORITY_NORMAL):
+        """
+        Queue one read coils command for a board.
+
+        Returns:
+            threading.Event: Set once the response (or its failure) has been processed
+        """
+        address = self.relay_addresses[relay_name]
+        logger.info(f"Sending status request to {relay_name} at address 0x{address:02X}")
+        # Get channel count for this relay (default 16)
+        channels = self.relay_channels.get(relay_name, 16)
+
+        # Calculate response length dynamically:
+        # Response format: [addr][func][byte_count][data...][crc_lo][crc_hi]
+        # byte_count = ceil(num_coils / 8), using integer math: (channels + 7) // 8
+        data_bytes = (channels + 7) // 8
+        response_length = 5 + data_bytes  # 1+1+1+data_bytes+2
+
+        # Build command to request status for configured number of coils
+        command = bytearray([address, 0x01, 0x00, 0x00, 0x00, channels])
+        logger.info(f"Command bytes: {[f'0x{b:02X}' for b in command]}, channels: {channels}, response_length: {response_length}")
+
+        timeout = 2.0
+        command_id = self.modbus_client.send_command(
+            device_type="relay",
+            port=self.port,  # Use the port from config
+            command=command,
+            baudrate=self.baud_rate,
+            response_length=response_length,
+            timeout=timeout,
+            priority=priority,
+        )
+        logger.info(f"baudrate: {self.baud_rate}")
+        # Track the pending command with timestamp
+        done = threading.Event()
+        self.pending_commands[command_id] = {
+            "type": "get_status",
+            "relay_name": relay_name,
+            "timestamp": time.time(),
+            "timeout": timeout,
+            "done": done,
+        }
+        return done
+
     def turn_on(self, device_name, relay_index):
         """
         Queue a turn on command for a specific relay port.
@@ -317,27 +370,7 @@ class Relay:
             - Supports case-insensitive device name matching
             - Tracks pending commands for response verification
         """
-        # Get the correct address for the device from relay_addresses
-        device_upper = device_name.upper()
-        address = None
-        
-        # Try exact match first
-        if device_name in self.relay_addresses:
-            address = self.relay_addresses[device_name]
-            logger.info(f"Using exact address match for {device_name}: 0x{address:02X}")
-        else:
-            # Try case-insensitive match
-            for key, value in self.relay_addresses.items():
-                if key.upper() == device_upper:
-                    address = value
-                    device_name = key  # Use the correct case for the key
-                    logger.info(f"Using case-insensitive address match: {device_upper} -> {key}: 0x{address:02X}")
-                    break
-        
-        # Fall back to default if no match found
-        if address is None:
-            address = self.address
-            logger.warning(f"No matching relay found for {device_name}, using default address {address}")
+        device_name, address = self._resolve_board(device_name)
             
         logger.info(f"TURNING ON: device={device_name}, address=0x{address:02X}, relay_index={relay_index}")
         
@@ -352,14 +385,17 @@ class Relay:
             response_length=8,
             timeout=5.0,
         )
+        ack = self.shadow.record_write(device_name, relay_index, [True])
         self.pending_commands[command_id] = {
             "type": "turn_on",
             "device": device_name,
             "relay": relay_index,
+            "ack": ack,
         }
         logger.info(
             f"Sent turn on command for {device_name}, relay {relay_index} with UUID: {command_id}"
         )
+        return ack
 
     def turn_off(self, device_name, relay_index):
         """
@@ -379,27 +415,7 @@ class Relay:
             - Supports case-insensitive device name matching
             - Tracks pending commands for response verification
         """
-        # Get the correct address for the device from relay_addresses
-        device_upper = device_name.upper()
-        address = None
-        
-        # Try exact match first
-        if device_name in self.relay_addresses:
-            address = self.relay_addresses[device_name]
-            logger.info(f"Using exact address match for {device_name}: 0x{address:02X}")
-        else:
-            # Try case-insensitive match
-            for key, value in self.relay_addresses.items():
-                if key.upper() == device_upper:
-                    address = value
-                    device_name = key  # Use the correct case for the key
-                    logger.info(f"Using case-insensitive address match: {device_upper} -> {key}: 0x{address:02X}")
-                    break
-        
-        # Fall back to default if no match found
-        if address is None:
-            address = self.address
-            logger.warning(f"No matching relay found for {device_name}, using default address {address}")
+        device_name, address = self._resolve_board(device_name)
             
         logger.info(f"TURNING OFF: device={device_name}, address=0x{address:02X}, relay_index={relay_index}")
         
@@ -414,14 +430,17 @@ class Relay:
             response_length=8,
             timeout=5.0,
         )
+        ack = self.shadow.record_write(device_name, relay_index, [False])
         self.pending_commands[command_id] = {
             "type": "turn_off",
             "device": device_name,
             "relay": relay_index,
+            "ack": ack,
         }
         logger.info(
             f"Sent turn off command for {device_name}, relay {relay_index} with UUID: {command_id}"
         )
+        return ack
 
     def load_addresses(self):
         """Load relay addresses, channel counts, and assignments from config file"""
@@ -509,6 +528,8 @@ class Relay:
                 logger.info(f"Loaded {len(self.relay_assignments)} relay assignments: {self.relay_assignments}")
             else:
                 logger.warning("No RELAY_ASSIGNMENTS section found in config")
+
+            self._build_indices()
                 
         except ValueError as e:
             logger.warning(f"Invalid address format in config: {e}")
@@ -516,26 +537,95 @@ class Relay:
             logger.warning(f"Error loading relay addresses: {e}")
             logger.exception("Full exception details:")
 
+    def _build_indices(self):
+        """
+        Build the lookups used on every relay command and status response.
+
+        - device name (lower case) -> (device, board, port)
+        - (board, port) -> device names, in assignment order
+        - board name (upper case) -> config key
+        - the 16 relay_metrics points per board, tagged once with their device
+        - one all-channels-off frame per board for emergency_all_off()
+
+        Also drops the cached sprinkler mapping and the published bitmasks so
+        the next save_data() republishes every channel.
+        """
+        assignments = getattr(self, 'relay_assignments', None)
+        if assignments is None:
+            self.relay_assignments = assignments = {}
+        self._device_index = {}
+        self._port_devices = {}
+        for device, info in assignments.items():
+            key = (info.get('relay_name'), info.get('index'))
+            self._device_index.setdefault(device.lower(), (device,) + key)
+            self._port_devices.setdefault(key, []).append(device)
+        self._board_index = {board.upper(): board for board in self.relay_addresses}
+        self._metric_points = {
+            board: [self._metric_point(board, port) for port in range(16)]
+            for board in self.relay_addresses
+        }
+        self._published_masks = {}
+        self._sprinkler_mapping = None
+        self._all_off_frames = {board: self._all_off_frame(board) for board in self.relay_addresses}
+        self._indexed_assignments = assignments
+
+    def _ensure_indices(self):
+        if getattr(self, '_indexed_assignments', None) is not getattr(self, 'relay_assignments', None):
+            self._build_indices()
+
+    def _all_off_frame(self, board):
+        channels = self.relay_channels.get(board, 16)
+        return bytes([self.relay_addresses[board], 0x10, 0x00, 0x00, 0x00, channels, channels * 2]
+                     + [0x00] * (channels * 2))
+
+    def _metric_point(self, board, port):
+        devices = self._port_devices.get((board, port))
+        return {
+            "tags": {
+                "relay_board": self.relay_board_names.get(board, board),  # Use the board name from config
+                "port_index": port,
+                "port_type": "assigned" if devices else "unassigned",
+                "device": devices[0] if devices else "none"
+            },
+            "fields": {
+                "status": 0,
+                "is_assigned": bool(devices),
+                "raw_status": 0
+            },
+            "timestamp": None
+        }
+
+    def _resolve_device(self, device_name):
+        """(device, board, port) for a device name, exact match first, then case-insensitive; None if unassigned."""
+        self._ensure_indices()
+        info = self.relay_assignments.get(device_name)
+        if info is not None:
+            return device_name, info.get('relay_name'), info.get('index')
+        return self._device_index.get(device_name.lower())
+
+    def _resolve_board(self, board_name):
+        """(config key, Modbus address) of a relay board, case-insensitive; default address if unknown."""
+        if board_name in self.relay_addresses:
+            return board_name, self.relay_addresses[board_name]
+        self._ensure_indices()
+        key = self._board_index.get(board_name.upper())
+        if key is not None:
+            return key, self.relay_addresses[key]
+        logger.warning(f"No matching relay found for {board_name}, using default address {self.address}")
+        return board_name, self.address
+
     def _get_relay_info(self, device_name):
         """Get relay name and index for a device name."""
-        # Try exact match first
-        if device_name in self.relay_assignments:
-            info = self.relay_assignments[device_name]
-            return info.get('relay_name', None), info.get('index', None)
-            
-        # Try case-insensitive match
-        device_lower = device_name.lower()
-        for key, info in self.relay_assignments.items():
-            if key.lower() == device_lower:
-                logger.info(f"Case-insensitive match found: {device_name} -> {key}")
-                return info.get('relay_name', None), info.get('index', None)
-                
-        logger.warning(f"No match found for {device_name} in relay assignments")
-        return None, None
+        resolved = self._resolve_device(device_name)
+        if resolved is None:
+            logger.warning(f"No match found for {device_name} in relay assignments")
+            return None, None
+        return resolved[1], resolved[2]
 
     def save_null_data(self):
         """Save null data in the new format."""
         self.relay_statuses = {}
+        self._published_masks = {}
         self.last_updated = helpers.datetime_to_iso8601()
         
         null_relay_data = {
@@ -560,122 +650,76 @@ class Relay:
 
     def save_data(self, relay_name=None):
         """
-        Save status data in the new format.
+        Publish relay states to the sensor data file, only for channels that changed.
+
+        Each board's state is compared as a bitmask with the last one
+        published; only the metric points of differing channels are updated,
+        and nothing is written when no channel changed. The points, the port
+        configuration and the relays/devices summaries go out in two saves;
+        only the changed points are folded into the rollups.
+
+        Args:
+            relay_name (str, optional): Board whose status just arrived; None checks all boards
         """
         try:
-            # If relay_name is provided, only process that relay
-            relays_to_process = [relay_name] if relay_name else self.relay_addresses.keys()
-            
-            # Create metrics data structure for relay_metrics
+            self._ensure_indices()
+            boards = [relay_name] if relay_name else list(self.relay_addresses.keys())
+            changed = []
+            for board in boards:
+                if board not in self._metric_points:
+                    continue
+                mask = to_mask((self.relay_statuses.get(board) or [])[:16])
+                previous = self._published_masks.get(board)
+                delta = 0xFFFF if previous is None else mask ^ previous
+                if not delta:
+                    continue
+                for port, point in enumerate(self._metric_points[board]):
+                    if delta >> port & 1:
+                        status = mask >> port & 1
+                        point["fields"]["status"] = status
+                        point["fields"]["raw_status"] = status
+                        point["timestamp"] = self.last_updated
+                        changed.append(point)
+                self._published_masks[board] = mask
+
+            if not changed:
+                logger.debug("Relay states unchanged, nothing to save")
+                return
+
             metrics_data = {
                 "measurements": {
                     "name": "relay_metrics",
-                    "points": []
-                }
-            }
-            
-            # Keep track of assigned ports for configuration
-            assigned_ports_map = {}
-            
-            # Process relay status points for each relay
-            for current_relay in relays_to_process:
-                # Get the board name for this relay
-                board_name = self.relay_board_names.get(current_relay, current_relay)
-                
-                # Initialize assigned ports for this relay
-                assigned_ports_map[current_relay] = []
-                
-                # Ensure we can access up to 16 ports even if we only have status for 8
-                status_array = self.relay_statuses.get(current_relay, [0] * 16)
-                if len(status_array) < 16:
-                    status_array.extend([0] * (16 - len(status_array)))
-                
-                # Create points for all 16 ports
-                for port_index in range(16):
-                    status = status_array[port_index] if port_index < len(status_array) else 0
-                    
-                    # Default to unassigned
-                    point = {
-                        "tags": {
-                            "relay_board": board_name,  # Use the board name from config
-                            "port_index": port_index,
-                            "port_type": "unassigned",
-                            "device": "none"
-                        },
-                        "fields": {
-                            "status": status,
-                            "is_assigned": False,
-                            "raw_status": status
-                        },
-                        "timestamp": self.last_updated
-                    }
-                    
-                    # Check if port is assigned to a device
-                    for device_name, info in self.relay_assignments.items():
-                        if info.get('relay_name') == current_relay and info.get('index') == port_index:
-                            point["tags"]["port_type"] = "assigned"
-                            point["tags"]["device"] = device_name
-                            point["fields"]["is_assigned"] = True
-                            assigned_ports_map[current_relay].append(port_index)
-                            break
-                    
-                    metrics_data["measurements"]["points"].append(point)
-            
-            # Save relay metrics points
-            helpers.save_sensor_data(["data", "relay_metrics"], metrics_data)
-            
-            # Save relay configuration
-            config_data = {
-                "relay_configuration": {}
+                    "points": [point for points in self._metric_points.values() for point in points]
+                },
+                "configuration": {"relay_configuration": self._relay_configuration()},
             }
-            
-            # Update configuration with assigned and unassigned ports
-            for relay in relays_to_process:
-                assigned = assigned_ports_map.get(relay, [])
-                board_name = self.relay_board_names.get(relay, relay)
-                
-                config_data["relay_configuration"][board_name] = {
-                    "total_ports": 16,
-                    "assigned_ports": sorted(assigned),
-                    "unassigned_ports": sorted(list(set(range(16)) - set(assigned)))
-                }
-                
-                logger.info(f"Relay {board_name} assigned ports: {sorted(assigned)}")
-                logger.info(f"Relay {board_name} unassigned ports: {sorted(list(set(range(16)) - set(assigned)))}")
-            
-            helpers.save_sensor_data(["data", "relay_metrics", "configuration"], config_data)
-            
-            # Update relay status in the main structure
-            relay_data = {
-                "last_updated": self.last_updated
-            }
-            
-            # Create full relay status structure
-            for current_relay in relays_to_process:
-                # Ensure we have status for all 16 ports
-                status_array = self.relay_statuses.get(current_relay, [0] * 16)
-                if len(status_array) < 16:
-                    status_array.extend([0] * (16 - len(status_array)))
-                
-                # Use the board name from config
-                board_name = self.relay_board_names.get(current_relay, current_relay)
-                relay_data[board_name] = status_array[:16]  # Ensure exactly 16 elements
-            
-            # Save relay status
-            helpers.save_sensor_data(["relays"], relay_data)
-            
-            # Update devices data
-            devices_data = {
-                "last_updated": self.last_updated
-            }
-            helpers.save_sensor_data(["devices"], devices_data)
-            
-            logger.info(f"Saved relay data with assignments.")
-            
+            relay_data = {"last_updated": self.last_updated}
+            for board, points in self._metric_points.items():
+                board_name = self.relay_board_names.get(board, board)
+                relay_data[board_name] = [point["fields"]["status"] for point in points]
+
+            helpers.save_sensor_data(
+                ["data", "relay_metrics"], metrics_data,
+                rollup={"measurements": {"name": "relay_metrics", "points": changed}},
+            )
+            helpers.save_sensor_data([], {"relays": relay_data, "devices": {"last_updated": self.last_updated}})
+            logger.info(f"Saved {len(changed)} changed relay channel(s).")
+
         except Exception as e:
             logger.error(f"Error in save_data: {e}")
             logger.exception("Full exception details:")
 
+    def _relay_configuration(self):
+        configuration = {}
+        for board, points in self._metric_points.items():
+            assigned = [point["tags"]["port_index"] for point in points if point["fields"]["is_assigned"]]
+            configuration[self.relay_board_names.get(board, board)] = {
+                "total_ports": 16,
+                "assigned_ports": assigned,
+                "unassigned_ports": sorted(set(range(16)) - set(assigned))
+            }
+        return configuration
+
     # Convenience methods for controlling specific devices
     def set_nanobubbler(self, status):
         if not globals.HAS_NANOBUBBLER:
@@ -839,38 +883,24 @@ class Relay:
             starting_relay_index (int): Starting relay index for the consecutive group
             states (list): List of boolean values indicating desired states (1 to 16 states)
             
+        Returns:
+            WriteAck: Resolves when the echo confirms the write (see relay_shadow),
+                None if the states were rejected
+            
         Note:
             - Docstring created by Claude 3.5 Sonnet on 2024-09-22
             - Uses Modbus function code 0x10 (Write Multiple Registers)
             - Supports 1 to 16 consecutive relay ports
             - Each relay state uses 2 bytes (0x00, 0x01 for ON, 0x00, 0x00 for OFF)
             - Provides optimized control for consecutive relay operations
+            - Frames sent inside relay_coalescer.safety_priority() jump the Modbus queue
         """
         logger.info(f"Setting {len(states)} relays starting at index {starting_relay_index} with states {states}")
         if not 1 <= len(states) <= 16:
             logger.warning("Must provide between 1 and 16 relay states")
             return
         
-        # Get the correct address for the device from relay_addresses
-        # Convert to uppercase for case-insensitive matching
-        device_upper = device_name.upper()
-        address = None
-        
-        # Try exact match first
-        if device_name in self.relay_addresses:
-            address = self.relay_addresses[device_name]
-        else:
-            # Try case-insensitive match
-            for key, value in self.relay_addresses.items():
-                if key.upper() == device_upper:
-                    address = value
-                    device_name = key  # Use the correct case for the key
-                    break
-        
-        # Fall back to default if no match found
-        if address is None:
-            address = self.address
-            logger.warning(f"No matching relay found for {device_name}, using default address {address}")
+        device_name, address = self._resolve_board(device_name)
         
         num_registers = len(states)
         byte_count = num_registers * 2  # Each register needs 2 bytes
@@ -897,18 +927,199 @@ class Relay:
             baudrate=self.baud_rate,
             response_length=8,
             timeout=5.0,
+            priority=PRIORITY_EMERGENCY if in_safety_priority() else PRIORITY_NORMAL,
         )
         logger.info(f"baudrate: {self.baud_rate}")
+        ack = self.shadow.record_write(device_name, starting_relay_index, states)
         self.pending_commands[command_id] = {
             "type": f"set_{num_registers}_relays",
             "device": device_name,
             "starting_relay": starting_relay_index,
-            "states": states
+            "states": states,
+            "ack": ack,
         }
         logger.info(
             f"Sent set_{num_registers}_relays command starting at relay {starting_relay_index} "
             f"Command: {command}, UUID: {command_id}"
         )
+        return ack
+
+    def apply_states(self, states, fill_gaps=True):
+        """
+        Set several devices with the fewest Modbus writes.
+
+        Devices are resolved to (board, port) and grouped per board, merged
+        with any changes waiting in the board's coalescing window (see
+        relay_coalescer), and sent at once. Ports already in the requested
+        state (confirmed, no write in flight) are dropped. Each board gets
+        one write-multiple-registers frame from its lowest to its highest
+        changed port; the ports in between are rewritten with their expected
+        state (the confirmed shadow state plus any writes still awaiting
+        their echo). Dropping and gap filling only happen while the board's
+        last coil read is at most SHADOW_TRUST_SECONDS old; otherwise every
+        requested port is written, one frame per contiguous run.
+
+        Args:
+            states (dict): {device_name: bool}; names match case-insensitively
+            fill_gaps (bool): False to write only the requested ports, one frame
+                per contiguous run
+
+        Returns:
+            list: WriteAck per write transaction sent in this batch; each
+                ack.wait() blocks until its echo confirms the write
+
+        Note:
+            - A port between two changes whose state is unknown (never read
+              or confirmed) is never written; the frame is split around it instead
+            - Unknown devices are logged and skipped
+        """
+        boards = {}
+        for device_name, state in states.items():
+            relay_name, index = self._get_relay_info(device_name)
+            if relay_name is None or index is None:
+                logger.error(f"Cannot find relay assignment for {device_name}")
+                continue
+            boards.setdefault(relay_name, {})[index] = bool(state)
+
+        acks = []
+        for relay_name, ports in boards.items():
+            acks += self.coalescer.request(relay_name, ports, flush=True, fill_gaps=fill_gaps)
+        logger.info(f"Applied {len(states)} relay state(s) in {len(acks)} write(s)")
+        return acks
+
+    def _send_ports(self, relay_name, ports, fill_gaps=True):
+        """Write {port: state} on one board as planned by _plan_board_writes; returns the WriteAcks."""
+        acks = []
+        for start, run in self._plan_board_writes(relay_name, ports, fill_gaps):
+            ack = self.set_multiple_relays(relay_name, start, run)
+            if ack is not None:
+                acks.append(ack)
+        return acks
+
+    def _shadow_trusted(self, relay_name):
+        """True if the board was read back recently enough to drop or gap-fill writes against it."""
+        age = self.shadow.read_age(relay_name)
+        return age is not None and age <= SHADOW_TRUST_SECONDS
+
+    def _settled_state(self, relay_name, index):
+        """Settled shadow state for the coalescer; None (always send) once the board's last read is stale."""
+        return self.shadow.settled(relay_name, index) if self._shadow_trusted(relay_name) else None
+
+    def _coalesce_window(self):
+        try:
+            return config_snapshot.get_config_snapshot().relay_coalesce_window
+        except Exception:
+            return config_snapshot.DEFAULT_RELAY_COALESCE_WINDOW
+
+    def _plan_board_writes(self, relay_name, ports, fill_gaps=True):
+        """Contiguous (start, states) runs covering ports on one board, at most 16 states each."""
+        shadow = self.shadow.expected(relay_name) if fill_gaps and self._shadow_trusted(relay_name) else []
+        runs = []
+        start, run = None, []
+        for index in range(min(ports), max(ports) + 1):
+            if index in ports:
+                state = ports[index]
+            elif index < len(shadow) and shadow[index] is not None:
+                state = shadow[index]
+            else:
+                if run:
+                    runs.append((start, run))
+                start, run = None, []
+                continue
+            if start is None or len(run) == 16:
+                if run:
+                    runs.append((start, run))
+                start, run = index, []
+            run.append(state)
+        if run:
+            runs.append((start, run))
+        return runs
+
+    def emergency_all_off(self, verify_timeout=EMERGENCY_VERIFY_TIMEOUT):
+        """
+        Switch every channel of every board off ahead of all other Modbus traffic.
+
+        Pending coalesced changes are discarded. Each board gets its prebuilt
+        all-off frame (write multiple registers from port 0 over all its
+        channels, the write these boards use) at emergency queue priority,
+        followed by one coil read per board. The call waits for the write
+        echoes and the read-backs and reports the latency of each step.
+
+        Args:
+            verify_timeout (float): Seconds to wait for echoes and read-backs
+
+        Returns:
+            dict: {"ok", "all_off_ms", "verified_ms", "within_target", "discarded",
+                "boards": {board: {"off_ms", "verified", "verify_ms"}}}; off_ms is
+                None if the echo did not arrive, verified False if a channel
+                read back on or the read did not arrive
+        """
+        started = time.monotonic()
+        elapsed_ms = lambda: round((time.monotonic() - started) * 1000, 1)  # noqa: E731
+        self._ensure_indices()
+        discarded = self.coalescer.discard()
+
+        acks, reads = {}, {}
+        for board, frame in self._all_off_frames.items():
+            channels = self.relay_channels.get(board, 16)
+            try:
+                command_id = self.modbus_client.send_command(
+                    device_type="relay", port=self.port, command=bytearray(frame),
+                    baudrate=self.baud_rate, response_length=8, timeout=verify_timeout,
+                    priority=PRIORITY_EMERGENCY)
+                ack = self.shadow.record_write(board, 0, [False] * channels)
+                self.pending_commands[command_id] = {
+                    "type": f"set_{channels}_relays", "device": board,
+                    "starting_relay": 0, "states": [False] * channels, "ack": ack,
+                }
+                acks[board] = ack
+            except Exception as e:
+                logger.error(f"[EMERGENCY] Failed to queue all-off frame for {board}: {e}")
+        for board in acks:
+            try:
+                reads[board] = self._send_status_request(board, priority=PRIORITY_EMERGENCY)
+            except Exception as e:
+                logger.error(f"[EMERGENCY] Failed to queue read-back for {board}: {e}")
+
+        deadline = started + verify_timeout
+        boards = {}
+        for board in self._all_off_frames:
+            ack = acks.get(board)
+            confirmed = ack is not None and ack.wait(max(0.0, deadline - time.monotonic()))
+            report = {"off_ms": elapsed_ms() if confirmed else None, "verified": False, "verify_ms": None}
+            read = reads.get(board)
+            if read is not None and read.wait(max(0.0, deadline - time.monotonic())):
+                on, known = self.shadow.masks(board)
+                report["verified"] = on == 0 and known != 0
+                report["verify_ms"] = elapsed_ms()
+            boards[board] = report
+
+        off_times = [report["off_ms"] for report in boards.values()]
+        all_off_ms = max(off_times) if off_times and None not in off_times else None
+        ok = bool(boards) and all(report["verified"] for report in boards.values())
+        result = {
+            "ok": ok,
+            "all_off_ms": all_off_ms,
+            "verified_ms": elapsed_ms() if ok else None,
+            "within_target": all_off_ms is not None and all_off_ms <= EMERGENCY_OFF_TARGET_MS,
+            "discarded": discarded,
+            "boards": boards,
+        }
+        if ok and result["within_target"]:
+            logger.critical(f"[EMERGENCY] All outputs off in {all_off_ms} ms, verified in {result['verified_ms']} ms")
+        else:
+            logger.critical(f"[EMERGENCY] All-off incomplete or slow "
+                            f"(target {EMERGENCY_OFF_TARGET_MS} ms): {result}")
+        return result
+
+    def wait_for_writes(self, timeout=5.0):
+        """
+        Wait until every write sent so far has been confirmed or has failed.
+
+        Returns:
+            bool: False if writes were still unresolved after timeout seconds
+        """
+        return self.shadow.wait_for_writes(timeout)
 
     # Convenience methods to maintain the original API
     def set_four_relays(self, device_name, starting_relay_index, states):
@@ -1106,6 +1317,13 @@ class Relay:
             return None
 
     def _get_sprinkler_mapping(self):
+        """Sprinkler mapping derived once per assignment set (see _derive_sprinkler_mapping)."""
+        self._ensure_indices()
+        if self._sprinkler_mapping is None:
+            self._sprinkler_mapping = self._derive_sprinkler_mapping()
+        return dict(self._sprinkler_mapping)
+
+    def _derive_sprinkler_mapping(self):
         """
         Get sprinkler mapping based on current configuration.
         Determines which case applies based on device.conf:
@@ -1505,66 +1723,61 @@ class Relay:
 
     def set_relay(self, device_name, state):
         """Set a relay by its device name."""
-        # Find the relay device based on its name (case-insensitive)
-        device_name_lower = device_name.lower()
-        for name, details in self.relay_assignments.items():
-            if name.lower() == device_name_lower:
-                device_name = name  # Use the correct case
-                break
-                
         logger.info(f"Setting relay {device_name} to {state}")
-        
-        if device_name not in self.relay_assignments:
+
+        resolved = self._resolve_device(device_name)
+        if resolved is None:
             logger.error(f"Cannot find relay assignment for {device_name}")
             return False
-            
-        relay_name = self.relay_assignments[device_name]['relay_name']
-        index = self.relay_assignments[device_name]['index']
-        
+
+        _, relay_name, index = resolved
         return self.set_relay_at_index(relay_name, index, state)
         
-    def get_relay_state(self, device_name):
-        """Get the current state of a relay by its device name."""
-        # Find the relay device based on its name (case-insensitive)
-        device_name_lower = device_name.lower()
-        for name, details in self.relay_assignments.items():
-            if name.lower() == device_name_lower:
-                device_name = name  # Use the correct case
-                break
-                
-        if device_name not in self.relay_assignments:
+    def get_relay_state(self, device_name, max_age=None, wait=STATUS_WAIT_SECONDS):
+        """
+        Get the confirmed state of a relay by its device name.
+
+        Answers from the relay shadow (last coil read or confirmed write echo).
+        If the port is unknown, or its board was last confirmed more than
+        max_age seconds ago, a coil read is requested and awaited for up to
+        wait seconds.
+
+        Args:
+            device_name (str): Device name from RELAY_ASSIGNMENTS (case-insensitive)
+            max_age (float, optional): Oldest acceptable state in seconds; None accepts any
+            wait (float): Seconds to wait for a requested read; 0 to only request it
+
+        Returns:
+            bool: Relay state, or None if unknown
+        """
+        resolved = self._resolve_device(device_name)
+        if resolved is None:
             logger.warning(f"Cannot find relay assignment for {device_name}")
             return None
-            
-        # Get relay details
-        relay_name = self.relay_assignments[device_name]['relay_name']
-        index = self.relay_assignments[device_name]['index']
-        
-        # Make sure we have status data
-        if relay_name not in self.relay_statuses or not self.relay_statuses[relay_name]:
-            # Try to refresh the status
+        _, relay_name, index = resolved
+
+        state = self.shadow.state(relay_name, index)
+        age = self.shadow.age(relay_name)
+        if state is None or (max_age is not None and (age is None or age > max_age)):
+            version = self.shadow.board_version(relay_name)
             self.get_status()
-            
-            # Check again
-            if relay_name not in self.relay_statuses or not self.relay_statuses[relay_name]:
-                logger.warning(f"No status data available for relay {relay_name}")
-                return None
-        
-        # Get the current state
-        if 0 <= index < len(self.relay_statuses[relay_name]):
-            return bool(self.relay_statuses[relay_name][index])
-        else:
-            logger.warning(f"Index {index} out of range for relay {relay_name}")
-            return None
+            if wait:
+                self.shadow.wait_for_update(relay_name, version, wait)
+            state = self.shadow.state(relay_name, index)
+
+        if state is None:
+            logger.warning(f"No status data available for relay {relay_name}[{index}]")
+        return state
 
     def set_relay_at_index(self, relay_name, index, state):
-        """Set a relay at a specific index."""
+        """Set a relay at a specific index (through the board's coalescing window)."""
         try:
             if relay_name not in self.relay_addresses:
                 logger.error(f"Relay key {relay_name} not found in relay addresses")
                 return False
                 
-            return self.set_multiple_relays(relay_name, index, [state])
+            self.coalescer.request(relay_name, {index: state})
+            return True
         except Exception as e:
             logger.error(f"Error setting relay at index: {e}")
             return False
@@ -11,11 +11,20 @@ sys.path.insert(0, project_root)
 from src.lumina_modbus_event_emitter import ModbusResponse
 import src.globals as globals
 from src.lumina_logger import GlobalLogger
+from src.poll_scheduler import get_bus_gate
+from src import reactive_dosing
 
 logger = GlobalLogger("RippleEC", log_prefix="ripple_").logger
 
 import math
-import helpers
+
+try:
+    # Try importing when running from main directory
+    import src.helpers as helpers
+except ImportError:
+    # Import when running from src directory
+    import helpers
+from src.reading import Reading, ReadingSet
 
 class EC:
     """
@@ -169,14 +178,14 @@ class EC:
         process its response independently through the event emitter.
         
         Note:
-            - Uses a 0.3s delay between sensors to match THC sensor spacing and avoid conflicts
+            - Frames on one serial bus are spaced by the shared bus gate
+              ([POLLING] bus_min_frame_gap_seconds) instead of a fixed 0.3s sleep
             - Responses are handled asynchronously via _handle_response method
             - Each sensor maintains its own pending commands queue
         """
-        tasks = []
         for _, sensor_instance in EC._instances.items():
+            get_bus_gate().wait(sensor_instance.port)
             sensor_instance.get_status_async()
-            time.sleep(0.3)  # Match THC sensor spacing
 
     def __new__(cls, sensor_id, *args, **kwargs):
         if sensor_id not in cls._instances:
@@ -647,6 +656,7 @@ class EC:
                     logger.debug(additional)
                 
                 self.save_data()
+                reactive_dosing.notify_reading("ec", self.ec, sensor_id=self.sensor_id)
                 
             except Exception as e:
                 logger.warning(f"Error processing response for {self.sensor_id}: {e}")
@@ -771,39 +781,29 @@ class EC:
         self.last_updated = helpers.datetime_to_iso8601()
         self.save_data()
 
+    def get_readings(self):
+        """Return the latest poll as a ReadingSet (legacy dict built lazily)."""
+        sid = self.sensor_id
+        extra = self.sensor_data.get
+        return ReadingSet("water_metrics", "ec", "ec", sid, self.last_updated, (
+            Reading("value", sid, self.ec, "mS/cm"),
+            Reading("tds", sid, self.tds, "ppm"),
+            Reading("salinity", sid, self.salinity, "ppm"),
+            Reading("temperature", sid, self.temperature, "°C"),
+            Reading("resistance", sid, extra('resistance'), "Ω"),
+            Reading("ec_constant", sid, extra('ec_constant')),
+            Reading("compensation_coef", sid, extra('compensation_coef')),
+            Reading("manual_temp", sid, extra('manual_temp'), "°C"),
+            Reading("temp_offset", sid, extra('temp_offset'), "°C"),
+            Reading("electrode_sensitivity", sid, extra('electrode_sensitivity')),
+            Reading("compensation_mode", sid, extra('compensation_mode')),
+            Reading("sensor_type", sid, extra('sensor_type')),
+        ))
+
     def save_data(self):
-        # Update the sensor-specific configuration in the file
-        data = {
-            "measurements": {
-                "name": "water_metrics",
-                "points": [
-                    {
-                        "tags": {
-                            "sensor": "ec",
-                            "measurement": "ec",
-                            "location": self.sensor_id
-                        },
-                        "fields": {
-                            "value": round(self.ec, 2) if self.ec is not None else None,
-                            "tds": round(self.tds, 2) if self.tds is not None else None,
-                            "salinity": round(self.salinity, 2) if self.salinity is not None else None,
-                            "temperature": round(self.temperature, 2) if self.temperature is not None else None,
-                            "resistance": round(self.sensor_data.get('resistance', None), 2) if self.sensor_data.get('resistance') is not None else None,
-                            "ec_constant": round(self.sensor_data.get('ec_constant', None), 2) if self.sensor_data.get('ec_constant') is not None else None,
-                            "compensation_coef": round(self.sensor_data.get('compensation_coef', None), 2) if self.sensor_data.get('compensation_coef') is not None else None,
-                            "manual_temp": round(self.sensor_data.get('manual_temp', None), 2) if self.sensor_data.get('manual_temp') is not None else None,
-                            "temp_offset": round(self.sensor_data.get('temp_offset', None), 2) if self.sensor_data.get('temp_offset') is not None else None,
-                            "electrode_sensitivity": round(self.sensor_data.get('electrode_sensitivity', None), 2) if self.sensor_data.get('electrode_sensitivity') is not None else None,
-                            "compensation_mode": self.sensor_data.get('compensation_mode', None),
-                            "sensor_type": self.sensor_data.get('sensor_type', None)
-                        },
-                        "timestamp": self.last_updated
-                    }
-                ]
-            }
-        }
-        helpers.save_sensor_data(['data', 'water_metrics', 'ec'], data)
-        logger.log_sensor_data(['data', 'water_metrics', 'ec'], data)
+        readings = self.get_readings()
+        helpers.save_readings(['data', 'water_metrics', 'ec'], readings)
+        logger.log_sensor_data(['data', 'water_metrics', 'ec'], readings.to_legacy())
         
     def is_connected(self):
         """
@@ -10,6 +10,7 @@ sys.path.insert(0, project_root)
 from src.lumina_modbus_event_emitter import ModbusResponse
 import src.globals as globals
 from src.lumina_logger import GlobalLogger
+from src.poll_scheduler import get_bus_gate
 
 logger = GlobalLogger("RippleNPK", log_prefix="ripple_").logger
 
@@ -70,8 +71,8 @@ class NPK:
     @classmethod
     def get_statuses_async(cls):
         for _, sensor_instance in NPK._instances.items():
+            get_bus_gate().wait(sensor_instance.port)
             sensor_instance.get_status_async()
-            time.sleep(0.01)
 
     def __new__(cls, sensor_id, *args, **kwargs):
         if sensor_id not in cls._instances:
@@ -10,12 +10,21 @@ sys.path.insert(0, project_root)
 from src.lumina_modbus_event_emitter import ModbusResponse
 import src.globals as globals
 from src.lumina_logger import GlobalLogger
+from src.poll_scheduler import get_bus_gate
+from src import reactive_dosing
 
 logger = GlobalLogger("RipplepH", log_prefix="ripple_").logger
 
 import math
-import helpers
+
+try:
+    # Try importing when running from main directory
+    import src.helpers as helpers
+except ImportError:
+    # Import when running from src directory
+    import helpers
 from src.ph_static import get_ph_targets
+from src.reading import Reading, ReadingSet
 
 class pH:
     """
@@ -119,14 +128,14 @@ class pH:
         process its response independently through the event emitter.
         
         Note:
-            - Uses a small delay (0.01s) between sensors to avoid command conflicts
+            - Frames on one serial bus are spaced by the shared bus gate
+              ([POLLING] bus_min_frame_gap_seconds)
             - Responses are handled asynchronously via _handle_response method
             - Each sensor maintains its own pending commands queue
         """
-        tasks = []
         for _, sensor_instance in pH._instances.items():
+            get_bus_gate().wait(sensor_instance.port)
             sensor_instance.get_status_async()
-            time.sleep(0.01)  # Small delay between sensors
 
     def __new__(cls, sensor_id, *args, **kwargs):
         if sensor_id not in cls._instances:
@@ -390,6 +399,7 @@ class pH:
                 logger.info(f"{self.sensor_id} - pH: {self.ph}, Temperature: {self.temperature}°C")
                 
                 self.save_data()
+                reactive_dosing.notify_reading("ph", self.ph, sensor_id=self.sensor_id)
                 
             except Exception as e:
                 logger.warning(f"Error processing response for {self.sensor_id}: {e}")
@@ -465,31 +475,22 @@ class pH:
         except Exception:
             return {"target_ph_lower": None, "target_ph_upper": None}
 
+    def get_readings(self):
+        """Return the latest poll as a ReadingSet (legacy dict built lazily)."""
+        sid = self.sensor_id
+        targets = self._get_target_ph_fields()
+        return ReadingSet("water_metrics", "ph", "ph", sid, self.last_updated, (
+            Reading("value", sid, self.ph, "pH"),
+            Reading("temperature", sid, self.temperature, "°C"),
+            Reading("offset", sid, self.sensor_data.get('offset'), "pH"),
+            Reading("target_ph_lower", sid, targets["target_ph_lower"], "pH"),
+            Reading("target_ph_upper", sid, targets["target_ph_upper"], "pH"),
+        ))
+
     def save_data(self):
-        # Update the sensor-specific configuration in the file
-        data = {
-            "measurements": {
-                "name": "water_metrics",
-                "points": [
-                    {
-                        "tags": {
-                            "sensor": "ph",
-                            "measurement": "ph",
-                            "location": self.sensor_id
-                        },
-                        "fields": {
-                            "value": round(self.ph, 2) if self.ph is not None else None,
-                            "temperature": round(self.temperature, 2) if self.temperature is not None else None,
-                            "offset": round(self.sensor_data.get('offset', None), 2) if self.sensor_data.get('offset') is not None else None,
-                            **self._get_target_ph_fields()
-                        },
-                        "timestamp": self.last_updated
-                    }
-                ]
-            }
-        }
-        helpers.save_sensor_data(['data', 'water_metrics', 'ph'], data)
-        logger.log_sensor_data(['data', 'water_metrics', 'ph'], data)
+        readings = self.get_readings()
+        helpers.save_readings(['data', 'water_metrics', 'ph'], readings)
+        logger.log_sensor_data(['data', 'water_metrics', 'ph'], readings.to_legacy())
         
     def is_connected(self):
         """
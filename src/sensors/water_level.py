@@ -11,10 +11,12 @@ sys.path.insert(0, project_root)
 from src.lumina_modbus_event_emitter import ModbusResponse
 import src.globals as globals
 from src.lumina_logger import GlobalLogger
+from src.poll_scheduler import get_bus_gate
 
 logger = GlobalLogger("RippleWaterLevel", log_prefix="ripple_").logger
 
 import src.helpers as helpers
+from src.reading import Reading, ReadingSet
 
 class WaterLevel:
     """
@@ -161,11 +163,12 @@ class WaterLevel:
     def get_statuses_async(cls):
         """
         Asynchronously get status from all water level sensors.
+
+        Frames on one serial bus are spaced by the shared bus gate.
         """
-        tasks = []
         for _, sensor_instance in WaterLevel._instances.items():
+            get_bus_gate().wait(sensor_instance.port)
             sensor_instance.get_status_async()
-            time.sleep(0.01)  # Small delay between sensors
 
     def __new__(cls, sensor_id, *args, **kwargs):
         if sensor_id not in cls._instances:
@@ -954,34 +957,24 @@ class WaterLevel:
         self.last_updated = helpers.datetime_to_iso8601()
         self.save_data()
 
+    def get_readings(self):
+        """Return the latest poll as a ReadingSet (legacy dict built lazily)."""
+        sid = self.sensor_id
+        extra = self.sensor_data.get
+        return ReadingSet("water_metrics", "water_level", "level", sid, self.last_updated, (
+            Reading("value", sid, self.level, "%"),
+            Reading("temperature", sid, self.temperature, "°C"),
+            Reading("pressure_unit", sid, extra('pressure_unit')),
+            Reading("decimal_places", sid, extra('decimal_places')),
+            Reading("range_min", sid, extra('range_min')),
+            Reading("range_max", sid, extra('range_max')),
+            Reading("zero_offset", sid, extra('zero_offset')),
+        ))
+
     def save_data(self):
-        # Update the sensor-specific configuration in the file
-        data = {
-            "measurements": {
-                "name": "water_metrics",
-                "points": [
-                    {
-                        "tags": {
-                            "sensor": "water_level",
-                            "measurement": "level",
-                            "location": self.sensor_id
-                        },
-                        "fields": {
-                            "value": round(self.level, 2) if self.level is not None else None,
-                            "temperature": round(self.temperature, 2) if self.temperature is not None else None,
-                            "pressure_unit": self.sensor_data.get('pressure_unit', None),
-                            "decimal_places": self.sensor_data.get('decimal_places', None),
-                            "range_min": round(self.sensor_data.get('range_min', None), 2) if self.sensor_data.get('range_min') is not None else None,
-                            "range_max": round(self.sensor_data.get('range_max', None), 2) if self.sensor_data.get('range_max') is not None else None,
-                            "zero_offset": round(self.sensor_data.get('zero_offset', None), 2) if self.sensor_data.get('zero_offset') is not None else None
-                        },
-                        "timestamp": self.last_updated
-                    }
-                ]
-            }
-        }
-        helpers.save_sensor_data(['data', 'water_metrics', 'water_level'], data)
-        logger.log_sensor_data(['data', 'water_metrics', 'water_level'], data)
+        readings = self.get_readings()
+        helpers.save_readings(['data', 'water_metrics', 'water_level'], readings)
+        logger.log_sensor_data(['data', 'water_metrics', 'water_level'], readings.to_legacy())
         
     def is_connected(self):
         """
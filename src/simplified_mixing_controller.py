@@ -2,24 +2,21 @@
 Simplified Mixing Controller with Dual-Layer Protection.
 
 Uses APScheduler as primary mechanism with SQLite persistence,
-plus a single failsafe timer thread as backup.
+plus a failsafe deadline as backup.
 
 Architecture:
 - Layer 1: APScheduler with static functions (no serialization issues)
-- Layer 2: Simple failsafe timer thread (backup only)
+- Layer 2: Cancellable failsafe deadline on the shared deadline service (backup only)
 
 Based on proven sprinkler pattern.
 Created: 2025-09-23
 Author: Linus-style simplification
 """
 
-import threading
-import time
 import configparser
 import os
 from datetime import datetime, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 
 # Import static functions
 from src.mixing_static import (
@@ -29,6 +26,8 @@ from src.mixing_static import (
     parse_duration,
     get_scheduler
 )
+from src.deadline_service import get_deadline_service
+from src.relay_coalescer import safety_priority
 
 try:
     from src.lumina_logger import GlobalLogger
@@ -43,7 +42,7 @@ class SimplifiedMixingController:
     
     Features:
     - APScheduler primary timing with SQLite persistence
-    - Single failsafe timer thread as backup
+    - Failsafe deadline as backup
     - Static functions to avoid serialization issues
     - Clean job management with consistent IDs
     """
@@ -152,17 +151,17 @@ class SimplifiedMixingController:
             return False
             
     def _start_failsafe_timer(self, duration):
-        """Start failsafe timer as backup (Layer 2)"""
+        """Start failsafe deadline as backup (Layer 2)"""
         try:
             def failsafe_stop():
-                time.sleep(duration)
                 if self.is_running:  # Only stop if still running
                     logger.warning("[CONTROLLER] FAILSAFE activated - APScheduler may have failed")
                     try:
                         from src.sensors.Relay import Relay
                         relay = Relay()
                         if relay:
-                            relay.set_mixing_pump(False)
+                            with safety_priority():
+                                relay.set_mixing_pump(False)
                             self.is_running = False
                             logger.info("[CONTROLLER] FAILSAFE stopped mixing pump")
                             
@@ -174,16 +173,22 @@ class SimplifiedMixingController:
                     except Exception as e:
                         logger.error(f"[CONTROLLER] FAILSAFE error: {e}")
                         
-            self.failsafe_timer = threading.Thread(target=failsafe_stop, daemon=False)
-            self.failsafe_timer.start()
+            self._cancel_failsafe_timer()
+            self.failsafe_timer = get_deadline_service().call_later(duration, failsafe_stop, name="mixing_failsafe")
             logger.info(f"[CONTROLLER] Failsafe timer started: {duration}s")
             
         except Exception as e:
             logger.error(f"Error starting failsafe timer: {e}")
             
+    def _cancel_failsafe_timer(self):
+        """Cancel a pending failsafe deadline (cycle already stopped)"""
+        if self.failsafe_timer and self.failsafe_timer.cancel():
+            logger.info("[CONTROLLER] Failsafe timer cancelled")
+            
     def _stop_mixing_pump_and_mark_complete(self):
         """Stop mixing pump and mark cycle complete (called by APScheduler)"""
         try:
+            self._cancel_failsafe_timer()
             if self.is_running:
                 from src.sensors.Relay import Relay
                 relay = Relay()
@@ -206,6 +211,7 @@ class SimplifiedMixingController:
     def stop_current_cycle(self):
         """Stop current mixing cycle"""
         try:
+            self._cancel_failsafe_timer()
             # Note: Don't manually remove date-triggered jobs - APScheduler handles this automatically
             # after job execution. Manual removal causes race conditions.
                     
@@ -2,24 +2,21 @@
 Simplified pH Controller with Dual-Layer Protection.
 
 Uses APScheduler as primary mechanism with SQLite persistence,
-plus a single failsafe timer thread as backup.
+plus a failsafe deadline as backup.
 
 Architecture:
 - Layer 1: APScheduler with static functions (no serialization issues)
-- Layer 2: Simple failsafe timer thread (backup only)
+- Layer 2: Cancellable failsafe deadline on the shared deadline service (backup only)
 
 Based on proven nutrient pattern.
 Created: 2025-09-23
 Author: Linus-style simplification
 """
 
-import threading
-import time
 import configparser
 import os
 from datetime import datetime, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 
 # Import static functions
 from src.ph_static import (
@@ -29,6 +26,8 @@ from src.ph_static import (
     parse_duration,
     get_scheduler
 )
+from src.deadline_service import get_deadline_service
+from src.relay_coalescer import safety_priority
 
 try:
     from src.lumina_logger import GlobalLogger
@@ -43,7 +42,7 @@ class SimplifiedpHController:
     
     Features:
     - APScheduler primary timing with SQLite persistence
-    - Single failsafe timer thread as backup
+    - Failsafe deadline as backup
     - Static functions to avoid serialization issues
     - Clean job management with consistent IDs
     """
@@ -51,7 +50,7 @@ class SimplifiedpHController:
     def __init__(self):
         """Initialize the simplified pH controller"""
         self.is_running = False
-        self.current_thread = None
+        self.failsafe_timer = None
         self.scheduler = get_scheduler()
         logger.info("SimplifiedpHController initialized")
     
@@ -143,28 +142,34 @@ class SimplifiedpHController:
             return False
     
     def _start_failsafe_timer(self, duration_seconds):
-        """Start failsafe timer thread"""
+        """Start failsafe deadline"""
         try:
             # Add 30 seconds buffer for failsafe
             failsafe_seconds = duration_seconds + 30
             
             def failsafe_stop():
-                time.sleep(failsafe_seconds)
                 if self.is_running:
                     logger.warning(f"[FAILSAFE] pH pump still running after {failsafe_seconds}s - emergency stop!")
-                    self._emergency_stop_ph_pump()
+                    with safety_priority():
+                        self._emergency_stop_ph_pump()
                     
-            self.current_thread = threading.Thread(target=failsafe_stop, daemon=False)
-            self.current_thread.start()
+            self._cancel_failsafe_timer()
+            self.failsafe_timer = get_deadline_service().call_later(failsafe_seconds, failsafe_stop, name="ph_failsafe")
             logger.info(f"[CONTROLLER] Failsafe timer started ({failsafe_seconds}s)")
             
         except Exception as e:
             logger.error(f"Error starting failsafe timer: {e}")
     
+    def _cancel_failsafe_timer(self):
+        """Cancel a pending failsafe deadline (cycle already stopped)"""
+        if self.failsafe_timer and self.failsafe_timer.cancel():
+            logger.info("[CONTROLLER] Failsafe timer cancelled")
+    
     def _stop_ph_pump_and_mark_complete(self):
         """Stop pH pump and mark cycle complete (called by APScheduler)"""
         try:
             logger.info("[CONTROLLER] APScheduler triggered stop")
+            self._cancel_failsafe_timer()
             
             # Turn off pH pumps
             from src.sensors.Relay import Relay
@@ -217,6 +222,7 @@ class SimplifiedpHController:
                 return True
                 
             logger.info("[CONTROLLER] Manual stop requested")
+            self._cancel_failsafe_timer()
             
             # Note: Don't manually remove date-triggered jobs - APScheduler handles this automatically
             # after job execution. Manual removal causes race conditions.
@@ -242,7 +248,7 @@ class SimplifiedpHController:
         return {
             'is_running': self.is_running,
             'has_scheduler': self.scheduler is not None,
-            'has_thread': self.current_thread is not None and self.current_thread.is_alive()
+            'has_failsafe': self.failsafe_timer is not None and self.failsafe_timer.active
         }
     
     def shutdown(self):
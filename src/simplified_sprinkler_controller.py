@@ -2,23 +2,20 @@
 Simplified Sprinkler Controller with Dual-Layer Protection.
 
 Uses APScheduler as primary mechanism with SQLite persistence,
-plus a single failsafe timer thread as backup.
+plus a failsafe deadline as backup.
 
 Architecture:
 - Layer 1: APScheduler with static functions (no serialization issues)
-- Layer 2: Simple failsafe timer thread (backup only)
+- Layer 2: Cancellable failsafe deadline on the shared deadline service (backup only)
 
 Created: 2025-09-22
 Author: Linus-style simplification
 """
 
-import threading
-import time
 import configparser
 import os
 from datetime import datetime, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 
 # Import static functions
 from src.sprinkler_static import (
@@ -28,6 +25,8 @@ from src.sprinkler_static import (
     parse_duration,
     get_scheduler
 )
+from src.deadline_service import get_deadline_service
+from src.relay_coalescer import safety_priority
 
 try:
     from src.lumina_logger import GlobalLogger
@@ -42,7 +41,7 @@ class SimplifiedSprinklerController:
     
     Features:
     - APScheduler primary timing with SQLite persistence
-    - Single failsafe timer thread as backup
+    - Failsafe deadline as backup
     - Static functions to avoid serialization issues
     - Clean job management with consistent IDs
     """
@@ -153,13 +152,11 @@ class SimplifiedSprinklerController:
             return False
             
     def _start_failsafe_timer(self, duration):
-        """Start failsafe timer as backup (Layer 2)"""
+        """Start failsafe deadline as backup (Layer 2)"""
         try:
             def failsafe_stop():
                 try:
-                    logger.info(f"[FAILSAFE] Timer started, sleeping for {duration}s")
-                    time.sleep(duration)
-                    logger.info(f"[FAILSAFE] Timer woke up after {duration}s, checking if sprinklers still running...")
+                    logger.info(f"[FAILSAFE] Deadline of {duration}s reached, checking if sprinklers still running...")
                     
                     if self.is_running:  # Only stop if still running
                         logger.warning("[FAILSAFE] ACTIVATED - APScheduler failed, emergency stop!")
@@ -167,7 +164,8 @@ class SimplifiedSprinklerController:
                             from src.sensors.Relay import Relay
                             relay = Relay()
                             if relay:
-                                relay.set_sprinklers(False)
+                                with safety_priority():
+                                    relay.set_sprinklers(False)
                                 self.is_running = False
                                 logger.critical("[FAILSAFE] Emergency stop completed - sprinklers turned off!")
                                 
@@ -182,23 +180,29 @@ class SimplifiedSprinklerController:
                         logger.info("[FAILSAFE] APScheduler worked correctly - sprinklers already stopped")
                         
                 except Exception as e:
-                    logger.error(f"[FAILSAFE] Thread error: {e}")
+                    logger.error(f"[FAILSAFE] Deadline error: {e}")
                         
             # Cancel existing failsafe if any
-            if hasattr(self, 'failsafe_timer') and self.failsafe_timer and self.failsafe_timer.is_alive():
+            if self.failsafe_timer and self.failsafe_timer.active:
                 logger.info("[CONTROLLER] Canceling existing failsafe timer")
+            self._cancel_failsafe_timer()
                 
-            self.failsafe_timer = threading.Thread(target=failsafe_stop, daemon=False)
-            self.failsafe_timer.start()
-            logger.info(f"[CONTROLLER] Failsafe timer started: {duration}s (Thread: {self.failsafe_timer.name})")
+            self.failsafe_timer = get_deadline_service().call_later(duration, failsafe_stop, name="sprinkler_failsafe")
+            logger.info(f"[CONTROLLER] Failsafe timer started: {duration}s")
             
         except Exception as e:
             logger.error(f"[CONTROLLER] Error starting failsafe timer: {e}")
             logger.exception("Full failsafe timer error:")
             
+    def _cancel_failsafe_timer(self):
+        """Cancel a pending failsafe deadline (cycle already stopped)"""
+        if self.failsafe_timer and self.failsafe_timer.cancel():
+            logger.info("[CONTROLLER] Failsafe timer cancelled")
+            
     def _stop_sprinklers_and_mark_complete(self):
         """Stop sprinklers and mark cycle complete (called by APScheduler)"""
         try:
+            self._cancel_failsafe_timer()
             if self.is_running:
                 from src.sensors.Relay import Relay
                 relay = Relay()
@@ -221,6 +225,7 @@ class SimplifiedSprinklerController:
     def stop_current_cycle(self):
         """Stop current sprinkler cycle"""
         try:
+            self._cancel_failsafe_timer()
             # Note: Don't manually remove date-triggered jobs - APScheduler handles this automatically
             # after job execution. Manual removal causes race conditions.
                     
@@ -266,8 +271,8 @@ class SimplifiedSprinklerController:
                 logger.error("APScheduler: NOT AVAILABLE")
                 
             # Check failsafe timer
-            if hasattr(self, 'failsafe_timer') and self.failsafe_timer:
-                logger.info(f"Failsafe timer alive: {self.failsafe_timer.is_alive()}")
+            if self.failsafe_timer:
+                logger.info(f"Failsafe timer pending: {self.failsafe_timer.active}")
                 logger.info(f"Failsafe timer name: {self.failsafe_timer.name}")
             else:
                 logger.error("Failsafe timer: NOT AVAILABLE")
@@ -8,7 +8,6 @@ Created: 2025-09-22
 Author: Linus-style simplification
 """
 
-import configparser
 import os
 import time
 from datetime import datetime, timedelta
@@ -22,6 +21,11 @@ except Exception:
     import logging
     logger = logging.getLogger(__name__)
 
+try:
+    from src.config_snapshot import get_config_snapshot
+except ImportError:
+    from config_snapshot import get_config_snapshot
+
 def get_scheduler():
     """Get the global scheduler instance from globals.py"""
     try:
@@ -31,43 +35,19 @@ def get_scheduler():
         logger.error(f"Error getting global scheduler: {e}")
         return None
 
+def _config():
+    """Current device.conf snapshot; re-parsed only when the file changes"""
+    config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'device.conf')
+    return get_config_snapshot(config_path)
+
 def get_sprinkler_config():
     """Get sprinkler configuration from device.conf"""
-    try:
-        config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'device.conf')
-        config = configparser.ConfigParser()
-        config.read(config_path)
-        
-        # Get operational values (second value after comma)
-        on_str = config.get('Sprinkler', 'sprinkler_on_duration')
-        wait_str = config.get('Sprinkler', 'sprinkler_wait_duration')
-        
-        on_duration = on_str.split(',')[1].strip()
-        wait_duration = wait_str.split(',')[1].strip()
-        
-        return on_duration, wait_duration
-    except Exception as e:
-        logger.error(f"Error reading sprinkler config: {e}")
-        return "00:00:00", "00:00:00"
+    config = _config()
+    return config.sprinkler_on_duration, config.sprinkler_wait_duration
 
 def is_sprinkler_scheduling_enabled():
     """Check if automatic sprinkler scheduling is enabled in config"""
-    try:
-        config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'device.conf')
-        config = configparser.ConfigParser()
-        config.read(config_path)
-        
-        if not config.has_option('Sprinkler', 'sprinkler_scheduling_enabled'):
-            # Default to enabled if option doesn't exist (backward compatibility)
-            return True
-            
-        enabled_str = config.get('Sprinkler', 'sprinkler_scheduling_enabled')
-        # Get operational value (second value after comma)
-        operational_value = enabled_str.split(',')[1].strip().lower()
-        return operational_value == 'true'
-    except Exception as e:
-        logger.error(f"Error checking sprinkler_scheduling_enabled: {e}")
-        return True  # Default to enabled on error
+    return _config().sprinkler_scheduling_enabled
 
 def parse_duration(duration_str):
     """Parse HH:MM:SS to seconds"""
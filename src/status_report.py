@@ -0,0 +1,165 @@
+"""
+Human-readable system status rendering.
+
+Splits the old RippleController.write_status_file into two steps:
+- extract_status_values() pulls the displayed values out of the sensor data
+  snapshot. It is cheap and comparable, so callers can tell whether anything
+  visible changed.
+- render_status() turns those values into the system_status.txt text.
+
+main.py renders only when the values change (or STATUS_MAX_REFRESH_SECONDS
+elapse). server.py renders on demand for GET /api/v1/status/text.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+STATUS_MAX_REFRESH_SECONDS = 300  # Rewrite at least every 5 minutes even if unchanged
+
+
+def extract_status_values(cached_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract the values shown in the status report from sensor data.
+
+    Timestamps are deliberately left out so that a new reading with the same
+    value does not count as a change.
+
+    Args:
+        cached_data (dict): saved_sensor_data structure (file or in-memory copy)
+
+    Returns:
+        dict: {"relays", "water_levels", "ph", "ec"} lists of tuples, or an
+            "error" string per section when the data could not be read
+    """
+    values: Dict[str, Any] = {}
+    data = cached_data.get('data', {}) if isinstance(cached_data, dict) else {}
+    water_metrics = data.get('water_metrics', {})
+
+    try:
+        relay_points = data.get('relay_metrics', {}).get('measurements', {}).get('points', [])
+        if relay_points:
+            values["relays"] = [
+                ("device", point.get('tags', {}).get('device', 'none'),
+                 bool(point.get('fields', {}).get('status', 0)))
+                for point in relay_points
+                if point.get('tags', {}).get('device', 'none') not in (None, '', 'none')
+            ]
+        else:
+            # Fallback: raw relay array
+            values["relays"] = [
+                ("raw", name, tuple(states))
+                for name, states in cached_data.get('relays', {}).items()
+                if name != 'last_updated' and isinstance(states, list)
+            ]
+    except Exception as e:
+        values["relays"] = f"Error reading relays: {e}"
+
+    try:
+        levels = []
+        for key, value in water_metrics.items():
+            if 'level' in key.lower() or 'water' in key.lower():
+                for point in value.get('measurements', {}).get('points', []):
+                    levels.append((point.get('tags', {}).get('location', 'unknown'),
+                                   point.get('fields', {}).get('value', 'N/A')))
+        values["water_levels"] = levels
+    except Exception as e:
+        values["water_levels"] = f"Error reading water levels: {e}"
+
+    try:
+        values["ph"] = [
+            (point.get('tags', {}).get('location', 'unknown'),
+             point.get('fields', {}).get('value', 'N/A'),
+             point.get('fields', {}).get('temperature', 'N/A'))
+            for point in water_metrics.get('ph', {}).get('measurements', {}).get('points', [])
+        ]
+    except Exception as e:
+        values["ph"] = f"Error reading pH: {e}"
+
+    try:
+        values["ec"] = [
+            (point.get('tags', {}).get('location', 'unknown'),
+             point.get('fields', {}).get('value', 'N/A'),
+             point.get('fields', {}).get('tds', 'N/A'),
+             point.get('fields', {}).get('temperature', 'N/A'))
+            for point in water_metrics.get('ec', {}).get('measurements', {}).get('points', [])
+        ]
+    except Exception as e:
+        values["ec"] = f"Error reading EC: {e}"
+
+    return values
+
+
+def controller_status_lines(sprinkler=None, nutrient=None, ph=None, mixing=None, water_level=None) -> List[str]:
+    """Describe the simplified controllers for the CONTROLLER STATES section."""
+    lines = []
+    if sprinkler:
+        enabled = getattr(sprinkler, 'scheduling_enabled', 'N/A')
+        lines.append(f"Sprinkler scheduling: {'Enabled' if enabled else 'Disabled'}")
+    if nutrient:
+        lines.append("Nutrient controller: Active")
+    if ph:
+        lines.append("pH controller: Active")
+    if mixing:
+        lines.append("Mixing controller: Active")
+    if water_level:
+        lines.append("Water level controller: Active")
+    return lines
+
+
+def render_status(values: Dict[str, Any], controllers: Optional[List[str]] = None,
+                  now: Optional[datetime] = None) -> str:
+    """
+    Render status values as the system_status.txt text.
+
+    Args:
+        values (dict): Output of extract_status_values()
+        controllers (list): Output of controller_status_lines(), or None when
+            controller state is not available (e.g. in server.py)
+        now (datetime): Generation time. Defaults to now.
+
+    Returns:
+        str: Multi-line status report
+    """
+    now = now or datetime.now()
+    lines = [
+        "=" * 60,
+        "RIPPLE SYSTEM STATUS",
+        f"Generated: {now.strftime('%Y-%m-%d %H:%M:%S')}",
+        "=" * 60,
+        "",
+    ]
+
+    def section(title, entries, fmt, empty):
+        lines.append(title)
+        lines.append("-" * 40)
+        if isinstance(entries, str):
+            lines.append(f"  ({entries})")
+        elif entries:
+            lines.extend(f"  {fmt(entry)}" for entry in entries)
+        else:
+            lines.append(f"  ({empty})")
+        lines.append("")
+
+    def relay_line(entry):
+        kind, name, state = entry
+        if kind == "device":
+            return f"{name}: {'ON' if state else 'OFF'}"
+        return f"{name}: {list(state)}"
+
+    section("RELAY STATES:", values.get("relays"), relay_line, "No relay data available")
+    section("WATER LEVELS:", values.get("water_levels"),
+            lambda e: f"{e[0]}: {e[1]}%", "No water level data available")
+    section("PH SENSORS:", values.get("ph"),
+            lambda e: f"{e[0]}: pH {e[1]} (temp: {e[2]}°C)", "No pH data available")
+    section("EC SENSORS:", values.get("ec"),
+            lambda e: f"{e[0]}: EC {e[1]} mS/cm, TDS {e[2]} ppm (temp: {e[3]}°C)", "No EC data available")
+
+    if controllers is not None:
+        lines.append("CONTROLLER STATES:")
+        lines.append("-" * 40)
+        lines.extend(f"  {line}" for line in controllers)
+        lines.append("")
+
+    lines.append(f"Next status update: ~{STATUS_MAX_REFRESH_SECONDS // 60} minutes")
+    lines.append("=" * 60)
+    return '\n'.join(lines)
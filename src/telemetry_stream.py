@@ -0,0 +1,368 @@
+"""
+Live telemetry push stream for the API process.
+
+The Edge and local dashboards used to poll GET /api/v1/status to see new
+readings, and every poll re-read sensor data. Polling hard loaded the Pi;
+polling gently delivered data late.
+
+TelemetryHub pushes events to subscribers as they happen, on four topics:
+- "reading": a validated sensor reading (one metric point) was saved;
+- "relay": a relay channel changed state;
+- "mode": the operating mode changed (passive/autonomous);
+- "alarm": an alarm audit event was stored.
+
+Readings and relay states are written by the controller process to
+saved_sensor_data.json, and alarms to the audit database. One
+TelemetryWatcher thread per API process follows both: it stats the file
+every POLL_SECONDS, parses it only when it changed, and publishes the
+points whose fields or timestamp differ from the last copy. Alarms are
+fetched by rowid, only while someone subscribes to them. The operating mode
+is owned by the controller too (heartbeat timeouts happen there), so while
+someone subscribes to "mode" the watcher also calls its mode_source each
+poll; the API process publishes the transitions it sees. Nothing is parsed
+or asked for while there are no subscribers.
+
+Each event is serialised once into an SSE frame shared by all subscribers.
+Every subscriber has its own bounded send queue (QUEUE_SIZE frames); a
+client that falls that far behind is dropped rather than allowed to grow
+memory or delay the others.
+
+Usage:
+    hub = get_telemetry_hub()
+    subscriber = hub.subscribe({"reading", "alarm"}, loop)
+    frames = await subscriber.next_frames(timeout=15)
+    hub.unsubscribe(subscriber)
+"""
+
+import asyncio
+import itertools
+import os
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import orjson
+
+try:
+    from src.lumina_logger import GlobalLogger
+    logger = GlobalLogger("RippleTelemetry", log_prefix="ripple_").logger
+except Exception:
+    import logging
+    logger = logging.getLogger(__name__)
+
+TOPICS = ("reading", "relay", "mode", "alarm")
+QUEUE_SIZE = 64         # Frames a subscriber may have waiting before it is dropped
+POLL_SECONDS = 0.5      # How often the watcher stats saved_sensor_data.json
+ALARM_BATCH = 50        # Alarm rows fetched per poll
+
+
+class Subscriber:
+    """
+    One stream client: its topics and bounded queue of pending SSE frames.
+
+    offer() is called from any thread; next_frames() is awaited on the
+    client's event loop.
+
+    Attributes:
+        id (int): Subscriber number, for logs
+        topics (frozenset): Topics the client asked for
+        dropped (bool): True once the queue overflowed; the stream should end
+    """
+
+    def __init__(self, subscriber_id: int, topics: Iterable[str], loop: asyncio.AbstractEventLoop,
+                 queue_size: int):
+        self.id = subscriber_id
+        self.topics = frozenset(topics)
+        self.dropped = False
+        self._loop = loop
+        self._queue_size = queue_size
+        self._frames: deque = deque()
+        self._lock = threading.Lock()
+        self._wake = asyncio.Event()
+        self._wake_pending = False
+
+    def offer(self, frame: bytes) -> bool:
+        """Queue a frame; returns False if the subscriber is (now) dropped."""
+        with self._lock:
+            if self.dropped:
+                return False
+            if len(self._frames) >= self._queue_size:
+                self.dropped = True
+                self._frames.clear()
+            else:
+                self._frames.append(frame)
+            if self._wake_pending:
+                return not self.dropped
+            self._wake_pending = True
+        try:
+            self._loop.call_soon_threadsafe(self._wake.set)
+        except RuntimeError:
+            pass  # event loop already closed
+        return not self.dropped
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._frames)
+
+    async def next_frames(self, timeout: float) -> List[bytes]:
+        """Wait for queued frames and take them all; [] on timeout or once dropped."""
+        while True:
+            with self._lock:
+                frames = list(self._frames)
+                self._frames.clear()
+                self._wake_pending = False
+                self._wake.clear()
+                if frames or self.dropped:
+                    return frames
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+
+
+class TelemetryHub:
+    """
+    Fan-out of telemetry events to stream subscribers, by topic.
+
+    Args:
+        queue_size (int): Per-subscriber send queue bound
+    """
+
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        self._queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers: Dict[int, Subscriber] = {}
+        self._ids = itertools.count(1)
+        self._sequence = itertools.count(1)
+        self.published = 0
+        self.dropped_clients = 0
+        self.watcher: Optional["TelemetryWatcher"] = None
+
+    def subscribe(self, topics: Optional[Iterable[str]], loop: asyncio.AbstractEventLoop) -> Subscriber:
+        """
+        Add a subscriber on loop for topics (all topics if None or empty).
+
+        Raises:
+            ValueError: If a topic is unknown
+        """
+        topics = set(topics or TOPICS)
+        unknown = topics.difference(TOPICS)
+        if unknown:
+            raise ValueError(f"Unknown topic(s): {', '.join(sorted(unknown))}; expected {', '.join(TOPICS)}")
+        with self._lock:
+            subscriber = Subscriber(next(self._ids), topics, loop, self._queue_size)
+            self._subscribers[subscriber.id] = subscriber
+            watcher = self.watcher
+        if watcher is not None:
+            watcher.start()
+        logger.info(f"[STREAM] Subscriber {subscriber.id} joined for {sorted(subscriber.topics)}")
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            self._subscribers.pop(subscriber.id, None)
+
+    def has_subscribers(self, topic: Optional[str] = None) -> bool:
+        with self._lock:
+            return any(topic is None or topic in s.topics for s in self._subscribers.values())
+
+    def publish(self, topic: str, data: Any) -> int:
+        """
+        Send an event to every subscriber of topic; safe from any thread.
+
+        Returns:
+            int: Subscribers the event was queued for
+        """
+        with self._lock:
+            targets = [s for s in self._subscribers.values() if topic in s.topics]
+            if not targets:
+                return 0
+            event_id = next(self._sequence)
+            self.published += 1
+        frame = b"id: %d\nevent: %s\ndata: %s\n\n" % (event_id, topic.encode(), orjson.dumps(data))
+        delivered = 0
+        for subscriber in targets:
+            if subscriber.offer(frame):
+                delivered += 1
+            else:
+                self._drop(subscriber)
+        return delivered
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self.published,
+                "dropped_clients": self.dropped_clients,
+                "queue_size": self._queue_size,
+            }
+
+    def _drop(self, subscriber: Subscriber):
+        with self._lock:
+            if self._subscribers.pop(subscriber.id, None) is None:
+                return
+            self.dropped_clients += 1
+        logger.warning(f"[STREAM] Dropped slow subscriber {subscriber.id}: "
+                       f"{self._queue_size} event(s) not yet sent")
+
+
+def _measurement_points(tree: Any, path: Tuple[str, ...] = ()):
+    """Yield (path, point) for every metric point in a saved sensor data tree."""
+    if not isinstance(tree, dict):
+        return
+    measurements = tree.get("measurements")
+    if isinstance(measurements, dict) and isinstance(measurements.get("points"), list):
+        for point in measurements["points"]:
+            if isinstance(point, dict):
+                yield path, point
+    for key, value in tree.items():
+        if key != "measurements" and isinstance(value, dict):
+            yield from _measurement_points(value, path + (key,))
+
+
+def _point_key(path: Tuple[str, ...], point: Dict[str, Any]):
+    tags = point.get("tags") or {}
+    return path, tuple(sorted((str(k), str(v)) for k, v in tags.items()))
+
+
+class TelemetryWatcher:
+    """
+    Turns changes to saved_sensor_data.json and new alarm rows into hub events.
+
+    Args:
+        hub (TelemetryHub): Hub to publish to
+        sensor_data_path (str): saved_sensor_data.json written by the controller
+        audit_store: AuditStore to follow for alarms (None to skip)
+        interval (float): Seconds between polls
+        mode_source (callable): Called each poll while "mode" has subscribers;
+            refreshes the mode from the controller and returns the number of
+            mode events it published (None to skip)
+    """
+
+    def __init__(self, hub: TelemetryHub, sensor_data_path: str, audit_store=None,
+                 interval: float = POLL_SECONDS, mode_source: Optional[Callable[[], int]] = None):
+        self._hub = hub
+        self._path = sensor_data_path
+        self._audit = audit_store
+        self._mode_source = mode_source
+        self._interval = interval
+        self._signature = None
+        self._points: Optional[Dict[Any, Dict[str, Any]]] = None
+        self._alarm_rowid: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        """Start the polling thread once; later calls do nothing."""
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="telemetry_watcher", daemon=True)
+                self._thread.start()
+
+    def poll(self) -> int:
+        """Check every source once; returns the number of events published."""
+        return self._poll_sensor_data() + self._poll_alarms() + self._poll_mode()
+
+    # Internals
+
+    def _run(self):
+        event = threading.Event()
+        while True:
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"[STREAM] Telemetry poll failed: {e}")
+            event.wait(self._interval)
+
+    def _poll_sensor_data(self) -> int:
+        if not self._hub.has_subscribers("reading") and not self._hub.has_subscribers("relay"):
+            self._signature, self._points = None, None   # re-baseline when someone subscribes
+            return 0
+        try:
+            stat = os.stat(self._path)
+        except OSError:
+            return 0
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return 0
+        try:
+            with open(self._path, "rb") as file:
+                tree = orjson.loads(file.read())
+        except (OSError, orjson.JSONDecodeError):
+            return 0  # mid-write; the next poll sees the finished file
+        self._signature = signature
+
+        points = {_point_key(path, point): (path, point) for path, point in _measurement_points(tree.get("data"))}
+        previous, self._points = self._points, points
+        if previous is None:
+            return 0
+        published = 0
+        for key, (path, point) in points.items():
+            old = previous.get(key)
+            if old is not None and old[1].get("fields") == point.get("fields") \
+                    and old[1].get("timestamp") == point.get("timestamp"):
+                continue
+            if path and path[0] == "relay_metrics":
+                published += self._publish_relay(point, old[1] if old else None)
+            else:
+                self._hub.publish("reading", {
+                    "metric": ".".join(path),
+                    "tags": point.get("tags") or {},
+                    "fields": point.get("fields") or {},
+                    "timestamp": point.get("timestamp"),
+                })
+                published += 1
+        return published
+
+    def _publish_relay(self, point: Dict[str, Any], old: Optional[Dict[str, Any]]) -> int:
+        status = (point.get("fields") or {}).get("status")
+        if old is not None and (old.get("fields") or {}).get("status") == status:
+            return 0  # timestamp-only refresh
+        tags = point.get("tags") or {}
+        self._hub.publish("relay", {
+            "device": tags.get("device"),
+            "relay_board": tags.get("relay_board"),
+            "port_index": tags.get("port_index"),
+            "status": status,
+            "timestamp": point.get("timestamp"),
+        })
+        return 1
+
+    def _poll_alarms(self) -> int:
+        if self._audit is None:
+            return 0
+        if not self._hub.has_subscribers("alarm"):
+            self._alarm_rowid = None
+            return 0
+        if self._alarm_rowid is None:
+            self._alarm_rowid = self._audit.last_rowid()
+            return 0
+        published = 0
+        for event in self._audit.get_since(self._alarm_rowid, "alarm", limit=ALARM_BATCH):
+            self._alarm_rowid = event.pop("rowid")
+            self._hub.publish("alarm", event)
+            published += 1
+        return published
+
+    def _poll_mode(self) -> int:
+        if self._mode_source is None or not self._hub.has_subscribers("mode"):
+            return 0
+        return self._mode_source()
+
+
+_hub: Optional[TelemetryHub] = None
+_hub_lock = threading.Lock()
+
+
+def get_telemetry_hub(sensor_data_path: Optional[str] = None, audit_store=None,
+                      mode_source: Optional[Callable[[], int]] = None) -> TelemetryHub:
+    """Process-wide hub; its watcher is created on first use when sensor_data_path is given."""
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            _hub = TelemetryHub()
+            if sensor_data_path:
+                _hub.watcher = TelemetryWatcher(_hub, sensor_data_path, audit_store,
+                                                mode_source=mode_source)
+        return _hub
@@ -8,7 +8,6 @@ Created: 2025-09-23
 Simplified to event-driven: 2026-02-09
 """
 
-import configparser
 import os
 from datetime import datetime
 
@@ -19,6 +18,21 @@ except Exception:
     import logging
     logger = logging.getLogger(__name__)
 
+try:
+    from src.config_snapshot import get_config_snapshot
+except ImportError:
+    from config_snapshot import get_config_snapshot
+
+try:
+    from src.poll_scheduler import realtime_boost, realtime_release
+except ImportError:
+    from poll_scheduler import realtime_boost, realtime_release
+
+try:
+    from src.deadline_service import get_deadline_service
+except ImportError:
+    from deadline_service import get_deadline_service
+
 
 # --- Drain state (module-level) ---
 _drain_state = {
@@ -31,70 +45,31 @@ _drain_state = {
     'mode': None,            # 'drain', 'flush', 'full_drain'
 }
 
+# Deadline that ends the drain at max_duration even if level readings stop
+_drain_deadline = None
+
+
+def _config():
+    """Current device.conf snapshot; re-parsed only when the file changes"""
+    config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'device.conf')
+    return get_config_snapshot(config_path)
+
 
 def get_water_level_targets():
     """Get water level targets and limits from device.conf"""
-    try:
-        config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'device.conf')
-        config = configparser.ConfigParser()
-        config.read(config_path)
-
-        # Get operational values (second value after comma)
-        target_str = config.get('WaterLevel', 'water_level_target')
-        deadband_str = config.get('WaterLevel', 'water_level_deadband')
-        min_str = config.get('WaterLevel', 'water_level_min')
-        max_str = config.get('WaterLevel', 'water_level_max')
-
-        target = float(target_str.split(',')[1].strip())
-        deadband = float(deadband_str.split(',')[1].strip())
-        water_min = float(min_str.split(',')[1].strip())
-        water_max = float(max_str.split(',')[1].strip())
-
-        return target, deadband, water_min, water_max
-    except Exception as e:
-        logger.error(f"Error reading water level targets: {e}")
-        return 80.0, 10.0, 50.0, 100.0  # Default: target=80, deadband=10, min=50, max=100
+    config = _config()
+    return config.water_level_target, config.water_level_deadband, config.water_level_min, config.water_level_max
 
 
 def is_water_level_control_enabled():
     """Check if automatic water level valve control is enabled in config"""
-    try:
-        config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'device.conf')
-        config = configparser.ConfigParser()
-        config.read(config_path)
-
-        if not config.has_option('WaterLevel', 'water_level_control_enabled'):
-            # Default to enabled if option doesn't exist (backward compatibility)
-            return True
-
-        enabled_str = config.get('WaterLevel', 'water_level_control_enabled')
-        # Get operational value (second value after comma)
-        operational_value = enabled_str.split(',')[1].strip().lower()
-        return operational_value == 'true'
-    except Exception as e:
-        logger.error(f"Error reading water_level_control_enabled: {e}")
-        return True  # Default to enabled
+    return _config().water_level_control_enabled
 
 
 def get_drain_config():
     """Read drain safety config from device.conf."""
-    try:
-        config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'device.conf')
-        config = configparser.ConfigParser()
-        config.read(config_path)
-
-        safety_floor = 30.0
-        max_duration = 1800
-
-        if config.has_option('WaterLevel', 'tank_dump_safety_floor'):
-            safety_floor = float(config.get('WaterLevel', 'tank_dump_safety_floor').split(',')[1].strip())
-        if config.has_option('WaterLevel', 'tank_dump_max_duration_seconds'):
-            max_duration = int(config.get('WaterLevel', 'tank_dump_max_duration_seconds').split(',')[1].strip())
-
-        return safety_floor, max_duration
-    except Exception as e:
-        logger.error(f"Error reading drain config: {e}")
-        return 30.0, 1800
+    config = _config()
+    return config.tank_dump_safety_floor, config.tank_dump_max_duration_seconds
 
 
 def start_drain(target_level=None, drain_amount=None, duration_seconds=None,
@@ -110,7 +85,7 @@ def start_drain(target_level=None, drain_amount=None, duration_seconds=None,
     Returns:
       dict with 'status' ('ok' or 'error') and 'message'.
     """
-    global _drain_state
+    global _drain_state, _drain_deadline
 
     if _drain_state['active']:
         return {'status': 'error', 'message': 'Drain already active. Stop it first.'}
@@ -179,6 +154,11 @@ def start_drain(target_level=None, drain_amount=None, duration_seconds=None,
 
     logger.info(f"DRAIN STARTED: mode={mode}, target={resolved_target} cm, "
                 f"max_duration={max_dur}s, reason={reason}, inhibit_refill={inhibit_refill}")
+    # Poll the level fast so the target is not overshot by a whole poll interval of flow
+    realtime_boost("water_level", "drain", duration=max_dur)
+    if max_dur:
+        _drain_deadline = get_deadline_service().call_later(
+            max_dur, lambda: stop_drain(f"duration {max_dur}s exceeded (deadline)"), name="drain_max_duration")
 
     return {'status': 'ok', 'message': f'Drain started: mode={mode}, target={resolved_target} cm'}
 
@@ -205,6 +185,9 @@ def stop_drain(reason_msg='manual stop'):
 
     logger.info(f"DRAIN STOPPED: reason='{reason_msg}', mode={_drain_state['mode']}, "
                 f"elapsed={elapsed:.1f}s, target_was={_drain_state['target_level']} cm")
+    realtime_release("water_level", "drain")
+    if _drain_deadline is not None:
+        _drain_deadline.cancel()
 
     _drain_state = {
         'active': False,
@@ -229,6 +212,45 @@ def get_drain_status():
     return state
 
 
+def check_drain(level):
+    """Stop an active drain whose target or max duration is reached.
+
+    Returns:
+        bool: True while a drain that inhibits refill is still active
+    """
+    if not _drain_state['active']:
+        return False
+
+    inhibit_refill = _drain_state['inhibit_refill']
+    elapsed = (datetime.now() - _drain_state['started_at']).total_seconds()
+
+    # Check stop conditions
+    if level <= _drain_state['target_level']:
+        stop_drain(f"target {_drain_state['target_level']} cm reached (level={level} cm)")
+    elif _drain_state['max_duration'] and elapsed >= _drain_state['max_duration']:
+        stop_drain(f"duration {_drain_state['max_duration']}s exceeded (elapsed={elapsed:.1f}s)")
+    else:
+        logger.info(f"DRAIN active: level={level} cm, target={_drain_state['target_level']} cm, "
+                    f"elapsed={elapsed:.1f}s/{_drain_state['max_duration']}s")
+
+    return inhibit_refill
+
+
+def refill_decision(level, targets=None):
+    """Inlet valve state for a level: True open, False close, None hold (hysteresis band).
+
+    Args:
+        level (float): Current water level in cm
+        targets (tuple): (target, deadband, min, max); read from device.conf when None
+    """
+    target, deadband, water_min, water_max = targets or get_water_level_targets()
+    if level < water_min or level < target - deadband:
+        return True
+    if level >= target:
+        return False
+    return None
+
+
 def evaluate_water_level(level):
     """Evaluate water level and control valve. Called on every sensor reading."""
     if not is_water_level_control_enabled():
@@ -238,21 +260,8 @@ def evaluate_water_level(level):
         return
 
     # --- Drain/flush logic ---
-    if _drain_state['active']:
-        inhibit_refill = _drain_state['inhibit_refill']
-        elapsed = (datetime.now() - _drain_state['started_at']).total_seconds()
-
-        # Check stop conditions
-        if level <= _drain_state['target_level']:
-            stop_drain(f"target {_drain_state['target_level']} cm reached (level={level} cm)")
-        elif _drain_state['max_duration'] and elapsed >= _drain_state['max_duration']:
-            stop_drain(f"duration {_drain_state['max_duration']}s exceeded (elapsed={elapsed:.1f}s)")
-        else:
-            logger.info(f"DRAIN active: level={level} cm, target={_drain_state['target_level']} cm, "
-                        f"elapsed={elapsed:.1f}s/{_drain_state['max_duration']}s")
-
-        if inhibit_refill:
-            return  # Skip refill logic for pure drain / full drain
+    if check_drain(level):
+        return  # Skip refill logic for pure drain / full drain
 
     # --- Refill logic (runs normally during flush, or when no drain active) ---
     target, deadband, water_min, water_max = get_water_level_targets()
@@ -263,13 +272,17 @@ def evaluate_water_level(level):
     if not relay:
         return
 
-    if level < water_min:
+    decision = refill_decision(level, (target, deadband, water_min, water_max))
+    if decision and level < water_min:
         relay.set_valve_outside_to_tank(True)
+        realtime_boost("water_level", "fill")
         logger.warning(f"Water level ({level} cm) BELOW minimum ({water_min} cm) - EMERGENCY REFILL")
-    elif level < low_threshold:
+    elif decision:
         relay.set_valve_outside_to_tank(True)
+        realtime_boost("water_level", "fill")
         logger.info(f"Water level ({level} cm) below threshold ({low_threshold} cm) - REFILL")
-    elif level >= target:
+    elif decision is False:
         relay.set_valve_outside_to_tank(False)
+        realtime_release("water_level", "fill")
         logger.info(f"Water level ({level} cm) reached target ({target} cm) - valve CLOSED")
     # Between low_threshold and target: no action (hysteresis)
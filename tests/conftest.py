@@ -66,6 +66,10 @@ mixing_duration = 00:00:10, 00:00:10
     # Disable actual scheduler to prevent background jobs
     monkeypatch.setattr("src.globals._scheduler_running", False)
 
+    # No dose left running by a previous test (its stop job never fires)
+    monkeypatch.setattr("src.nutrient_static._dose_running", False)
+    monkeypatch.setattr("src.ph_static._ph_dose_running", False)
+
     yield {
         "config_dir": config_dir,
         "data_dir": data_dir,
@@ -0,0 +1,14 @@
+"""Manually advanced clock for tests of time-driven code"""
+
+
+class FakeClock:
+    """Callable stand-in for time.monotonic(); sleep() advances it instantly"""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
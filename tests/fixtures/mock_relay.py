@@ -74,3 +74,85 @@ def mock_relay(monkeypatch):
     monkeypatch.setattr("src.sensors.Relay.Relay", lambda: mock)
 
     return mock
+
+
+def board_relay(assignments, statuses=None, echo_writes=False):
+    """
+    Real Relay write logic over a fake bus.
+
+    Args:
+        assignments: {device: (board, port)}
+        statuses: {board: [0/1, ...]} coil read-back per board (seeds the shadow)
+        echo_writes: Echo each write as soon as it is sent, instead of
+            waiting for relay.respond() (for callers that block on the echo)
+
+    Returns:
+        Relay: relay.writes lists (board, start, states) per frame sent,
+            relay.frames the raw Modbus commands; relay.respond() delivers
+            the bus responses to every pending command. Coalescing is off
+            (relay.coalesce_window = 0) unless a test sets a window.
+    """
+    from src.lumina_modbus_event_emitter import ModbusResponse
+    from src.relay_coalescer import RelayCoalescer
+    from src.relay_shadow import RelayShadow
+    from src.sensors.Relay import Relay
+
+    relay = object.__new__(Relay)
+    boards = sorted({board for board, _ in assignments.values()})
+    relay.relay_addresses = {board: 0x01 + i for i, board in enumerate(boards)}
+    relay.relay_board_names = {board: board for board in boards}
+    relay.relay_channels = {board: 16 for board in boards}
+    relay.relay_assignments = {
+        device: {'relay_name': board, 'index': index, 'board_name': board}
+        for device, (board, index) in assignments.items()
+    }
+    relay.relay_statuses = {board: list(states) for board, states in (statuses or {}).items()}
+    relay.shadow = RelayShadow()
+    for board, states in (statuses or {}).items():
+        relay.shadow.record_read(board, states)
+    relay.coalesce_window = 0.0
+    relay.coalescer = RelayCoalescer(relay._send_ports, relay._settled_state, lambda: relay.coalesce_window)
+    relay.pending_commands = {}
+    relay.port, relay.baud_rate, relay.address = "/dev/null", 38400, 0x01
+    relay.last_updated = None
+    relay.save_data = MagicMock()
+    relay.save_null_data = MagicMock()
+
+    relay.frames = []
+    sent = {}
+
+    def send_command(**kwargs):
+        relay.frames.append(bytes(kwargs["command"]))
+        command_id = f"cmd-{len(relay.frames)}"
+        sent[command_id] = bytes(kwargs["command"])
+        return command_id
+    relay.modbus_client = MagicMock()
+    relay.modbus_client.send_command.side_effect = send_command
+
+    def answer(command_id, status="success", coils=None):
+        command = sent[command_id]
+        data = command[:6] + b"\x00\x00"
+        if command[1] == 0x01:
+            board = relay.pending_commands[command_id]["relay_name"]
+            bits = sum(1 << i for i, on in enumerate((coils or {}).get(board, [])) if on)
+            data = bytes([command[0], 0x01, 2, bits & 0xFF, bits >> 8, 0, 0])
+        relay._handle_response(ModbusResponse(command_id, data if status == "success" else None,
+                                              "relay", status))
+
+    def respond(status="success", coils=None):
+        """Answer every pending command: writes are echoed, reads return coils[board]."""
+        for command_id in list(relay.pending_commands):
+            answer(command_id, status, coils)
+    relay.respond = respond
+
+    relay.writes = []
+    send = relay.set_multiple_relays
+
+    def record(board, start, states):
+        relay.writes.append((board, start, list(states)))
+        ack = send(board, start, states)
+        if echo_writes:
+            answer(next(reversed(sent)))
+        return ack
+    relay.set_multiple_relays = record
+    return relay
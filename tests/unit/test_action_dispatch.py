@@ -0,0 +1,115 @@
+"""action.json dispatch: compiled once per config version, applied as one relay batch"""
+import json
+import time
+
+import pytest
+
+from tests.fixtures.mock_relay import board_relay
+
+
+CONF = """
+[RELAY_CONTROLS]
+nutrient_pump_a = NutrientPumpA
+nutrient_pump_b = NutrientPumpB
+nutrient_pumps = NutrientPumpA, NutrientPumpB, NutrientPumpC
+sprinkler_a = SprinklerA
+sprinkler_b = SprinklerB
+"""
+
+
+def _snapshot(version, sections):
+    from src.config_snapshot import ConfigSnapshot
+    return ConfigSnapshot(version, "/tmp/device.conf", None, sections)
+
+
+def test_table_is_compiled_once_per_config_version():
+    from src.action_dispatch import get_action_table
+
+    controls = {"RELAY_CONTROLS": {"mixing_pump": "MixingPump"}}
+    first = get_action_table(_snapshot(7, controls))
+    assert get_action_table(_snapshot(7, controls)) is first
+    changed = get_action_table(_snapshot(8, {"RELAY_CONTROLS": {"mixing_pump": "MixingPumpTwo"}}))
+    assert changed is not first and changed.devices == {"mixing_pump": ("MixingPumpTwo",)}
+
+
+def test_groups_expand_and_unknown_actions_are_reported():
+    from src.action_dispatch import ActionDispatchTable, DEFAULT_RELAY_CONTROLS
+
+    table = ActionDispatchTable(1, {"nutrient_pumps": "NutrientPumpA, NutrientPumpB", "sprinkler_a": "SprinklerA"})
+    states, unknown = table.resolve({"nutrient_pumps": True, "sprinkler_a": False, "warp_drive": True})
+    assert states == {"NutrientPumpA": True, "NutrientPumpB": True, "SprinklerA": False}
+    assert unknown == ["warp_drive"]
+
+    default = ActionDispatchTable.from_snapshot(_snapshot(2, {}))
+    assert default.devices["ph_up_pump"] == (DEFAULT_RELAY_CONTROLS["ph_up_pump"],)
+
+
+@pytest.fixture
+def handler(tmp_path, monkeypatch):
+    import main
+
+    (tmp_path / "config").mkdir(exist_ok=True)
+    conf = tmp_path / "config" / "device.conf"
+    conf.write_text(CONF)
+    monkeypatch.chdir(tmp_path)
+
+    relay = board_relay({
+        "NutrientPumpA": ("relayone", 0), "NutrientPumpB": ("relayone", 1), "NutrientPumpC": ("relayone", 2),
+        "SprinklerA": ("relayone", 9), "SprinklerB": ("relayone", 10),
+    }, statuses={"relayone": [0] * 16}, echo_writes=True)
+    monkeypatch.setattr(main, "Relay", lambda: relay)
+    monkeypatch.setattr(main.time, "sleep", lambda seconds: pytest.fail("process_actions slept"))
+
+    handler = object.__new__(main.ConfigFileHandler)
+    handler.controller = type("Controller", (), {"config_file": str(conf)})()
+    handler.last_action_state = {}
+    handler.last_action_report = None
+    return handler, relay
+
+
+def test_actions_are_applied_as_one_batch_and_confirmed(handler):
+    handler, relay = handler
+    actions = {"nutrient_pumps": True, "sprinkler_a": True, "sprinkler_b": True, "unknown_thing": False}
+    with open("config/action.json", "w") as f:
+        json.dump(actions, f)
+
+    started = time.monotonic()
+    handler.process_actions()
+
+    assert time.monotonic() - started < 1.0
+    # One frame for the whole payload; ports 3-8 are filled from the shadow
+    assert relay.writes == [("relayone", 0, [True, True, True] + [False] * 6 + [True, True])]
+    report = handler.last_action_report
+    assert report["confirmed"] and report["writes"] == 1 and report["devices"] == 5
+    assert report["unknown"] == ["unknown_thing"]
+    assert report["write_to_confirm_ms"] >= 0
+    with open("config/action.json") as f:
+        assert json.load(f) == {}
+
+
+def test_confirmation_covers_only_this_batch_and_fails_on_a_failed_echo():
+    from src.action_dispatch import apply_actions
+
+    relay = board_relay({"SprinklerA": ("relayone", 9), "MixingPump": ("relayone", 12)},
+                        statuses={"relayone": [0] * 16})
+    snapshot = _snapshot(3, {"RELAY_CONTROLS": {"sprinkler_a": "SprinklerA"}})
+    relay.set_multiple_relays("relayone", 12, [True])        # unrelated write, never echoed
+    relay.pending_commands.clear()                           # respond() must not answer it
+
+    send = relay.apply_states
+    status = ["success"]
+
+    def apply_and_answer(states, **kwargs):
+        acks = send(states, **kwargs)
+        relay.respond(status=status[0])
+        return acks
+    relay.apply_states = apply_and_answer
+
+    started = time.monotonic()
+    report = apply_actions(snapshot, {"sprinkler_a": True}, relay, confirm_timeout=1.0)
+    assert report["confirmed"] and report["writes"] == 1
+    assert time.monotonic() - started < 0.5                  # did not wait for the unrelated write
+
+    status[0] = "timeout"
+    report = apply_actions(snapshot, {"sprinkler_a": False}, relay, confirm_timeout=1.0)
+    assert not report["confirmed"] and report["writes"] == 1
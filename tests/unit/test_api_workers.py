@@ -0,0 +1,149 @@
+"""Blocking API work runs on worker pools; heartbeats stay fast meanwhile"""
+import asyncio
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+
+async def _call(app, method, path, body=None, query=""):
+    """Minimal ASGI request; returns (status, decoded JSON body)."""
+    payload = json.dumps(body).encode() if body is not None else b""
+    messages, delivered = [], False
+
+    async def receive():
+        nonlocal delivered
+        if not delivered:
+            delivered = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": query.encode(), "headers": [(b"content-type", b"application/json")],
+        "client": ("10.0.0.2", 50000), "server": ("ripple", 5000),
+    }
+    await app(scope, receive, send)
+    return messages[0]["status"], json.loads(b"".join(m.get("body", b"") for m in messages[1:]))
+
+
+@pytest.fixture
+def api(monkeypatch):
+    import server
+
+    monkeypatch.setattr(server, "audit", None)
+    monkeypatch.setattr(server, "_edge_ip", "10.0.0.2")        # no edge_ip.txt rewrite
+    monkeypatch.setattr(server, "_current_mode", "passive")
+    server.app.dependency_overrides[server.verify_credentials] = lambda: "test"
+    yield server
+    server.app.dependency_overrides.clear()
+
+
+async def _heartbeat_during(app, slow_request):
+    """Start slow_request, then time a heartbeat while it is still running."""
+    slow = asyncio.ensure_future(slow_request)
+    await asyncio.sleep(0.05)
+    started = time.monotonic()
+    status, body = await _call(app, "POST", "/api/v1/heartbeat", {})
+    latency = time.monotonic() - started
+    assert status == 200 and body["mode"] == "passive"
+    assert not slow.done()
+    return latency, await slow
+
+
+def test_heartbeat_is_answered_while_a_scan_runs(api, monkeypatch):
+    from src.scan_jobs import ScanJobManager
+
+    client = SimpleNamespace(read_holding_registers=lambda *args, **kwargs: time.sleep(0.05))
+    manager = ScanJobManager(client)
+    monkeypatch.setattr(api, "_scan_jobs", lambda: manager)
+
+    async def scenario():
+        started = time.monotonic()
+        status, body = await _call(api.app, "POST", "/api/v1/scan",
+                                   {"ports": ["/dev/ttyAMA2"], "baud_rates": [9600], "addr_end": 0x20})
+        submit_latency = time.monotonic() - started
+        await asyncio.sleep(0.1)
+        started = time.monotonic()
+        heartbeat = await _call(api.app, "POST", "/api/v1/heartbeat", {})
+        return submit_latency, time.monotonic() - started, body, heartbeat
+
+    submit_latency, latency, body, heartbeat = asyncio.run(scenario())
+    job = manager.get(body["job_id"])
+    try:
+        assert submit_latency < 0.2 and latency < 0.2
+        assert heartbeat[0] == 200 and job.state == "running"
+    finally:
+        manager.cancel(job.id)
+
+
+def test_heartbeat_is_answered_while_a_calibration_read_polls(api, monkeypatch):
+    responses, pending = {}, {}
+
+    def send_command(**kwargs):
+        pending["cal-1"] = True
+
+        def answer():                               # pH 6.86 at 25.0 C, 0.6 s later
+            responses["cal-1"] = SimpleNamespace(status="success",
+                                                 data=bytes([0x10, 0x03, 4, 0x02, 0xAE, 0x00, 0xFA, 0, 0]))
+            pending.pop("cal-1")
+        threading.Timer(0.6, answer).start()
+        return "cal-1"
+
+    client = SimpleNamespace(send_command=send_command, pending_commands=pending, command_responses=responses)
+    monkeypatch.setattr(api.globals, "modbus_client", client)
+    monkeypatch.setattr(api, "_get_sensor_config",
+                        lambda sensor: {"port": "/dev/ttyAMA1", "address": 0x10, "baudrate": 9600})
+
+    latency, (status, body) = asyncio.run(_heartbeat_during(
+        api.app, _call(api.app, "GET", "/api/v1/calibration/live", query="sensor=ph")))
+
+    assert latency < 0.2
+    assert status == 200 and body["value"] == 6.86 and body["temperature"] == 25.0
+
+
+def test_worker_exceptions_reach_the_handler():
+    from fastapi import HTTPException
+    from src import api_workers
+
+    def fail():
+        raise HTTPException(status_code=502, detail="Modbus read timed out")
+
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(api_workers.run_blocking(fail))
+    assert raised.value.status_code == 502
+
+
+def test_slow_controller_calls_do_not_stall_the_event_loop(api, monkeypatch):
+    """Heartbeat and mode wait for the controller on a worker, not on the loop"""
+    def slow_call(method, **kwargs):
+        time.sleep(0.2)
+        return {"mode": "passive", "last_heartbeat": 1.0, "timeout_s": 60}
+    monkeypatch.setattr(api, "_controller", lambda: SimpleNamespace(call=slow_call))
+
+    async def scenario():
+        gaps, done = [], asyncio.Event()
+
+        async def ticker():
+            last = time.monotonic()
+            while not done.is_set():
+                await asyncio.sleep(0.01)
+                now = time.monotonic()
+                gaps.append(now - last)
+                last = now
+        ticking = asyncio.ensure_future(ticker())
+        results = await asyncio.gather(_call(api.app, "POST", "/api/v1/heartbeat", {}),
+                                       _call(api.app, "GET", "/api/v1/mode"))
+        done.set()
+        await ticking
+        return results, max(gaps)
+
+    (heartbeat, mode), worst_gap = asyncio.run(scenario())
+    assert heartbeat[1]["mode"] == "passive" and mode[1]["timeout_s"] == 60
+    assert worst_gap < 0.1
@@ -0,0 +1,181 @@
+"""Key-level config change bus and controller subscriptions"""
+import pytest
+
+
+def _sections(**overrides):
+    sections = {
+        "Sprinkler": {"sprinkler_on_duration": "01:10:00, 00:15:00",
+                      "sprinkler_wait_duration": "03:00:00, 03:00:00"},
+        "EC": {"ec_target": "0.8, 1.0", "ec_deadband": "0.1, 0.1"},
+        "pH": {"ph_target": "5.5, 5.5"},
+    }
+    for name, value in overrides.items():
+        section, key = name.split("__")
+        sections.setdefault(section, {})[key] = value
+    return sections
+
+
+def test_diff_is_key_level():
+    """Only the edited key is reported, with old and new raw values"""
+    from src.config_bus import diff_snapshots
+
+    changes = diff_snapshots(_sections(), _sections(Sprinkler__sprinkler_on_duration="01:10:00, 00:20:00"))
+
+    assert [c.name for c in changes] == ["Sprinkler.sprinkler_on_duration"]
+    assert changes[0].old_operational == "00:15:00"
+    assert changes[0].new_operational == "00:20:00"
+
+
+def test_diff_reports_added_and_removed_keys():
+    """Added sections, removed keys and removed sections are all key-level changes"""
+    from src.config_bus import diff_snapshots
+
+    old = _sections()
+    new = _sections(DO__do_target="10, 10")
+    del new["pH"]
+    new["EC"].pop("ec_deadband")
+
+    changes = {c.name: (c.old, c.new) for c in diff_snapshots(old, new)}
+
+    assert changes == {
+        "DO.do_target": (None, "10, 10"),
+        "EC.ec_deadband": ("0.1, 0.1", None),
+        "pH.ph_target": ("5.5, 5.5", None),
+    }
+
+
+def test_subscribers_receive_only_matching_keys():
+    """Pattern subscriptions filter changes; a failing subscriber does not block others"""
+    from src.config_bus import ConfigChangeBus
+
+    bus = ConfigChangeBus()
+    received = {}
+
+    def broken(changes, snapshot):
+        raise RuntimeError("boom")
+
+    bus.subscribe("Sprinkler.*", lambda changes, snapshot: received.setdefault("sprinkler", changes))
+    bus.subscribe("*", broken)
+    bus.subscribe(["EC.ec_target", "pH.*"], lambda changes, snapshot: received.setdefault("targets", changes))
+
+    bus.set_baseline(_sections())
+    changes = bus.publish(_sections(Sprinkler__sprinkler_wait_duration="03:00:00, 01:00:00"))
+
+    assert len(changes) == 1
+    assert [c.key for c in received["sprinkler"]] == ["sprinkler_wait_duration"]
+    assert "targets" not in received
+
+
+def test_first_publish_is_baseline():
+    """Nothing is dispatched until there is something to diff against"""
+    from src.config_bus import ConfigChangeBus
+
+    bus = ConfigChangeBus()
+    calls = []
+    bus.subscribe("*", lambda changes, snapshot: calls.append(changes))
+
+    assert bus.publish(_sections()) == []
+    assert calls == []
+
+
+def test_stale_snapshot_does_not_roll_back(tmp_path):
+    """A reload that publishes after a newer one is ignored"""
+    from src.config_bus import ConfigChangeBus
+    from src.config_snapshot import reload_config_snapshot
+
+    conf = tmp_path / "device.conf"
+    conf.write_text("[EC]\nec_target = 0.8, 1.0\n")
+    baseline = reload_config_snapshot(str(conf))
+    conf.write_text("[EC]\nec_target = 0.8, 1.05\n")
+    older = reload_config_snapshot(str(conf))
+    conf.write_text("[EC]\nec_target = 0.8, 1.125\n")
+    newer = reload_config_snapshot(str(conf))
+
+    bus = ConfigChangeBus()
+    calls = []
+    bus.subscribe("*", lambda changes, snapshot: calls.append(snapshot.version))
+    bus.set_baseline(baseline)
+
+    assert len(bus.publish(newer)) == 1
+    assert bus.publish(older) == []
+    assert bus.baseline is newer and calls == [newer.version]
+
+
+@pytest.fixture
+def subscribed_controller(monkeypatch):
+    from main import RippleController
+    from src.config_bus import ConfigChangeBus
+
+    calls = []
+    for handler in ("_on_any_config_changed", "_on_mixing_config_changed", "_on_nutrient_duration_changed",
+                    "_on_ph_pump_duration_changed", "_on_sprinkler_config_changed", "_on_ec_target_changed",
+                    "_on_water_level_config_changed", "_on_plumbing_config_changed",
+                    "_on_sensor_targets_changed"):
+        monkeypatch.setattr(RippleController, handler,
+                            lambda self, changes, snapshot, _name=handler: calls.append(
+                                (_name, sorted(c.name for c in changes))))
+
+    controller = RippleController.__new__(RippleController)
+    controller.config_bus = ConfigChangeBus()
+    controller._subscribe_config_changes()
+    controller.config_bus.set_baseline(_sections())
+    return controller, calls
+
+
+def test_sprinkler_edit_does_not_touch_ph_or_ec(subscribed_controller):
+    """A sprinkler duration edit reaches only the sprinkler handler"""
+    controller, calls = subscribed_controller
+
+    controller.config_bus.publish(_sections(Sprinkler__sprinkler_on_duration="01:10:00, 00:30:00"))
+
+    assert calls == [
+        ("_on_any_config_changed", ["Sprinkler.sprinkler_on_duration"]),
+        ("_on_sprinkler_config_changed", ["Sprinkler.sprinkler_on_duration"]),
+    ]
+
+
+def test_target_edits_reload_targets_once(subscribed_controller):
+    """EC and pH target edits in one write reload sensor targets once"""
+    controller, calls = subscribed_controller
+
+    controller.config_bus.publish(_sections(EC__ec_target="0.8, 1.2", pH__ph_target="5.5, 6.0",
+                                            Sprinkler__sprinkler_on_at_startup="false, true"))
+
+    handlers = [name for name, _ in calls]
+    assert handlers.count("_on_sensor_targets_changed") == 1
+    assert ("_on_ec_target_changed", ["EC.ec_target"]) in calls
+    assert "_on_sprinkler_config_changed" not in handlers
+
+
+def test_ec_limit_edits_reschedule_nutrient_dosing(subscribed_controller):
+    """ec_min/ec_max still reach the EC handler, as the section-level reload did"""
+    controller, calls = subscribed_controller
+
+    controller.config_bus.publish(_sections(EC__ec_min="0.5, 0.6", EC__ec_max="2.0, 1.8"))
+
+    assert ("_on_ec_target_changed", ["EC.ec_max", "EC.ec_min"]) in calls
+
+
+def test_config_mirror_drops_deleted_keys_and_hashes_snapshot_text(tmp_path, monkeypatch):
+    """self.config is rebuilt from the snapshot and the hash comes from its text, not a re-read"""
+    import configparser
+    import hashlib
+    from main import RippleController
+    from src.config_snapshot import reload_config_snapshot
+
+    conf = tmp_path / "device.conf"
+    conf.write_text("[EC]\nec_target = 0.8, 1.0\nec_min = 0.5, 0.5\n")
+    controller = RippleController.__new__(RippleController)
+    controller.config = configparser.ConfigParser(interpolation=None)
+    controller.config.read(conf)
+    monkeypatch.setattr(controller, "_read_config_with_hash",
+                        lambda: pytest.fail("device.conf re-read for the hash"))
+
+    conf.write_text("[EC]\nec_target = 0.8, 1.2\n")
+    snapshot = reload_config_snapshot(str(conf))
+    controller._on_any_config_changed([], snapshot)
+
+    assert not controller.config.has_option("EC", "ec_min")
+    assert controller.config.get("EC", "ec_target") == "0.8, 1.2"
+    assert controller.current_config_text == "[EC]\nec_target = 0.8, 1.2\n"
+    assert controller.current_config_hash == hashlib.sha256(b"[EC]\nec_target = 0.8, 1.2\n").hexdigest()
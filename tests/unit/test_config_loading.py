@@ -199,3 +199,85 @@ ec_deadband = 0.1
 
         # Assert
         assert target == 1.5  # Updated value
+
+
+class TestConfigSnapshot:
+    """Versioned, typed device.conf snapshot behind the *_static getters"""
+
+    def _write(self, path, ec_target):
+        path.write_text(f"[EC]\nec_target = 1.0, {ec_target}\nec_deadband = 0.1, 0.2\n")
+
+    def test_snapshot_is_typed_and_immutable(self, tmp_path):
+        """Operational values are parsed once into typed, read-only attributes"""
+        from src.config_snapshot import get_config_snapshot
+
+        conf = tmp_path / "device.conf"
+        self._write(conf, "1.4")
+        snapshot = get_config_snapshot(str(conf))
+
+        assert snapshot.ec_target == 1.4
+        assert snapshot.ec_deadband == 0.2
+        assert snapshot.abc_ratio == (1, 1, 0)  # Default when missing
+        assert snapshot.operational("EC", "EC_TARGET") == "1.4"
+        with pytest.raises(AttributeError):
+            snapshot.ec_target = 2.0
+        with pytest.raises(TypeError):
+            snapshot.sections["EC"]["ec_target"] = "1.0, 2.0"
+
+    def test_version_only_advances_on_change(self, tmp_path):
+        """Unchanged files return the same snapshot object"""
+        from src.config_snapshot import get_config_snapshot, reload_config_snapshot
+
+        conf = tmp_path / "device.conf"
+        self._write(conf, "1.4")
+        first = get_config_snapshot(str(conf))
+        assert reload_config_snapshot(str(conf)) is first
+
+        self._write(conf, "1.55")
+        second = get_config_snapshot(str(conf))
+        assert second.version == first.version + 1
+        assert second.ec_target == 1.55
+        assert first.ec_target == 1.4  # Old readers keep a consistent view
+
+    def test_watched_path_is_swapped_by_reload(self, tmp_path):
+        """Watched paths skip the file check until the watcher reloads them"""
+        from src.config_snapshot import (get_config_snapshot, reload_config_snapshot,
+                                         watch_config, unwatch_config)
+
+        conf = tmp_path / "device.conf"
+        self._write(conf, "1.4")
+        get_config_snapshot(str(conf))
+        watch_config(str(conf))
+        try:
+            self._write(conf, "1.9")
+            assert get_config_snapshot(str(conf)).ec_target == 1.4
+
+            reload_config_snapshot(str(conf))
+            assert get_config_snapshot(str(conf)).ec_target == 1.9
+        finally:
+            unwatch_config(str(conf))
+
+    def test_missing_file_keeps_previous_snapshot(self, tmp_path):
+        """A reload during a sed -i rename must not fall back to defaults"""
+        from src.config_snapshot import get_config_snapshot, reload_config_snapshot
+
+        conf = tmp_path / "device.conf"
+        self._write(conf, "1.4")
+        snapshot = get_config_snapshot(str(conf))
+        conf.unlink()
+
+        assert reload_config_snapshot(str(conf)) is snapshot
+
+    def test_device_getters_read_snapshot(self, setup_test_environment):
+        """globals.get_device_* read fields from the current snapshot"""
+        import src.globals as globals_module
+
+        config_file = setup_test_environment["config_dir"] / "device.conf"
+        with open(config_file, "a") as f:
+            f.write("\n[SENSORS]\nEC_main = ec, main, EC_main, /dev/ttyAMA3, 0x22, 19200\n")
+
+        assert globals_module.get_device_port('SENSORS', 'EC_main') == '/dev/ttyAMA3'
+        assert globals_module.get_device_address('SENSORS', 'EC_main') == 0x22
+        assert globals_module.get_device_baudrate('SENSORS', 'EC_main') == 19200
+        assert globals_module.get_device_position('SENSORS', 'EC_main') == 'main'
+        assert globals_module.get_device_port('SENSORS', 'pH_main', '/dev/ttyAMA2') == '/dev/ttyAMA2'
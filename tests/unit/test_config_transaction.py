@@ -0,0 +1,158 @@
+"""Coalesced, validated, atomic device.conf writes"""
+import configparser
+import os
+import shutil
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def conf_path(tmp_path):
+    template = os.path.join(os.path.dirname(__file__), "..", "..", "config", "template_device.conf")
+    path = tmp_path / "device.conf"
+    shutil.copy(template, path)
+    return str(path)
+
+
+def _set(section, key, value):
+    def mutate(config):
+        reference = config.get(section, key).split(',')[0].strip()
+        config.set(section, key, f"{reference}, {value}")
+        return {key: value}
+    return mutate
+
+
+def _operational(path, section, key):
+    config = configparser.ConfigParser(interpolation=None)
+    config.read(path)
+    return config.get(section, key).split(',')[1].strip()
+
+
+def test_concurrent_updates_are_written_once(conf_path):
+    """Updates within the window share one write and one notification with the full diff"""
+    from src.config_transaction import ConfigTransactionWriter
+
+    writer = ConfigTransactionWriter(conf_path, window=0.1)
+    notifications = []
+    writer.add_listener(lambda changes: notifications.append(sorted(c.name for c in changes)))
+
+    futures = [
+        writer.submit(_set("Sprinkler", "sprinkler_on_duration", "00:20:00"), label="sprinkler"),
+        writer.submit(_set("Mixing", "mixing_duration", "00:10:00"), label="mixing"),
+        writer.submit(_set("EC", "ec_target", "1.4"), label="fertigation"),
+    ]
+    results = [future.result(timeout=2) for future in futures]
+
+    assert results[1] == {"mixing_duration": "00:10:00"}
+    assert writer.stats()["writes"] == 1
+    assert notifications == [["EC.ec_target", "Mixing.mixing_duration", "Sprinkler.sprinkler_on_duration"]]
+    assert _operational(conf_path, "Mixing", "mixing_duration") == "00:10:00"
+    assert not os.path.exists(conf_path + ".tmp")
+
+
+def test_invalid_update_is_rejected_alone(conf_path):
+    """A bad value fails its own request; the rest of the batch is written"""
+    from src.config_transaction import ConfigTransactionWriter, ConfigValidationError
+
+    writer = ConfigTransactionWriter(conf_path, window=0.1)
+    good = writer.submit(_set("Mixing", "mixing_interval", "01:00:00"))
+    bad = writer.submit(_set("Sprinkler", "sprinkler_on_duration", "20 minutes"))
+
+    assert good.result(timeout=2) == {"mixing_interval": "01:00:00"}
+    with pytest.raises(ConfigValidationError):
+        bad.result(timeout=2)
+    assert _operational(conf_path, "Sprinkler", "sprinkler_on_duration") == "00:15:00"
+    assert writer.stats()["rejected"] == 1
+
+
+def test_ranges_validated_across_requests(conf_path):
+    """min <= target <= max is checked against the batch as applied so far"""
+    from src.config_transaction import ConfigTransactionWriter, ConfigValidationError
+
+    writer = ConfigTransactionWriter(conf_path, window=0.1)
+    lower_max = writer.submit(_set("pH", "ph_max", "6.0"))
+    high_target = writer.submit(_set("pH", "ph_target", "6.5"))
+
+    lower_max.result(timeout=2)
+    with pytest.raises(ConfigValidationError):
+        high_target.result(timeout=2)
+    assert _operational(conf_path, "pH", "ph_max") == "6.0"
+
+
+def test_no_change_no_write(conf_path):
+    """A batch that leaves every value as it was does not touch the file"""
+    from src.config_transaction import ConfigTransactionWriter
+
+    before = os.stat(conf_path).st_mtime_ns
+    writer = ConfigTransactionWriter(conf_path, window=0.01)
+    current = _operational(conf_path, "Mixing", "mixing_duration")
+    writer.apply(_set("Mixing", "mixing_duration", current))
+
+    assert writer.stats()["writes"] == 0
+    assert os.stat(conf_path).st_mtime_ns == before
+
+
+@pytest.mark.slow
+def test_benchmark_push_to_applied(conf_path):
+    """Compare push-to-applied latency: one rewrite per request vs one transaction"""
+    from src.config_bus import ConfigChangeBus
+    from src.config_snapshot import get_config_snapshot, reload_config_snapshot
+    from src.config_transaction import ConfigTransactionWriter
+
+    pushes = [
+        ("Sprinkler", "sprinkler_on_duration", "00:2{i}:00"),
+        ("Sprinkler", "sprinkler_wait_duration", "02:0{i}:00"),
+        ("Mixing", "mixing_duration", "00:1{i}:00"),
+        ("Mixing", "mixing_interval", "01:0{i}:00"),
+        ("WaterLevel", "water_level_target", "8{i}"),
+        ("EC", "ec_target", "1.{i}"),
+        ("pH", "ph_target", "6.{i}"),
+        ("PLUMBING", "mixingpump_on_at_startup", "{flag}"),
+    ]
+    bus = ConfigChangeBus()
+    applied = []
+    bus.subscribe("*", lambda changes, snapshot: applied.append(len(changes)))
+    bus.set_baseline(get_config_snapshot(conf_path))
+
+    def push_each(i):
+        # Previous behaviour: every request rewrites the file and main.py reloads each time
+        for section, key, value in pushes:
+            config = configparser.ConfigParser()
+            config.read(conf_path)
+            _set(section, key, value.format(i=i, flag=str(i % 2 == 0).lower()))(config)
+            with open(conf_path, "w") as f:
+                config.write(f)
+            time.sleep(0.002)  # keep mtimes distinct so each write is seen
+            bus.publish(reload_config_snapshot(conf_path))
+
+    def push_batched(i):
+        writer = ConfigTransactionWriter(conf_path, window=0.02)
+        threads = [threading.Thread(target=writer.apply, args=(
+            _set(section, key, value.format(i=i, flag=str(i % 2 == 0).lower())),))
+            for section, key, value in pushes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        bus.publish(reload_config_snapshot(conf_path))
+
+    rounds = 5
+    started = time.perf_counter()
+    for i in range(rounds):
+        push_each(i)
+    each_ms = (time.perf_counter() - started) * 1000 / rounds
+    each_publishes = len(applied)
+
+    applied.clear()
+    started = time.perf_counter()
+    for i in range(5, 5 + rounds):
+        push_batched(i)
+    batched_ms = (time.perf_counter() - started) * 1000 / rounds
+
+    print(f"\nper-request writes: {each_ms:.1f} ms push-to-applied, {each_publishes // rounds} reloads per push")
+    print(f"transaction       : {batched_ms:.1f} ms push-to-applied, {len(applied) // rounds} reload per push")
+
+    assert len(applied) == rounds
+    assert _operational(conf_path, "pH", "ph_target") == "6.9"
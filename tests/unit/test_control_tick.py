@@ -0,0 +1,153 @@
+"""Unified control tick: one snapshot, all controllers, one relay frame per board"""
+from unittest.mock import MagicMock
+
+import pytest
+
+from tests.fixtures.fake_clock import FakeClock
+from tests.fixtures.mock_relay import board_relay
+
+
+CONF = """
+[NutrientPump]
+nutrient_pump_on_duration = 00:00:10, 00:00:10
+nutrient_pump_wait_duration = 00:05:00, 00:05:00
+abc_ratio = 1:1:0, 1:1:0
+ph_pump_on_duration = 00:00:05, 00:00:04
+ph_pump_wait_duration = 00:02:00, 00:02:00
+
+[WaterLevel]
+water_level_target = 80, 80
+water_level_deadband = 10, 10
+water_level_min = 50, 50
+water_level_max = 100, 100
+
+[Mixing]
+mixing_duration = 00:01:00, 00:01:00
+mixing_interval = 00:10:00, 00:10:00
+
+[Sprinkler]
+sprinkler_on_duration = 00:02:00, 00:02:00
+sprinkler_wait_duration = 01:00:00, 01:00:00
+
+[CONTROL]
+unified_tick_enabled = false, true
+tick_interval_seconds = 2, 1
+"""
+
+
+def _water(ec, ph, level):
+    metric = lambda value: {"measurements": {"points": [{"fields": {"value": value}}]}}  # noqa: E731
+    return {"data": {"water_metrics": {"ec": metric(ec), "ph": metric(ph), "water_level": metric(level)}}}
+
+
+@pytest.fixture
+def plant(tmp_path, monkeypatch):
+    import src.control_tick as ct
+    import src.nutrient_static as ns
+    import src.ph_static as ps
+    from src.deadline_service import DeadlineService
+
+    conf = tmp_path / "device.conf"
+    conf.write_text(CONF)
+    for module in (ct, ns, ps):
+        monkeypatch.setattr(module, "audit", None)
+        monkeypatch.setattr(module, "logger", MagicMock())
+    monkeypatch.setattr(ns, "get_ec_targets", lambda: (1.2, 0.1))
+    monkeypatch.setattr(ns, "get_ec_min_max", lambda: (0.0, 99.0))
+    monkeypatch.setattr(ns, "_dosing_active", False)
+    monkeypatch.setattr(ps, "get_ph_targets", lambda: (6.0, 0.2, 4.0, 8.0))
+    monkeypatch.setattr(ps, "_ph_dosing_active", False)
+    clock = FakeClock()
+    deadlines = DeadlineService(clock=clock, start_threads=False)
+    monkeypatch.setattr(ct, "get_deadline_service", lambda: deadlines)
+
+    relay = board_relay({
+        "NutrientPumpA": ("relayone", 0), "NutrientPumpB": ("relayone", 1), "NutrientPumpC": ("relayone", 2),
+        "pHUpPump": ("relayone", 3), "pHDownPump": ("relayone", 4), "MixingPump": ("relayone", 5),
+        "ValveOutsideToTank": ("relayone", 6), "SprinklerA": ("relaytwo", 0), "SprinklerB": ("relaytwo", 1),
+    }, statuses={"relayone": [0] * 16, "relaytwo": [0] * 16})
+    relay._get_sprinkler_mapping = lambda: {'case': 2, 'sprinkler_a': 'SprinklerA', 'sprinkler_b': 'SprinklerB'}
+    sensors = {"data": _water(0.9, 6.6, 60.0)}
+    tick = ct.ControlTick(relay_factory=lambda: relay, config_path=str(conf), clock=clock,
+                          sensor_source=lambda: sensors["data"])
+    return tick, relay, clock, sensors, deadlines
+
+
+def test_one_tick_decides_everything_and_writes_once_per_board(plant):
+    """EC, pH, mixing and refill all switch in one frame on their shared board"""
+    tick, relay, clock, sensors, deadlines = plant
+
+    timing = tick.run()
+
+    assert relay.writes == [
+        # A, B on (ratio 1:1:0), C off, pH up off, pH down on, mixing on, inlet open
+        ("relayone", 0, [True, True, False, False, True, True, True]),
+    ]                                              # sprinklers start with their wait: already off
+    assert timing["writes"] == 1 and timing["changes"] == 9
+    assert set(timing["decide_ms"]) == {"water_level", "nutrient", "ph", "mixing", "sprinkler"}
+    for key in ("sensors_ms", "config_ms", "relay_ms", "total_ms"):
+        assert timing[key] >= 0
+    assert deadlines.pending() == 3                # nutrient, pH and mixing runs have failsafes
+
+    clock.now = 1.0
+    assert tick.run()["writes"] == 0               # nothing changed, nothing written
+
+    clock.now = 6.0                                # pH dose (5 s max) ends
+    tick.run()
+    assert relay.writes[-1] == ("relayone", 4, [False])
+
+    clock.now = 11.0                               # nutrient dose ends, level reached target
+    sensors["data"] = _water(1.0, 6.1, 80.0)
+    tick.run()
+    assert relay.writes[-1] == ("relayone", 0, [False, False, False, False, False, True, False])
+    assert deadlines.pending() == 1                # only mixing still running
+    assert tick.stats()["ticks"] == 4
+
+
+def test_failsafe_switches_off_when_ticks_stop(plant):
+    tick, relay, clock, sensors, deadlines = plant
+    tick.run()
+
+    relay.writes.clear()
+    clock.now = 100.0                              # no tick for 100 s
+    deadlines.run_due()
+    assert sorted(relay.writes) == [("relayone", 0, [False]), ("relayone", 1, [False]),
+                                    ("relayone", 4, [False]), ("relayone", 5, [False])]
+
+
+def test_failing_controller_leaves_its_devices_alone(plant):
+    tick, relay, clock, sensors, deadlines = plant
+    tick._controllers[1].decide = MagicMock(side_effect=RuntimeError("bad config"))
+
+    timing = tick.run()
+
+    written = {start: states for board, start, states in relay.writes if board == "relayone"}
+    assert 0 not in written and written[4] == [True, True, True]   # pH up is already off
+    assert "nutrient" in timing["decide_ms"]
+
+
+def test_stale_or_missing_readings_are_not_acted_on():
+    from src.control_tick import SensorSnapshot
+
+    data = _water(1.1, 6.0, 70.0)
+    data["data"]["water_metrics"]["ph"]["measurements"]["points"][0]["timestamp"] = "2020-01-01T00:00:00+00:00"
+    del data["data"]["water_metrics"]["water_level"]
+
+    snapshot = SensorSnapshot.from_saved_data(data)
+    assert (snapshot.ec, snapshot.ph, snapshot.water_level) == (1.1, None, None)
+    assert SensorSnapshot.from_saved_data({}).ec is None
+
+
+def test_control_tick_config_from_snapshot(tmp_path):
+    from src.config_snapshot import ConfigSnapshot
+
+    default = ConfigSnapshot(1, str(tmp_path / "device.conf"), None, {})
+    assert default.control_tick_enabled is False
+    assert default.control_tick_interval == 2.0
+
+    snapshot = ConfigSnapshot(2, str(tmp_path / "device.conf"), None, {"CONTROL": {
+        "unified_tick_enabled": "false, true",
+        "tick_interval_seconds": "2, 1",
+    }})
+    assert snapshot.control_tick_enabled is True
+    assert snapshot.control_tick_interval == 1.0
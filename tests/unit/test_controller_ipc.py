@@ -0,0 +1,228 @@
+"""Controller channel: RPC round trips, Modbus proxying, controller-owned mode and API actions"""
+import asyncio
+import statistics
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from tests.fixtures.mock_relay import board_relay
+
+
+@pytest.fixture
+def channel(tmp_path):
+    from src.controller_ipc import ControllerClient, ControllerIPCServer
+
+    server = ControllerIPCServer(str(tmp_path / "controller.sock"))
+    yield server, lambda: ControllerClient(server.path)
+    server.stop()
+
+
+def test_round_trips_take_well_under_a_millisecond_and_errors_come_back(channel):
+    from src.controller_ipc import ControllerCallError, ControllerUnavailable
+
+    server, client_for = channel
+    server.register("echo", lambda **params: params)
+    server.register("fail", lambda: int("pump"))
+    server.start()
+    client = client_for()
+
+    timings = []
+    for n in range(200):
+        started = time.perf_counter()
+        assert client.call("echo", n=n, edge_ip="10.0.0.2") == {"n": n, "edge_ip": "10.0.0.2"}
+        timings.append(time.perf_counter() - started)
+    assert statistics.median(timings) < 0.005
+
+    with pytest.raises(ControllerCallError) as failed:
+        client.call("fail")
+    assert failed.value.error_type == "ValueError"
+    with pytest.raises(ControllerCallError):
+        client.call("warp_drive")
+    assert client.call("echo", ok=True) == {"ok": True}       # connection still usable
+
+    server.register("slow", lambda: time.sleep(0.2))
+    with pytest.raises(ControllerUnavailable) as late:
+        client.call("slow", reply_timeout=0.05)
+    assert late.value.sent                                     # may still run on the controller
+
+
+def test_unreachable_controller_and_restart(channel):
+    from src.controller_ipc import ControllerUnavailable
+
+    server, client_for = channel
+    client = client_for()
+    with pytest.raises(ControllerUnavailable) as unreachable:
+        client.call("ping")
+    assert not unreachable.value.sent
+
+    server.register("ping", lambda: "pong")
+    server.start()
+    assert client.call("ping") == "pong"
+    server.stop()
+    server.start()                                             # pooled socket is now stale
+    assert client.call("ping") == "pong"
+
+
+def test_modbus_proxy_reads_through_the_controllers_client(channel):
+    from src.controller_ipc import ControllerModbusProxy, modbus_command_handler
+    from src.lumina_modbus_event_emitter import ModbusResponse
+
+    frames = []
+    bus = SimpleNamespace(pending_commands={}, command_responses={})
+
+    def send_command(device_type, port, command, **kwargs):
+        command_id = f"bus-{len(frames)}"
+        frames.append((device_type, port, command, kwargs))
+        bus.pending_commands[command_id] = True
+
+        def answer():                                          # two registers: 700, 250
+            bus.command_responses[command_id] = ModbusResponse(
+                command_id, bytes([command[0], 0x03, 4, 0x02, 0xBC, 0x00, 0xFA, 0, 0]), device_type)
+            bus.pending_commands.pop(command_id)
+        threading.Timer(0.01, answer).start()
+        return command_id
+    bus.send_command = send_command
+
+    server, client_for = channel
+    server.register("modbus.command", modbus_command_handler(bus))
+    server.start()
+    proxy = ControllerModbusProxy(client_for())
+
+    response = proxy.read_holding_registers("/dev/ttyAMA2", 0x0000, 2, slave_addr=0x10, baudrate=9600)
+    assert not response.isError() and response.registers == [700, 250]
+    assert frames == [("MODBUS_READ", "/dev/ttyAMA2", bytes([0x10, 0x03, 0, 0, 0, 2]),
+                       {"baudrate": 9600, "response_length": 11, "timeout": 1.0})]
+    assert proxy.pending_commands == {} and proxy.command_responses == {}
+    assert bus.command_responses == {}
+
+    server.stop()
+    command_id = proxy.send_command(device_type="relay", port="/dev/ttyAMA1", command=b"\x01\x01\x00\x00\x00\x10")
+    deadline = time.monotonic() + 2
+    while command_id in proxy.pending_commands and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert proxy.command_responses[command_id].status == "connection_lost" and not proxy.is_connected
+
+
+def test_mode_state_times_out_and_persists_edge_ip_on_change(tmp_path):
+    from src.operating_mode import ModeState
+
+    now = [1000.0]
+    ip_file = tmp_path / "edge_ip.txt"
+    state = ModeState(str(ip_file), clock=lambda: now[0])
+    assert state.check_timeout(60) is None                     # never heard from Edge
+
+    assert state.heartbeat("10.0.0.2")["changed"]
+    mtime = ip_file.stat().st_mtime_ns
+    now[0] += 30
+    assert not state.heartbeat("10.0.0.2")["changed"]
+    assert ip_file.stat().st_mtime_ns == mtime and ip_file.read_text() == "10.0.0.2"
+
+    now[0] += 61
+    assert state.check_timeout(60) == pytest.approx(61)
+    assert state.mode == "autonomous" and state.check_timeout(60) is None
+
+
+def test_controller_heartbeat_timeout_uses_its_own_mode_state(monkeypatch):
+    import main
+    from src.operating_mode import ModeState
+
+    now = [1000.0]
+    controller = object.__new__(main.RippleController)
+    controller.mode_state = ModeState(None, clock=lambda: now[0])
+    relay = MagicMock()
+    monkeypatch.setattr(main, "Relay", lambda: relay)
+
+    controller._ipc_heartbeat("10.0.0.2")
+    now[0] += main.operating_mode.HEARTBEAT_TIMEOUT_S + 1
+    controller._check_heartbeat_timeout()
+
+    assert controller.mode_state.mode == "autonomous"
+    states = relay.apply_states.call_args.args[0]
+    assert states["SprinklerA"] is False and states["pHUpPump"] is False
+
+
+@pytest.fixture
+def api_via_controller(channel, tmp_path, monkeypatch):
+    """server.py wired to a real controller channel served by RippleController's handlers."""
+    import main
+    import server
+    from src.operating_mode import ModeState
+
+    (tmp_path / "config").mkdir(exist_ok=True)
+    conf = tmp_path / "config" / "device.conf"
+    conf.write_text("[RELAY_CONTROLS]\nmixing_pump = MixingPump\nsprinkler_a = SprinklerA\n")
+    monkeypatch.chdir(tmp_path)
+
+    relay = board_relay({"MixingPump": ("relayone", 3), "SprinklerA": ("relayone", 9)},
+                        statuses={"relayone": [0] * 16}, echo_writes=True)
+    monkeypatch.setattr(main, "Relay", lambda: relay)
+    controller = object.__new__(main.RippleController)
+    controller.config_file = str(conf)
+    controller.mode_state = ModeState(None)
+
+    ipc, client_for = channel
+    ipc.register("mode.heartbeat", controller._ipc_heartbeat)
+    ipc.register("mode.get", controller.mode_state.snapshot)
+    ipc.register("actions.apply", controller._ipc_apply_actions)
+    ipc.start()
+
+    client = client_for()
+    monkeypatch.setattr(server, "_controller", lambda: client)
+    monkeypatch.setattr(server, "audit", None)
+    monkeypatch.setattr(server, "_current_mode", "autonomous")
+    monkeypatch.setattr(server, "get_valid_relay_fields", lambda: {"mixing_pump", "sprinkler_a", "device_id"})
+    server.app.dependency_overrides[server.verify_credentials] = lambda: "test"
+    yield server, controller, relay
+    server.app.dependency_overrides.clear()
+
+
+def test_heartbeats_and_actions_reach_the_controller_directly(api_via_controller, monkeypatch):
+    from tests.unit.test_api_workers import _call
+
+    server, controller, relay = api_via_controller
+    persisted = []
+    monkeypatch.setattr(server.io_accounting, "open_accounted", lambda *args, **kwargs: persisted.append(args))
+
+    async def scenario():
+        heartbeat = await _call(server.app, "POST", "/api/v1/heartbeat", {})
+        mode = await _call(server.app, "GET", "/api/v1/mode")
+        started = time.monotonic()
+        action = await _call(server.app, "POST", "/api/v1/action", {"mixing_pump": True, "sprinkler_a": True})
+        return heartbeat, mode, action, time.monotonic() - started
+
+    heartbeat, mode, action, latency = asyncio.run(scenario())
+
+    assert heartbeat == (200, {"status": "success", "mode": "passive", "timestamp": heartbeat[1]["timestamp"]})
+    assert controller.mode_state.mode == "passive" and controller.mode_state.edge_ip == "10.0.0.2"
+    assert server.get_mode() == "passive" and mode[1]["mode"] == "passive"
+    assert action[0] == 200 and action[1]["status"] == "success"
+    assert relay.writes == [("relayone", 3, [True] + [False] * 5 + [True])]
+    assert latency < 0.5
+    assert persisted == []                                     # no edge_ip.txt or action.json
+
+
+def test_actions_are_not_reapplied_here_once_sent(api_via_controller, monkeypatch):
+    """A failed or unanswered actions.apply is an error, never a local run or an action.json write"""
+    from src.controller_ipc import ControllerCallError, ControllerUnavailable
+    from tests.unit.test_api_workers import _call
+
+    server, controller, relay = api_via_controller
+    persisted = []
+    monkeypatch.setattr(server.io_accounting, "open_accounted", lambda *args, **kwargs: persisted.append(args))
+    monkeypatch.setattr(server, "_execute_actions_here", lambda actions: pytest.fail("applied locally"))
+    monkeypatch.delenv("RIPPLE_MODBUS_VIA_CONTROLLER", raising=False)
+
+    def post_failing_with(error):
+        def call(method, **kwargs):
+            raise error
+        monkeypatch.setattr(server, "_controller", lambda: SimpleNamespace(call=call))
+        return asyncio.run(_call(server.app, "POST", "/api/v1/action", {"mixing_pump": True}))
+
+    assert post_failing_with(ControllerCallError("actions.apply", "relay", "ValueError"))[1]["status"] == "error"
+    assert post_failing_with(ControllerUnavailable("no reply", sent=True))[1]["status"] == "error"
+    monkeypatch.setenv("RIPPLE_MODBUS_VIA_CONTROLLER", "1")    # no bus of our own to fall back to
+    assert post_failing_with(ControllerUnavailable("not reachable"))[1]["status"] == "error"
+    assert persisted == [] and relay.writes == []
@@ -0,0 +1,89 @@
+"""Monotonic deadline heap for pump stop timers"""
+import threading
+
+from tests.fixtures.fake_clock import FakeClock
+
+
+def test_deadlines_fire_in_order_and_record_jitter():
+    from src.deadline_service import DeadlineService
+
+    clock = FakeClock(50.0)
+    service = DeadlineService(clock=clock, start_threads=False)
+    fired = []
+    service.call_later(30, lambda: fired.append("mixing"), name="mixing")
+    service.call_later(10, lambda: fired.append("nutrient"), name="nutrient")
+    late = service.call_later(10, lambda: fired.append("ph"), name="ph")
+
+    clock.now = 55.0
+    assert service.run_due() == []
+    clock.now = 60.5
+    assert service.run_due() == ["nutrient", "ph"]
+    assert late.fired and late.jitter == 0.5
+    clock.now = 80.0
+    service.run_due()
+
+    assert fired == ["nutrient", "ph", "mixing"]
+    assert service.stats()["max_jitter_ms"] == 500.0
+    assert service.pending() == 0
+
+
+def test_cancelled_deadline_never_fires():
+    """The primary stop cancels the failsafe; a raising callback does not stop the others"""
+    from src.deadline_service import DeadlineService
+
+    clock = FakeClock(50.0)
+    service = DeadlineService(clock=clock, start_threads=False)
+    fired = []
+
+    def broken():
+        raise IOError("relay offline")
+
+    failsafe = service.call_later(5, lambda: fired.append("failsafe"))
+    service.call_later(5, broken, name="broken")
+    service.call_later(6, lambda: fired.append("after"))
+    assert failsafe.cancel() is True
+    assert failsafe.cancel() is False
+
+    clock.now = 60.0
+    assert service.run_due() == ["broken", "<lambda>"]
+    assert fired == ["after"]
+    assert service.stats()["cancelled"] == 1
+    assert service.stats()["errors"] == 1
+
+
+def test_many_timers_use_two_threads():
+    """Hundreds of pending timers share one timer and one worker thread"""
+    from src.deadline_service import DeadlineService
+
+    service = DeadlineService()
+    before = threading.active_count()
+    done = threading.Event()
+    handles = [service.call_later(60, lambda: None, name=f"pump_{i}") for i in range(200)]
+    service.call_later(0.05, done.set, name="soon")
+    try:
+        assert done.wait(2)
+        assert threading.active_count() - before == 2
+        assert all(handle.cancel() for handle in handles)
+        assert service.stats()["mean_jitter_ms"] < 100
+    finally:
+        service.shutdown()
+
+
+def test_failsafe_cancelled_when_controller_stops(monkeypatch):
+    """A manual stop cancels the failsafe instead of leaving a sleeping thread"""
+    import src.simplified_mixing_controller as mixing
+    from src.deadline_service import DeadlineService
+
+    service = DeadlineService(start_threads=False)
+    monkeypatch.setattr(mixing, "get_deadline_service", lambda: service)
+    monkeypatch.setattr(mixing.SimplifiedMixingController, "_setup_scheduler", lambda self: None)
+
+    controller = mixing.SimplifiedMixingController()
+    threads = threading.active_count()
+    controller._start_failsafe_timer(600)
+    assert service.pending() == 1
+    assert threading.active_count() == threads
+
+    controller.stop_current_cycle()
+    assert service.pending() == 0
+    assert controller.failsafe_timer.cancelled
@@ -0,0 +1,117 @@
+"""Emergency all-off: prebuilt frames at queue priority, read-back verified, latency reported"""
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from tests.fixtures.mock_relay import board_relay
+
+
+ZEROS = [0] * 16
+
+
+@pytest.fixture
+def relay():
+    relay = board_relay({
+        "NutrientPumpA": ("relayone", 0), "pHUpPump": ("relayone", 3), "SprinklerA": ("relaytwo", 0),
+    }, statuses={"relayone": [1, 0, 0, 1] + [0] * 12, "relaytwo": [1] + [0] * 15})
+    return relay
+
+
+def _answer(relay, coils):
+    """Keep answering the fake bus until stopped, like the Modbus event thread."""
+    stop = threading.Event()
+
+    def loop():
+        while not stop.is_set():
+            relay.respond(coils=coils)
+            time.sleep(0.002)
+    thread = threading.Thread(target=loop, daemon=True)
+    thread.start()
+    return stop
+
+
+def test_all_off_sends_prebuilt_frames_first_and_verifies(relay):
+    from lumina_modbus_client import PRIORITY_EMERGENCY
+
+    relay.coalesce_window = 60.0
+    relay.coalescer._call_later = lambda delay, callback, name: MagicMock()
+    relay.set_relay("SprinklerA", True)          # still in the coalescing window
+    relay.set_relay("NutrientPumpA", False)
+
+    stop = _answer(relay, {"relayone": ZEROS, "relaytwo": ZEROS})
+    try:
+        report = relay.emergency_all_off()
+    finally:
+        stop.set()
+
+    assert report["ok"] and report["within_target"]
+    assert report["discarded"] == 2              # the pending changes were never sent
+    assert report["all_off_ms"] < 100
+    assert set(report["boards"]) == {"relayone", "relaytwo"}
+    assert all(board["verified"] for board in report["boards"].values())
+    assert relay.frames[:2] == [bytes([0x01, 0x10, 0, 0, 0, 16, 32] + [0] * 32),
+                                bytes([0x02, 0x10, 0, 0, 0, 16, 32] + [0] * 32)]
+    assert [frame[1] for frame in relay.frames[2:]] == [0x01, 0x01]     # one read-back per board
+    priorities = {call.kwargs["priority"] for call in relay.modbus_client.send_command.call_args_list}
+    assert priorities == {PRIORITY_EMERGENCY}
+    assert relay.shadow.masks("relayone")[0] == 0 and relay.coalescer.stats()["pending"] == 0
+
+
+def test_relay_still_on_after_all_off_is_not_verified(relay):
+    stuck = [0, 0, 0, 1] + [0] * 12              # pH up welded on
+    stop = _answer(relay, {"relayone": stuck, "relaytwo": ZEROS})
+    try:
+        report = relay.emergency_all_off(verify_timeout=0.5)
+    finally:
+        stop.set()
+
+    assert report["ok"] is False
+    assert report["boards"]["relayone"]["verified"] is False
+    assert report["boards"]["relaytwo"]["verified"] is True
+    assert report["all_off_ms"] is not None      # the writes themselves were echoed
+
+
+def test_silent_bus_reports_failure_within_timeout(relay):
+    started = time.monotonic()
+    report = relay.emergency_all_off(verify_timeout=0.1)
+
+    assert time.monotonic() - started < 0.5
+    assert report["ok"] is False and report["all_off_ms"] is None
+    assert report["boards"]["relayone"] == {"off_ms": None, "verified": False, "verify_ms": None}
+
+
+def test_emergency_shutdown_uses_fast_path_and_falls_back(tmp_path):
+    from src.emergency_shutdown import trigger_emergency_shutdown
+
+    relay = MagicMock()
+    relay.emergency_all_off.return_value = {"ok": True, "all_off_ms": 12.0}
+    report = trigger_emergency_shutdown("test", str(tmp_path / "a.flag"), relay=relay)
+    assert report["all_off_ms"] == 12.0
+    relay.set_relay.assert_not_called()
+
+    relay.emergency_all_off.return_value = {"ok": False, "all_off_ms": None}
+    trigger_emergency_shutdown("test", str(tmp_path / "b.flag"), relay=relay)
+    relay.set_relay.assert_any_call("NutrientPumpA", False)
+
+
+def test_emergency_commands_jump_the_modbus_queue():
+    from lumina_modbus_client import LuminaModbusClient, PRIORITY_EMERGENCY
+    import itertools
+    import queue
+
+    client = object.__new__(LuminaModbusClient)
+    client._request_times_lock = threading.Lock()
+    client.request_times = {}
+    client.pending_commands = {}
+    client.command_queue = queue.PriorityQueue()
+    client._command_seq = itertools.count()
+
+    first = client.send_command("THC", "/dev/ttyAMA2", bytes([0x01, 0x03, 0, 0, 0, 2]))
+    second = client.send_command("EC", "/dev/ttyAMA2", bytes([0x02, 0x03, 0, 0, 0, 2]))
+    urgent = client.send_command("relay", "/dev/ttyAMA2", bytes([0x01, 0x10, 0, 0, 0, 1, 2, 0, 0]),
+                                 priority=PRIORITY_EMERGENCY)
+
+    order = [client.command_queue.get_nowait()[2]["id"] for _ in range(3)]
+    assert order == [urgent, first, second]
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def io_accounting():
+    from src import io_accounting
+    io_accounting.reset()
+    io_accounting.configure(None, None, None)
+    yield io_accounting
+    io_accounting.reset()
+    io_accounting.configure(None, None, None)
+
+
+def test_accounted_file_counts_bytes_and_opens(tmp_path, io_accounting):
+    """Wrapped writes are counted per subsystem"""
+    with io_accounting.open_accounted("device_conf", tmp_path / "device.conf", "w") as f:
+        f.write("[SYSTEM]\n")
+        f.write("fertigation_model = v2\n")
+
+    counters = io_accounting.local_snapshot()["hours"]
+    bucket = next(iter(counters.values()))
+    assert bucket["device_conf"]["bytes"] == len("[SYSTEM]\nfertigation_model = v2\n")
+    assert bucket["device_conf"]["opens"] == 1
+    assert bucket["device_conf"]["writes"] == 2
+    assert (tmp_path / "device.conf").read_text().startswith("[SYSTEM]")
+
+
+def test_fsync_counted(tmp_path, io_accounting):
+    """fsync() through the wrapper is counted"""
+    with io_accounting.open_accounted("action_json", tmp_path / "action.json", "w") as f:
+        json.dump({}, f)
+        f.fsync()
+
+    bucket = next(iter(io_accounting.local_snapshot()["hours"].values()))
+    assert bucket["action_json"]["fsyncs"] == 1
+
+
+def test_no_budget_never_defers(io_accounting):
+    """Without a budget low-priority writers are never deferred"""
+    io_accounting.record_write("status_file", 10 * 1024 * 1024)
+    assert io_accounting.should_defer("status_file") is False
+
+
+def test_budget_defers_low_priority_only(tmp_path, io_accounting):
+    """Over budget, low-priority writers are deferred; others are not"""
+    io_accounting.configure("test", str(tmp_path), budget_mb_per_hour=1)
+    io_accounting.record_write("sensor_data_json", 2 * 1024 * 1024)
+    io_accounting.record_write("status_file", 100)
+
+    assert io_accounting.over_budget() is True
+    assert io_accounting.should_defer("status_file") is True
+    assert io_accounting.should_defer("device_conf") is False
+    assert io_accounting.local_snapshot()["deferred"] == {"status_file": 1}
+
+
+def test_report_merges_process_snapshots(tmp_path, io_accounting):
+    """Report merges other processes' snapshots with live counters"""
+    io_accounting.configure("main", str(tmp_path))
+    io_accounting.record_write("sensor_log", 500, opens=1)
+    io_accounting.snapshot()
+
+    # Same process now reports as the server; the main snapshot stays on disk
+    io_accounting.reset()
+    io_accounting.configure("server", str(tmp_path))
+    io_accounting.record_write("sensor_log", 250, opens=1)
+
+    report = io_accounting.get_report(str(tmp_path), hours=1)
+    assert report["totals"]["sensor_log"]["bytes"] == 750
+    assert report["totals"]["sensor_log"]["opens"] == 2
+    assert {"main", "server"} <= set(report["processes"])
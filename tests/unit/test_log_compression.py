@@ -0,0 +1,230 @@
+import gzip
+import os
+
+
+def _write_lines(path, lines):
+    with open(path, "w") as f:
+        f.writelines(f"{line}\n" for line in lines)
+
+
+def test_compress_file_replaces_original(tmp_path):
+    """Compressed segment replaces the plain file and keeps content"""
+    from src.lumina_logger import compress_file
+
+    log_file = tmp_path / "ripple_20260130_001.log"
+    _write_lines(log_file, [f"line {i}" for i in range(1000)])
+
+    gz_path = compress_file(str(log_file))
+
+    assert gz_path == str(log_file) + ".gz"
+    assert not log_file.exists()
+    with gzip.open(gz_path, "rt") as f:
+        assert f.readline() == "line 0\n"
+
+
+def test_app_log_segments_ordered_and_streamed(tmp_path):
+    """Tail spans compressed and active segments in write order"""
+    from src.lumina_logger import compress_file, list_app_log_segments, tail_log_lines
+
+    _write_lines(tmp_path / "ripple_20260129_001.log", ["a1", "a2"])
+    _write_lines(tmp_path / "ripple_20260130_001.log", ["b1", "b2"])
+    _write_lines(tmp_path / "ripple_20260130_002.log", ["c1"])
+    _write_lines(tmp_path / "ripple_server_20260130_001.log", ["other"])
+    compress_file(str(tmp_path / "ripple_20260129_001.log"))
+    compress_file(str(tmp_path / "ripple_20260130_001.log"))
+
+    segments = list_app_log_segments("ripple_", str(tmp_path))
+
+    assert [os.path.basename(s) for s in segments] == [
+        "ripple_20260129_001.log.gz",
+        "ripple_20260130_001.log.gz",
+        "ripple_20260130_002.log",
+    ]
+    assert tail_log_lines(segments, lines=3) == ["b1\n", "b2\n", "c1\n"]
+
+
+def test_sensor_data_rotation_compresses_segment(tmp_path, monkeypatch):
+    """Full sensor log is rotated into a gzip segment instead of truncated"""
+    import src.lumina_logger as lumina_logger
+    from src.lumina_logger import GlobalLogger
+
+    base_path = str(tmp_path / "sensor_data")
+    monkeypatch.setattr(lumina_logger, "SENSOR_DATA_LOG_PATH", base_path)
+    monkeypatch.setattr(lumina_logger, "SENSOR_DATA_LOG_MAX_SIZE", 200)
+    monkeypatch.setattr(lumina_logger, "compress_in_background", lumina_logger.compress_file)
+
+    logger = GlobalLogger("RippleTest", log_prefix="ripple_test_").logger
+    for i in range(20):
+        logger.log_sensor_data(["data", "water_metrics", "ph"], {"value": 6.0 + i / 100})
+
+    segments = lumina_logger.list_sensor_data_segments(["data", "water_metrics", "ph"], base_path)
+    assert any(s.endswith(".gz") for s in segments)
+    lines = list(lumina_logger.iter_log_lines(segments))
+    assert len(lines) == 20
+    assert lines[-1].rstrip().endswith('{"value": 6.19}')
+
+
+def test_compression_report_measures_savings(tmp_path):
+    """Report uses the gzip trailer to measure original vs on-disk bytes"""
+    from src.lumina_logger import compress_file, get_compression_report
+
+    log_file = tmp_path / "ripple_20260130_001.log"
+    _write_lines(log_file, ["2026-01-30 10:00:00 - main.py - run - sensor ok"] * 500)
+    original_size = log_file.stat().st_size
+    compress_file(str(log_file))
+
+    report = get_compression_report([str(tmp_path)])
+
+    assert report["segments"] == 1
+    assert report["original_bytes"] == original_size
+    assert report["disk_bytes"] < original_size
+    assert report["saved_bytes"] == original_size - report["disk_bytes"]
+    assert report["ratio"] < 0.5
+
+
+def test_loggers_sharing_a_prefix_rotate_together(tmp_path, monkeypatch):
+    """After one rotation every logger of the prefix writes the new segment; nothing is lost"""
+    import src.lumina_logger as lumina_logger
+    from src.lumina_logger import GlobalLogger
+
+    monkeypatch.setattr(lumina_logger, "LOG_FOLDER_PATH", str(tmp_path))
+    monkeypatch.setattr(lumina_logger, "LOG_MAX_SIZE", 0)
+    monkeypatch.setattr(lumina_logger, "compress_in_background", lumina_logger.compress_file)
+    monkeypatch.setattr(GlobalLogger, "schedule_cleanup", lambda self: None)
+    monkeypatch.setattr(lumina_logger, "_prefix_log_files", {})
+
+    first = GlobalLogger("RippleRotateA", log_prefix="ripple_rot_")
+    second = GlobalLogger("RippleRotateB", log_prefix="ripple_rot_")
+    try:
+        assert first.logger.handlers[0] is second.logger.handlers[0]
+        first.logger.info("before rotation")
+        first.clean_up_if_needed()
+        rotated = lumina_logger.list_app_log_segments("ripple_rot_", str(tmp_path))
+        assert len(rotated) == 2 and first.LOG_FILE_PATH == second.LOG_FILE_PATH == rotated[-1]
+
+        second.logger.info("after rotation from B")
+        first.logger.info("after rotation from A")
+        first._log_file.compress_idle_segments(now=os.path.getmtime(rotated[0]) + 1)
+        assert not os.path.exists(rotated[0] + ".gz")       # still inside the idle grace
+        first._log_file.compress_idle_segments(
+            now=os.path.getmtime(rotated[0]) + lumina_logger.LOG_COMPRESSION_IDLE)
+
+        list_segments = lumina_logger.list_app_log_segments("ripple_rot_", str(tmp_path))
+        assert list_segments == [rotated[0] + ".gz", rotated[1]]
+        text = "".join(lumina_logger.iter_log_lines(list_segments))
+        assert text.index("before rotation") < text.index("after rotation from B") < text.index("after rotation from A")
+    finally:
+        first._log_file.handler.close()
+        for key in ("RippleRotateA_ripple_rot_", "RippleRotateB_ripple_rot_"):
+            GlobalLogger._instances.pop(key, None)
+
+
+def test_compression_never_replaces_an_existing_segment(tmp_path):
+    """A reused segment name keeps both the old .gz and the new plain file"""
+    from src.lumina_logger import compress_file
+
+    _write_lines(tmp_path / "ripple_20260130_001.log", ["old"])
+    compress_file(str(tmp_path / "ripple_20260130_001.log"))
+    _write_lines(tmp_path / "ripple_20260130_001.log", ["new"])
+
+    assert compress_file(str(tmp_path / "ripple_20260130_001.log")) is None
+    with gzip.open(tmp_path / "ripple_20260130_001.log.gz", "rt") as f:
+        assert f.read() == "old\n"
+    assert (tmp_path / "ripple_20260130_001.log").read_text() == "new\n"
+
+
+def test_tail_reads_newest_segments_first_and_stops(tmp_path, monkeypatch):
+    """A short tail never opens older compressed segments"""
+    import src.lumina_logger as lumina_logger
+    from src.lumina_logger import compress_file, tail_log_lines
+
+    _write_lines(tmp_path / "ripple_20260130_001.log", [f"a{i}" for i in range(100)])
+    _write_lines(tmp_path / "ripple_20260130_002.log", [f"b{i}" for i in range(3)])
+    _write_lines(tmp_path / "ripple_20260130_003.log", [f"c{i}" for i in range(5000)])
+    compress_file(str(tmp_path / "ripple_20260130_001.log"))
+    compress_file(str(tmp_path / "ripple_20260130_002.log"))
+    segments = lumina_logger.list_app_log_segments("ripple_", str(tmp_path))
+
+    opened = []
+    real_open = lumina_logger.open_log_segment
+    monkeypatch.setattr(lumina_logger, "open_log_segment", lambda path: opened.append(path) or real_open(path))
+
+    assert tail_log_lines(segments, lines=2) == ["c4998\n", "c4999\n"]
+    assert opened == []
+    assert tail_log_lines(segments, lines=5004)[:4] == ["a99\n", "b0\n", "b1\n", "b2\n"]
+    assert opened == [segments[1], segments[0]]
+
+
+def test_leftover_sensor_segments_are_listed_and_requeued(tmp_path, monkeypatch):
+    """A segment renamed before a crash is visible and compressed at the next start"""
+    import src.lumina_logger as lumina_logger
+
+    base_path = str(tmp_path / "sensor_data")
+    active = lumina_logger.sensor_data_log_path(["data", "water_metrics", "ec"], base_path)
+    _write_lines(active + ".20260130T101500000000", ["old"])
+    _write_lines(active + ".20260130T111500000000", ["newer"])
+    compress_file_calls = []
+    monkeypatch.setattr(lumina_logger, "compress_in_background",
+                        lambda path: compress_file_calls.append(lumina_logger.compress_file(path)))
+    lumina_logger.compress_file(active + ".20260130T101500000000")
+    _write_lines(active, ["current"])
+
+    assert [os.path.basename(s) for s in lumina_logger.list_sensor_data_segments(
+        ["data", "water_metrics", "ec"], base_path)] == [
+        "sensor_data.data.water_metrics.ec.log.20260130T101500000000.gz",
+        "sensor_data.data.water_metrics.ec.log.20260130T111500000000",
+        "sensor_data.data.water_metrics.ec.log",
+    ]
+    assert lumina_logger.requeue_leftover_segments(base_path) == 1
+    assert compress_file_calls == [active + ".20260130T111500000000.gz"]
+
+
+def test_deferred_sensor_entries_are_written_later_not_dropped(tmp_path, monkeypatch):
+    """Over the IO budget entries are buffered, then appended with the next allowed write"""
+    import src.lumina_logger as lumina_logger
+    from src import io_accounting
+    from src.lumina_logger import GlobalLogger
+
+    base_path = str(tmp_path / "sensor_data")
+    monkeypatch.setattr(lumina_logger, "SENSOR_DATA_LOG_PATH", base_path)
+    monkeypatch.setattr(lumina_logger, "SENSOR_LOG_DEFER_MAX_ENTRIES", 3)
+    io_accounting.reset()
+    defer = [True]
+    monkeypatch.setattr(io_accounting, "should_defer", lambda subsystem: defer[0])
+    logger = GlobalLogger("RippleTest", log_prefix="ripple_test_").logger
+    ph_path = lumina_logger.sensor_data_log_path(["data", "water_metrics", "ph"], base_path)
+    ec_path = lumina_logger.sensor_data_log_path(["data", "water_metrics", "ec"], base_path)
+
+    logger.log_sensor_data(["data", "water_metrics", "ec"], 1.1)
+    for value in (6.0, 6.1, 6.2):
+        logger.log_sensor_data(["data", "water_metrics", "ph"], value)
+    assert not os.path.exists(ph_path) and not os.path.exists(ec_path)
+    assert io_accounting.local_snapshot()["dropped"] == {"sensor_log": 1}   # the oldest (ec) entry
+
+    defer[0] = False
+    logger.log_sensor_data(["data", "water_metrics", "ph"], 6.3)
+    values = [line.rstrip("\n").split("\t")[2] for line in open(ph_path)]
+    assert values == ["6.0", "6.1", "6.2", "6.3"]
+    assert not os.path.exists(ec_path)
+    io_accounting.reset()
+
+
+def test_deferred_sensor_entries_are_flushed_at_exit(tmp_path, monkeypatch):
+    """Entries still held back when the process exits are appended by the atexit hook"""
+    import src.lumina_logger as lumina_logger
+    from src import io_accounting
+    from src.lumina_logger import GlobalLogger
+
+    base_path = str(tmp_path / "sensor_data")
+    monkeypatch.setattr(lumina_logger, "SENSOR_DATA_LOG_PATH", base_path)
+    io_accounting.reset()
+    monkeypatch.setattr(io_accounting, "should_defer", lambda subsystem: True)
+    logger = GlobalLogger("RippleTest", log_prefix="ripple_test_").logger
+    ph_path = lumina_logger.sensor_data_log_path(["data", "water_metrics", "ph"], base_path)
+
+    logger.log_sensor_data(["data", "water_metrics", "ph"], 6.0)
+    assert not os.path.exists(ph_path)
+
+    lumina_logger._flush_deferred_sensor_entries_at_exit()
+    assert [line.split("\t")[2] for line in open(ph_path)] == ["6.0\n"]
+    io_accounting.reset()
@@ -0,0 +1,237 @@
+"""Deadline-based sensor polling and per-bus frame spacing"""
+import pytest
+
+from tests.fixtures.fake_clock import FakeClock
+
+
+def test_tasks_run_at_their_own_rates():
+    """Water level every 2 s, EC every 10 s, NPK every 60 s"""
+    from src.poll_scheduler import PollScheduler
+
+    clock = FakeClock(100.0)
+    scheduler = PollScheduler(clock=clock)
+    calls = []
+    for name, interval in (("water_level", 2), ("ec", 10), ("npk", 60)):
+        scheduler.add(name, interval, lambda name=name: calls.append(name))
+
+    while clock.now < 160.0:
+        scheduler.run_pending()
+        clock.sleep(max(scheduler.time_until_next(), 0.001))
+
+    assert calls.count("water_level") == 30
+    assert calls.count("ec") == 6
+    assert calls.count("npk") == 1
+    assert all(s["skipped"] == 0 for s in scheduler.stats().values())
+
+
+def test_deadlines_do_not_drift():
+    """A slow poll does not shift later deadlines off the grid"""
+    from src.poll_scheduler import PollScheduler
+
+    clock = FakeClock(100.0)
+    scheduler = PollScheduler(clock=clock)
+    task = scheduler.add("ec", 10, lambda: clock.sleep(0.7))
+
+    started = []
+    for _ in range(5):
+        while scheduler.time_until_next() > 0:
+            clock.sleep(scheduler.time_until_next())
+        started.append(clock.now)
+        scheduler.run_pending()
+
+    assert started == [100.0, 110.0, 120.0, 130.0, 140.0]
+    assert task.max_lateness == 0.0
+
+
+def test_missed_deadlines_are_skipped_and_counted():
+    """Falling several intervals behind runs once and counts what was skipped"""
+    from src.poll_scheduler import PollScheduler
+
+    clock = FakeClock(100.0)
+    scheduler = PollScheduler(clock=clock)
+    calls = []
+    task = scheduler.add("water_level", 2, lambda: calls.append(clock.now))
+
+    scheduler.run_pending()          # deadline 100
+    clock.sleep(7.5)                 # loop stalled through 102, 104, 106
+    scheduler.run_pending()          # runs the 106 deadline late, once
+
+    assert len(calls) == 2
+    assert task.skipped == 2
+    assert task.next_deadline == 108.0
+
+
+def test_failing_poll_keeps_schedule():
+    """An exception is counted and the task stays on its grid"""
+    from src.poll_scheduler import PollScheduler
+
+    clock = FakeClock(100.0)
+    scheduler = PollScheduler(clock=clock)
+
+    def broken():
+        raise IOError("bus timeout")
+
+    task = scheduler.add("npk", 60, broken)
+    scheduler.run_pending()
+
+    assert task.errors == 1
+    assert task.next_deadline == 160.0
+    with pytest.raises(ValueError):
+        scheduler.add("bad", 0, broken)
+
+
+def test_bus_gate_spaces_frames_per_bus():
+    """Frames on one bus wait for the gap; other buses are not held up"""
+    from src.poll_scheduler import BusGate
+
+    clock = FakeClock(100.0)
+    gate = BusGate(min_gap=0.1, clock=clock, sleep=clock.sleep)
+
+    assert gate.wait("/dev/ttyAMA1") == 0.0
+    assert gate.wait("/dev/ttyAMA1") == pytest.approx(0.1)
+    assert gate.wait("/dev/ttyAMA2") == 0.0
+    clock.sleep(0.5)
+    assert gate.wait("/dev/ttyAMA1") == 0.0
+    assert gate.wait(None) == 0.0
+
+
+def test_polling_config_from_snapshot(tmp_path):
+    """[POLLING] overrides defaults key by key"""
+    from src.config_snapshot import ConfigSnapshot
+
+    snapshot = ConfigSnapshot(1, str(tmp_path / "device.conf"), None, {
+        "POLLING": {"npk_interval_seconds": "60, 120", "bus_min_frame_gap_seconds": "0.1, 0.05",
+                    "realtime_water_level_interval_seconds": "1, 0.5"},
+    })
+
+    assert snapshot.poll_intervals["npk"] == 120.0
+    assert snapshot.poll_intervals["water_level"] == 2.0
+    assert snapshot.bus_min_frame_gap == 0.05
+    assert snapshot.realtime_enabled is True
+    assert snapshot.realtime_intervals["water_level"] == 0.5
+    assert snapshot.realtime_intervals["ec"] == 2.0
+
+
+def test_boost_speeds_up_task_until_released():
+    """A drain boost polls water level at 1 s and reverts when the drain stops"""
+    from src.poll_scheduler import PollScheduler
+
+    clock = FakeClock(100.0)
+    changes = []
+    scheduler = PollScheduler(clock=clock, on_realtime_change=changes.append)
+    scheduler.configure_realtime(True, {"water_level": 1.0}, 2.0, 120.0)
+    task = scheduler.add("water_level", 10, lambda: None)
+    scheduler.run_pending()
+    assert task.next_deadline == 110.0
+
+    clock.sleep(0.4)
+    assert scheduler.boost("water_level", "drain") is True
+    assert task.interval == 1.0
+    assert task.next_deadline == pytest.approx(101.4)   # takes effect now, not at the old deadline
+    assert scheduler.stats()["water_level"]["boosted_by"] == ["drain"]
+
+    scheduler.release("water_level", "drain")
+    assert task.interval == 10.0
+    assert changes == [True, False]
+    assert scheduler.boost("npk", "drain") is False     # no realtime interval configured
+
+
+def test_boost_expires_and_respects_budget():
+    """Boosts stretch to fit the polls-per-second budget and lapse on their own"""
+    from src.poll_scheduler import PollScheduler
+
+    clock = FakeClock(100.0)
+    scheduler = PollScheduler(clock=clock)
+    scheduler.configure_realtime(True, {"water_level": 1.0, "ec": 1.0, "ph": 1.0}, 1.5, 0.0)
+    tasks = {name: scheduler.add(name, interval, lambda: None)
+             for name, interval in (("water_level", 2), ("ec", 10), ("ph", 10))}
+
+    scheduler.boost("water_level", "fill", duration=30)
+    scheduler.boost("ec", "nutrient_dose", duration=5)
+    scheduler.boost("ph", "ph_dose", duration=5)
+    # 3 polls/s requested against a budget of 1.5: each boosted interval doubles,
+    # but water level never drops below its own 2 s rate
+    assert tasks["ec"].interval == 2.0
+    assert tasks["ph"].interval == 2.0
+    assert tasks["water_level"].interval == 2.0
+
+    clock.sleep(6)
+    scheduler.run_pending()
+    assert tasks["ec"].interval == 10.0
+    assert tasks["water_level"].interval == 1.0         # budget freed by the expired dose boosts
+    assert scheduler.realtime_active()
+
+    scheduler.configure_realtime(False, {"water_level": 1.0}, 1.5, 0.0)
+    assert tasks["water_level"].interval == 2.0
+    assert not scheduler.realtime_active()
+
+
+def test_drain_overshoot_with_realtime_boost():
+    """Closed-loop drain: the target is overshot by less with the level polled at 1 s"""
+    from src.poll_scheduler import PollScheduler
+
+    def drain(realtime):
+        clock = FakeClock(100.0)
+        scheduler = PollScheduler(clock=clock)
+        scheduler.configure_realtime(realtime, {"water_level": 1.0}, 2.0, 0.0)
+        state = {"level": 80.0, "open": True}
+
+        def poll():
+            if state["open"] and state["level"] <= 50.0:
+                state["open"] = False
+                scheduler.release("water_level", "drain")
+
+        scheduler.add("water_level", 10, poll, offset=0.3)
+        scheduler.boost("water_level", "drain")
+        while state["open"]:
+            scheduler.run_pending()
+            step = max(min(scheduler.time_until_next(), 0.1), 0.001)
+            clock.sleep(step)
+            state["level"] -= 0.37 * step          # cm per second of outflow
+        return 50.0 - state["level"]
+
+    fixed, boosted = drain(False), drain(True)
+    print(f"\ndrain overshoot: {fixed:.2f} cm at 10 s polls, {boosted:.2f} cm with realtime boost")
+    assert boosted < 0.4 < fixed
+
+
+def test_slow_housekeeping_does_not_hold_back_sensor_polls(tmp_path, monkeypatch):
+    """Action confirmation waits run on the housekeeping thread, not the poll loop"""
+    import threading
+    import time
+    from types import SimpleNamespace
+
+    import main
+    from src import poll_scheduler
+
+    polled = []
+    for name in ("WaterLevel", "pH", "EC", "NPK"):
+        monkeypatch.setattr(main, name, SimpleNamespace(get_statuses_async=lambda n=name: polled.append(n)))
+    controller = object.__new__(main.RippleController)
+    controller.config_file = str(tmp_path / "device.conf")
+    controller._poll_relays = lambda: None
+    release, runs = threading.Event(), []
+    controller._run_housekeeping = lambda: (runs.append(time.monotonic()), release.wait(5))
+
+    scheduler = controller._build_poll_scheduler()
+    try:
+        tasks = {task.name: task for task in scheduler._tasks}
+        started = time.monotonic()
+        tasks["housekeeping"].poll()                    # due: hands off, returns at once
+        tasks["water_level"].poll()
+        assert time.monotonic() - started < 0.1 and polled == ["WaterLevel"]
+
+        deadline = time.monotonic() + 2
+        while not runs and time.monotonic() < deadline:
+            time.sleep(0.01)
+        tasks["housekeeping"].poll()                    # due again while still busy
+        tasks["housekeeping"].poll()
+        release.set()
+        deadline = time.monotonic() + 2
+        while len(runs) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        assert len(runs) == 2                           # coalesced into one follow-up
+    finally:
+        release.set()
+        poll_scheduler.set_active_scheduler(None)
@@ -0,0 +1,253 @@
+"""Event-driven dosing evaluation on fresh EC/pH readings"""
+from unittest.mock import MagicMock
+
+from tests.fixtures.fake_clock import FakeClock
+
+
+def _evaluator(evaluate, clock, **kwargs):
+    from src.reactive_dosing import ReactiveEvaluator
+    from src.sensor_validation import is_valid_ec, is_ec_change_valid
+
+    kwargs.setdefault("enabled", True)
+    return ReactiveEvaluator("ec", evaluate, is_valid_ec, is_ec_change_valid,
+                             clock=clock, run_async=False, **kwargs)
+
+
+def test_readings_are_validated_and_rate_limited():
+    """Baseline first, then one evaluation per interval; bad readings never reach evaluate"""
+    clock = FakeClock()
+    seen = []
+    evaluator = _evaluator(lambda value: seen.append(value) or False, clock, min_interval=30)
+
+    assert evaluator.on_reading(1.00, "ec_1") == "baseline"
+    assert evaluator.on_reading(0.98, "ec_1") == "evaluating"
+    clock.now = 10
+    assert evaluator.on_reading(0.97, "ec_1") == "throttled"
+    assert evaluator.on_reading(5.0, "ec_1") == "rejected"          # out of sensor range
+    clock.now = 31
+    assert evaluator.on_reading(0.96, "ec_1") == "evaluating"
+
+    assert seen == [0.98, 0.96]
+    assert evaluator.counts["rejected"] == 1
+    assert evaluator.counts["throttled"] == 1
+
+
+def test_implausible_jump_needs_confirmation():
+    """A jump beyond the per-reading change limit is rejected once, then accepted"""
+    clock = FakeClock()
+    seen = []
+    evaluator = _evaluator(lambda value: seen.append(value) or False, clock, min_interval=0)
+
+    evaluator.on_reading(1.5)
+    assert evaluator.on_reading(0.6) == "rejected"
+    assert evaluator.on_reading(0.62) == "evaluating"
+    assert seen == [0.62]
+
+
+def test_disabled_evaluator_only_tracks_readings():
+    from src import reactive_dosing
+
+    clock = FakeClock()
+    evaluate = MagicMock(return_value=True)
+    evaluator = _evaluator(evaluate, clock, enabled=False)
+    reactive_dosing.register(evaluator)
+    try:
+        reactive_dosing.notify_reading("ec", 1.0)
+        reactive_dosing.notify_reading("ec", 0.9)
+        reactive_dosing.notify_reading("ph", 6.0)    # no pH evaluator: ignored
+        evaluate.assert_not_called()
+
+        evaluator.configure(True, 0)
+        reactive_dosing.notify_reading("ec", 0.88)
+        evaluate.assert_called_once_with(0.88)
+    finally:
+        reactive_dosing._evaluators.clear()
+
+
+def test_nutrient_evaluation_keeps_dose_spacing(monkeypatch):
+    """No reactive dose while pumps run or within the wait duration after a stop"""
+    import src.nutrient_static as ns
+
+    jobs = {}
+    scheduler = MagicMock()
+    scheduler.get_job.side_effect = jobs.get
+    scheduler.remove_job.side_effect = jobs.pop
+    monkeypatch.setattr(ns, "get_scheduler", lambda: scheduler)
+    monkeypatch.setattr(ns, "logger", MagicMock())
+    monkeypatch.setattr(ns, "get_nutrient_config", lambda: ("00:00:10", "00:05:00"))
+    monkeypatch.setattr(ns, "get_ec_targets", lambda: (1.2, 0.1))
+    monkeypatch.setattr(ns, "get_ec_min_max", lambda: (0.0, 99.0))
+    dose = MagicMock(return_value=True)
+    monkeypatch.setattr(ns, "_dose_nutrients", dose)
+    monkeypatch.setattr(ns, "_dosing_active", False)
+
+    jobs["nutrient_stop"] = object()
+    monkeypatch.setattr(ns, "_last_dose_stopped_at", None)
+    assert ns.evaluate_nutrient_dosing_now(0.9) is False          # pumps still on
+
+    del jobs["nutrient_stop"]
+    monkeypatch.setattr(ns, "_last_dose_stopped_at", ns.time.monotonic() - 60)
+    assert ns.evaluate_nutrient_dosing_now(0.9) is False          # 60 s of a 300 s wait
+    dose.assert_not_called()
+
+    jobs["nutrient_start"] = object()
+    monkeypatch.setattr(ns, "_last_dose_stopped_at", ns.time.monotonic() - 301)
+    assert ns.evaluate_nutrient_dosing_now(1.15) is False         # inside deadband, hysteresis off
+    assert ns.evaluate_nutrient_dosing_now(0.9) is True
+    dose.assert_called_once()
+    assert "nutrient_start" not in jobs                           # chain re-arms on stop
+
+
+def test_nutrient_check_and_start_is_one_step(monkeypatch):
+    """Chain job and reactive evaluation never both dose; a failed start keeps the chain"""
+    import threading
+    import time
+    import src.nutrient_static as ns
+
+    jobs = {"nutrient_start": object()}
+    scheduler = MagicMock()
+    scheduler.get_job.side_effect = jobs.get
+    scheduler.remove_job.side_effect = jobs.pop
+    monkeypatch.setattr(ns, "get_scheduler", lambda: scheduler)
+    monkeypatch.setattr(ns, "logger", MagicMock())
+    monkeypatch.setattr(ns, "get_nutrient_config", lambda: ("00:00:10", "00:05:00"))
+    monkeypatch.setattr(ns, "check_if_nutrient_dosing_needed", lambda current_ec=None: True)
+    monkeypatch.setattr(ns, "_last_dose_stopped_at", ns.time.monotonic() - 301)
+
+    monkeypatch.setattr(ns, "_dose_nutrients", lambda trigger="": False)
+    assert ns.evaluate_nutrient_dosing_now(0.9) is False
+    assert "nutrient_start" in jobs                               # chain not orphaned
+
+    doses = []
+
+    def slow_dose(trigger="EC-driven"):
+        doses.append(trigger)
+        time.sleep(0.05)                                          # relay writes
+        jobs["nutrient_stop"] = object()
+        return True
+    monkeypatch.setattr(ns, "_dose_nutrients", slow_dose)
+
+    chain = threading.Thread(target=ns.start_nutrient_pumps_static)
+    chain.start()
+    ns.evaluate_nutrient_dosing_now(0.9)
+    chain.join()
+    assert len(doses) == 1
+
+
+def test_reactive_config_from_snapshot(tmp_path):
+    from src.config_snapshot import ConfigSnapshot
+
+    default = ConfigSnapshot(1, str(tmp_path / "device.conf"), None, {})
+    assert default.reactive_dosing_enabled is False
+    assert default.reactive_evaluation_interval == 30.0
+
+    snapshot = ConfigSnapshot(2, str(tmp_path / "device.conf"), None, {"NutrientPump": {
+        "reactive_dosing_enabled": "false, true",
+        "reactive_min_evaluation_interval_seconds": "30, 15",
+    }})
+    assert snapshot.reactive_dosing_enabled is True
+    assert snapshot.reactive_evaluation_interval == 15.0
+
+
+def _simulate_ec_loop(reactive, hours=8):
+    """
+    Closed-loop EC simulation on a fake clock.
+
+    The tank loses EC through plant uptake and is diluted by top-ups; a dose
+    raises EC after a mixing delay. Dosing decisions use the real hysteresis
+    check; the chain checks every wait duration, the reactive path evaluates
+    readings (every 10 s) through ReactiveEvaluator with the same spacing rules.
+    """
+    import src.nutrient_static as ns
+
+    on_s, wait_s, reading_s, mixing_s = 10, 300, 10, 60
+    uptake_per_s, dose_ec, top_up_ec = 0.00002, 0.08, 0.15
+    target, deadband = 1.2, 0.1
+    lower = target - deadband
+
+    clock = FakeClock()
+    state = {"ec": target, "pump_off_at": None, "last_stop": None, "next_check": 0.0}
+    pending = []          # (applies_at, delta)
+    dose_starts = []
+    deficit = 0.0         # integral of (lower - ec) while below the lower threshold, mS/cm * s
+    crossings = []        # times EC fell below the lower threshold
+    latencies = []
+
+    def dose_allowed():
+        if state["pump_off_at"] is not None:
+            return False
+        return state["last_stop"] is None or clock.now - state["last_stop"] >= wait_s
+
+    def start_dose():
+        dose_starts.append(clock.now)
+        state["pump_off_at"] = clock.now + on_s
+        state["next_check"] = None
+        pending.append((clock.now + on_s + mixing_s, dose_ec))
+        if crossings and len(latencies) < len(crossings):
+            latencies.append(clock.now - crossings[-1])
+
+    def evaluate(ec):
+        if not dose_allowed() or not ns.check_if_nutrient_dosing_needed(ec):
+            return False
+        start_dose()
+        return True
+
+    evaluator = _evaluator(evaluate, clock, min_interval=30) if reactive else None
+    below = False
+    for t in range(hours * 3600):
+        clock.now = float(t)
+        state["ec"] -= uptake_per_s
+        if t and t % 2700 == 0:
+            state["ec"] -= top_up_ec
+        for item in [p for p in pending if p[0] <= t]:
+            state["ec"] += item[1]
+            pending.remove(item)
+
+        if state["ec"] < lower:
+            deficit += lower - state["ec"]
+            if not below:
+                crossings.append(t)
+            below = True
+        else:
+            below = False
+
+        if state["pump_off_at"] is not None and t >= state["pump_off_at"]:
+            state["pump_off_at"] = None
+            state["last_stop"] = t
+            state["next_check"] = t + wait_s
+        if state["next_check"] is not None and t >= state["next_check"]:
+            if not evaluate(round(state["ec"], 3)):
+                state["next_check"] = t + wait_s
+        if evaluator is not None and t % reading_s == 0:
+            evaluator.on_reading(round(state["ec"], 3), "ec_1")
+
+    gaps = [b - a for a, b in zip(dose_starts, dose_starts[1:])]
+    return {
+        "doses": len(dose_starts),
+        "mean_latency_s": sum(latencies) / max(len(latencies), 1),
+        "deficit": deficit,
+        "min_gap_s": min(gaps) if gaps else None,
+    }
+
+
+def test_closed_loop_reacts_faster_to_drift(monkeypatch):
+    """Reactive evaluation corrects drift sooner without breaking dose spacing"""
+    import src.nutrient_static as ns
+
+    monkeypatch.setattr(ns, "logger", MagicMock())
+    monkeypatch.setattr(ns, "audit", None)
+    monkeypatch.setattr(ns, "get_ec_targets", lambda: (1.2, 0.1))
+    monkeypatch.setattr(ns, "get_ec_min_max", lambda: (0.0, 99.0))
+
+    monkeypatch.setattr(ns, "_dosing_active", False)
+    chain = _simulate_ec_loop(reactive=False)
+    monkeypatch.setattr(ns, "_dosing_active", False)
+    reactive = _simulate_ec_loop(reactive=True)
+
+    print(f"\nchain   : {chain}")
+    print(f"reactive: {reactive}")
+
+    assert reactive["mean_latency_s"] < chain["mean_latency_s"] / 2
+    assert reactive["deficit"] < chain["deficit"]
+    # on + wait between dose starts, as for the chain
+    assert reactive["min_gap_s"] >= 310
@@ -0,0 +1,183 @@
+"""Slotted Reading objects, lazy legacy serialization and allocation benchmark"""
+import time
+import tracemalloc
+
+import orjson
+import pytest
+
+
+def _ec_readings(ec=1.234, sensor_id="ec_main"):
+    from src.reading import Reading, ReadingSet
+    return ReadingSet("water_metrics", "ec", "ec", sensor_id, "2026-01-30T10:00:00+08:00", (
+        Reading("value", sensor_id, ec, "mS/cm"),
+        Reading("tds", sensor_id, 617.0, "ppm"),
+        Reading("temperature", sensor_id, 22.456, "°C"),
+        Reading("compensation_mode", sensor_id, "auto"),
+        Reading("ec_constant", sensor_id, None),
+    ))
+
+
+def test_reading_is_slotted():
+    """Readings carry no per-instance __dict__"""
+    from src.reading import Reading, QUALITY_GOOD, QUALITY_MISSING
+
+    reading = Reading("value", "ph_main", 6.1, "pH")
+    assert not hasattr(reading, "__dict__")
+    assert reading.quality == QUALITY_GOOD
+    assert Reading("value", "ph_main", None).quality == QUALITY_MISSING
+    with pytest.raises(AttributeError):
+        reading.extra = 1
+
+
+def test_legacy_format_matches_previous_layout():
+    """to_legacy() reproduces the nested measurements dict"""
+    readings = _ec_readings()
+
+    assert readings.to_legacy() == {
+        "measurements": {
+            "name": "water_metrics",
+            "points": [{
+                "tags": {"sensor": "ec", "measurement": "ec", "location": "ec_main"},
+                "fields": {
+                    "value": 1.23,
+                    "tds": 617.0,
+                    "temperature": 22.46,
+                    "compensation_mode": "auto",
+                    "ec_constant": None,
+                },
+                "timestamp": "2026-01-30T10:00:00+08:00",
+            }],
+        }
+    }
+
+
+def test_legacy_built_once():
+    """The legacy dict is cached on the set"""
+    readings = _ec_readings()
+    assert readings.to_legacy() is readings.to_legacy()
+
+
+def test_readings_inherit_set_timestamp():
+    """Readings without their own timestamp take the poll timestamp"""
+    readings = _ec_readings()
+    assert all(r.timestamp == readings.timestamp for r in readings)
+    assert readings.get("tds") == 617.0
+    assert readings.metric_name(readings.readings[0]) == "water_metrics.ec.ec_main.value"
+
+
+def test_save_readings_writes_snapshot_and_rollups(tmp_path, monkeypatch):
+    """save_readings writes the legacy snapshot and feeds the rollups"""
+    import src.helpers as helpers
+    import src.sensor_rollup as sensor_rollup
+
+    sensor_file = tmp_path / "saved_sensor_data.json"
+    store = sensor_rollup.SensorRollupStore(db_path=str(tmp_path / "rollups.db"))
+    monkeypatch.setattr("src.globals.SAVED_SENSOR_DATA_PATH", str(sensor_file))
+    monkeypatch.setattr(sensor_rollup, "_rollup_store", store)
+
+    helpers.save_readings(["data", "water_metrics", "ec"], _ec_readings())
+
+    saved = orjson.loads(sensor_file.read_bytes())
+    point = saved["data"]["water_metrics"]["ec"]["measurements"]["points"][0]
+    assert point["fields"]["value"] == 1.23
+    assert "water_metrics.ec.ec_main.value" in store.metrics()
+    assert "water_metrics.ec.ec_main.compensation_mode" not in store.metrics()
+
+
+def _legacy_save_data(subpath, data, path):
+    # Pre-Reading save path: whole-file read, merge, whole-tree float format, write
+    with open(path, "rb") as f:
+        config = orjson.loads(f.read())
+    level = config
+    for key in subpath[:-1]:
+        level = level.setdefault(key, {})
+    level.setdefault(subpath[-1], {}).update(data)
+
+    def format_floats(obj):
+        if isinstance(obj, float):
+            return round(obj, 2)
+        if isinstance(obj, dict):
+            return {k: format_floats(v) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [format_floats(item) for item in obj]
+        return obj
+
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(format_floats(config), option=orjson.OPT_INDENT_2))
+
+
+def _legacy_ec_dict(ec):
+    return {
+        "measurements": {
+            "name": "water_metrics",
+            "points": [{
+                "tags": {"sensor": "ec", "measurement": "ec", "location": "ec_main"},
+                "fields": {
+                    "value": round(ec, 2),
+                    "tds": round(617.0, 2),
+                    "temperature": round(22.456, 2),
+                    "compensation_mode": "auto",
+                    "ec_constant": None,
+                },
+                "timestamp": "2026-01-30T10:00:00+08:00",
+            }],
+        }
+    }
+
+
+def _measure(fn, cycles):
+    # Warm up outside tracing so long-lived caches are not counted as per-cycle cost
+    fn(0)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    for i in range(cycles):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, elapsed / cycles
+
+
+@pytest.mark.slow
+def test_benchmark_allocations_per_poll_cycle(tmp_path, monkeypatch):
+    """Compare peak allocation per poll cycle: legacy dict path vs Reading path"""
+    import src.helpers as helpers
+    import src.sensor_rollup as sensor_rollup
+
+    # A realistic snapshot: 2 relay boards x 16 points plus sensors
+    relay_points = [
+        {"tags": {"relay_board": f"board{b}", "port_index": i, "port_type": "unassigned", "device": "none"},
+         "fields": {"status": 0, "is_assigned": False, "raw_status": 0},
+         "timestamp": "2026-01-30T10:00:00+08:00"}
+        for b in range(2) for i in range(16)
+    ]
+    seed = {"data": {"relay_metrics": {"measurements": {"name": "relay_metrics", "points": relay_points}},
+                     "water_metrics": {}}}
+    legacy_file = tmp_path / "legacy.json"
+    reading_file = tmp_path / "readings.json"
+    legacy_file.write_bytes(orjson.dumps(seed))
+    reading_file.write_bytes(orjson.dumps(seed))
+
+    store = sensor_rollup.SensorRollupStore(db_path=str(tmp_path / "rollups.db"))
+    monkeypatch.setattr(sensor_rollup, "_rollup_store", store)
+    monkeypatch.setattr("src.globals.SAVED_SENSOR_DATA_PATH", str(reading_file))
+
+    def legacy_cycle(i):
+        data = _legacy_ec_dict(1.0 + i / 1000)
+        _legacy_save_data(["data", "water_metrics", "ec"], data, str(legacy_file))
+        store.ingest_measurements(data)
+
+    def reading_cycle(i):
+        helpers.save_readings(["data", "water_metrics", "ec"], _ec_readings(1.0 + i / 1000))
+
+    cycles = 200
+    legacy_peak, legacy_time = _measure(legacy_cycle, cycles)
+    reading_peak, reading_time = _measure(reading_cycle, cycles)
+
+    print(f"\nlegacy path : peak {legacy_peak / 1024:.1f} KiB, {legacy_time * 1e3:.3f} ms/cycle")
+    print(f"reading path: peak {reading_peak / 1024:.1f} KiB, {reading_time * 1e3:.3f} ms/cycle")
+
+    assert orjson.loads(reading_file.read_bytes())["data"]["water_metrics"]["ec"] == \
+        orjson.loads(legacy_file.read_bytes())["data"]["water_metrics"]["ec"]
+    assert reading_peak <= legacy_peak
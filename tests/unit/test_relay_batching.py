@@ -0,0 +1,68 @@
+"""Batched relay writes: one frame per board, gaps filled from the shadow state"""
+from tests.fixtures.mock_relay import board_relay
+
+
+PORTS = {f"Pump{i}": ("relayone", i) for i in range(16)}
+
+
+def test_sixteen_changes_take_one_transaction():
+    relay = board_relay(PORTS, statuses={"relayone": [0, 1] * 8})
+
+    writes = relay.apply_states({f"Pump{i}": i % 2 == 0 for i in range(16)})
+
+    assert len(writes) == 1
+    assert relay.writes == [("relayone", 0, [i % 2 == 0 for i in range(16)])]
+    frame = relay.frames[0]
+    assert frame[:7] == bytes([0x01, 0x10, 0x00, 0x00, 0x00, 16, 32])
+    relay.respond()
+    assert relay.relay_statuses["relayone"] == [1, 0] * 8
+
+
+def test_one_write_per_board_with_gaps_from_shadow():
+    relay = board_relay({"NutrientPumpA": ("relayone", 0), "MixingPump": ("relayone", 5),
+                         "SprinklerA": ("relaytwo", 2)},
+                        statuses={"relayone": [0, 1, 0, 1, 0, 0, 0, 0], "relaytwo": [0] * 8})
+
+    assert len(relay.apply_states({"NutrientPumpA": True, "MixingPump": True, "SprinklerA": True})) == 2
+    assert relay.writes == [
+        ("relayone", 0, [True, True, False, True, False, True]),  # ports 1-4 keep their read-back
+        ("relaytwo", 2, [True]),
+    ]
+    assert relay.frames[1][0] == 0x02
+
+
+def test_unknown_port_splits_the_frame():
+    """Ports with no read-back are never written blind"""
+    relay = board_relay(PORTS, statuses={"relayone": [0, 0, 0]})
+
+    assert len(relay.apply_states({"Pump0": True, "Pump2": True, "Pump5": True})) == 2
+    assert relay.writes == [("relayone", 0, [True, False, True]), ("relayone", 5, [True])]
+
+
+def test_requested_ports_only_without_fill():
+    relay = board_relay(PORTS, statuses={"relayone": [0, 0, 0, 0, 1] + [0] * 11})
+
+    assert len(relay.apply_states({"Pump0": True, "Pump1": True, "Pump4": False}, fill_gaps=False)) == 2
+    assert relay.writes == [("relayone", 0, [True, True]), ("relayone", 4, [False])]
+
+
+def test_shadow_tracks_writes_and_skips_unknown_devices():
+    relay = board_relay(PORTS, statuses={"relayone": [0] * 16})
+
+    relay.apply_states({"Pump3": True})
+    relay.apply_states({"Pump1": True, "Pump5": True, "NoSuchPump": True})
+
+    # Pump3 stays on in the second frame instead of being reverted to the old read-back
+    assert relay.writes[-1] == ("relayone", 1, [True, False, True, False, True])
+    assert len(relay.writes) == 2
+
+
+def test_stale_read_back_is_neither_dropped_against_nor_used_for_gaps(monkeypatch):
+    """Another process may have switched ports since the last coil read"""
+    import src.sensors.Relay as relay_module
+
+    relay = board_relay(PORTS, statuses={"relayone": [1, 0, 0, 0] + [0] * 12})
+    monkeypatch.setattr(relay_module, "SHADOW_TRUST_SECONDS", -1)   # read-back is already too old
+
+    assert len(relay.apply_states({"Pump0": True, "Pump3": True})) == 2
+    assert relay.writes == [("relayone", 0, [True]), ("relayone", 3, [True])]
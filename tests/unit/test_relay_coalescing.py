@@ -0,0 +1,83 @@
+"""Relay write coalescing: last command wins per window, safety offs bypass it"""
+from src.relay_coalescer import RelayCoalescer, safety_priority
+from tests.fixtures.mock_relay import board_relay
+
+
+PUMPS = {"NutrientPumpA": ("relayone", 0), "NutrientPumpB": ("relayone", 1),
+         "NutrientPumpC": ("relayone", 2), "MixingPump": ("relayone", 5)}
+
+
+def _windowed_relay():
+    relay = board_relay(PUMPS, statuses={"relayone": [0] * 16})
+    timers = []
+    relay.coalescer = RelayCoalescer(relay._send_ports, relay.shadow.settled, lambda: 0.05,
+                                     call_later=lambda delay, callback, name: timers.append(callback) or _Timer())
+    return relay, timers
+
+
+class _Timer:
+    def cancel(self):
+        return True
+
+
+def test_changes_in_the_window_become_one_write():
+    relay, timers = _windowed_relay()
+
+    for pump in ("NutrientPumpA", "NutrientPumpB", "NutrientPumpC"):
+        relay.set_relay(pump, True)
+    assert relay.writes == [] and len(timers) == 1       # one window per board
+
+    timers[0]()
+    assert relay.writes == [("relayone", 0, [True, True, True])]
+    assert relay.coalescer.stats()["saved"] == 2
+
+
+def test_chatter_collapses_to_the_final_state():
+    """On, off, on, off within the window: the relay is already off, so nothing is sent"""
+    relay, timers = _windowed_relay()
+
+    for state in (True, False, True, False):
+        relay.set_relay("MixingPump", state)
+    relay.coalescer.flush()
+
+    assert relay.writes == []
+    stats = relay.coalescer.stats()
+    assert stats["requested"] == 4 and stats["coalesced"] == 3 and stats["redundant"] == 1
+    assert stats["saved"] == 4 and stats["pending"] == 0
+
+
+def test_safety_off_bypasses_the_window():
+    relay, timers = _windowed_relay()
+    relay.set_relay("NutrientPumpA", True)
+
+    with safety_priority():
+        relay.set_relay("NutrientPumpA", False)       # already off, still sent
+    assert relay.writes == [("relayone", 0, [False])]
+
+    relay.coalescer.flush()                           # the queued "on" was cancelled
+    assert relay.writes == [("relayone", 0, [False])]
+    assert relay.coalescer.stats()["bypassed"] == 1
+
+
+def test_only_settled_state_makes_a_command_redundant():
+    relay, timers = _windowed_relay()
+    relay.set_relay("MixingPump", True)
+    relay.coalescer.flush()
+
+    relay.set_relay("MixingPump", True)               # first write not echoed yet: resend
+    relay.coalescer.flush()
+    assert len(relay.writes) == 2
+
+    relay.respond()
+    relay.set_relay("MixingPump", True)               # confirmed on: dropped
+    relay.coalescer.flush()
+    assert len(relay.writes) == 2
+
+
+def test_coalesce_window_from_snapshot(tmp_path):
+    from src.config_snapshot import ConfigSnapshot
+
+    assert ConfigSnapshot(1, str(tmp_path / "device.conf"), None, {}).relay_coalesce_window == 0.05
+    snapshot = ConfigSnapshot(2, str(tmp_path / "device.conf"), None,
+                              {"CONTROL": {"relay_coalesce_window_seconds": "0.05, 0"}})
+    assert snapshot.relay_coalesce_window == 0.0
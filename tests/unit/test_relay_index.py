@@ -0,0 +1,73 @@
+"""Relay assignment indices and delta-only relay metrics"""
+from tests.fixtures.mock_relay import board_relay
+
+
+ASSIGNMENTS = {"NutrientPumpA": ("relayone", 0), "MixingPump": ("relayone", 5), "SprinklerA": ("relaytwo", 2)}
+
+
+def _publishing_relay(monkeypatch):
+    from src.sensors.Relay import Relay
+
+    relay = board_relay(ASSIGNMENTS, statuses={"relayone": [0] * 16, "relaytwo": [0] * 16})
+    relay.save_data = Relay.save_data.__get__(relay)
+    saves, rollups = [], []
+
+    def save_sensor_data(subpath, data, rollup=None):
+        saves.append((subpath, data))
+        if rollup is not None:
+            rollups.append(rollup)
+
+    monkeypatch.setattr("src.helpers.save_sensor_data", save_sensor_data)
+    return relay, saves, rollups
+
+
+def test_lookups_use_the_prebuilt_index():
+    relay = board_relay(ASSIGNMENTS)
+
+    assert relay._get_relay_info("mixingpump") == ("relayone", 5)
+    assert relay._get_relay_info("NoSuchPump") == (None, None)
+    assert relay._resolve_board("RELAYTWO") == ("relaytwo", 0x02)
+    assert relay._port_devices[("relaytwo", 2)] == ["SprinklerA"]
+
+    # Replacing the assignments rebuilds the index
+    relay.relay_assignments = {"Valve": {'relay_name': 'relaytwo', 'index': 7}}
+    assert relay._get_relay_info("valve") == ("relaytwo", 7)
+    assert relay._get_relay_info("MixingPump") == (None, None)
+
+
+def test_sprinkler_mapping_is_derived_once(monkeypatch):
+    relay = board_relay(ASSIGNMENTS)
+    calls = []
+    monkeypatch.setattr(relay, "_derive_sprinkler_mapping",
+                        lambda: calls.append(1) or {'case': 2, 'sprinkler_a': 'SprinklerA'})
+
+    relay._get_sprinkler_mapping()["case"] = 99               # callers get a copy
+    assert relay._get_sprinkler_mapping()["case"] == 2
+    assert len(calls) == 1
+
+
+def test_only_changed_channels_are_published(monkeypatch):
+    relay, saves, rollups = _publishing_relay(monkeypatch)
+
+    relay.last_updated = "t1"
+    relay.save_data()
+    assert [subpath for subpath, _ in saves] == [["data", "relay_metrics"], []]
+    metrics, summary = saves[0][1], saves[1][1]
+    points = metrics["measurements"]["points"]
+    assert len(points) == 32
+    assert points[5]["tags"]["device"] == "MixingPump" and points[5]["fields"]["is_assigned"]
+    assert metrics["configuration"]["relay_configuration"]["relaytwo"]["assigned_ports"] == [2]
+    assert summary["relays"]["relayone"] == [0] * 16
+    assert len(rollups[0]["measurements"]["points"]) == 32
+
+    saves.clear()
+    relay.save_data(relay_name="relayone")                    # same read-back again
+    assert saves == []
+
+    relay.set_relay("MixingPump", True)
+    relay.respond()                                           # echo publishes the change
+    points = saves[0][1]["measurements"]["points"]
+    assert points[5]["fields"]["status"] == 1 and points[5]["timestamp"] != "t1"
+    assert points[0]["timestamp"] == "t1"                     # unchanged channel left alone
+    assert rollups[-1]["measurements"]["points"] == [points[5]]  # only the change is rolled up
+    assert saves[1][1]["relays"]["relayone"][5] == 1
@@ -0,0 +1,73 @@
+"""Relay shadow state: confirmed by echoes and read-back, versioned, with staleness"""
+import threading
+
+from tests.fixtures.fake_clock import FakeClock
+from tests.fixtures.mock_relay import board_relay
+
+
+def test_write_is_confirmed_by_its_echo():
+    from src.relay_shadow import RelayShadow
+
+    clock = FakeClock(100.0)
+    shadow = RelayShadow(clock=clock)
+    shadow.record_read("relayone", [0, 0, 0, 0])
+    assert shadow.version == 1
+
+    ack = shadow.record_write("relayone", 1, [True, True])
+    assert not ack.done and shadow.state("relayone", 1) is False    # not confirmed yet
+    assert shadow.expected("relayone") == [False, True, True, False]
+
+    clock.now = 103.0
+    assert shadow.age("relayone") == 3.0
+    assert shadow.confirm(ack) == 2
+    assert ack.wait(0) and ack.version == 2
+    assert shadow.states("relayone") == [False, True, True, False]
+    assert shadow.age("relayone") == 0.0
+
+    failed = shadow.record_write("relayone", 0, [True])
+    shadow.fail(failed, "timeout")
+    assert not failed.wait(0) and failed.error == "timeout"
+    assert shadow.expected("relayone")[0] is False and shadow.version == 2
+    assert shadow.snapshot()["boards"]["relayone"]["version"] == 2
+
+
+def test_relay_acks_follow_bus_responses():
+    relay = board_relay({"MixingPump": ("relayone", 5), "SprinklerA": ("relaytwo", 0)},
+                        statuses={"relayone": [0] * 16})
+
+    relay.set_relay("MixingPump", True)
+    ack = relay.pending_commands["cmd-1"]["ack"]
+    relay.respond()
+    assert ack.confirmed and relay.get_relay_state("MixingPump", wait=0) is True
+
+    relay.set_relay("SprinklerA", True)
+    ack = relay.pending_commands["cmd-2"]["ack"]
+    relay.respond(status="timeout")
+    assert ack.error == "timeout"
+    assert relay.get_relay_state("SprinklerA", wait=0) is None      # never confirmed
+    assert relay.wait_for_writes(0)
+
+
+def test_unknown_state_waits_for_read_back():
+    """get_relay_state requests a coil read and waits for it instead of checking again at once"""
+    relay = board_relay({"NutrientPumpA": ("relayone", 0)})
+    coils = {"relayone": [1] + [0] * 15}
+    threading.Timer(0.2, lambda: relay.respond(coils=coils)).start()
+
+    assert relay.get_relay_state("NutrientPumpA", wait=2.0) is True
+    assert relay.frames[-1][1] == 0x01                               # read coils
+
+
+def test_stale_state_is_refreshed_when_max_age_given():
+    from src.relay_shadow import RelayShadow
+
+    clock = FakeClock(100.0)
+    relay = board_relay({"NutrientPumpA": ("relayone", 0)}, statuses={"relayone": [0] * 16})
+    relay.shadow = RelayShadow(clock=clock)
+    relay.shadow.record_read("relayone", [0] * 16)
+
+    clock.now = 200.0
+    assert relay.get_relay_state("NutrientPumpA", wait=0) is False  # any age accepted
+    assert relay.frames == []
+    assert relay.get_relay_state("NutrientPumpA", max_age=60, wait=0) is False
+    assert relay.frames[-1][1] == 0x01                               # read requested
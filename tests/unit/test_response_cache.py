@@ -0,0 +1,101 @@
+"""ETag-tagged cached response bodies"""
+
+
+class _Request:
+    def __init__(self, headers=None):
+        self.headers = {k.lower(): v for k, v in (headers or {}).items()}
+
+
+def test_body_rebuilt_only_on_version_change():
+    """Same version serves the cached bytes; a new version rebuilds"""
+    from src.response_cache import ResponseCache
+
+    cache = ResponseCache()
+    builds = []
+
+    def builder():
+        builds.append(1)
+        return {"ph": 6.1}
+
+    first = cache.get_or_build("status", (1,), builder)
+    second = cache.get_or_build("status", (1,), builder)
+    third = cache.get_or_build("status", (2,), builder)
+
+    assert first is second
+    assert len(builds) == 2
+    assert cache.hits == 1 and cache.builds == 2
+    assert third.etag == first.etag  # identical content keeps its tag
+
+
+def test_etag_changes_with_content():
+    """Different body, different ETag"""
+    from src.response_cache import ResponseCache
+
+    cache = ResponseCache()
+    a = cache.get_or_build("config", 1, lambda: {"ec_target": 1.0})
+    b = cache.get_or_build("config", 2, lambda: {"ec_target": 1.2})
+
+    assert a.etag != b.etag
+    assert a.etag.startswith('"') and a.etag.endswith('"')
+
+
+def test_failed_build_is_not_cached():
+    """A builder that raises leaves the previous body in place"""
+    import pytest
+    from src.response_cache import ResponseCache
+
+    cache = ResponseCache()
+    good = cache.get_or_build("mixing", 1, lambda: {"mixing_duration": "00:05:00"})
+
+    def broken():
+        raise ValueError("bad config")
+
+    with pytest.raises(ValueError):
+        cache.get_or_build("mixing", 2, broken)
+    assert cache.get_or_build("mixing", 1, broken) is good
+
+
+def test_etag_matching():
+    """If-None-Match accepts lists, weak tags and *"""
+    from src.response_cache import etag_matches
+
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"xyz", W/"abc"', etag)
+    assert etag_matches('*', etag)
+    assert not etag_matches('"xyz"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_conditional_response():
+    """Matching If-None-Match gets an empty 304, otherwise the cached body"""
+    from src.response_cache import ResponseCache, conditional_response
+
+    cached = ResponseCache().get_or_build("plumbing", 1, lambda: {"valve": True})
+
+    full = conditional_response(_Request(), cached)
+    assert full.status_code == 200
+    assert full.body == cached.body
+    assert full.headers["etag"] == cached.etag
+
+    not_modified = conditional_response(_Request({"If-None-Match": cached.etag}), cached)
+    assert not_modified.status_code == 304
+    assert not_modified.body == b""
+    assert not_modified.headers["etag"] == cached.etag
+
+
+def test_volatile_keys_do_not_change_the_etag():
+    """A rebuild with the same values but a new timestamp keeps body and ETag"""
+    from src.response_cache import ResponseCache
+
+    cache = ResponseCache()
+    first = cache.get_or_build("status", (1, "save-1"), lambda: {"ph": 6.1, "timestamp": "T1"},
+                               volatile_keys=("timestamp",))
+    second = cache.get_or_build("status", (1, "save-2"), lambda: {"ph": 6.1, "timestamp": "T2"},
+                                volatile_keys=("timestamp",))
+    third = cache.get_or_build("status", (1, "save-3"), lambda: {"ph": 6.2, "timestamp": "T3"},
+                               volatile_keys=("timestamp",))
+
+    assert second.etag == first.etag and second.body == first.body and b'"T1"' in second.body
+    assert third.etag != first.etag and b'"T3"' in third.body
+    assert cache.get_or_build("status", (1, "save-3"), lambda: None) is third
@@ -0,0 +1,139 @@
+"""Background sensor-scan jobs: progress, ETA, cancellation and the SSE stream"""
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from tests.fixtures.fake_clock import FakeClock
+from tests.unit.test_sensor_scanner import FakeReadResponse, make_mock_client
+
+
+def _request(**kwargs):
+    from src.sensor_scanner import ScanRequest
+    return ScanRequest(**dict({"ports": ["/dev/ttyAMA2"], "baud_rates": [9600], "addr_start": 0x01,
+                               "addr_end": 0x04, "sensor_types": ["ph"]}, **kwargs))
+
+
+def test_progress_counts_addresses_found_sensors_and_eta():
+    from src.scan_jobs import ScanJobManager
+
+    clock = FakeClock(100.0)
+    client = make_mock_client({(0x02, 0x0000, 2): FakeReadResponse(registers=[700, 250])})
+    manager = ScanJobManager(client, clock=clock, start_threads=False)
+    seen = []
+
+    def listener(job):
+        clock.now += 2.0                           # every address takes 2 s
+        seen.append(job.progress())
+    manager.add_listener(listener)
+
+    job = manager.submit(_request())
+    assert job.progress()["state"] == "queued" and job.total == 4
+    manager.run_pending()
+
+    halfway = next(p for p in seen if p["probed"] == 2)
+    assert halfway["state"] == "running" and halfway["percent"] == 50.0
+    assert halfway["current"] == {"port": "/dev/ttyAMA2", "baud_rate": 9600, "address": "0x02"}
+    assert halfway["sensors_found"] == 1 and halfway["sensors"][0]["sensor_type"] == "ph"
+    assert halfway["eta_seconds"] == pytest.approx(halfway["elapsed_seconds"])   # half done, half left
+
+    results = job.results()
+    assert results["status"] == "completed" and results["probed"] == 4
+    assert [sensor["address"] for sensor in results["sensors_found"]] == ["0x02"]
+    assert results["scan_parameters"]["addr_end"] == "0x04"
+
+
+def test_cancel_stops_before_next_probe_and_keeps_partial_results():
+    from src.scan_jobs import ScanJobManager
+
+    client = make_mock_client({(0x01, 0x0000, 2): FakeReadResponse(registers=[650, 240])})
+    manager = ScanJobManager(client, start_threads=False)
+    job = manager.submit(_request(addr_end=0x40))
+    manager.add_listener(lambda changed: changed.probed == 3 and manager.cancel(changed.id))
+
+    manager.run_pending()
+
+    assert job.state == "cancelled" and job.probed == 3
+    assert client.read_holding_registers.call_count == 3
+    assert len(job.results()["sensors_found"]) == 1
+
+
+def test_one_scan_at_a_time_and_finished_jobs_are_pruned(monkeypatch):
+    import src.scan_jobs as scan_jobs
+
+    monkeypatch.setattr(scan_jobs, "MAX_FINISHED_JOBS", 2)
+    manager = scan_jobs.ScanJobManager(make_mock_client(), start_threads=False)
+    first = manager.submit(_request(addr_end=0x01))
+    with pytest.raises(scan_jobs.ScanBusyError) as busy:
+        manager.submit(_request())
+    assert busy.value.job_id == first.id
+
+    manager.run_pending()
+    ids = [first.id]
+    for _ in range(3):
+        ids.append(manager.submit(_request(addr_end=0x01)).id)
+        manager.run_pending()
+    assert manager.get(first.id) is None                         # two finished kept besides the newest
+    assert [job.id for job in manager.jobs()] == ids[:0:-1]
+
+
+def test_scan_endpoints_stream_progress_until_done(monkeypatch):
+    import server
+    from src.scan_jobs import ScanJobManager
+    from tests.unit.test_api_workers import _call
+
+    def read(*args, **kwargs):
+        time.sleep(0.01)
+        return FakeReadResponse(error=True)
+    manager = ScanJobManager(SimpleNamespace(read_holding_registers=read))
+    monkeypatch.setattr(server, "_scan_jobs", lambda: manager)
+    server.app.dependency_overrides[server.verify_credentials] = lambda: "test"
+
+    async def scenario():
+        status, accepted = await _call(server.app, "POST", "/api/v1/scan", {
+            "ports": ["/dev/ttyAMA2"], "baud_rates": [9600], "addr_start": 1, "addr_end": 5, "sensor_types": ["ph"]})
+        busy = await _call(server.app, "POST", "/api/v1/scan", {})
+        stream = await _call_stream(server.app, accepted["events_url"])
+        results = await _call(server.app, "GET", accepted["results_url"])
+        return status, accepted, busy, stream, results
+
+    try:
+        status, accepted, busy, stream, results = asyncio.run(scenario())
+    finally:
+        server.app.dependency_overrides.clear()
+
+    assert status == 202 and accepted["total_probes"] == 5
+    assert busy[0] == 409 and busy[1]["detail"]["job_id"] == accepted["job_id"]
+    events = [(kind, json.loads(data)) for kind, data in stream]
+    assert events[-1][0] == "done" and events[-1][1]["probed"] == 5
+    assert all(kind == "progress" for kind, _ in events[:-1])
+    probed = [body["probed"] for _, body in events]
+    assert probed == sorted(probed)
+    assert results[0] == 200 and results[1]["status"] == "completed"
+
+
+async def _call_stream(app, path):
+    """GET an SSE endpoint and return its (event, data) pairs once the stream closes."""
+    chunks = []
+
+    async def receive():
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [], "client": ("10.0.0.2", 50000), "server": ("ripple", 5000),
+    }
+    await asyncio.wait_for(app(scope, receive, send), 5)
+    events = []
+    for block in b"".join(chunks).decode().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if "event" in fields:
+            events.append((fields["event"], fields["data"]))
+    return events
@@ -205,3 +205,97 @@ class TestSchedulerPersistence:
 
         # Cleanup
         scheduler.shutdown()
+
+
+@pytest.fixture
+def hybrid_scheduler(tmp_path, monkeypatch):
+    """Run the real globals.start_scheduler() against a tmp database"""
+    import src.globals as ripple_globals
+
+    db_path = str(tmp_path / "scheduler_jobs.sqlite")
+    monkeypatch.setattr(ripple_globals, 'SCHEDULER_DB_PATH', db_path)
+    monkeypatch.setattr(ripple_globals, '_scheduler_running', False)
+    monkeypatch.setattr(ripple_globals, 'scheduler', None)
+    yield ripple_globals, db_path
+    if ripple_globals.scheduler:
+        ripple_globals.scheduler.shutdown(wait=False)
+    monkeypatch.setattr(ripple_globals, '_scheduler_running', False)
+    monkeypatch.setattr(ripple_globals, 'scheduler', None)
+
+
+def _count_sqlite_writes(jobstore):
+    """Count INSERT/UPDATE/DELETE statements the jobstore sends to SQLite"""
+    from sqlalchemy import event
+
+    writes = {'count': 0}
+
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().split(' ', 1)[0].upper() in ('INSERT', 'UPDATE', 'DELETE'):
+            writes['count'] += 1
+
+    event.listen(jobstore.engine, 'after_cursor_execute', after_execute)
+    return writes
+
+
+def _run_chains_for_an_hour(scheduler):
+    """Replay one hour of nutrient (10 s on / 60 s wait) and pH (3 s / 120 s) chains"""
+    far = datetime.now() + timedelta(days=1)
+    for chain, cycles in (('nutrient', 3600 // 70), ('ph', 3600 // 123)):
+        for _ in range(cycles):
+            # start job ran and is removed, stop job added; then the same for stop -> start
+            for finished, queued in ((f'{chain}_start', f'{chain}_stop'), (f'{chain}_stop', f'{chain}_start')):
+                if scheduler.get_job(finished):
+                    scheduler.remove_job(finished)
+                scheduler.add_job('tests.unit.test_scheduler_persistence:dummy_job_function',
+                                  'date', run_date=far, id=queued, replace_existing=True)
+
+
+class TestHybridJobStores:
+    """Chain jobs in memory, cron schedules in SQLite"""
+
+    def test_chain_jobs_stay_in_memory(self, hybrid_scheduler):
+        from apscheduler.jobstores.memory import MemoryJobStore
+        from apscheduler.schedulers.base import STATE_RUNNING
+
+        ripple_globals, db_path = hybrid_scheduler
+        ripple_globals.start_scheduler()
+        scheduler = ripple_globals.scheduler
+        scheduler.add_job('tests.unit.test_scheduler_persistence:dummy_job_function', 'date',
+                          run_date=datetime.now() + timedelta(minutes=5), id='nutrient_start')
+
+        assert isinstance(scheduler._jobstores['default'], MemoryJobStore)
+        assert [j.id for j in scheduler.get_jobs(jobstore='default')] == ['nutrient_start']
+        assert [j.id for j in scheduler.get_jobs(jobstore=ripple_globals.DURABLE_JOBSTORE)] == ['weekly_system_reboot']
+        assert scheduler.state == STATE_RUNNING   # resumed after start-up cleanup
+
+    def test_persisted_chain_jobs_are_dropped_on_start(self, hybrid_scheduler):
+        """Date jobs left in SQLite by older versions do not come back next to the rebuilt chain"""
+        ripple_globals, db_path = hybrid_scheduler
+        old = create_scheduler_with_sqlite(db_path)
+        old.add_job('tests.unit.test_scheduler_persistence:dummy_job_function', 'date',
+                    run_date=datetime.now() + timedelta(hours=1), id='nutrient_start')
+        old.shutdown()
+
+        ripple_globals.start_scheduler()
+
+        assert ripple_globals.scheduler.get_job('nutrient_start') is None
+        assert ripple_globals.scheduler.get_job('weekly_system_reboot') is not None
+
+    def test_jobstore_writes_per_hour(self, hybrid_scheduler, tmp_path):
+        """Measure SQLite writes for an hour of dosing chains, all-SQLite vs hybrid"""
+        ripple_globals, db_path = hybrid_scheduler
+
+        before = create_scheduler_with_sqlite(tmp_path / "before.sqlite")
+        before_writes = _count_sqlite_writes(before._jobstores['default'])
+        _run_chains_for_an_hour(before)
+        before.shutdown()
+
+        ripple_globals.start_scheduler()
+        durable = ripple_globals.scheduler._jobstores[ripple_globals.DURABLE_JOBSTORE]
+        after_writes = _count_sqlite_writes(durable)
+        _run_chains_for_an_hour(ripple_globals.scheduler)
+
+        print(f"\nSQLite jobstore writes per hour: {before_writes['count']} all-SQLite, "
+              f"{after_writes['count']} hybrid")
+        assert before_writes['count'] > 300
+        assert after_writes['count'] == 0
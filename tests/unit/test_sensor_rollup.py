@@ -0,0 +1,171 @@
+import time
+
+import pytest
+
+
+def _store(tmp_path):
+    from src.sensor_rollup import SensorRollupStore
+    return SensorRollupStore(db_path=str(tmp_path / "rollups.db"))
+
+
+def test_ingest_updates_all_tiers(tmp_path):
+    """One reading creates one bucket in each tier"""
+    store = _store(tmp_path)
+    base = 1_700_000_000
+
+    store.ingest("ph", 6.0, timestamp=base)
+
+    tiers = store.stats()["tiers"]
+    assert tiers["1m"]["buckets"] == 1
+    assert tiers["1h"]["buckets"] == 1
+    assert tiers["1d"]["buckets"] == 1
+
+
+def test_bucket_aggregates_count_sum_min_max_last(tmp_path):
+    """Readings in the same minute fold into a single bucket"""
+    store = _store(tmp_path)
+    base = 1_700_000_040  # aligned to a minute boundary
+
+    for offset, value in enumerate([6.0, 5.5, 6.5, 6.2]):
+        store.ingest("ph", value, timestamp=base + offset)
+
+    result = store.query("ph", base, base + 59, step=60, now=base + 60)
+    assert result["tier"] == "1m"
+    assert len(result["points"]) == 1
+    point = result["points"][0]
+    assert point["count"] == 4
+    assert point["min"] == 5.5
+    assert point["max"] == 6.5
+    assert point["last"] == 6.2
+    assert point["avg"] == pytest.approx(6.05)
+
+
+def test_query_picks_coarsest_tier_for_step(tmp_path):
+    """Step selects the coarsest tier whose bucket fits"""
+    from src.sensor_rollup import select_tier
+
+    assert select_tier(None)[0] == "1m"
+    assert select_tier(30)[0] == "1m"
+    assert select_tier(300)[0] == "1m"
+    assert select_tier(3600)[0] == "1h"
+    assert select_tier(6 * 3600)[0] == "1h"
+    assert select_tier(7 * 86400)[0] == "1d"
+
+
+def test_query_merges_buckets_into_step(tmp_path):
+    """A 5 minute step merges five minute buckets"""
+    store = _store(tmp_path)
+    base = 1_700_000_100  # multiple of 300
+
+    for minute in range(10):
+        store.ingest("ec", float(minute), timestamp=base + minute * 60)
+
+    result = store.query("ec", base, base + 599, step=300, now=base + 600)
+    assert result["step"] == 300
+    assert [p["count"] for p in result["points"]] == [5, 5]
+    assert result["points"][0]["last"] == 4.0
+    assert result["points"][1]["max"] == 9.0
+
+
+def test_non_numeric_values_ignored(tmp_path):
+    """Strings, booleans and None are not rolled up"""
+    store = _store(tmp_path)
+
+    assert store.ingest("mode", "auto") is False
+    assert store.ingest("flag", True) is False
+    assert store.ingest("missing", None) is False
+    assert store.metrics() == []
+
+
+def test_ingest_measurements_payload(tmp_path):
+    """Sensor save_data payloads map to dotted metric names"""
+    store = _store(tmp_path)
+    data = {
+        "measurements": {
+            "name": "water_metrics",
+            "points": [{
+                "tags": {"sensor": "ph", "measurement": "ph", "location": "ph_main"},
+                "fields": {"value": 6.1, "temperature": 22.5, "offset": None},
+                "timestamp": "2026-01-30T10:00:00+08:00",
+            }],
+        }
+    }
+
+    assert store.ingest_measurements(data) == 2
+    assert store.metrics() == [
+        "water_metrics.ph.ph_main.temperature",
+        "water_metrics.ph.ph_main.value",
+    ]
+
+
+def test_prune_applies_per_tier_retention(tmp_path):
+    """Minute buckets expire long before day buckets"""
+    store = _store(tmp_path)
+    base = 1_700_000_000
+
+    store.ingest("ph", 6.0, timestamp=base)
+    store.prune(now=base + 30 * 86400)
+
+    tiers = store.stats()["tiers"]
+    assert tiers["1m"]["buckets"] == 0
+    assert tiers["1h"]["buckets"] == 1
+    assert tiers["1d"]["buckets"] == 1
+
+
+def test_query_moves_to_a_tier_that_still_retains_start(tmp_path):
+    """A 30-day query at a 5 minute step reads hour buckets, not 7 days of minutes"""
+    from src.sensor_rollup import select_tier
+
+    now = 1_700_000_000
+    assert select_tier(300, start=now - 86400, now=now)[0] == "1m"
+    assert select_tier(300, start=now - 30 * 86400, now=now)[0] == "1h"
+    assert select_tier(None, start=now - 365 * 86400, now=now)[0] == "1d"
+
+    store = _store(tmp_path)
+    month_ago = time.time() - 30 * 86400
+    store.ingest("ph", 6.0, timestamp=month_ago)
+    result = store.query("ph", month_ago - 3600, time.time(), step=300)
+    assert result["tier"] == "1h" and [p["count"] for p in result["points"]] == [1]
+
+
+def test_points_are_bucketed_by_their_own_timestamp(tmp_path):
+    """A late-saved point lands in the minute it was measured"""
+    from datetime import datetime, timezone
+
+    store = _store(tmp_path)
+    measured = 1_700_000_040
+    data = {"measurements": {"name": "water_metrics", "points": [{
+        "tags": {"sensor": "ec", "location": "ec_main"},
+        "fields": {"value": 1.4},
+        "timestamp": datetime.fromtimestamp(measured, timezone.utc).isoformat(),
+    }]}}
+
+    assert store.ingest_measurements(data, timestamp=measured + 600) == 1
+    points = store.query("water_metrics.ec.ec_main.value", measured, measured + 59, step=60, now=measured + 600)["points"]
+    assert [p["timestamp"] for p in points] == [measured]
+
+
+def test_relay_payload_keeps_ports_apart_and_skips_resaved_points(tmp_path):
+    """Each relay port is its own series and re-saving unchanged points adds nothing"""
+    store = _store(tmp_path)
+    measured = 1_700_000_040
+    data = {"measurements": {"name": "relay_metrics", "points": [
+        {"tags": {"relay_board": "RelayOne", "port_index": i, "port_type": "unassigned", "device": "none"},
+         "fields": {"status": i % 2, "is_assigned": False, "raw_status": i % 2},
+         "timestamp": measured}
+        for i in range(16)
+    ]}}
+
+    assert store.ingest_measurements(data, timestamp=measured) == 32
+    assert store.ingest_measurements(data, timestamp=measured) == 0
+    assert len(store.metrics()) == 32
+    assert "relay_metrics.RelayOne.0.status" in store.metrics()
+
+    data["measurements"]["points"][3]["fields"]["status"] = 0
+    data["measurements"]["points"][3]["timestamp"] = measured + 5
+    assert store.ingest_measurements(data, timestamp=measured) == 2
+
+    points = store.query("relay_metrics.RelayOne.3.status", measured, measured + 59, step=60, now=measured + 60)["points"]
+    assert [(p["count"], p["min"], p["max"], p["last"]) for p in points] == [(2, 0.0, 1.0, 0.0)]
+    points = store.query("relay_metrics.RelayOne.4.status", measured, measured + 59, step=60, now=measured + 60)["points"]
+    assert [p["count"] for p in points] == [1]
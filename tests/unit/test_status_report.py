@@ -0,0 +1,86 @@
+"""Status report rendering and dirty-driven status file writes"""
+import pytest
+
+
+def _sensor_data(ph=6.1, relay_on=True, timestamp="2026-01-30T10:00:00+08:00"):
+    return {
+        "data": {
+            "water_metrics": {
+                "ph": {"measurements": {"points": [{
+                    "tags": {"location": "ph_main"},
+                    "fields": {"value": ph, "temperature": 22.5},
+                    "timestamp": timestamp,
+                }]}},
+            },
+            "relay_metrics": {"measurements": {"points": [{
+                "tags": {"device": "MixingPump"},
+                "fields": {"status": 1 if relay_on else 0},
+                "timestamp": timestamp,
+            }]}},
+        }
+    }
+
+
+def test_extract_ignores_timestamps():
+    """Same values with a newer timestamp are not a change"""
+    from src.status_report import extract_status_values
+
+    old = extract_status_values(_sensor_data(timestamp="2026-01-30T10:00:00+08:00"))
+    new = extract_status_values(_sensor_data(timestamp="2026-01-30T10:00:10+08:00"))
+
+    assert old == new
+    assert old != extract_status_values(_sensor_data(relay_on=False))
+
+
+def test_render_contains_sections():
+    """Rendered text matches the system_status.txt layout"""
+    from src.status_report import extract_status_values, render_status
+
+    text = render_status(extract_status_values(_sensor_data()), ["pH controller: Active"])
+
+    assert "RIPPLE SYSTEM STATUS" in text
+    assert "  MixingPump: ON" in text
+    assert "  ph_main: pH 6.1 (temp: 22.5°C)" in text
+    assert "  (No EC data available)" in text
+    assert "  pH controller: Active" in text
+
+
+@pytest.fixture
+def status_controller(tmp_path, monkeypatch):
+    from main import RippleController
+    import src.helpers as helpers
+
+    state = {"data": _sensor_data()}
+    monkeypatch.setattr(helpers, "get_saved_sensor_data", lambda: state["data"])
+
+    controller = RippleController.__new__(RippleController)
+    controller.data_dir = str(tmp_path)
+    controller.sprinkler_controller = None
+    controller.nutrient_controller = None
+    controller.ph_controller = None
+    controller.mixing_controller = None
+    controller.water_level_controller = None
+    controller._last_status_values = None
+    controller._last_status_write = 0.0
+    return controller, state
+
+
+def test_status_file_written_only_on_change(status_controller):
+    """Unchanged values skip the write until a value changes"""
+    controller, state = status_controller
+
+    assert controller.write_status_file() is True
+    assert controller.write_status_file() is False
+
+    state["data"] = _sensor_data(ph=6.4)
+    assert controller.write_status_file() is True
+
+
+def test_status_file_refreshed_after_max_interval(status_controller, monkeypatch):
+    """Unchanged values are still rewritten after the max refresh interval"""
+    import src.status_report as status_report
+    controller, _ = status_controller
+
+    assert controller.write_status_file() is True
+    monkeypatch.setattr(status_report, "STATUS_MAX_REFRESH_SECONDS", 0)
+    assert controller.write_status_file() is True
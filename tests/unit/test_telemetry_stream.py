@@ -0,0 +1,220 @@
+"""Live telemetry stream: topic filters, slow-consumer drops, file watcher and subscriber load"""
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+
+def _frames_to_events(frames):
+    events = []
+    for block in b"".join(frames).decode().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if "event" in fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_subscribers_only_get_their_topics():
+    from src.telemetry_stream import TelemetryHub
+
+    async def scenario():
+        hub = TelemetryHub()
+        loop = asyncio.get_running_loop()
+        readings = hub.subscribe(["reading"], loop)
+        everything = hub.subscribe(None, loop)
+        hub.publish("reading", {"metric": "water_metrics.ph", "fields": {"value": 6.1}})
+        hub.publish("mode", {"mode": "passive"})
+        assert hub.publish("alarm", {"action": "ph_above_maximum"}) == 1
+        return await readings.next_frames(1), await everything.next_frames(1)
+
+    readings, everything = asyncio.run(scenario())
+    assert [kind for kind, _ in _frames_to_events(readings)] == ["reading"]
+    assert [kind for kind, _ in _frames_to_events(everything)] == ["reading", "mode", "alarm"]
+    assert b"id: 1\nevent: reading\n" in readings[0]
+
+    with pytest.raises(ValueError):
+        TelemetryHub().subscribe(["weather"], None)
+
+
+def test_slow_consumer_is_dropped_without_affecting_others():
+    from src.telemetry_stream import TelemetryHub
+
+    async def scenario():
+        hub = TelemetryHub(queue_size=4)
+        loop = asyncio.get_running_loop()
+        slow, fast = hub.subscribe(["relay"], loop), hub.subscribe(["relay"], loop)
+        received = []
+        for status in range(10):
+            hub.publish("relay", {"device": "MixingPump", "status": status % 2})
+            received.extend(await fast.next_frames(1))
+        return hub, slow, received, await slow.next_frames(1)
+
+    hub, slow, received, leftover = asyncio.run(scenario())
+    assert slow.dropped and leftover == []
+    assert len(_frames_to_events(received)) == 10
+    assert hub.stats()["dropped_clients"] == 1 and hub.stats()["subscribers"] == 1
+
+
+class FakeAudit:
+    def __init__(self):
+        self.rows = [{"rowid": 3, "event_type": "alarm", "action": "old_alarm"}]
+
+    def last_rowid(self):
+        return self.rows[-1]["rowid"]
+
+    def get_since(self, after_rowid, event_type=None, limit=100):
+        return [dict(row) for row in self.rows if row["rowid"] > after_rowid][:limit]
+
+
+def _sensor_file(path, ph, timestamp, relay_status, relay_timestamp):
+    path.write_bytes(orjson.dumps({"data": {
+        "water_metrics": {"ph": {"measurements": {"name": "water_metrics", "points": [{
+            "tags": {"sensor": "ph", "location": "ph_main"},
+            "fields": {"value": ph}, "timestamp": timestamp}]}}},
+        "relay_metrics": {"measurements": {"name": "relay_metrics", "points": [
+            {"tags": {"relay_board": "RelayOne", "port_index": port, "device": device},
+             "fields": {"status": relay_status if port == 0 else 0}, "timestamp": relay_timestamp}
+            for port, device in enumerate(["MixingPump", "SprinklerA"])]}},
+    }}))
+
+
+def test_watcher_publishes_changed_readings_relays_and_alarms(tmp_path):
+    from src.telemetry_stream import TelemetryHub, TelemetryWatcher
+
+    data = tmp_path / "saved_sensor_data.json"
+    _sensor_file(data, 6.1, "T1", 0, "T1")
+    audit = FakeAudit()
+
+    async def scenario():
+        hub = TelemetryHub()
+        watcher = TelemetryWatcher(hub, str(data), audit)
+        subscriber = hub.subscribe(None, asyncio.get_running_loop())
+        assert watcher.poll() == 0                         # baseline, nothing old is replayed
+        assert watcher.poll() == 0                         # file unchanged: not even parsed
+        _sensor_file(data, 6.3, "T2", 1, "T2")
+        audit.rows.append({"rowid": 4, "event_type": "alarm", "action": "ph_above_maximum"})
+        assert watcher.poll() == 3
+        _sensor_file(data, 6.3, "T2", 1, "T3")             # relay timestamp refresh only
+        assert watcher.poll() == 0
+        return await subscriber.next_frames(1)
+
+    events = _frames_to_events(asyncio.run(scenario()))
+    assert events == [
+        ("reading", {"metric": "water_metrics.ph", "tags": {"sensor": "ph", "location": "ph_main"},
+                     "fields": {"value": 6.3}, "timestamp": "T2"}),
+        ("relay", {"device": "MixingPump", "relay_board": "RelayOne", "port_index": 0,
+                   "status": 1, "timestamp": "T2"}),
+        ("alarm", {"event_type": "alarm", "action": "ph_above_maximum"}),
+    ]
+
+
+def test_controller_mode_changes_reach_mode_subscribers(tmp_path, monkeypatch):
+    """A heartbeat timeout happens in main.py; the watcher picks it up for the stream"""
+    import server
+    from src.telemetry_stream import TelemetryHub, TelemetryWatcher
+
+    hub = TelemetryHub()
+    calls = []
+    controller_mode = ["passive"]
+    monkeypatch.setattr(server, "_telemetry", lambda: hub)
+    monkeypatch.setattr(server, "_current_mode", "passive")
+    monkeypatch.setattr(server, "_controller", lambda: SimpleNamespace(
+        call=lambda method, **kwargs: calls.append(method) or {"mode": controller_mode[0]}))
+
+    async def scenario():
+        watcher = TelemetryWatcher(hub, str(tmp_path / "missing.json"), mode_source=server._sync_mode_from_controller)
+        assert watcher.poll() == 0 and calls == []         # nobody listening: controller not asked
+        subscriber = hub.subscribe({"mode"}, asyncio.get_running_loop())
+        assert watcher.poll() == 0                         # unchanged
+        controller_mode[0] = "autonomous"
+        assert watcher.poll() == 1
+        assert watcher.poll() == 0
+        return await subscriber.next_frames(1)
+
+    events = _frames_to_events(asyncio.run(scenario()))
+    assert [(topic, data["mode"], data["previous"]) for topic, data in events] == [("mode", "autonomous", "passive")]
+    assert server.get_mode() == "autonomous"
+
+
+async def _open_stream(app, query, chunks, disconnect):
+    async def receive():
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/api/v1/stream", "raw_path": b"/api/v1/stream", "root_path": "",
+        "query_string": query.encode(), "headers": [], "client": ("10.0.0.2", 50000),
+        "server": ("ripple", 5000),
+    }
+    await app(scope, receive, send)
+
+
+@pytest.fixture
+def stream_api(monkeypatch):
+    import server
+    from src.telemetry_stream import TelemetryHub
+
+    hub = TelemetryHub()
+    monkeypatch.setattr(server, "_telemetry", lambda: hub)
+    monkeypatch.setattr(server, "audit", None)
+    server.app.dependency_overrides[server.verify_credentials] = lambda: "test"
+    yield server, hub
+    server.app.dependency_overrides.clear()
+
+
+def test_twenty_stream_subscribers_cost_negligible_cpu(stream_api):
+    server, hub = stream_api
+    clients, events = 20, 200
+
+    async def scenario():
+        disconnect = asyncio.Event()
+        chunks = [[] for _ in range(clients)]
+        tasks = [asyncio.ensure_future(_open_stream(server.app, "topics=reading,mode", chunks[i], disconnect))
+                 for i in range(clients)]
+        while hub.stats()["subscribers"] < clients:
+            await asyncio.sleep(0.01)
+
+        idle_started = time.process_time()
+        await asyncio.sleep(0.5)
+        idle_cpu = time.process_time() - idle_started
+
+        busy_started = time.process_time()
+        for n in range(events):
+            hub.publish("reading", {"metric": "water_metrics.ph", "fields": {"value": 6.0 + n / 1000},
+                                    "timestamp": f"T{n}"})
+            hub.publish("relay", {"device": "MixingPump", "status": n % 2})     # nobody asked for it
+            await asyncio.sleep(0)
+        server.set_mode("autonomous" if server.get_mode() == "passive" else "passive")
+        while any(b"event: mode" not in b"".join(chunk) for chunk in chunks):
+            await asyncio.sleep(0.01)
+        busy_cpu = time.process_time() - busy_started
+
+        disconnect.set()
+        await asyncio.wait_for(asyncio.gather(*tasks), 5)
+        return chunks, idle_cpu, busy_cpu
+
+    chunks, idle_cpu, busy_cpu = asyncio.run(scenario())
+
+    for chunk in chunks:
+        kinds = [kind for kind, _ in _frames_to_events(chunk)]
+        assert kinds.count("reading") == events and kinds[-1] == "mode" and "relay" not in kinds
+    assert hub.stats() == {"subscribers": 0, "published": events + 1, "dropped_clients": 0,
+                           "queue_size": hub.stats()["queue_size"]}
+    assert idle_cpu < 0.05                                   # idle subscribers do not spin
+    assert busy_cpu / (clients * events) < 250e-6            # well under a millisecond per delivery
+
+
+def test_stream_rejects_unknown_topics(stream_api):
+    server, _ = stream_api
+    from tests.unit.test_api_workers import _call
+
+    status, body = asyncio.run(_call(server.app, "GET", "/api/v1/stream", query="topics=reading,weather"))
+    assert status == 400 and "weather" in body["detail"]